@@ -4,7 +4,7 @@ import flet_map as map
 from typing import TYPE_CHECKING
 
 from config import LOCATION_GRAND_HOTEL, LOCATION_TAIPEI_101, LOCATION_TAIPEI_CITY_HALL, USER_DASHBOARD_MAP_TEMPLATE, MAP_ROUTING_CITYHALL_101, MAP_ROUTING_101_GRAND_HOTEL
-from config import WINDOW_HEIGHT, WINDOW_WIDTH, SCAN_RESULT_LSIT
+from config import WINDOW_HEIGHT, WINDOW_WIDTH
 from constants import *
 
 if TYPE_CHECKING:
@@ -310,10 +310,10 @@ def build_scan_view(app_instance: 'App') -> ft.View:
 def build_scan_results_view(app_instance: 'App') -> ft.View:
     
     logger.info("Building Scan Results View")
-    scan_result_text = ""
-    for baggage in SCAN_RESULT_LSIT:
-        scan_result_text += f"{baggage['size']}吋{baggage['color']}{baggage['type']} {baggage['quantity']} 件\n"
-    app_instance.scan_results = len(SCAN_RESULT_LSIT)
+    scan = app_instance.scan_result()
+    scan_items = scan.items
+    scan_result_text = scan.to_text()
+    app_instance.scan_results = len(scan_items)
     
     return ft.View(
         route="/app/driver/scan_results",
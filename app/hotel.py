@@ -2,7 +2,7 @@ import logging
 import flet as ft
 from typing import TYPE_CHECKING
 
-from config import WINDOW_HEIGHT, WINDOW_WIDTH, SCAN_RESULT_LSIT
+from config import WINDOW_HEIGHT, WINDOW_WIDTH
 from constants import *
 
 if TYPE_CHECKING:
@@ -36,8 +36,7 @@ def build_hotel_view(app_instance: 'App') -> ft.View:
 
 
     logger.info("Building Hotel View")
-    
-
+    stats = app_instance.hotel_controller.get_dashboard_stats()
 
     return ft.View(
         route="/app/user/hotel",
@@ -55,8 +54,9 @@ def build_hotel_view(app_instance: 'App') -> ft.View:
                         width=WINDOW_WIDTH,
                         opacity=0.7
                     ),
-                    ft.Text(f"當前行李容量： {app_instance.hotel_baggages} 件 / 180 件", size=20, weight=ft.FontWeight.BOLD, color=ft.Colors.BLACK),
-                    ft.Text(f"當前尚未抵達旅客： {app_instance.hotel_not_arrived_customer} 組", size=20, weight=ft.FontWeight.BOLD, color=ft.Colors.BLACK)
+                    ft.Text(f"當前行李容量： {stats['baggage_count']} 件 / {stats['baggage_capacity']} 件", size=20, weight=ft.FontWeight.BOLD, color=ft.Colors.BLACK),
+                    ft.Text(f"今日預計抵達： {stats['inbound_trips']} 組 ({stats['inbound_luggage']} 件行李)", size=20, weight=ft.FontWeight.BOLD, color=ft.Colors.BLACK),
+                    ft.Text(f"當前尚未抵達旅客： {stats['not_arrived']} 組", size=20, weight=ft.FontWeight.BOLD, color=ft.Colors.BLACK)
                 ],
                 
             ),
@@ -123,13 +123,26 @@ def build_scan_view(app_instance: 'App') -> ft.View:
                         alignment=ft.alignment.center,
                     ),
                     ft.Container(
-                        content=ft.ElevatedButton(
-                            text="掃描行李",
-                            icon=ft.Icons.CAMERA,
-                            height=60,
-                            on_click=app_instance.handle_hotel_scan_start,
-                            color=ft.Colors.WHITE,
-                            bgcolor=ft.Colors.GREEN,
+                        content=ft.Row(
+                            controls=[
+                                ft.ElevatedButton(
+                                    text="掃描行李",
+                                    icon=ft.Icons.CAMERA,
+                                    height=60,
+                                    on_click=app_instance.handle_hotel_scan_start,
+                                    color=ft.Colors.WHITE,
+                                    bgcolor=ft.Colors.GREEN,
+                                ),
+                                ft.ElevatedButton(
+                                    text="團體批次",
+                                    icon=ft.Icons.PHOTO_LIBRARY,
+                                    height=60,
+                                    on_click=app_instance.handle_hotel_batch_scan_start,
+                                    color=ft.Colors.WHITE,
+                                    bgcolor=ft.Colors.TEAL,
+                                ),
+                            ],
+                            alignment=ft.MainAxisAlignment.CENTER,
                         ),
                         alignment=ft.alignment.bottom_center,
                         padding=50
@@ -145,12 +158,15 @@ def build_scan_view(app_instance: 'App') -> ft.View:
 def build_scan_results_view(app_instance: 'App') -> ft.View:
     
     logger.info("Building Scan Results View")
-    scan_result_text = ""
-    for baggage in SCAN_RESULT_LSIT:
-        scan_result_text += f"{baggage['size']}吋{baggage['color']}{baggage['type']} {baggage['quantity']} 件\n"
-    app_instance.scan_results = len(SCAN_RESULT_LSIT)
-    app_instance.hotel_baggages += 5
-    app_instance.hotel_not_arrived_customer += 1
+    scan = app_instance.scan_result()
+    scan_items = scan.items
+    scan_result_text = scan.to_text()
+    app_instance.scan_results = len(scan_items)
+
+    def handle_check_in(e):
+        if not app_instance.hotel_controller.check_in_baggage(scan_items):
+            logger.warning("行李 check-in 失敗 (容量不足)")
+        app_instance.page.go("/app/hotel")
     
     return ft.View(
         route="/app/hotel/scan_results",
@@ -204,7 +220,7 @@ def build_scan_results_view(app_instance: 'App') -> ft.View:
                                             height=50,
                                             bgcolor=ft.Colors.GREEN_100,
                                             color=ft.Colors.GREEN_800,
-                                            on_click=lambda _: app_instance.page.go("/app/hotel"),
+                                            on_click=handle_check_in,
                                             expand=True,
                                         )
                                     ]
@@ -219,4 +235,86 @@ def build_scan_results_view(app_instance: 'App') -> ft.View:
                 spacing=0
             )
         ]
-    )
\ No newline at end of file
+    )
+
+def build_batch_scan_results_view(app_instance: 'App') -> ft.View:
+    
+    logger.info("Building Batch Scan Results View")
+    batch = app_instance.last_batch_scan
+    if batch is None:
+        return ft.View(
+            route="/app/hotel/batch_scan_results",
+            controls=[ft.Text("尚未進行批次掃描。")],
+            appbar=ft.AppBar(title=ft.Text("批次掃描結果"), leading=ft.IconButton(icon=ft.Icons.CLOSE, on_click=lambda _: app_instance.page.go("/app/hotel/scan")))
+        )
+
+    scan_result_text = ""
+    for luggage in batch.luggage_items():
+        scan_result_text += f"{luggage.size}吋行李 {luggage.quantity} 件\n"
+    summary_text = (
+        f"{len(batch.results)} 張照片，共 {batch.total} 件行李"
+        f"{f' (略過 {batch.duplicates} 張重複照片)' if batch.duplicates else ''}\n"
+        f"辨識耗時 {batch.seconds:.1f} 秒，約每分鐘 {batch.bags_per_minute:.0f} 件"
+    )
+    app_instance.scan_results = batch.total
+
+    def handle_check_in(e):
+        # 整批行李在單一交易中入庫
+        if not app_instance.hotel_controller.check_in_baggage(batch.items, reference="batch-scan"):
+            logger.warning("批次 check-in 失敗 (容量不足)")
+        app_instance.last_batch_scan = None
+        app_instance.page.go("/app/hotel")
+
+    return ft.View(
+        route="/app/hotel/batch_scan_results",
+        bgcolor=ft.Colors.BLACK,
+        appbar=ft.AppBar(
+            title=ft.Text("批次掃描結果", color=ft.Colors.BLACK), 
+            bgcolor=COLOR_BRAND_YELLOW, 
+            leading=ft.IconButton(
+                icon=ft.Icons.ARROW_BACK, 
+                on_click=lambda _: app_instance.page.go("/app/hotel/scan"), 
+                icon_color=ft.Colors.WHITE
+            )
+        ),
+        controls=[
+            ft.Container(
+                padding=10,
+                bgcolor=COLOR_BG_LIGHT_TAN,
+                border_radius=ft.BorderRadius(top_left=10, top_right=10, bottom_left=10, bottom_right=10),
+                content=ft.Column(
+                    controls=[
+                        ft.Text("批次掃描結果", size=20, weight=ft.FontWeight.BOLD, color=COLOR_TEXT_DARK),
+                        ft.Text(summary_text, size=14, color=ft.Colors.GREY_700),
+                        ft.Text(scan_result_text, size=14, color=ft.Colors.GREY_800),
+                        ft.Text("確認無誤後整批 check-in。", size=16, color=COLOR_TEXT_DARK),
+                        ft.Divider(height=10, color=ft.Colors.TRANSPARENT),
+                        ft.Row(
+                            controls=[
+                                ft.ElevatedButton(
+                                    text="返回",
+                                    icon=ft.Icons.CANCEL,
+                                    height=50,
+                                    bgcolor=ft.Colors.RED_100,
+                                    color=ft.Colors.RED_800,
+                                    on_click=lambda _: app_instance.page.go("/app/hotel/scan"),
+                                    expand=True,
+                                ),
+                                ft.ElevatedButton(
+                                    text="整批 Check-in",
+                                    icon=ft.Icons.CHECK_CIRCLE,
+                                    height=50,
+                                    bgcolor=ft.Colors.GREEN_100,
+                                    color=ft.Colors.GREEN_800,
+                                    on_click=handle_check_in,
+                                    expand=True,
+                                )
+                            ]
+                        )
+                    ],
+                    scroll=ft.ScrollMode.ADAPTIVE
+                ),
+                expand=True
+            )
+        ]
+    )
@@ -1,29 +1,59 @@
 import flet as ft
+import importlib
 import logging
 from typing import TYPE_CHECKING
 
+from app.view_cache import ViewCache
+from metrics import ROUTE_BUILD_SECONDS, Metrics
+from services.order_event_bus import OrderEventBus
+
 # --- View 匯入 ---
-from views.login.splash_view import build_splash_view
-from views.login.login_view import build_login_view
-from views.login.splash_view_to_user import build_splash_to_user_view
-from views.login.splash_view_to_user2 import build_splash_to_user_view2
-from views.login.splash_view_to_driver import build_splash_to_driver_view
-from views.login.splash_view_to_hotel import build_splash_to_hotel_view
-
-from views.user.user_home_page_content import build_dashboard_view
-from views.user.user_home_page_more_content import build_more_view
-from views.user.user_instant_booking import build_instant_booking_view
-from views.user.user_previous_booking import build_previous_booking_view
-from views.user.user_supporting import build_support_view
-from views.user.map_view import build_map_view
-from views.user.user_history_refactored import build_history_view
-from views.user.user_vehicle_selection import build_vehicle_selection_view
-
-# --- 從 app/ 子模組匯入 ---
-from app.user import build_user_tracking_view
-from app.scan import build_scan_view, build_scan_results_view
-from app.driver import build_driver_home_view, build_driver_tracking_view_101, build_driver_tracking_view_hotel, build_scan_view as build_driver_scan_view, build_scan_results_view as build_driver_scan_results_view
-from app.hotel import build_hotel_view, build_scan_view as build_hotel_scan_view, build_scan_results_view as build_hotel_scan_results_view
+# 各 View 模組在第一次進入對應路由時才匯入，啟動時只載入路由表本身
+
+
+def _lazy_view(module_path: str, func_name: str):
+    """回傳一個第一次呼叫時才匯入模組的 View 建立函式"""
+    builder = None
+
+    def load(*args, **kwargs):
+        nonlocal builder
+        if builder is None:
+            builder = getattr(importlib.import_module(module_path), func_name)
+        return builder(*args, **kwargs)
+
+    load.__name__ = func_name
+    return load
+
+
+build_splash_view = _lazy_view("views.login.splash_view", "build_splash_view")
+build_login_view = _lazy_view("views.login.login_view", "build_login_view")
+build_splash_to_user_view = _lazy_view("views.login.splash_view_to_user", "build_splash_to_user_view")
+build_splash_to_user_view2 = _lazy_view("views.login.splash_view_to_user2", "build_splash_to_user_view2")
+build_splash_to_driver_view = _lazy_view("views.login.splash_view_to_driver", "build_splash_to_driver_view")
+build_splash_to_hotel_view = _lazy_view("views.login.splash_view_to_hotel", "build_splash_to_hotel_view")
+
+build_dashboard_view = _lazy_view("views.user.user_home_page_content", "build_dashboard_view")
+build_more_view = _lazy_view("views.user.user_home_page_more_content", "build_more_view")
+build_instant_booking_view = _lazy_view("views.user.user_instant_booking", "build_instant_booking_view")
+build_previous_booking_view = _lazy_view("views.user.user_previous_booking", "build_previous_booking_view")
+build_support_view = _lazy_view("views.user.user_supporting", "build_support_view")
+build_map_view = _lazy_view("views.user.map_view", "build_map_view")
+build_history_view = _lazy_view("views.user.user_history_refactored", "build_history_view")
+build_vehicle_selection_view = _lazy_view("views.user.user_vehicle_selection", "build_vehicle_selection_view")
+
+# --- app/ 子模組 ---
+build_user_tracking_view = _lazy_view("app.user", "build_user_tracking_view")
+build_scan_view = _lazy_view("app.scan", "build_scan_view")
+build_scan_results_view = _lazy_view("app.scan", "build_scan_results_view")
+build_driver_home_view = _lazy_view("app.driver", "build_driver_home_view")
+build_driver_tracking_view_101 = _lazy_view("app.driver", "build_driver_tracking_view_101")
+build_driver_tracking_view_hotel = _lazy_view("app.driver", "build_driver_tracking_view_hotel")
+build_driver_scan_view = _lazy_view("app.driver", "build_scan_view")
+build_driver_scan_results_view = _lazy_view("app.driver", "build_scan_results_view")
+build_hotel_view = _lazy_view("app.hotel", "build_hotel_view")
+build_hotel_scan_view = _lazy_view("app.hotel", "build_scan_view")
+build_hotel_scan_results_view = _lazy_view("app.hotel", "build_scan_results_view")
+build_hotel_batch_scan_results_view = _lazy_view("app.hotel", "build_batch_scan_results_view")
 
 
 if TYPE_CHECKING:
@@ -31,11 +61,41 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+def _route_label(route: str) -> str:
+    """指標用的路由標籤：帶有動態片段的路由合併為同一個標籤，未知路由一律記為 other"""
+    if route.startswith("/app/user/map/"):
+        return "/app/user/map/*"
+    if route.startswith("/login/"):
+        return "/login/*"
+    if route.startswith(("/app/", "/splash")):
+        return route
+    return "other"
+
 def create_route_handler(app_instance: 'App'):
     """
     這是一個「工廠函式」。
     它接收 App 實例，並「返回」一個 Flet 可以使用的路由處理函式。
     """
+    # --- 可快取的 View：返回時重新掛上既有的控制項樹，不重新載入資料 ---
+    view_cache = ViewCache(app_instance)
+    view_cache.register("/app/user/dashboard", build_dashboard_view)
+    view_cache.register("/app/user/more", build_more_view)
+    view_cache.register("/app/user/support", build_support_view)
+    # 事先預約的兩個路由共用同一個 View，狀態保存在 controller
+    view_cache.register(
+        "/app/user/previous_booking",
+        build_previous_booking_view,
+        controller_attr="previous_booking_controller",
+    )
+    # 顯示中的歷史列表由 HistoryController 就地更新；不在畫面上時遇到訂單變更就重建，
+    # 以免新訂單只被插在最前面而沒有依時間排序
+    view_cache.register(
+        "/app/user/history",
+        build_history_view,
+        controller_attr="history_controller",
+        invalidate_on=(OrderEventBus.INSERT, OrderEventBus.UPDATE, OrderEventBus.CANCEL),
+    )
+    app_instance.view_cache = view_cache
 
     def on_route_change(route_event): # <--- 這才是 Flet 實際呼叫的函式
         """
@@ -44,7 +104,10 @@ def create_route_handler(app_instance: 'App'):
         """
         page = app_instance.page
         logger.info(f"Navigating to route: {page.route}")
-        
+        with Metrics.timer(ROUTE_BUILD_SECONDS, route=_route_label(page.route)):
+            build_route(page)
+
+    def build_route(page):
         if page.route == "/app/user/map" or page.route == "/app/user/instant_booking":
             page.update()
         else:
@@ -71,25 +134,25 @@ def create_route_handler(app_instance: 'App'):
         elif page.route == "/app/user":
             page.go("/app/user/dashboard")
         elif page.route == "/app/user/dashboard":
-            page.views.append(build_dashboard_view(app_instance))
+            page.views.append(view_cache.get("/app/user/dashboard"))
         elif page.route == "/app/user/more":
-            page.views.append(build_more_view(app_instance))
+            page.views.append(view_cache.get("/app/user/more"))
         elif page.route == "/app/user/instant_booking":
             page.views.append(build_instant_booking_view(app_instance))
         elif page.route == "/app/user/confirm_order":
             page.views.append(build_instant_booking_view(app_instance))
         elif page.route == "/app/user/previous_booking":
-            page.views.append(build_previous_booking_view(app_instance))
+            page.views.append(view_cache.get("/app/user/previous_booking"))
         elif page.route == "/app/user/previous_booking_confirm":
-            page.views.append(build_previous_booking_view(app_instance))
+            page.views.append(view_cache.get("/app/user/previous_booking"))
         elif page.route == "/app/user/support":
-            page.views.append(build_support_view(app_instance))
+            page.views.append(view_cache.get("/app/user/support"))
         elif page.route == "/app/user/scan":
             page.views.append(build_scan_view(app_instance))
         elif page.route == "/app/user/scan_results":
             page.views.append(build_scan_results_view(app_instance))
         elif page.route == "/app/user/history":
-            page.views.append(build_history_view(app_instance))
+            page.views.append(view_cache.get("/app/user/history"))
         elif page.route == "/app/user/vehicle_selection":
             page.views.append(build_vehicle_selection_view(app_instance))
         elif page.route.startswith("/app/user/map/"):
@@ -122,6 +185,8 @@ def create_route_handler(app_instance: 'App'):
             page.views.append(build_hotel_scan_view(app_instance))
         elif page.route == "/app/hotel/scan_results":
             page.views.append(build_hotel_scan_results_view(app_instance))
+        elif page.route == "/app/hotel/batch_scan_results":
+            page.views.append(build_hotel_batch_scan_results_view(app_instance))
         
         # --- 預設 (未登入) ---
         else:
@@ -2,7 +2,7 @@ import logging
 import flet as ft
 from typing import TYPE_CHECKING
 
-from config import WINDOW_HEIGHT, WINDOW_WIDTH, SCAN_RESULT_LSIT
+from config import WINDOW_HEIGHT, WINDOW_WIDTH
 from constants import *
 
 if TYPE_CHECKING:
@@ -66,10 +66,10 @@ def build_scan_view(app_instance: 'App') -> ft.View:
 def build_scan_results_view(app_instance: 'App') -> ft.View:
     
     logger.info("Building Scan Results View")
-    scan_result_text = ""
-    for baggage in SCAN_RESULT_LSIT:
-        scan_result_text += f"{baggage['size']}吋{baggage['color']}{baggage['type']} {baggage['quantity']} 件\n"
-    app_instance.scan_results = len(SCAN_RESULT_LSIT)
+    scan = app_instance.scan_result()
+    scan_items = scan.items
+    scan_result_text = scan.to_text()
+    app_instance.scan_results = len(scan_items)
     
     return ft.View(
         route="/app/user/scan_results",
@@ -0,0 +1,173 @@
+"""
+View Cache
+路由 View 的生命週期管理：依 (工作階段, 路由) 快取已建立的 View，
+返回時直接重新掛上既有的控制項樹，相關狀態變更時才標記失效並重建
+"""
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import flet as ft
+
+from services.order_event_bus import OrderEvent, OrderEventBus
+
+if TYPE_CHECKING:
+    from main import App
+
+logger = logging.getLogger(__name__)
+
+ViewBuilder = Callable[['App'], ft.View]
+SessionKey = Tuple[Optional[str], Optional[str]]
+
+
+@dataclass
+class CachedView:
+    """一個已建立的 View 與重新掛上時需要還原的狀態"""
+
+    view: ft.View
+    controller: Any = None
+    binding: Any = None
+    nav_indexes: List[Tuple[ft.NavigationBar, Optional[int]]] = field(default_factory=list)
+    stale: bool = False
+
+
+@dataclass
+class ViewSpec:
+    builder: ViewBuilder
+    controller_attr: Optional[str] = None
+    invalidate_on: frozenset = frozenset()
+
+
+class ViewCache:
+    """
+    View 快取
+
+    - 只快取 register() 過的路由，其餘路由照舊每次重建
+    - 登入身分 (role, email) 改變時整批清除
+    - View 建立時綁定到 controller 的 ViewUpdater 會被記住，重新掛上時再綁回去
+    - 訂閱訂單事件：未掛在畫面上的 View 遇到 invalidate_on 中的事件即標記失效，
+      下次進入時重建；目前顯示中的 View 由其 controller 就地更新
+    """
+
+    def __init__(self, app_instance: 'App'):
+        self.app = app_instance
+        self._specs: Dict[str, ViewSpec] = {}
+        self._entries: Dict[str, CachedView] = {}
+        self._session: Optional[SessionKey] = None
+        self._lock = threading.Lock()
+        self._subscription = None
+        self.hits = 0
+        self.misses = 0
+
+    def register(
+        self,
+        key: str,
+        builder: ViewBuilder,
+        controller_attr: Optional[str] = None,
+        invalidate_on: Iterable[str] = (),
+    ) -> None:
+        """
+        登記可快取的 View
+
+        Args:
+            key: 快取鍵 (通常為路由；多個路由共用同一個 View 時使用同一個鍵)
+            builder: View 建立函式
+            controller_attr: View 建立時會 bind_view 的 controller 在 App 上的屬性名稱
+            invalidate_on: 會讓此 View 失效的訂單事件種類 (OrderEventBus.INSERT / UPDATE / CANCEL)
+        """
+        spec = ViewSpec(builder, controller_attr, frozenset(invalidate_on))
+        self._specs[key] = spec
+        if spec.invalidate_on and self._subscription is None:
+            # 只標記失效旗標，成本極低，直接在發布者執行緒中處理
+            self._subscription = OrderEventBus.subscribe(self._on_order_event, name="view_cache", sync=True)
+
+    def is_cached(self, key: str) -> bool:
+        return key in self._specs
+
+    def get(self, key: str) -> ft.View:
+        """取得 View：命中時重新掛上既有的控制項樹，否則建立並快取"""
+        spec = self._specs[key]
+        with self._lock:
+            session = self._session_key()
+            if session != self._session:
+                self._entries.clear()
+                self._session = session
+            entry = self._entries.get(key)
+
+        if entry is not None and not entry.stale:
+            self.hits += 1
+            self._remount(entry)
+            logger.debug("View 快取命中: %s", key)
+            return entry.view
+
+        self.misses += 1
+        entry = self._build(spec)
+        with self._lock:
+            self._entries[key] = entry
+        logger.debug("View 已建立並快取: %s", key)
+        return entry.view
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """使指定 (或全部) View 失效"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """清除所有快取的 View"""
+        self.invalidate()
+
+    def close(self) -> None:
+        """Session 結束時呼叫：清除快取並取消訂單事件訂閱"""
+        if self._subscription is not None:
+            self._subscription.close()
+            self._subscription = None
+        self.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"cached": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    # ------------------ 內部工具 ------------------
+    def _session_key(self) -> SessionKey:
+        page = self.app.page
+        session = getattr(page, "session", None)
+        if session is None:
+            return (None, None)
+        return (session.get("role"), session.get("email"))
+
+    def _build(self, spec: ViewSpec) -> CachedView:
+        view = spec.builder(self.app)
+        controller = getattr(self.app, spec.controller_attr, None) if spec.controller_attr else None
+        return CachedView(
+            view=view,
+            controller=controller,
+            binding=getattr(controller, "view", None),
+            nav_indexes=[(bar, bar.selected_index) for bar in self._navigation_bars(view)],
+        )
+
+    @staticmethod
+    def _navigation_bars(view: ft.View) -> List[ft.NavigationBar]:
+        candidates = [view.navigation_bar, *view.controls]
+        return [c for c in candidates if isinstance(c, ft.NavigationBar)]
+
+    @staticmethod
+    def _remount(entry: CachedView) -> None:
+        # 離開頁面時點選的導航項目會留在舊的導航列上，還原成此頁的項目
+        for bar, index in entry.nav_indexes:
+            bar.selected_index = index
+        if entry.controller is not None and entry.binding is not None:
+            entry.controller.bind_view(entry.binding)
+
+    def _on_order_event(self, event: OrderEvent) -> None:
+        page = self.app.page
+        mounted = list(getattr(page, "views", None) or [])
+        with self._lock:
+            for key, entry in self._entries.items():
+                if event.kind not in self._specs[key].invalidate_on:
+                    continue
+                if any(view is entry.view for view in mounted):
+                    continue
+                entry.stale = True
@@ -0,0 +1,188 @@
+"""
+Booking API Benchmark
+量測 HTTP 預約 API (services/booking_api.py) 對儲存層的吞吐量 (requests/s 與每秒建立的行程數)
+
+    quote             POST /quote，keep-alive (不碰資料檔)
+    trip-close        POST /trips，每個請求新建連線 (Connection: close)
+    trip-keepalive    POST /trips，keep-alive
+    trip-batch        POST /trips/batch，每個請求 --batch 筆行程
+    orders            GET /orders 第一頁，keep-alive
+
+伺服器在背景執行緒的事件迴圈中執行，資料檔為 benchmarks.datasets 產生的合成資料集 (暫存目錄)，
+因此每次建立行程的成本隨 --orders 增加 (JSON 資料檔整份讀寫)。
+
+執行方式 (於專案根目錄):
+    python -m benchmarks.bench_booking_api --orders 1000 --connections 8 --requests 400
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.datasets import BENCH_USER_EMAIL, random_coordinate, write_dataset
+from services.booking_api import BookingApiServer
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class _Client:
+    """最小的 HTTP/1.1 用戶端 (依 Content-Length 讀取回應)"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(self, method: str, path: str, payload: Any = None, keep_alive: bool = True) -> Tuple[int, Any]:
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        head = (
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        self._writer.write(head.encode("latin-1") + body)
+        await self._writer.drain()
+
+        response_head = (await self._reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+        status = int(response_head.split(" ", 2)[1])
+        length = 0
+        for line in response_head.split("\r\n")[1:]:
+            name, _, value = line.partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        data = json.loads(await self._reader.readexactly(length)) if length else None
+        if not keep_alive:
+            await self.close()
+        return status, data
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            await self._writer.wait_closed()
+            self._reader = self._writer = None
+
+
+def _trip_payload(rng: random.Random) -> Dict[str, Any]:
+    pickup, dropoff = random_coordinate(rng), random_coordinate(rng)
+    return {
+        "user_email": BENCH_USER_EMAIL,
+        "pickup": {"name": "Bench pickup", "lat": pickup[0], "lon": pickup[1]},
+        "dropoff": {"name": "Bench dropoff", "lat": dropoff[0], "lon": dropoff[1]},
+        "luggage_items": [{"size": 24, "quantity": rng.randint(1, 3)}],
+        "vehicle_type": rng.choice(("sedan", "suv", "van")),
+    }
+
+
+async def _run_case(
+    host: str, port: int, connections: int, requests: int, make_request, keep_alive: bool = True
+) -> Tuple[float, List[float]]:
+    """connections 條連線平行送出共 requests 個請求，回傳 (總秒數, 每個請求的延遲)"""
+    latencies: List[float] = []
+    counter = iter(range(requests))
+
+    async def worker() -> None:
+        client = _Client(host, port)
+        try:
+            for _ in counter:
+                method, path, payload = make_request()
+                start = time.perf_counter()
+                status, _ = await client.request(method, path, payload, keep_alive=keep_alive)
+                latencies.append(time.perf_counter() - start)
+                if status >= 400:
+                    raise RuntimeError(f"{method} {path} 回應 {status}")
+        finally:
+            await client.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(connections)))
+    return time.perf_counter() - start, latencies
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+
+async def _benchmark(port: int, args: argparse.Namespace) -> List[Tuple[str, int, float, List[float]]]:
+    host = "127.0.0.1"
+    rng = random.Random(args.seed)
+
+    def quote():
+        payload = _trip_payload(rng)
+        return "POST", "/quote", {key: payload[key] for key in ("pickup", "dropoff", "luggage_items")}
+
+    def trip():
+        return "POST", "/trips", _trip_payload(rng)
+
+    def trip_batch():
+        return "POST", "/trips/batch", {"user_email": BENCH_USER_EMAIL, "trips": [_trip_payload(rng) for _ in range(args.batch)]}
+
+    def orders():
+        return "GET", f"/orders?user_email={BENCH_USER_EMAIL}&limit=20", None
+
+    # (名稱, 每個請求的行程數, 請求產生器, 請求數, keep-alive)
+    cases = (
+        ("quote", 0, quote, args.requests, True),
+        ("trip-close", 1, trip, args.requests, False),
+        ("trip-keepalive", 1, trip, args.requests, True),
+        ("trip-batch", args.batch, trip_batch, max(1, args.requests // args.batch), True),
+        ("orders", 0, orders, args.requests, True),
+    )
+    results = []
+    for name, trips_per_request, make_request, count, keep_alive in cases:
+        elapsed, latencies = await _run_case(host, port, args.connections, count, make_request, keep_alive)
+        results.append((name, trips_per_request, elapsed, latencies))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Booking API throughput benchmark")
+    parser.add_argument("--orders", type=int, default=1000, help="合成資料集的既有訂單數")
+    parser.add_argument("--connections", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--batch", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    source = os.path.join(PROJECT_ROOT, "demo_db.json")
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        write_dataset(tmp_dir, orders=args.orders, hotels=1000, seed=args.seed, source_path=source)
+        os.chdir(tmp_dir)
+        server = BookingApiServer(port=0)
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(server.start())
+        thread = threading.Thread(target=loop.run_forever, name="booking-api", daemon=True)
+        thread.start()
+        try:
+            results = asyncio.run(_benchmark(server.port, args))
+        finally:
+            asyncio.run_coroutine_threadsafe(server.stop(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+            os.chdir(cwd)
+
+    print(f"orders: {args.orders}  connections: {args.connections}  batch: {args.batch}")
+    print(f"{'case':<16} {'requests':>8} {'req/s':>9} {'trips/s':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    for name, trips_per_request, elapsed, latencies in results:
+        rps = len(latencies) / elapsed
+        trips = f"{rps * trips_per_request:>9.1f}" if trips_per_request else f"{'-':>9}"
+        print(
+            f"{name:<16} {len(latencies):>8} {rps:>9.1f} {trips} "
+            f"{_percentile(latencies, 0.5):>9.2f} {_percentile(latencies, 0.99):>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Catalog Load Benchmark
+比較目錄的兩種載入方式：直接 json.load 資料檔 vs. 以 mmap 開啟二進位快照
+
+    json      解析整份資料檔並建立 HotelCatalog (快照無法使用時的退回路徑)
+    snapshot  CatalogSnapshot.load：檢查資料檔 mtime / 大小後映射快照 (不複製資料)
+
+執行方式 (於專案根目錄):
+    python -m benchmarks.bench_catalog_load --repeat 20
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from services.catalog_service import CatalogService
+from services.catalog_snapshot import CatalogSnapshot
+
+
+def _best(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Catalog load benchmark")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        snapshot_path = os.path.join(tmp_dir, "catalog_snapshot.bin")
+        start = time.perf_counter()
+        CatalogSnapshot.build(CatalogService.DB_PATH, snapshot_path)
+        build_time = time.perf_counter() - start
+
+        def load_snapshot():
+            snapshot = CatalogSnapshot.load(CatalogService.DB_PATH, snapshot_path)
+            hotels = snapshot.hotel_catalog("hotels")
+            snapshot.hotel_catalog("partner_hotels")
+            snapshot.json_table("recommendations")
+            return hotels
+
+        json_time = _best(CatalogService._load_json_tables, args.repeat)
+        snapshot_time = _best(load_snapshot, args.repeat)
+        hotel_count = len(load_snapshot())
+        size_kb = os.path.getsize(snapshot_path) / 1024
+
+    print(f"source          : {CatalogService.DB_PATH} ({os.path.getsize(CatalogService.DB_PATH) / 1024:.0f} KB)")
+    print(f"snapshot build  : {build_time * 1000:.1f} ms ({size_kb:.0f} KB, {hotel_count} hotels)")
+    print(f"json load       : {json_time * 1000:.2f} ms (best of {args.repeat})")
+    print(f"snapshot mmap   : {snapshot_time * 1000:.3f} ms (best of {args.repeat})")
+    print(f"speed-up        : {json_time / snapshot_time:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
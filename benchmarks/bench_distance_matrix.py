@@ -0,0 +1,65 @@
+"""
+Distance Matrix Benchmark
+比較逐點 LocationService.calculate_distance 與向量化 DistanceMatrixService 的耗時
+
+執行方式 (於專案根目錄):
+    python -m benchmarks.bench_distance_matrix --origins 50 --destinations 2000
+"""
+import argparse
+import random
+import time
+
+from services.booking_service import BookingService
+from services.distance_matrix_service import DistanceMatrixService
+from services.location_service import LocationService
+
+
+def _sample_coordinates(count: int, seed: int):
+    hotels = BookingService.load_hotels()
+    rng = random.Random(seed)
+    if not hotels:
+        return [(rng.uniform(22.0, 25.3), rng.uniform(120.0, 122.0)) for _ in range(count)]
+    return [(h["lat"], h["lon"]) for h in rng.choices(hotels, k=count)]
+
+
+def _time_it(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Distance matrix benchmark")
+    parser.add_argument("--origins", type=int, default=50)
+    parser.add_argument("--destinations", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    origins = _sample_coordinates(args.origins, args.seed)
+    destinations = _sample_coordinates(args.destinations, args.seed + 1)
+
+    def scalar():
+        return [
+            [LocationService.calculate_distance(o[0], o[1], d[0], d[1]) for d in destinations]
+            for o in origins
+        ]
+
+    def vectorized():
+        return DistanceMatrixService.haversine_matrix(origins, destinations)
+
+    scalar_sec = _time_it(scalar, args.repeat)
+    vector_sec = _time_it(vectorized, args.repeat)
+
+    pairs = args.origins * args.destinations
+    print(f"pairs            : {pairs}")
+    print(f"scalar (best)    : {scalar_sec * 1000:.2f} ms")
+    print(f"vectorized (best): {vector_sec * 1000:.2f} ms")
+    print(f"speed-up         : {scalar_sec / vector_sec:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
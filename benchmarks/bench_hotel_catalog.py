@@ -0,0 +1,90 @@
+"""
+Hotel Catalog Memory Benchmark
+比較飯店目錄的兩種存放方式的記憶體用量與名稱查詢耗時：
+
+    before  每間飯店一個唯讀 dict (MappingProxyType) + 名稱 → dict 的查詢表 + 搜尋文字索引
+    after   欄式 HotelCatalog (float64 陣列、合作飯店位元圖、intern 字串表) + by_name
+
+以 tracemalloc 量測建立各結構時新增的 Python 記憶體 (不含 JSON 解析本身)。
+
+執行方式 (於專案根目錄):
+    python -m benchmarks.bench_hotel_catalog
+"""
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+from types import MappingProxyType
+
+from services.catalog_service import CatalogService
+from services.hotel_catalog import HotelCatalog
+
+
+def _measure(build):
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    result = build()
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, after - before
+
+
+def _build_dicts(records):
+    hotels = tuple(MappingProxyType(dict(record)) for record in records)
+    lookup = MappingProxyType({h["name"]: h for h in hotels if h.get("name")})
+    search_index = MappingProxyType({
+        h["name"]: MappingProxyType({
+            "address": h["address"],
+            "is_partner": h["is_partner"],
+            "full_text": f"{h['name']} ({h['address']})",
+        })
+        for h in hotels
+    })
+    return hotels, lookup, search_index
+
+
+def _build_columnar(records):
+    hotels = HotelCatalog.from_records(records)
+    return hotels, hotels.by_name
+
+
+def _lookup_time(lookup, names, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for name in names:
+            hotel = lookup[name]
+            hotel["lat"], hotel["lon"], hotel.get("is_partner")
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Hotel catalog memory benchmark")
+    parser.add_argument("--lookups", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with open(CatalogService.DB_PATH, "r", encoding="utf-8") as f:
+        records = json.load(f).get("hotels", [])
+    # 兩種結構各自從重新解析的 JSON 建立，字串成本也計入量測
+    (dict_hotels, dict_lookup, _), dict_bytes = _measure(lambda: _build_dicts(json.loads(json.dumps(records))))
+    (col_hotels, col_lookup), col_bytes = _measure(lambda: _build_columnar(json.loads(json.dumps(records))))
+
+    names = random.Random(42).choices(list(col_lookup), k=args.lookups)
+    dict_time = _lookup_time(dict_lookup, names, args.repeat)
+    col_time = _lookup_time(col_lookup, names, args.repeat)
+
+    print(f"hotels          : {len(col_hotels)}")
+    print(f"before (dicts)  : {dict_bytes / (1024 * 1024):.2f} MB ({dict_bytes / len(records):.0f} B / hotel)")
+    print(f"after (columnar): {col_bytes / (1024 * 1024):.2f} MB ({col_bytes / len(records):.0f} B / hotel)")
+    print(f"columns         : {col_hotels.memory_usage()}")
+    print(f"lookup x{args.lookups:<6}  : dicts {dict_time * 1000:.2f} ms | columnar {col_time * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Import Time Budget
+以 `python -X importtime` 量測冷啟動匯入 main 與建立啟動畫面的成本，超出預算時以非零狀態結束
+
+檢查項目：
+    1. `import main` 的累計匯入時間 (不含 flet 本身) 的中位數不超過 --budget-ms
+    2. 匯入 main 並進入 /splash 後，controllers / views 與較重的相依套件 (numpy, geopy, Pillow) 都尚未載入，
+       啟動畫面與飯店目錄大小無關
+
+單次量測受 bytecode 編譯與磁碟快取影響很大：先暖身一次 (產生 __pycache__)，再取 --runs 次的中位數。
+tests/test_import_time.py 以同樣的量測在 pytest 中檢查預算。
+
+執行方式 (於專案根目錄):
+    python -m benchmarks.bench_import_time --budget-ms 150
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+# 進入啟動畫面前不應被匯入的模組 (前綴比對)
+DEFERRED_MODULES = (
+    "controllers.",
+    "views.user.",
+    "numpy",
+    "geopy",
+    "PIL",
+    "google.generativeai",
+    "services.scan_service",
+    "services.booking_service",
+    "services.location_service",
+)
+
+# 子行程：匯入 main，以替身 Page 走一次 /splash，印出已載入的模組
+_SPLASH_SCRIPT = """
+import sys
+import main
+from app.router import create_route_handler
+
+class _StubPage:
+    route = "/"
+    views = []
+    session = {}
+    def go(self, route):
+        self.route = route
+        self.on_route_change(None)
+    def update(self, *controls):
+        pass
+
+app = main.App()
+app.page = _StubPage()
+app.page.on_route_change = create_route_handler(app)
+app.page.go("/splash")
+print("\\n".join(sorted(sys.modules)))
+"""
+
+# flet 本身的匯入成本與本專案無關，不計入預算
+EXTERNAL_PREFIXES = ("flet", "flet_map")
+
+DEFAULT_BUDGET_MS = 150.0
+DEFAULT_RUNS = 5
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@dataclass
+class ImportTimeReport:
+    """多次量測的結果"""
+
+    samples_ms: List[float]  # 每次 import main 扣除 flet 的累計時間
+    rows: List[Tuple[int, int, str]]  # 最後一次的 (self us, cumulative us, 模組)
+    early: List[str]  # 進入 /splash 前就已載入的延後模組
+
+    @property
+    def median_ms(self) -> float:
+        return statistics.median(self.samples_ms)
+
+
+def _run_importtime(project_root: str) -> Tuple[List[Tuple[int, int, str]], List[str]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _SPLASH_SCRIPT],
+        cwd=project_root,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|", 1).split("|"))
+        if self_us.isdigit():
+            rows.append((int(self_us), int(cumulative_us), name))
+    return rows, result.stdout.split()
+
+
+def _top_level_cost(rows: List[Tuple[int, int, str]]) -> Dict[str, int]:
+    """main 本身的累計時間，以及其中 flet 佔去的部分"""
+    costs = {"main": 0, "external": 0}
+    for _, cumulative_us, name in rows:
+        if name == "main":
+            costs["main"] = cumulative_us
+        elif name in EXTERNAL_PREFIXES:
+            costs["external"] += cumulative_us
+    return costs
+
+
+def measure(runs: int = DEFAULT_RUNS, project_root: str = PROJECT_ROOT) -> ImportTimeReport:
+    """暖身一次後量測 runs 次 (每次都是新的子行程)"""
+    _run_importtime(project_root)
+    samples, rows, loaded = [], [], []
+    for _ in range(max(1, runs)):
+        rows, loaded = _run_importtime(project_root)
+        costs = _top_level_cost(rows)
+        samples.append((costs["main"] - costs["external"]) / 1000)
+    early = [name for name in loaded if name.startswith(DEFERRED_MODULES)]
+    return ImportTimeReport(samples, rows, early)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import time budget check")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="import main 扣除 flet 後的預算 (中位數)")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    report = measure(args.runs)
+    samples = " / ".join(f"{sample:.1f}" for sample in report.samples_ms)
+    print(f"project + other deps : median {report.median_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    print(f"  samples            : {samples}")
+    print(f"top {args.top} modules by self time (last run):")
+    for self_us, _, name in sorted(report.rows, reverse=True)[: args.top]:
+        print(f"  {self_us / 1000:8.2f} ms  {name}")
+
+    if report.early:
+        print("loaded before first use:")
+        for name in report.early:
+            print(f"  {name}")
+
+    if report.median_ms > args.budget_ms or report.early:
+        print("FAIL")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Logging Overhead Benchmark
+比較動畫與估價迴圈在兩種 logging 設定下，呼叫端 (UI 執行緒 / 動畫計時器) 的每次迭代成本
+
+    legacy    原本的設定：basicConfig 同步寫檔、root 為 DEBUG，
+              每一格 / 每一筆都以 f-string 記錄 (重現已移除的 log 呼叫)
+    pipeline  logging_config.setup_logging：QueueHandler 背景寫檔、LOG_LEVEL / LOG_MODULE_LEVELS，
+              逐格與逐筆訊息經 ThrottledLogger 取樣、延遲格式化
+    pipeline-debug  同上但 root 為 DEBUG (確認開啟除錯時的成本)
+
+迴圈本體使用實際的程式碼 (SimulationService / LocationService 與 main 的動畫取樣 logger)。
+
+執行方式 (於專案根目錄):
+    python -m benchmarks.bench_logging --iterations 20000
+"""
+import argparse
+import logging
+import os
+import random
+import tempfile
+import time
+
+import logging_config
+from config import LOG_LEVEL, LOG_MODULE_LEVELS
+from logging_config import ThrottledLogger
+from services.location_service import LocationService
+from services.simulation_service import SimulationService
+
+# 與 main.py 相同的動畫取樣設定
+animation_logger = logging.getLogger("main")
+frame_logger = ThrottledLogger(animation_logger, every=10)
+simulation_logger = logging.getLogger("services.simulation_service")
+location_logger = logging.getLogger("services.location_service")
+
+
+def _configure_legacy(path: str) -> None:
+    logging_config.shutdown_logging()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    for name in LOG_MODULE_LEVELS:
+        logging.getLogger(name).setLevel(logging.NOTSET)
+    logging.basicConfig(
+        filename=path,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        level=logging.DEBUG,
+    )
+
+
+def _animation_loop(iterations: int, legacy: bool) -> None:
+    for i in range(iterations):
+        lat, lon = 25.03 + i * 1e-6, 121.56 + i * 1e-6
+        if legacy:
+            animation_logger.debug(f"Animation step {i}: Lat={lat}, Lon={lon}")
+            left, top = SimulationService.calculate_next_position(i % 300, i % 500, 300, 500)
+            simulation_logger.debug(f"計算新位置: ({left}, {top})")
+        else:
+            frame_logger.debug("Animation step %d: Lat=%s, Lon=%s", i, lat, lon)
+            SimulationService.calculate_next_position(i % 300, i % 500, 300, 500)
+
+
+def _pricing_loop(iterations: int, legacy: bool, rng: random.Random) -> None:
+    for _ in range(iterations):
+        lat1, lon1 = rng.uniform(22.0, 25.3), rng.uniform(120.0, 122.0)
+        lat2, lon2 = rng.uniform(22.0, 25.3), rng.uniform(120.0, 122.0)
+        distance = LocationService.calculate_distance(lat1, lon1, lat2, lon2)
+        minutes = SimulationService.calculate_estimated_time(distance)
+        price = SimulationService.simulate_price(distance)
+        if legacy:
+            location_logger.info(f"計算距離: {distance:.2f} km")
+            simulation_logger.info(f"計算預估時間: {distance}km -> {minutes}分鐘")
+            simulation_logger.info(f"計算價格: {distance}km -> NT${price}")
+
+
+def _per_iteration_us(func, iterations: int) -> float:
+    start = time.perf_counter()
+    func(iterations)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Logging overhead benchmark")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for mode in ("legacy", "pipeline", "pipeline-debug"):
+            path = os.path.join(tmp_dir, f"{mode}.log")
+            legacy = mode == "legacy"
+            if legacy:
+                _configure_legacy(path)
+            else:
+                level = "DEBUG" if mode == "pipeline-debug" else LOG_LEVEL
+                logging_config.setup_logging(path, level=level, module_levels=LOG_MODULE_LEVELS)
+            rng = random.Random(7)
+            animation = _per_iteration_us(lambda n: _animation_loop(n, legacy), args.iterations)
+            pricing = _per_iteration_us(lambda n: _pricing_loop(n, legacy, rng), args.iterations)
+            logging_config.shutdown_logging()
+            logging.shutdown()
+            size_kb = os.path.getsize(path) / 1024 if os.path.exists(path) else 0.0
+            results[mode] = (animation, pricing, size_kb)
+
+    print(f"iterations: {args.iterations}")
+    print(f"{'mode':<16} {'animation (us/step)':>20} {'pricing (us/quote)':>20} {'log size (KB)':>14}")
+    for mode, (animation, pricing, size_kb) in results.items():
+        print(f"{mode:<16} {animation:>20.2f} {pricing:>20.2f} {size_kb:>14.0f}")
+    legacy_animation, legacy_pricing, _ = results["legacy"]
+    animation, pricing, _ = results["pipeline"]
+    print(f"speed-up  : animation {legacy_animation / animation:.1f}x, pricing {legacy_pricing / pricing:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Metrics Overhead Benchmark
+量測指標停用 / 啟用時，計時器與計數器在熱路徑上增加的每次呼叫成本
+
+    baseline   未包裝的空函式
+    timed      @Metrics.timed 包裝
+    timer      with Metrics.timer(...) 區塊
+    inc        Metrics.inc(...)
+
+執行方式 (於專案根目錄):
+    python -m benchmarks.bench_metrics_overhead --calls 200000
+"""
+import argparse
+import time
+
+from metrics import Metrics
+
+BENCH_SECONDS = "ebaggage_bench_seconds"
+BENCH_TOTAL = "ebaggage_bench_total"
+
+
+def _noop():
+    return None
+
+
+@Metrics.timed(BENCH_SECONDS, operation="timed")
+def _timed_noop():
+    return None
+
+
+def _timer_block():
+    with Metrics.timer(BENCH_SECONDS, operation="timer"):
+        return None
+
+
+def _inc():
+    Metrics.inc(BENCH_TOTAL, result="hit")
+
+
+def _per_call_ns(func, calls: int) -> float:
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best / calls * 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Metrics overhead benchmark")
+    parser.add_argument("--calls", type=int, default=200_000)
+    args = parser.parse_args()
+
+    cases = (("baseline", _noop), ("timed", _timed_noop), ("timer", _timer_block), ("inc", _inc))
+    results = {}
+    for enabled in (False, True):
+        Metrics.enable() if enabled else Metrics.disable()
+        results[enabled] = {name: _per_call_ns(func, args.calls) for name, func in cases}
+    Metrics.disable()
+
+    print(f"{'case':<10} {'disabled (ns)':>14} {'enabled (ns)':>14}")
+    for name, _ in cases:
+        print(f"{name:<10} {results[False][name]:>14.0f} {results[True][name]:>14.0f}")
+    count = Metrics.histogram(BENCH_SECONDS).summary(operation="timed")["count"]
+    print(f"recorded  : {count:.0f} timed observations while enabled")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Route Switch Benchmark
+量測「首頁 → 行程紀錄 → 首頁」往返的路由切換耗時：每次重建 View vs. ViewCache 重新掛上
+
+以替身 Page 執行路由處理函式 (不連線 Flet 用戶端)，只量測 Python 端建立 / 掛上 View 的成本。
+
+執行方式 (於專案根目錄):
+    python -m benchmarks.bench_route_switch --loops 50
+"""
+import argparse
+import logging
+import time
+
+from app.router import create_route_handler
+from controllers.history_controller import HistoryController
+from main import App
+
+LOOP_ROUTES = ("/app/user/dashboard", "/app/user/history", "/app/user/dashboard")
+
+
+class _StubPage:
+    """只提供路由處理函式會用到的屬性"""
+
+    def __init__(self):
+        self.route = "/"
+        self.views = []
+        self.overlay = []
+        self.snack_bar = None
+        self.session = {"role": "user", "email": "user@example.com"}
+        self.on_route_change = None
+
+    def go(self, route: str) -> None:
+        self.route = route
+        self.on_route_change(None)
+
+    def update(self, *controls) -> None:
+        pass
+
+    def open(self, control) -> None:
+        pass
+
+    def close(self, control) -> None:
+        pass
+
+
+def _make_app() -> App:
+    app = App()
+    app.page = _StubPage()
+    app.history_controller = HistoryController(app)
+    app.page.on_route_change = create_route_handler(app)
+    return app
+
+
+def _run_loops(app: App, loops: int, cached: bool) -> list:
+    samples = []
+    for _ in range(loops):
+        for route in LOOP_ROUTES:
+            if not cached:
+                app.view_cache.clear()
+            start = time.perf_counter()
+            app.page.go(route)
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _summary(samples: list) -> str:
+    ordered = sorted(samples)
+    p50 = ordered[len(ordered) // 2]
+    p95 = ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)]
+    return f"p50 {p50 * 1000:.3f} ms | p95 {p95 * 1000:.3f} ms | total {sum(samples) * 1000:.1f} ms"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Route switch benchmark")
+    parser.add_argument("--loops", type=int, default=50)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    app = _make_app()
+    # 暖身：載入使用者訂單投影與模組
+    _run_loops(app, 1, cached=True)
+
+    rebuild = _run_loops(app, args.loops, cached=False)
+    cached = _run_loops(app, args.loops, cached=True)
+
+    print(f"route switches : {len(rebuild)} per mode ({' -> '.join(LOOP_ROUTES)})")
+    print(f"rebuild        : {_summary(rebuild)}")
+    print(f"view cache     : {_summary(cached)}")
+    print(f"cache stats    : {app.view_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Luggage Scan Benchmark
+量測飯店櫃台團體行李掃描的吞吐量 (每分鐘行李件數)
+
+    sequential  逐張 ScanService.scan (原本一次一張的流程)
+    concurrent  ScanService.submit_batch，後端不支援批次：各張在執行緒池平行辨識
+    batched     ScanService.submit_batch，後端支援批次：每 --batch-size 張合併為一次模型呼叫
+    rescan      同一批照片再次 submit_batch (交接點重複掃描，命中快取)
+
+模型以固定延遲的替身取代 (--latency 為每次呼叫的往返秒數，--per-image 為批次呼叫中每張增加的秒數)，
+影像為 Pillow 產生的相機尺寸照片，因此前處理 (縮圖 + JPEG 編碼) 的成本是真實的。
+另比較入庫：每件行李一次 HotelInventoryService.add_baggage vs. 整批 check_in 一次交易。
+
+執行方式 (於專案根目錄):
+    python -m benchmarks.bench_scan --photos 40 --workers 8
+"""
+import argparse
+import io
+import logging
+import os
+import random
+import tempfile
+import time
+from typing import Any, Dict, List, Sequence
+
+from PIL import Image, ImageDraw
+
+from services.hotel_inventory_service import HotelInventoryService
+from services.scan_service import ScanService, StubScanBackend
+
+
+class _LatencyBackend(StubScanBackend):
+    """StubScanBackend 加上模擬的模型延遲"""
+
+    def __init__(self, latency: float, per_image: float, batch_size: int = 1):
+        self.latency = latency
+        self.per_image = per_image
+        self.supports_batch = batch_size > 1
+        self.max_batch_size = batch_size
+        self.calls = 0
+
+    def detect(self, image: bytes) -> List[Dict[str, Any]]:
+        return self.detect_batch([image])[0]
+
+    def detect_batch(self, images: Sequence[bytes]) -> List[List[Dict[str, Any]]]:
+        self.calls += 1
+        time.sleep(self.latency + self.per_image * len(images))
+        return [StubScanBackend.detect(self, image) for image in images]
+
+
+def _photos(count: int, width: int, height: int, seed: int) -> List[bytes]:
+    rng = random.Random(seed)
+    photos = []
+    for _ in range(count):
+        image = Image.new("RGB", (width, height), tuple(rng.randrange(256) for _ in range(3)))
+        draw = ImageDraw.Draw(image)
+        for _ in range(rng.randint(2, 6)):
+            x, y = rng.randrange(width // 2), rng.randrange(height // 2)
+            draw.rectangle(
+                (x, y, x + rng.randint(200, width // 2), y + rng.randint(300, height // 2)),
+                fill=tuple(rng.randrange(256) for _ in range(3)),
+            )
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=90)
+        photos.append(buffer.getvalue())
+    return photos
+
+
+def _run(name: str, photos: List[bytes], backend: _LatencyBackend, workers: int, clear: bool = True) -> Dict[str, Any]:
+    ScanService.configure(backend, max_workers=workers)
+    if clear:
+        ScanService.clear_cache()
+    start = time.perf_counter()
+    if name == "sequential":
+        bags = sum(ScanService.scan(photo).total for photo in photos)
+    else:
+        bags = ScanService.submit_batch(photos).result().total
+    elapsed = time.perf_counter() - start
+    return {"mode": name, "seconds": elapsed, "bags": bags, "calls": backend.calls, "bags_per_minute": bags * 60 / elapsed}
+
+
+def _commit_compare(items: List[Dict[str, Any]]) -> Dict[str, float]:
+    """每件一次 add_baggage vs. 整批 check_in (暫存資料庫)"""
+    total = sum(item["quantity"] for item in items)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.chdir(tmp_dir)
+        try:
+            HotelInventoryService.ensure_hotel(1, "Bench", baggage_capacity=total * 4)
+            start = time.perf_counter()
+            for item in items:
+                for _ in range(item["quantity"]):
+                    HotelInventoryService.add_baggage(1, 1)
+            per_bag = time.perf_counter() - start
+            start = time.perf_counter()
+            HotelInventoryService.check_in(1, items, reference="bench")
+            batch = time.perf_counter() - start
+        finally:
+            os.chdir(cwd)
+    return {"bags": total, "per_bag_ms": per_bag * 1000, "batch_ms": batch * 1000}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Batch luggage scan throughput benchmark")
+    parser.add_argument("--photos", type=int, default=40)
+    parser.add_argument("--width", type=int, default=4032)
+    parser.add_argument("--height", type=int, default=3024)
+    parser.add_argument("--latency", type=float, default=0.8, help="每次模型呼叫的往返秒數")
+    parser.add_argument("--per-image", type=float, default=0.05, help="批次呼叫中每張影像增加的秒數")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    photos = _photos(args.photos, args.width, args.height, args.seed)
+    rows = [
+        _run("sequential", photos, _LatencyBackend(args.latency, args.per_image), args.workers),
+        _run("concurrent", photos, _LatencyBackend(args.latency, args.per_image), args.workers),
+    ]
+    batched = _LatencyBackend(args.latency, args.per_image, batch_size=args.batch_size)
+    rows.append(_run("batched", photos, batched, args.workers))
+    rows.append(_run("rescan", photos, batched, args.workers, clear=False))
+    rows[-1]["calls"] -= rows[-2]["calls"]
+
+    print(f"photos: {args.photos} ({args.width}x{args.height})  latency: {args.latency}s  workers: {args.workers}")
+    print(f"{'mode':<11} {'seconds':>8} {'bags':>5} {'calls':>6} {'bags/min':>9}")
+    for row in rows:
+        print(f"{row['mode']:<11} {row['seconds']:>8.2f} {row['bags']:>5} {row['calls']:>6} {row['bags_per_minute']:>9.0f}")
+
+    items = ScanService.submit_batch(photos).result().items
+    commit = _commit_compare(items)
+    print(
+        f"commit {commit['bags']} bags: add_baggage x{commit['bags']} {commit['per_bag_ms']:.1f} ms  "
+        f"check_in x1 {commit['batch_ms']:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Session Memory Benchmark
+模擬 N 個同時在線的 Flet session，量測常駐記憶體隨 session 數的成長
+
+每個 session 建立自己的 App 與 controller，查詢附近合作飯店、查詢飯店資料，
+並進入事先預約的規劃步驟 (建立含飯店搜尋建議的 AutoComplete)。
+
+    --mode shared       所有 session 共用 CatalogService 的同一份快照 (目前的做法)
+    --mode per-session  每個 session 各自載入一份目錄 (模擬共用前的行為)
+
+執行方式 (於專案根目錄):
+    python -m benchmarks.bench_session_memory --sessions 100 --mode shared
+    python -m benchmarks.bench_session_memory --sessions 20 --mode per-session
+"""
+import argparse
+import gc
+import logging
+import os
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from benchmarks.bench_route_switch import _StubPage
+from main import App
+from services.catalog_service import CatalogService
+
+
+def _rss_mb() -> float:
+    """目前的常駐記憶體 (MB)；非 Linux 時回傳 0"""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+def _open_session(per_session: bool) -> App:
+    if per_session:
+        CatalogService.reload()
+    app = App()
+    app.page = _StubPage()
+    app.catalog = CatalogService.acquire()
+
+    # 即時預約：附近合作飯店
+    app.instant_booking_controller.update_nearby_hotels(25.0330, 121.5654, limit=20)
+
+    # 事先預約：飯店查詢與規劃步驟的搜尋建議
+    from views.user.user_previous_booking import build_previous_booking_view
+
+    controller = app.previous_booking_controller
+    controller.hotel_lookup.get("圓山大飯店")
+    build_previous_booking_view(app)
+    controller.set_start_date(date.today() + timedelta(days=1))
+    controller.set_end_date(date.today() + timedelta(days=3))
+    controller.go_to_planning(None)
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Session memory benchmark")
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--mode", choices=("shared", "per-session"), default="shared")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    # 先建立一個 session，讓模組匯入與第一次載入不計入成長量
+    sessions = [_open_session(per_session=False)]
+    gc.collect()
+    tracemalloc.start()
+    base_rss = _rss_mb()
+    base_traced, _ = tracemalloc.get_traced_memory()
+
+    start = time.perf_counter()
+    for _ in range(args.sessions):
+        sessions.append(_open_session(per_session=args.mode == "per-session"))
+    elapsed = time.perf_counter() - start
+
+    gc.collect()
+    traced, peak = tracemalloc.get_traced_memory()
+    growth_mb = (traced - base_traced) / (1024 * 1024)
+    print(f"mode              : {args.mode}")
+    print(f"sessions          : {args.sessions}")
+    print(f"open time         : {elapsed:.2f} s")
+    print(f"python heap growth: {growth_mb:.1f} MB ({growth_mb / args.sessions * 1024:.0f} KB / session)")
+    print(f"peak traced       : {peak / (1024 * 1024):.1f} MB")
+    print(f"rss growth        : {_rss_mb() - base_rss:.1f} MB")
+    print(f"catalog stats     : {CatalogService.stats()}")
+
+    for app in sessions:
+        app.handle_session_close()
+    print(f"after close       : {CatalogService.stats()}")
+
+
+if __name__ == "__main__":
+    main()
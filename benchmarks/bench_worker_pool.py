@@ -0,0 +1,146 @@
+"""
+Worker Pool Benchmark
+量測 CPU 密集工作改由 worker pool (services/worker_pool.py) 執行時，隨行程數增加的吞吐量
+
+    travels   WorkerPool.generate_trips_many：多段住宿旅程的路段產生與報價
+    quotes    WorkerPool.quote_legs：大批路段報價
+    dispatch  WorkerPool.assign_drivers：多筆訂單同時派車
+    writes    多個子行程同時以 TravelService.save_trips 寫入同一個資料檔 (驗證 db_lock 不遺失寫入)
+
+inline 為未啟動 worker pool (在呼叫端執行)。每個量測使用不同的隨機資料，避免命中報價快取；
+行程池在量測前已預先啟動。能否隨核心數擴展取決於機器的實體核心數。
+
+執行方式 (於專案根目錄):
+    python -m benchmarks.bench_worker_pool --travels 2000 --legs 200000 --workers 1,2,4
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from benchmarks.datasets import random_coordinate
+from db_helpers import get_db, save_db
+from models.trip import HotelStay, LuggageItem, Travel
+from services.travel_service import TravelService
+from services.worker_pool import WorkerPool
+
+WRITE_USER_EMAIL = "bench-writer@example.com"
+
+
+def _travels(count: int, rng: random.Random) -> List[Travel]:
+    travels = []
+    for _ in range(count):
+        start = date(2026, 1, 1) + timedelta(days=rng.randint(0, 300))
+        hotels, day = [], start
+        for _ in range(rng.randint(3, 6)):
+            lat, lon = random_coordinate(rng)
+            nights = rng.randint(1, 3)
+            hotels.append(HotelStay(f"Hotel {lat:.3f}", "", lat, lon, day, day + timedelta(days=nights)))
+            day += timedelta(days=nights)
+        arrival, departure = random_coordinate(rng), random_coordinate(rng)
+        travels.append(Travel(
+            id=str(uuid.uuid4()),
+            total_start_date=start,
+            total_end_date=day,
+            luggage_count=rng.randint(1, 4),
+            arrival_transfer=True, arrival_location="Airport", arrival_lat=arrival[0], arrival_lon=arrival[1],
+            departure_transfer=True, departure_location="Station", departure_lat=departure[0], departure_lon=departure[1],
+            hotels=hotels,
+        ))
+    return travels
+
+
+def _legs(count: int, rng: random.Random):
+    legs = [(random_coordinate(rng), random_coordinate(rng)) for _ in range(count)]
+    luggage = [[LuggageItem(size=rng.choice((20, 24, 28)), quantity=rng.randint(1, 3))] for _ in range(count)]
+    return legs, luggage
+
+
+def _write_task(count: int, seed: int) -> int:
+    """子行程內逐筆寫入 count 個 trip (每筆一次完整的讀改寫)"""
+    rng = random.Random(seed)
+    for _ in range(count):
+        pickup, dropoff = random_coordinate(rng), random_coordinate(rng)
+        trip = TravelService.build_manual_trip(
+            datetime.now(), ("A", *pickup), ("B", *dropoff), [LuggageItem(size=24)]
+        )
+        TravelService.save_trips([trip], WRITE_USER_EMAIL)
+    return count
+
+
+def _timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def _run(workers: Optional[int], args: argparse.Namespace, seed: int) -> dict:
+    if workers:
+        WorkerPool.start(workers)
+        WorkerPool.submit(os.getpid).result()
+    rng = random.Random(seed)
+    travels = _travels(args.travels, rng)
+    legs, luggage = _legs(args.legs, rng)
+    pickups = [random_coordinate(rng) for _ in range(args.dispatch)]
+    drivers = [random_coordinate(rng) for _ in range(args.dispatch // 2)]
+
+    results = {
+        "travels": args.travels / _timed(lambda: WorkerPool.generate_trips_many(travels)),
+        "quotes": args.legs / _timed(lambda: WorkerPool.quote_legs(legs, luggage)),
+        "dispatch": args.dispatch / _timed(lambda: WorkerPool.assign_drivers(pickups, drivers).result()),
+    }
+
+    writers = max(1, workers or 1)
+    per_writer = args.writes // writers
+    before = len(get_db()["orders"])
+    elapsed = _timed(lambda: [f.result() for f in [
+        WorkerPool.submit(_write_task, per_writer, seed * 100 + i) for i in range(writers)
+    ]])
+    written = len(get_db()["orders"]) - before
+    results["writes"] = written / elapsed
+    results["lost_writes"] = per_writer * writers - written
+    WorkerPool.shutdown()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Worker pool scaling benchmark")
+    parser.add_argument("--travels", type=int, default=2000)
+    parser.add_argument("--legs", type=int, default=200_000)
+    parser.add_argument("--dispatch", type=int, default=2000, help="派車的訂單數 (司機數為一半)")
+    parser.add_argument("--writes", type=int, default=40, help="每輪寫入資料檔的 trip 總數")
+    parser.add_argument("--workers", default="1,2,4", help="逗號分隔的行程數")
+    parser.add_argument("--json", help="結果另存為 JSON")
+    args = parser.parse_args()
+
+    counts = [None] + [int(value) for value in args.workers.split(",") if value.strip()]
+    cwd = os.getcwd()
+    rows = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.chdir(tmp_dir)
+        try:
+            save_db({"users": {}, "orders": [], "scans": []})
+            for seed, workers in enumerate(counts, start=1):
+                rows["inline" if workers is None else f"{workers} proc"] = _run(workers, args, seed)
+        finally:
+            os.chdir(cwd)
+
+    print(f"cpu_count: {os.cpu_count()}  travels: {args.travels}  legs: {args.legs}  dispatch: {args.dispatch}")
+    print(f"{'mode':<8} {'travels/s':>10} {'legs/s':>11} {'orders/s':>10} {'writes/s':>9} {'lost':>5}")
+    for mode, row in rows.items():
+        print(
+            f"{mode:<8} {row['travels']:>10.0f} {row['quotes']:>11.0f} {row['dispatch']:>10.0f} "
+            f"{row['writes']:>9.1f} {row['lost_writes']:>5}"
+        )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"cpu_count": os.cpu_count(), "results": rows}, f, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
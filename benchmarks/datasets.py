@@ -0,0 +1,120 @@
+"""
+Benchmark Datasets
+依 demo_db.json 的資料形狀產生可重現的合成資料集 (訂單數、飯店數可放大)
+
+    - 訂單: 以 demo_db.json 中的訂單為樣板，重新給 id / 時間 / 狀態 / 使用者，
+      約 20% 屬於 BENCH_USER_EMAIL (歷史紀錄情境使用)
+    - 飯店: 重複使用真實飯店並對座標加上小幅偏移，名稱加上序號確保唯一
+    - 合作飯店: 依真實資料的比例 (約 500 / 15414) 由飯店中抽樣
+
+同一組 (orders, hotels, seed) 產生的內容完全相同。
+"""
+import copy
+import json
+import os
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+SOURCE_DB_PATH = "demo_db.json"
+BENCH_USER_EMAIL = "user@example.com"
+ORDER_STATUSES = ("PENDING", "ASSIGNED", "PICKED_UP", "COMPLETED", "COMPLETED", "COMPLETED", "CANCELLED")
+USER_SHARE = 0.2
+PARTNER_RATIO = 500 / 15414
+# 台灣本島範圍，產生合成座標時使用
+TAIWAN_BBOX = (21.9, 25.3, 120.0, 122.0)
+
+
+def _load_source(source_path: str) -> Dict[str, Any]:
+    with open(source_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _synthetic_orders(templates: List[Dict[str, Any]], count: int, rng: random.Random) -> List[Dict[str, Any]]:
+    base_time = datetime(2025, 1, 1)
+    orders = []
+    for index in range(count):
+        order = copy.deepcopy(templates[index % len(templates)])
+        created_at = base_time + timedelta(minutes=rng.randrange(0, 60 * 24 * 365))
+        order["id"] = str(uuid.UUID(int=rng.getrandbits(128)))
+        order["user_email"] = BENCH_USER_EMAIL if rng.random() < USER_SHARE else f"user{rng.randrange(5000)}@example.com"
+        order["status"] = rng.choice(ORDER_STATUSES)
+        order["created_at"] = created_at.isoformat()
+        if "start_time" in order:
+            order["start_time"] = (created_at + timedelta(days=rng.randrange(1, 30))).isoformat()
+        orders.append(order)
+    orders.sort(key=lambda o: o["created_at"], reverse=True)
+    return orders
+
+
+def _synthetic_hotels(templates: List[Dict[str, Any]], count: int, rng: random.Random) -> List[Dict[str, Any]]:
+    hotels = []
+    for index in range(count):
+        template = templates[index % len(templates)]
+        copy_number = index // len(templates)
+        hotel = dict(template)
+        if copy_number:
+            hotel["name"] = f"{template['name']} #{copy_number}"
+            hotel["lat"] = round(template["lat"] + rng.uniform(-0.01, 0.01), 7)
+            hotel["lon"] = round(template["lon"] + rng.uniform(-0.01, 0.01), 7)
+        hotel["is_partner"] = False
+        hotels.append(hotel)
+    return hotels
+
+
+def build_dataset(orders: int, hotels: int, seed: int = 42, source_path: str = SOURCE_DB_PATH) -> Dict[str, Any]:
+    """
+    產生合成資料庫內容 (與 demo_db.json 相同的頂層結構)
+
+    Args:
+        orders: 訂單數
+        hotels: 飯店數
+        seed: 亂數種子
+        source_path: 作為樣板的資料檔
+    """
+    source = _load_source(source_path)
+    rng = random.Random(seed)
+
+    order_templates = [o for o in source.get("orders", []) if isinstance(o, dict)] or [{"status": "PENDING"}]
+    hotel_templates = source.get("hotels") or [
+        {"name": "Hotel", "address": "", "lat": 25.03, "lon": 121.56, "is_partner": False}
+    ]
+
+    hotel_rows = _synthetic_hotels(hotel_templates, hotels, rng)
+    partner_count = min(len(hotel_rows), max(1, round(hotels * PARTNER_RATIO)))
+    partners = []
+    for index in sorted(rng.sample(range(len(hotel_rows)), partner_count)):
+        hotel_rows[index]["is_partner"] = True
+        partners.append(dict(hotel_rows[index]))
+
+    return {
+        "users": copy.deepcopy(source.get("users", {})),
+        "orders": _synthetic_orders(order_templates, orders, rng),
+        "scans": [],
+        "recommendations": copy.deepcopy(source.get("recommendations", [])),
+        "partner_hotels": partners,
+        "hotels": hotel_rows,
+    }
+
+
+def write_dataset(directory: str, orders: int, hotels: int, seed: int = 42, source_path: str = SOURCE_DB_PATH) -> str:
+    """
+    產生資料集並寫入 directory/demo_db.json (已存在時直接沿用)
+
+    Returns:
+        資料檔路徑
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, "demo_db.json")
+    if not os.path.exists(path):
+        data = build_dataset(orders, hotels, seed, source_path)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4, ensure_ascii=False)
+    return path
+
+
+def random_coordinate(rng: random.Random):
+    """台灣範圍內的隨機座標 (緯度, 經度)"""
+    lat_min, lat_max, lon_min, lon_max = TAIWAN_BBOX
+    return rng.uniform(lat_min, lat_max), rng.uniform(lon_min, lon_max)
@@ -0,0 +1,122 @@
+"""
+Benchmark Stubs
+以決定性的替身取代外部服務，讓基準測試不連網、結果可重現
+
+    StubGeocoder  取代 Nominatim (geocode / reverse)，依地址雜湊產生台灣範圍內的座標
+    stub_osrm()   暫時替換 requests.get，回應 OSRM route / table API (以直線距離估算)
+"""
+import contextlib
+import hashlib
+from types import SimpleNamespace
+from typing import Iterator, List, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.datasets import TAIWAN_BBOX
+from services.distance_matrix_service import DistanceMatrixService
+
+# 市區平均車速 (km/h)，用來由距離換算行車時間
+STUB_SPEED_KMH = 35.0
+ROUTE_POINTS = 32
+
+
+class StubGeocoder:
+    """Nominatim 替身：回傳與 geopy Location 相同屬性的物件"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def geocode(self, query, **kwargs):
+        self.calls += 1
+        digest = hashlib.blake2b(str(query).encode("utf-8"), digest_size=8).digest()
+        lat_min, lat_max, lon_min, lon_max = TAIWAN_BBOX
+        lat = lat_min + (lat_max - lat_min) * digest[0] / 255
+        lon = lon_min + (lon_max - lon_min) * digest[1] / 255
+        return SimpleNamespace(latitude=lat, longitude=lon, address=f"{query}, 臺灣")
+
+    def reverse(self, query, **kwargs):
+        self.calls += 1
+        lat, lon = query
+        return SimpleNamespace(
+            latitude=lat,
+            longitude=lon,
+            address=f"{lat:.4f}號, 測試路, 中正區, 臺北市, 100, 臺灣",
+        )
+
+
+class _StubResponse:
+    def __init__(self, payload):
+        self._payload = payload
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def json(self):
+        return self._payload
+
+
+def _parse_coordinates(path: str) -> List[Tuple[float, float]]:
+    """OSRM 路徑中的 "lon,lat;lon,lat" → [(lat, lon), ...]"""
+    raw = path.rsplit("/", 1)[-1]
+    coordinates = []
+    for pair in raw.split(";"):
+        lon, lat = pair.split(",")
+        coordinates.append((float(lat), float(lon)))
+    return coordinates
+
+
+def _route_payload(coordinates: List[Tuple[float, float]]):
+    (lat1, lon1), (lat2, lon2) = coordinates[0], coordinates[-1]
+    distance_km = DistanceMatrixService.pairwise_distances([(lat1, lon1)], [(lat2, lon2)])[0]
+    geometry = [
+        [lon1 + (lon2 - lon1) * step / (ROUTE_POINTS - 1), lat1 + (lat2 - lat1) * step / (ROUTE_POINTS - 1)]
+        for step in range(ROUTE_POINTS)
+    ]
+    return {
+        "code": "Ok",
+        "routes": [{
+            "distance": distance_km * 1000.0,
+            "duration": distance_km / STUB_SPEED_KMH * 3600.0,
+            "geometry": {"type": "LineString", "coordinates": geometry},
+        }],
+    }
+
+
+def _table_payload(coordinates: List[Tuple[float, float]], query: str):
+    params = parse_qs(query)
+    sources = [coordinates[int(i)] for i in params["sources"][0].split(";")]
+    destinations = [coordinates[int(i)] for i in params["destinations"][0].split(";")]
+    matrix = DistanceMatrixService.haversine_matrix(sources, destinations)
+    distances = [[float(value) * 1000.0 for value in row] for row in matrix]
+    durations = [[value / 1000.0 / STUB_SPEED_KMH * 3600.0 for value in row] for row in distances]
+    return {"code": "Ok", "distances": distances, "durations": durations}
+
+
+@contextlib.contextmanager
+def stub_osrm() -> Iterator[List[str]]:
+    """
+    在 with 區塊內以替身回應 OSRM API
+
+    Yields:
+        被呼叫過的 URL 列表 (可用來確認沒有實際連網)
+    """
+    import requests
+
+    calls: List[str] = []
+    original_get = requests.get
+
+    def fake_get(url, *args, **kwargs):
+        parsed = urlparse(url)
+        if "router.project-osrm.org" not in parsed.netloc:
+            return original_get(url, *args, **kwargs)
+        calls.append(url)
+        coordinates = _parse_coordinates(parsed.path)
+        if "/table/" in parsed.path:
+            return _StubResponse(_table_payload(coordinates, parsed.query))
+        return _StubResponse(_route_payload(coordinates))
+
+    requests.get = fake_get
+    try:
+        yield calls
+    finally:
+        requests.get = original_get
+
@@ -0,0 +1,440 @@
+"""
+Benchmark Suite
+儲存、搜尋、報價、歷史紀錄與地理編碼熱路徑的可重現基準測試
+
+每個情境在合成資料集 (benchmarks.datasets) 上執行，地理編碼與 OSRM 以替身取代
+(benchmarks.stubs)，不連網。每個情境回報：
+
+    p50 / p95 / p99 / mean 延遲 (ms)
+    alloc_peak_kb   單次操作期間 Python 記憶體配置的高峰 (tracemalloc)
+    alloc_net_kb    單次操作後仍保留的記憶體
+
+結果寫成 JSON (鍵排序、固定格式)，可直接 diff 或以 --compare 與舊結果比較。
+
+執行方式 (於專案根目錄):
+    python -m benchmarks.suite                        # 全部規模 (1k/10k/100k 訂單、15k/150k 飯店)
+    python -m benchmarks.suite --quick                # 只跑最小規模
+    python -m benchmarks.suite --filter history --compare benchmarks/results/abc1234.json
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.bench_route_switch import _StubPage
+from benchmarks.datasets import random_coordinate, write_dataset
+from benchmarks.stubs import StubGeocoder, stub_osrm
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(PROJECT_ROOT, "benchmarks", "results")
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), "ebaggage-bench-data")
+
+ORDER_SIZES = (1_000, 10_000, 100_000)
+HOTEL_SIZES = (15_000, 150_000)
+Dataset = Tuple[int, int]  # (訂單數, 飯店數)
+
+
+@dataclass
+class Case:
+    """單一基準情境"""
+
+    name: str
+    dataset: Dataset
+    run: Callable[[], Any]
+    setup: Optional[Callable[[], None]] = None  # 每次執行前呼叫，不計入時間
+
+
+class SuiteContext:
+    """目前資料集上的共用物件 (App、控制器、隨機座標)"""
+
+    def __init__(self, dataset: Dataset, seed: int, pristine: str):
+        from main import App
+
+        self.dataset = dataset
+        self.pristine = pristine
+        self.rng = random.Random(seed)
+        self.app = App()
+        self.app.page = _StubPage()
+
+    def restore_store(self) -> None:
+        """以原始資料集覆蓋工作目錄中的資料檔 (寫入類情境每次執行前呼叫)"""
+        shutil.copy(self.pristine, "demo_db.json")
+
+    def coordinates(self, count: int) -> List[Tuple[float, float]]:
+        return [random_coordinate(self.rng) for _ in range(count)]
+
+    def close(self) -> None:
+        self.app.handle_session_close()
+
+
+def _cycle(items):
+    """每次呼叫回傳下一個元素 (循環)"""
+    state = {"index": -1}
+
+    def next_item():
+        state["index"] = (state["index"] + 1) % len(items)
+        return items[state["index"]]
+
+    return next_item
+
+
+def _sample_travel(ctx: SuiteContext, stays: int):
+    """由目錄中的飯店組出一段 stays 晚連續住宿的旅程"""
+    import uuid
+
+    from models.trip import HotelStay, LuggageItem, Travel
+    from services.catalog_service import CatalogService
+
+    hotels = CatalogService.current().hotels
+    start = date.today() + timedelta(days=7)
+    hotel_stays = []
+    for night in range(stays):
+        hotel = hotels[ctx.rng.randrange(len(hotels))]
+        hotel_stays.append(HotelStay(
+            hotel_name=hotel["name"],
+            address=hotel["address"],
+            lat=hotel["lat"],
+            lon=hotel["lon"],
+            check_in_date=start + timedelta(days=night),
+            check_out_date=start + timedelta(days=night + 1),
+        ))
+    lat, lon = random_coordinate(ctx.rng)
+    return Travel(
+        id=str(uuid.UUID(int=ctx.rng.getrandbits(128))),
+        total_start_date=start,
+        total_end_date=start + timedelta(days=stays),
+        luggage_count=2,
+        arrival_transfer=True,
+        arrival_location="桃園國際機場",
+        arrival_lat=25.0797,
+        arrival_lon=121.2342,
+        departure_transfer=True,
+        departure_location="臺北車站",
+        departure_lat=lat,
+        departure_lon=lon,
+        luggage_items=[LuggageItem(size=24, quantity=1), LuggageItem(size=28, quantity=1)],
+        hotels=hotel_stays,
+    )
+
+
+# ------------------ 情境 ------------------
+def _storage_cases(ctx: SuiteContext) -> List[Case]:
+    from models.base import BaseModel
+    from services.travel_service import TravelService
+
+    travel = _sample_travel(ctx, stays=3)
+    TravelService.generate_trips(travel)
+    orders, _ = ctx.dataset
+    return [
+        Case(f"storage.get_db[orders={orders}]", ctx.dataset, BaseModel.get_db),
+        Case(
+            f"storage.save_travel_with_trips[orders={orders}]",
+            ctx.dataset,
+            lambda: TravelService.save_travel_with_trips(travel, "user@example.com"),
+            setup=ctx.restore_store,
+        ),
+    ]
+
+
+def _history_cases(ctx: SuiteContext) -> List[Case]:
+    from services.order_history_service import OrderHistoryService
+
+    controller = ctx.app.history_controller
+    orders, _ = ctx.dataset
+
+    def cold_setup():
+        # 丟棄投影與使用者索引，量測第一次進入歷史頁的完整載入
+        controller.projection = None
+        OrderHistoryService._index_signature = None
+
+    return [
+        Case(f"history.load_orders.cold[orders={orders}]", ctx.dataset, controller.load_orders, setup=cold_setup),
+        Case(f"history.load_orders.warm[orders={orders}]", ctx.dataset, controller.load_orders),
+    ]
+
+
+def _search_cases(ctx: SuiteContext) -> List[Case]:
+    from services.catalog_service import CatalogService
+    from services.distance_matrix_service import DistanceMatrixService
+
+    controller = ctx.app.instant_booking_controller
+    next_center = _cycle(ctx.coordinates(64))
+    hotel_coordinates = CatalogService.current().hotels.coordinates
+    _, hotels = ctx.dataset
+    return [
+        Case(
+            f"search.update_nearby_hotels[hotels={hotels}]",
+            ctx.dataset,
+            lambda: controller.update_nearby_hotels(*next_center(), limit=50),
+        ),
+        Case(
+            f"search.nearest_hotels[hotels={hotels}]",
+            ctx.dataset,
+            lambda: DistanceMatrixService.nearest_indices(next_center(), hotel_coordinates, limit=50),
+        ),
+    ]
+
+
+def _pricing_cases(ctx: SuiteContext) -> List[Case]:
+    from services.pricing_service import PricingService
+    from services.travel_service import TravelService
+
+    cases = []
+    for stays in (3, 10):
+        travel = _sample_travel(ctx, stays=stays)
+        cases.append(Case(
+            f"pricing.generate_trips[stays={stays}]",
+            ctx.dataset,
+            lambda travel=travel: TravelService.generate_trips(travel),
+            setup=PricingService.clear_cache,
+        ))
+    return cases
+
+
+def _geocode_cases(ctx: SuiteContext) -> List[Case]:
+    from services.catalog_service import CatalogService
+    from services.distance_matrix_service import DistanceMatrixService
+    from services.location_service import LocationService
+
+    service = LocationService()
+    service.geolocator = StubGeocoder()
+    hotels = CatalogService.current().hotels
+    next_address = _cycle([hotels.address(ctx.rng.randrange(len(hotels))) for _ in range(64)])
+    hit_address = next_address()
+    next_point = _cycle(ctx.coordinates(64))
+    origins, destinations = ctx.coordinates(5), ctx.coordinates(20)
+
+    def route_matrix():
+        with stub_osrm():
+            DistanceMatrixService.route_matrix(origins, destinations)
+
+    return [
+        Case(
+            "geocode.geocode.miss",
+            ctx.dataset,
+            lambda: service.geocode(next_address()),
+            setup=LocationService.clear_geocode_cache,
+        ),
+        Case("geocode.geocode.hit", ctx.dataset, lambda: service.geocode(hit_address)),
+        Case("geocode.reverse_geocode", ctx.dataset, lambda: service.reverse_geocode(*next_point())),
+        Case(
+            "routing.route_matrix[5x20]",
+            ctx.dataset,
+            route_matrix,
+            setup=DistanceMatrixService.clear_route_cache,
+        ),
+    ]
+
+
+def _plan(quick: bool) -> List[Tuple[Dataset, List[Callable[[SuiteContext], List[Case]]]]]:
+    """資料集 → 在其上執行的情境群組"""
+    order_sizes = ORDER_SIZES[:1] if quick else ORDER_SIZES
+    hotel_sizes = HOTEL_SIZES[:1] if quick else HOTEL_SIZES
+    base = (order_sizes[0], hotel_sizes[0])
+    plan: Dict[Dataset, List[Callable[[SuiteContext], List[Case]]]] = {
+        base: [_storage_cases, _history_cases, _search_cases, _pricing_cases, _geocode_cases],
+    }
+    for orders in order_sizes[1:]:
+        plan.setdefault((orders, base[1]), []).extend([_storage_cases, _history_cases])
+    for hotels in hotel_sizes[1:]:
+        plan.setdefault((base[0], hotels), []).append(_search_cases)
+    return list(plan.items())
+
+
+# ------------------ 量測 ------------------
+def _percentile(ordered: List[float], fraction: float) -> float:
+    """最近序位法百分位數 (ordered 已排序)"""
+    index = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def _measure(case: Case, min_iterations: int, max_iterations: int, budget: float, alloc_iterations: int) -> Dict[str, Any]:
+    # 暖身一次 (載入模組、建立延遲初始化的索引)
+    if case.setup:
+        case.setup()
+    case.run()
+
+    gc.collect()
+    samples: List[float] = []
+    deadline = time.perf_counter() + budget
+    while len(samples) < max_iterations and (len(samples) < min_iterations or time.perf_counter() < deadline):
+        if case.setup:
+            case.setup()
+        start = time.perf_counter_ns()
+        case.run()
+        samples.append((time.perf_counter_ns() - start) / 1e6)
+
+    peaks, nets = [], []
+    tracemalloc.start()
+    try:
+        for _ in range(alloc_iterations):
+            if case.setup:
+                case.setup()
+            gc.collect()
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            case.run()
+            current, peak = tracemalloc.get_traced_memory()
+            peaks.append((peak - before) / 1024)
+            nets.append((current - before) / 1024)
+    finally:
+        tracemalloc.stop()
+
+    ordered = sorted(samples)
+    orders, hotels = case.dataset
+    return {
+        "dataset": {"orders": orders, "hotels": hotels},
+        "iterations": len(samples),
+        "p50_ms": round(_percentile(ordered, 0.50), 4),
+        "p95_ms": round(_percentile(ordered, 0.95), 4),
+        "p99_ms": round(_percentile(ordered, 0.99), 4),
+        "mean_ms": round(sum(samples) / len(samples), 4),
+        "alloc_peak_kb": round(sorted(peaks)[len(peaks) // 2], 1) if peaks else None,
+        "alloc_net_kb": round(sorted(nets)[len(nets) // 2], 1) if nets else None,
+    }
+
+
+def _reset_shared_state() -> None:
+    """切換資料集後清除行程內的共用快取"""
+    from services.catalog_service import CatalogService
+    from services.distance_matrix_service import DistanceMatrixService
+    from services.location_service import LocationService
+    from services.pricing_service import PricingService
+
+    CatalogService.reload()
+    PricingService.clear_cache()
+    DistanceMatrixService.clear_route_cache()
+    LocationService.clear_geocode_cache()
+
+
+def _git_commit() -> str:
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        return f"{output}-dirty" if dirty else output
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_suite(args: argparse.Namespace) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    source_path = os.path.join(PROJECT_ROOT, "demo_db.json")
+    original_cwd = os.getcwd()
+    for dataset, groups in _plan(args.quick):
+        orders, hotels = dataset
+        pristine = write_dataset(
+            os.path.join(args.data_dir, f"orders{orders}_hotels{hotels}_seed{args.seed}"),
+            orders, hotels, args.seed, source_path,
+        )
+        with tempfile.TemporaryDirectory(prefix="ebaggage-bench-") as work_dir:
+            # 寫入類情境會修改資料檔：複製一份到暫存目錄執行，每個情境結束後還原為原始檔
+            shutil.copy(pristine, os.path.join(work_dir, "demo_db.json"))
+            os.chdir(work_dir)
+            try:
+                _reset_shared_state()
+                ctx = SuiteContext(dataset, args.seed, pristine)
+                try:
+                    for group in groups:
+                        for case in group(ctx):
+                            if args.filter and args.filter not in case.name:
+                                continue
+                            results[case.name] = _measure(
+                                case, args.min_iterations, args.max_iterations, args.budget, args.alloc_iterations
+                            )
+                            _print_row(case.name, results[case.name])
+                            ctx.restore_store()
+                finally:
+                    ctx.close()
+            finally:
+                os.chdir(original_cwd)
+    return results
+
+
+# ------------------ 輸出 ------------------
+def _print_row(name: str, result: Dict[str, Any]) -> None:
+    print(
+        f"{name:<48} n={result['iterations']:<4} p50 {result['p50_ms']:>10.3f} ms"
+        f"  p95 {result['p95_ms']:>10.3f}  p99 {result['p99_ms']:>10.3f}"
+        f"  alloc {result['alloc_peak_kb'] or 0:>10.1f} KB",
+        flush=True,
+    )
+
+
+def _compare(results: Dict[str, Any], baseline_path: str) -> None:
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f).get("cases", {})
+    print(f"\ncompared with {baseline_path}")
+    for name, result in results.items():
+        old = baseline.get(name)
+        if not old:
+            print(f"{name:<48} (new)")
+            continue
+        deltas = []
+        for key in ("p50_ms", "p95_ms", "alloc_peak_kb"):
+            if old.get(key):
+                deltas.append(f"{key} {(result[key] - old[key]) / old[key] * 100:+7.1f}%")
+        print(f"{name:<48} " + "  ".join(deltas))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Hot path benchmark suite")
+    parser.add_argument("--quick", action="store_true", help="只跑最小規模的資料集")
+    parser.add_argument("--filter", default="", help="只跑名稱包含此字串的情境")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--budget", type=float, default=2.0, help="每個情境的計時預算 (秒)")
+    parser.add_argument("--min-iterations", type=int, default=5)
+    parser.add_argument("--max-iterations", type=int, default=200)
+    parser.add_argument("--alloc-iterations", type=int, default=3)
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="合成資料集的快取目錄")
+    parser.add_argument("--output", help="結果 JSON 路徑 (預設 benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="與先前的結果 JSON 比較")
+    args = parser.parse_args()
+    args.data_dir = os.path.abspath(args.data_dir)
+    logging.disable(logging.INFO)
+
+    commit = _git_commit()
+    output = os.path.abspath(args.output or os.path.join(RESULTS_DIR, f"{commit}.json"))
+    compare = os.path.abspath(args.compare) if args.compare else None
+
+    results = run_suite(args)
+    report = {
+        "meta": {
+            "commit": commit,
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "seed": args.seed,
+            "quick": args.quick,
+        },
+        "cases": results,
+    }
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"\nresults written to {output}")
+
+    if compare:
+        _compare(results, compare)
+
+
+if __name__ == "__main__":
+    main()
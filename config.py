@@ -51,6 +51,76 @@ USER_DASHBOARD_MAP_TEMPLATE = "https://server.arcgisonline.com/ArcGIS/rest/servi
 MAP_ROUTING_101_BANQIAO = {"code":"Ok","routes":[{"legs":[{"steps":[],"weight":1019.5,"summary":"","duration":1019.5,"distance":12783.7}],"weight_name":"routability","geometry":{"coordinates":[[121.563871,25.034009],[121.563852,25.03401],[121.563623,25.034014],[121.563556,25.034015],[121.56356,25.034358],[121.563568,25.034612],[121.563605,25.035784],[121.563552,25.035908],[121.563551,25.036068],[121.563573,25.037265],[121.563574,25.037308],[121.563577,25.037361],[121.563579,25.037522],[121.563402,25.037526],[121.563356,25.037527],[121.562167,25.037552],[121.562119,25.037553],[121.561988,25.037555],[121.561811,25.037561],[121.561786,25.037562],[121.561641,25.037565],[121.561619,25.037566],[121.561575,25.037567],[121.561505,25.037569],[121.561312,25.037574],[121.561263,25.037576],[121.560623,25.037597],[121.557745,25.037684],[121.557645,25.037686],[121.557525,25.037747],[121.557413,25.037748],[121.557363,25.037749],[121.555613,25.037788],[121.55543,25.037794],[121.555348,25.037797],[121.553047,25.037836],[121.552937,25.037838],[121.552849,25.037839],[121.551556,25.037862],[121.551387,25.037866],[121.551222,25.037871],[121.551055,25.037872],[121.549881,25.037902],[121.549845,25.037902],[121.549732,25.037867],[121.549633,25.037883],[121.549511,25.037914],[121.549457,25.037933],[121.549287,25.038085],[121.549259,25.038103],[121.549203,25.03817],[121.549135,25.038226],[121.54902,25.038285],[121.548892,25.038315],[121.54876,25.038314],[121.548633,25.038281],[121.54852,25.03822],[121.548472,25.038181],[121.548431,25.038137],[121.548368,25.038039],[121.548348,25.037986],[121.548273,25.037943],[121.548196,25.037918],[121.548134,25.037904],[121.548026,25.037881],[121.547936,25.037864],[121.547768,25.037831],[121.547706,25.037833],[121.546169,25.037867],[121.546039,25.037869],[121.545913,25.037871],[121.543867,25.037907],[121.54376,25.03791],[121.543626,25.037912],[121.543524,25.037914],[121.543469,25.037916],[121.541003,25.037965],[121.539829,25.037985],[121.539689,25.037991],[121.538272,25.038019],[121.538153,25.038021],[121.538052,25.038023],[121.537783,25.038029],[121.537692,25.038031],[121.537541,25.038033],[121.534605,25.038083],[121.533014,25.03811],[121.53285,25.038117],[121.532687,25.03818],[121.532546,25.038182],[121.532411,25.038184],[121.529552,25.03823],[121.529466,25.038232],[121.529393,25.038233],[121.529312,25.038234],[121.528468,25.038248],[121.528373,25.038249],[121.528252,25.038251],[121.528145,25.038253],[121.528069,25.038254],[121.52541,25.038297],[121.525315,25.038299],[121.5252,25.0383],[121.525094,25.038316],[121.523778,25.038492],[121.523496,25.038529],[121.523408,25.038541],[121.52333,25.038552],[121.521707,25.038766],[121.521595,25.038781],[121.521475,25.038796],[121.521299,25.038819],[121.521113,25.038843],[121.518747,25.039158],[121.518404,25.039203],[121.518356,25.039209],[121.518311,25.039215],[121.518045,25.039222],[121.517884,25.039146],[121.517851,25.039187],[121.517808,25.03922],[121.517772,25.039238],[121.517734,25.03925],[121.517694,25.039256],[121.517653,25.039257],[121.517613,25.039252],[121.517574,25.039241],[121.517538,25.039225],[121.517504,25.039204],[121.517475,25.039179],[121.51745,25.03915],[121.517431,25.039117],[121.517418,25.039082],[121.51741,25.039046],[121.51741,25.039009],[121.517415,25.038973],[121.517427,25.038938],[121.517444,25.038904],[121.517468,25.038874],[121.517496,25.038848],[121.517528,25.038825],[121.517602,25.038796],[121.517557,25.038641],[121.517485,25.038392],[121.517464,25.038325],[121.517389,25.038078],[121.517375,25.03803],[121.516584,25.035287],[121.516575,25.035145],[121.516614,25.035016],[121.516706,25.034858],[121.516507,25.034832],[121.515317,25.034974],[121.515225,25.034986],[121.514725,25.035048],[121.514605,25.035073],[121.512702,25.035284],[121.512634,25.035293],[121.512491,25.035312],[121.512328,25.035347],[121.511676,25.035504],[121.510921,25.035671],[121.510811,25.035697],[121.510667,25.03573],[121.510255,25.035872],[121.508185,25.036699],[121.508014,25.036768],[121.507863,25.036839],[121.507581,25.036971],[121.50713,25.037163],[121.507086,25.037164],[121.506912,25.037166],[121.506712,25.037137],[121.506404,25.037206],[121.506323,25.037178],[121.505872,25.037014],[121.50583,25.037005],[121.505168,25.036763],[121.50508,25.036734],[121.505036,25.03672],[121.505012,25.036712],[121.504991,25.036701],[121.504939,25.036682],[121.504711,25.036505],[121.504595,25.036391],[121.504137,25.035945],[121.503997,25.035807],[121.503799,25.035614],[121.503757,25.035574],[121.503486,25.035308],[121.503449,25.035272],[121.503256,25.035214],[121.503221,25.035221],[121.503171,25.035227],[121.503064,25.03523],[121.502634,25.035242],[121.502355,25.035249],[121.502248,25.035252],[121.50222,25.035253],[121.502017,25.035258],[121.501743,25.035265],[121.501362,25.035275],[121.501227,25.035279],[121.501109,25.035276],[121.50098,25.035272],[121.500423,25.035295],[121.499617,25.035332],[121.499568,25.035335],[121.49937,25.03534],[121.499299,25.03534],[121.499064,25.03534],[121.498434,25.035343],[121.497713,25.03536],[121.497577,25.035364],[121.497503,25.035366],[121.497043,25.035375],[121.496839,25.035379],[121.496306,25.035419],[121.496108,25.035393],[121.495874,25.035392],[121.495769,25.035381],[121.494639,25.035416],[121.493668,25.035443],[121.49052,25.035533],[121.488438,25.035596],[121.488301,25.035632],[121.488117,25.035653],[121.487772,25.035668],[121.481964,25.035828],[121.481273,25.03584],[121.479905,25.035919],[121.479188,25.035969],[121.478987,25.035983],[121.478785,25.03598],[121.478564,25.035958],[121.478333,25.035918],[121.478131,25.035856],[121.477974,25.0358],[121.47773,25.035693],[121.477479,25.035553],[121.477291,25.035425],[121.477109,25.035275],[121.476908,25.035075],[121.476727,25.034901],[121.476287,25.034424],[121.476208,25.034349],[121.476157,25.034294],[121.476116,25.034252],[121.475582,25.033674],[121.475144,25.033183],[121.474839,25.032862],[121.474664,25.032668],[121.474308,25.032273],[121.473545,25.03142],[121.473123,25.030957],[121.472634,25.030411],[121.472357,25.030101],[121.47231,25.030055],[121.472224,25.029953],[121.472139,25.029856],[121.471457,25.029055],[121.471293,25.028854],[121.470994,25.028448],[121.470972,25.028401],[121.470952,25.028363],[121.470909,25.028298],[121.470631,25.027805],[121.470593,25.027745],[121.470553,25.027679],[121.470471,25.027547],[121.470201,25.027054],[121.470179,25.027006],[121.469925,25.026559],[121.469835,25.026383],[121.469751,25.026235],[121.469711,25.026166],[121.469596,25.025953],[121.469153,25.02519],[121.469115,25.02512],[121.469079,25.025051],[121.468939,25.024801],[121.468822,25.024583],[121.468793,25.024531],[121.468511,25.024039],[121.468401,25.023843],[121.468167,25.023425],[121.468086,25.023274],[121.467912,25.022939],[121.467778,25.022693],[121.467673,25.0225],[121.467621,25.022396],[121.467483,25.022194],[121.467399,25.022053],[121.467321,25.021957],[121.467214,25.021776],[121.467076,25.021552],[121.466893,25.021265],[121.466642,25.020901],[121.466456,25.020637],[121.466413,25.020578],[121.466174,25.020253],[121.465865,25.019852],[121.465826,25.019804],[121.465724,25.019677],[121.465248,25.019088],[121.464887,25.018639],[121.464371,25.018003],[121.464243,25.017844],[121.464183,25.01777],[121.464145,25.017723],[121.46407,25.017631],[121.46386,25.01737],[121.463417,25.016822],[121.46334,25.016727],[121.463079,25.016404],[121.462991,25.01631],[121.463071,25.016221],[121.463133,25.016189],[121.46322,25.016134],[121.463927,25.015639],[121.46423,25.015424],[121.464937,25.01496],[121.465113,25.014798],[121.465342,25.014658],[121.465424,25.014576],[121.465342,25.014515],[121.465303,25.014488],[121.464752,25.014111],[121.464591,25.014097],[121.464435,25.014052],[121.464248,25.013952]],"type":"LineString"},"weight":1019.5,"duration":1019.5,"distance":12783.7}],"waypoints":[{"hint":"_hoLhJApIYkFAAAAAAAAAEcAAAAAAAAAv971PwAAAADsCu9BAAAAAAUAAAAAAAAARwAAAAAAAAALRgAA3-o-Bxn9fQHw7D4H6Px9AQQA3wUAAAAA","location":[121.563871,25.034009],"name":"","distance":53.66698146},{"hint":"ENsfgP___381AAAANQAAAE8AAACTAAAAWxOvQQAAAADoWgNChHt0QjUAAAA1AAAATwAAAJMAAAALRgAAuGU9B8CufQH4Yz0HnrB9AQQA_w4AAAAA","location":[121.464248,25.013952],"name":"","distance":69.62896317}]}
 MAP_ROUTING_CITYHALL_101 = {"code":"Ok","routes":[{"legs":[{"steps":[],"weight":104.4,"summary":"","duration":104.4,"distance":1010.4}],"weight_name":"routability","geometry":{"coordinates":[[121.563577,25.037399],[121.563577,25.037361],[121.563574,25.037308],[121.563573,25.037265],[121.563551,25.036068],[121.563552,25.035908],[121.563485,25.035787],[121.563476,25.035419],[121.56347,25.035012],[121.563466,25.034819],[121.563453,25.034358],[121.563452,25.034267],[121.56345,25.034016],[121.563442,25.033624],[121.563423,25.033176],[121.563412,25.033005],[121.562655,25.033023],[121.562329,25.03303],[121.561991,25.033038],[121.561551,25.033048],[121.561509,25.033048],[121.561408,25.03305],[121.561382,25.033051],[121.56138,25.033011],[121.561377,25.032944],[121.561423,25.032943],[121.561496,25.032938],[121.563267,25.032897],[121.563695,25.032887],[121.564399,25.03287]],"type":"LineString"},"weight":104.4,"duration":104.4,"distance":1010.4}],"waypoints":[{"hint":"0F1PgASO8oYJAAAAAwAAAAAAAAB-AAAAlAZaQUazhkAAAAAAN_sgQwkAAAADAAAAAAAAAH4AAAALRgAAuek-B1cKfgFs6T4HWAp-AQAATwsAAAAA","location":[121.563577,25.037399],"name":"市府路","distance":7.772372774},{"hint":"MSZQgP___38_AAAAjgAAAOcAAAAOAAAAqyiOQkZErkKIDGpDDCJ3QT8AAACOAAAA5wAAAA4AAAALRgAA7-w-B6b4fQHw7D4HxPh9AQgAvwUAAAAA","location":[121.564399,25.03287],"name":"信義路五段","distance":3.324730081}]}
 MAP_ROUTING_101_GRAND_HOTEL = {"code":"Ok","routes":[{"legs":[{"steps":[],"weight":797.2,"summary":"","duration":797.2,"distance":9541.3}],"weight_name":"routability","geometry":{"coordinates":[[121.564399,25.03287],[121.565262,25.032849],[121.565415,25.032846],[121.565417,25.032958],[121.565266,25.032962],[121.563698,25.032998],[121.563536,25.033004],[121.563539,25.033175],[121.56354,25.033218],[121.563541,25.033273],[121.563556,25.034015],[121.56356,25.034358],[121.563568,25.034612],[121.563605,25.035784],[121.563552,25.035908],[121.563551,25.036068],[121.563573,25.037265],[121.563574,25.037308],[121.563577,25.037361],[121.563579,25.037522],[121.563402,25.037526],[121.563356,25.037527],[121.562167,25.037552],[121.562119,25.037553],[121.561988,25.037555],[121.561811,25.037561],[121.561786,25.037562],[121.561641,25.037565],[121.561619,25.037566],[121.561575,25.037567],[121.561505,25.037569],[121.561312,25.037574],[121.561263,25.037576],[121.560623,25.037597],[121.557745,25.037684],[121.557645,25.037686],[121.557525,25.037747],[121.557413,25.037748],[121.557363,25.037749],[121.555613,25.037788],[121.55543,25.037794],[121.555348,25.037797],[121.553047,25.037836],[121.552937,25.037838],[121.552849,25.037839],[121.551556,25.037862],[121.551387,25.037866],[121.551222,25.037871],[121.551055,25.037872],[121.549881,25.037902],[121.549845,25.037902],[121.549732,25.037867],[121.549633,25.037883],[121.549511,25.037914],[121.549457,25.037933],[121.549287,25.038085],[121.549259,25.038103],[121.549203,25.03817],[121.549135,25.038226],[121.54902,25.038285],[121.548892,25.038315],[121.54876,25.038314],[121.548633,25.038281],[121.54852,25.03822],[121.548472,25.038181],[121.548431,25.038137],[121.548347,25.038084],[121.548152,25.038068],[121.548056,25.038068],[121.547965,25.038068],[121.547776,25.038069],[121.547701,25.038071],[121.547105,25.038084],[121.546552,25.038096],[121.546154,25.038103],[121.546043,25.038107],[121.545919,25.038109],[121.545171,25.038125],[121.544371,25.038142],[121.543873,25.038152],[121.543765,25.038155],[121.543631,25.038158],[121.543529,25.038161],[121.543477,25.038161],[121.543001,25.038171],[121.541966,25.038189],[121.541535,25.038312],[121.541268,25.038382],[121.541143,25.038389],[121.541007,25.03839],[121.540651,25.038399],[121.540102,25.038408],[121.539844,25.038409],[121.539708,25.038416],[121.53907,25.038428],[121.539009,25.038429],[121.53872,25.038343],[121.538459,25.038236],[121.538324,25.038216],[121.538276,25.038213],[121.538172,25.038205],[121.538054,25.0382],[121.538035,25.038291],[121.538041,25.03834],[121.538039,25.038563],[121.538039,25.039094],[121.538002,25.039533],[121.537933,25.039927],[121.537904,25.040049],[121.537765,25.040416],[121.537568,25.040743],[121.537464,25.040987],[121.537271,25.041463],[121.537003,25.042104],[121.536911,25.042355],[121.536833,25.042623],[121.536735,25.043154],[121.536681,25.043728],[121.536679,25.04415],[121.536689,25.044471],[121.536727,25.045687],[121.536797,25.047873],[121.53681,25.048564],[121.536867,25.051579],[121.536944,25.055092],[121.536934,25.055951],[121.536968,25.058251],[121.53703,25.058904],[121.537105,25.06128],[121.537115,25.061477],[121.537136,25.061608],[121.537238,25.061829],[121.537245,25.062215],[121.53725,25.062314],[121.537257,25.062457],[121.537039,25.062463],[121.536803,25.062468],[121.536675,25.062472],[121.536373,25.062479],[121.53555,25.0625],[121.535309,25.062505],[121.535012,25.062513],[121.534948,25.062514],[121.534793,25.062518],[121.534332,25.06253],[121.534257,25.062547],[121.5335,25.062569],[121.533437,25.062571],[121.533403,25.062572],[121.533282,25.062564],[121.533152,25.062567],[121.533018,25.062569],[121.531774,25.062602],[121.531703,25.062603],[121.531606,25.062606],[121.530431,25.062636],[121.530292,25.06264],[121.530169,25.062643],[121.529789,25.062653],[121.529678,25.062671],[121.529055,25.062689],[121.528978,25.062663],[121.528911,25.062665],[121.527959,25.062695],[121.527876,25.062698],[121.527573,25.062713],[121.52747,25.062712],[121.52743,25.062712],[121.527207,25.062715],[121.527112,25.062732],[121.525842,25.06277],[121.52563,25.062763],[121.525497,25.062767],[121.524362,25.062797],[121.524298,25.062799],[121.523714,25.062814],[121.523248,25.062841],[121.522835,25.062852],[121.522716,25.062838],[121.522612,25.062841],[121.52258,25.06298],[121.52236,25.063936],[121.522283,25.064528],[121.522267,25.064804],[121.522261,25.064908],[121.52226,25.064976],[121.522256,25.065454],[121.522289,25.06594],[121.522332,25.066313],[121.522418,25.066761],[121.522434,25.066843],[121.522454,25.066914],[121.522829,25.068318],[121.522852,25.068403],[121.522875,25.068487],[121.522907,25.068607],[121.52345,25.070635],[121.523548,25.070737],[121.524063,25.072657],[121.524146,25.07297],[121.524265,25.073398],[121.524297,25.07347],[121.524344,25.073546],[121.524396,25.073606],[121.524453,25.073668],[121.524517,25.073725],[121.525526,25.074336],[121.525622,25.074383],[121.525697,25.07442],[121.525806,25.074464],[121.525927,25.074511],[121.525988,25.074608],[121.5261,25.074678],[121.52618,25.074725],[121.526243,25.074787],[121.526332,25.07486],[121.526423,25.074969],[121.526459,25.075055],[121.526492,25.075189],[121.526486,25.075583],[121.526444,25.075861],[121.526009,25.076384],[121.525797,25.076586],[121.525739,25.076628],[121.52573,25.076637],[121.525677,25.076713],[121.525651,25.076812],[121.525657,25.076996],[121.525738,25.077168],[121.525798,25.077259],[121.525864,25.077322],[121.525934,25.07738],[121.525994,25.077397],[121.526129,25.077471],[121.526215,25.077588],[121.526313,25.077745],[121.526418,25.077881],[121.526509,25.077966],[121.526578,25.078032],[121.526547,25.078141],[121.526497,25.078182],[121.526347,25.078236],[121.526282,25.07826]],"type":"LineString"},"weight":797.2,"duration":797.2,"distance":9541.3}],"waypoints":[{"hint":"MSZQgP___38_AAAAjgAAAOcAAAAOAAAAqyiOQkZErkKIDGpDDCJ3QT8AAACOAAAA5wAAAA4AAAALRgAA7-w-B6b4fQHw7D4HxPh9AQgAvwUAAAAA","location":[121.564399,25.03287],"name":"信義路五段","distance":3.324730081},{"hint":"WCMUgP___38QAAAAZgAAAFUAAABXAAAAE3DiQFN7DkIMIg5CBZsQQhAAAABmAAAAVQAAAFcAAAALRgAAClg-B_SpfgEcWD4HHKp-AQYAPxIAAAAA","location":[121.526282,25.07826],"name":"","distance":4.788658807}]}
+###############################
+### Startup Warm-up (預熱) ###
+###############################
+# 啟動畫面期間預先放入地理編碼快取的常用地點 (地址, 緯度, 經度)
+WARMUP_KNOWN_LOCATIONS = [
+    ("桃園國際機場", 25.0797, 121.2342),
+    ("臺北松山機場", 25.0694, 121.5525),
+    ("高雄國際機場", 22.5771, 120.3500),
+    ("台北車站", 25.0478, 121.5170),
+    ("台北101", LOCATION_TAIPEI_101[0], LOCATION_TAIPEI_101[1]),
+    ("板橋車站", LOCATION_BANQIAO_STATION[0], LOCATION_BANQIAO_STATION[1]),
+    ("圓山大飯店", LOCATION_GRAND_HOTEL[0], LOCATION_GRAND_HOTEL[1]),
+]
+# 已知路線 (起點, 終點, CatalogService 中的路線名稱)，預先放入路線快取
+WARMUP_ROUTE_FIXTURES = [
+    (LOCATION_TAIPEI_101, LOCATION_BANQIAO_STATION, "101_banqiao"),
+    (LOCATION_TAIPEI_CITY_HALL, LOCATION_TAIPEI_101, "cityhall_101"),
+    (LOCATION_TAIPEI_101, LOCATION_GRAND_HOTEL, "101_grand_hotel"),
+]
+
+###############
+### Logging ###
+###############
+# 日誌經由佇列在背景寫檔 (logging_config.py)；每次啟動寫入新的檔案
+LOG_LEVEL = "INFO"
+LOG_FILE_PATTERN = "ebaggage_{timestamp}.log"
+# 個別模組的等級 (flet 內部在 DEBUG 會記錄每個控制項訊息)；除錯動畫時可把 "main" 設為 "DEBUG"
+LOG_MODULE_LEVELS = {
+    "flet": "WARNING",
+    "flet_core": "WARNING",
+    "urllib3": "WARNING",
+    "geopy": "WARNING",
+}
+
+###########################
+### Metrics & Tracing ###
+###########################
+# 啟用後記錄地理編碼、路線、資料檔讀寫與頁面路由的耗時 (metrics.py)，
+# 每個 session 結束時把 Prometheus 文字格式快照寫入 METRICS_SNAPSHOT_PATH
+METRICS_ENABLED = False
+METRICS_SNAPSHOT_PATH = "metrics.prom"
+# 啟用後記錄即時預約流程的追蹤 (tracing.py)，span 逐行寫入 TRACING_PATH；
+# 以 python -m tracing 檢視瀑布圖
+TRACING_ENABLED = False
+TRACING_PATH = "traces.jsonl"
+
+###########################
+### Worker Pool ###
+###########################
+# 啟用後旅程路段產生等 CPU 密集工作改在子行程執行 (services/worker_pool.py)，不與 UI 搶 GIL；
+# WORKER_POOL_SIZE 為 0 時依 CPU 核心數
+WORKER_POOL_ENABLED = False
+WORKER_POOL_SIZE = 0
+
+###########################
+### Job Queue ###
+###########################
+# 掃描記錄與地理編碼重試排入背景工作佇列 (services/job_queue.py)，
+# UI 不等待；以 python -m services.job_queue --dead 檢視失敗的工作
+JOB_QUEUE_WORKERS = 2
+
+###########################
+### AI Luggage Scan ###
+###########################
+# 行李辨識後端 (services/scan_service.py)："stub" 依影像內容產生固定結果 (離線 / 測試用)；
+# "gemini" 需安裝 google-generativeai 並設定環境變數 GOOGLE_API_KEY
+SCAN_BACKEND = "stub"
+SCAN_GEMINI_MODEL = "gemini-1.5-flash"
+SCAN_WORKERS = 2
+
 ####################
 ### Demo Content ###
 ####################
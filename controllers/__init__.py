@@ -1,24 +1,34 @@
 """
 Controllers 模組
 用於處理業務邏輯和協調 Model 與 View
+
+各名稱在第一次存取時才匯入對應的子模組 (PEP 562)，
+匯入套件本身不會連帶載入所有 controller 及其使用的服務
 """
+import importlib
+
+_EXPORTS = {
+    'UserController': '.user_controller',
+    'DriverController': '.driver_controller',
+    'HotelController': '.hotel_controller',
+    'OrderController': '.order_controller',
+    'InstantBookingController': '.instant_booking_controller',
+    'PreviousBookingController': '.previous_booking_controller',
+    'HistoryController': '.history_controller',
+    'VehicleSelectionController': '.vehicle_selection_controller',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
 
-from .user_controller import UserController
-from .driver_controller import DriverController
-from .hotel_controller import HotelController
-from .order_controller import OrderController
-from .instant_booking_controller import InstantBookingController
-from .previous_booking_controller import PreviousBookingController
-from .history_controller import HistoryController
-from .vehicle_selection_controller import VehicleSelectionController
 
-__all__ = [
-    'UserController', 
-    'DriverController', 
-    'HotelController', 
-    'OrderController',
-    'InstantBookingController',
-    'PreviousBookingController',
-    'HistoryController',
-    'VehicleSelectionController',
-]
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -2,6 +2,7 @@ import flet as ft
 import json
 import logging
 from datetime import datetime, date
+from db_helpers import db_lock, load_json, save_json
 from models.trip import TripConfiguration, HotelStaySegment
 
 logger = logging.getLogger(__name__)
@@ -207,20 +208,19 @@ class PreviousBookingController:
         }
 
         try:
-            # 讀取現有 DB
-            try:
-                with open("demo_db.json", "r", encoding="utf-8") as f:
-                    db_data = json.load(f)
-            except (FileNotFoundError, json.JSONDecodeError):
-                db_data = {"orders": []}
-
-            # 寫入
-            if "orders" not in db_data:
-                db_data["orders"] = []
-            db_data["orders"].append(new_order)
-
-            with open("demo_db.json", "w", encoding="utf-8") as f:
-                json.dump(db_data, f, indent=4, ensure_ascii=False)
+            with db_lock():
+                # 讀取現有 DB
+                try:
+                    db_data = load_json("demo_db.json", source="booking_controller.submit_order")
+                except (FileNotFoundError, json.JSONDecodeError):
+                    db_data = {"orders": []}
+
+                # 寫入
+                if "orders" not in db_data:
+                    db_data["orders"] = []
+                db_data["orders"].append(new_order)
+
+                save_json("demo_db.json", db_data, source="booking_controller.submit_order")
             
             self.show_snack("訂單建立成功！", color="green")
             self.page.go("/app/user/history") # 跳轉回歷史紀錄
@@ -6,12 +6,45 @@ import logging
 from typing import Tuple, Optional
 from .base_controller import BaseController
 from models.driver import Driver
+from services.order_event_bus import OrderEvent, OrderEventBus
 
 logger = logging.getLogger(__name__)
 
 
 class DriverController(BaseController):
     """司機控制器"""
+
+    # 會派給司機的訂單種類 (travel 母單不派車)
+    DISPATCH_ORDER_TYPES = {"trip", "travel_trip", "instant_trip"}
+
+    def __init__(self, app_instance):
+        super().__init__(app_instance)
+        # 新訂單提醒只需最新的幾筆，佇列滿時丟棄最舊的提醒
+        self._subscription = OrderEventBus.subscribe(
+            self._on_order_event,
+            name="driver_alert",
+            maxsize=50,
+            overflow="drop_oldest",
+            kinds=[OrderEventBus.INSERT],
+        )
+
+    def close(self):
+        """Session 結束：取消訂單事件訂閱"""
+        self._subscription.close()
+    
+    def _on_order_event(self, event: OrderEvent):
+        """新訂單寫入時，若司機正在首頁則跳出接單提醒 (於派送執行緒呼叫，對話框交給 page.run_thread)"""
+        order = event.after or {}
+        if order.get("order_type") not in self.DISPATCH_ORDER_TYPES:
+            return
+        if not self.page or not (self.page.route or "").startswith("/app/driver"):
+            return
+        price = order.get("price")
+        message = f"新的行李預約：{order.get('pickup_location', '')} → {order.get('dropoff_location', '')}"
+        if isinstance(price, (int, float)):
+            message += f"，車資 NT$ {price:,.0f}"
+        logger.info(f"推送新訂單提醒給司機: {event.order_id}")
+        self.page.run_thread(self.app.show_driver_order_alert, message)
     
     def get_current_driver(self) -> Optional[Driver]:
         """
@@ -88,7 +121,7 @@ class DriverController(BaseController):
         """
         drivers = Driver.get_available_drivers()
         return [driver.to_dict() for driver in drivers]
-    
+
     def handle_navigation(self, route: str) -> str:
         """
         處理司機導航
@@ -4,10 +4,17 @@ History Controller
 """
 import flet as ft
 import logging
-from datetime import datetime
+import threading
 from typing import TYPE_CHECKING, List, Dict, Any, Optional
 
-from services import OrderHistoryService, DateService
+from services import (
+    OrderHistoryService,
+    OrderEvent,
+    OrderEventBus,
+    OrderSummary,
+    OrderSummaryService,
+    UserOrderProjection,
+)
 
 if TYPE_CHECKING:
     from main import App
@@ -17,20 +24,10 @@ logger = logging.getLogger(__name__)
 
 class HistoryController:
     """訂單歷史控制器"""
-    
-    STATUS_LABELS = {
-        "pending": "待確認",
-        "confirmed": "已確認",
-        "completed": "已完成",
-        "cancelled": "已取消",
-    }
 
-    STATUS_COLORS = {
-        "pending": ft.Colors.ORANGE_300,
-        "confirmed": ft.Colors.BLUE_300,
-        "completed": ft.Colors.GREEN_300,
-        "cancelled": ft.Colors.RED_300,
-    }
+    PAGE_SIZE = 20
+    
+    STATUS_LABELS = OrderSummaryService.STATUS_LABELS
 
     def __init__(self, app_instance: 'App'):
         logger.info("初始化 HistoryController")
@@ -40,144 +37,147 @@ class HistoryController:
         
         # 當前篩選條件
         self.filter_status = "all"  # all, pending, completed, cancelled
+        # orders 只以整個新列表替換 (copy-on-write)，View 迭代時不受事件執行緒修改影響；
+        # 讀改寫由 _orders_lock 串行化
         self.orders: List[Dict[str, Any]] = []
+        self.next_cursor: Optional[str] = None
+        self._loading_more = False
+        self._orders_lock = threading.RLock()
+
+        # 使用者訂單的記憶體投影，由訂單事件保持同步
+        self.projection: Optional[UserOrderProjection] = None
+        self._subscription = OrderEventBus.subscribe(self._on_order_event, name="history")
+        self._seen_dropped = 0
         logger.debug("HistoryController 初始化完成")
+
+    def close(self):
+        """Session 結束：取消訂單事件訂閱"""
+        self._subscription.close()
         
     def bind_view(self, view):
         """綁定 View 實例"""
         logger.info("綁定 View 到 HistoryController")
         self.view = view
         
+    def _current_user_email(self) -> str:
+        return self.app.current_user_email if hasattr(self.app, 'current_user_email') else "user@example.com"
+
+    def _get_projection(self) -> UserOrderProjection:
+        """取得當前使用者的訂單投影 (第一次使用或換使用者時才從儲存層載入)"""
+        user_email = self._current_user_email()
+        if self.projection is None or self.projection.user_email != user_email:
+            self.projection = UserOrderProjection(user_email)
+        elif self._subscription.dropped != self._seen_dropped:
+            # 有事件因佇列滿被丟棄，投影可能不完整，重新載入一次
+            self._seen_dropped = self._subscription.dropped
+            self.projection.reload()
+        return self.projection
+
+    @property
+    def has_more(self) -> bool:
+        """是否還有下一頁"""
+        return self.next_cursor is not None
+        
     def load_orders(self):
-        """載入訂單列表"""
+        """載入第一頁訂單 (由記憶體投影取得，篩選條件在查詢時套用)"""
         try:
-            # 從 Service 獲取訂單
-            user_email = self.app.current_user_email if hasattr(self.app, 'current_user_email') else "user@example.com"
-            
-            # 獲取所有排序後的訂單，然後過濾當前用戶
-            all_orders = OrderHistoryService.get_orders_sorted_by_date(reverse=True)
-            self.orders = [
-                order for order in all_orders 
-                if order.get('user_email') == user_email
-            ]
-            
-            logger.info(f"載入了 {len(self.orders)} 筆訂單 (用戶: {user_email})")
-            
-            # 根據篩選條件過濾
-            self.apply_filter()
+            with self._orders_lock:
+                projection = self._get_projection()
+                self.orders, self.next_cursor = projection.get_page(
+                    status=self.filter_status,
+                    limit=self.PAGE_SIZE,
+                )
+            logger.info(f"載入了 {len(self.orders)} 筆訂單 (用戶: {projection.user_email}, 篩選: {self.filter_status})")
             
         except Exception as e:
             logger.error(f"載入訂單失敗: {e}")
-            self.orders = []
-            
-    def apply_filter(self):
-        """套用篩選條件"""
-        if self.filter_status == "all":
+            with self._orders_lock:
+                self.orders = []
+                self.next_cursor = None
+
+    def load_more(self, e=None):
+        """載入下一頁訂單，並只把新的一頁交給 View 建立卡片"""
+        if not self.next_cursor or self._loading_more:
             return
-            
-        # 篩選訂單
-        self.orders = [
-            order for order in self.orders 
-            if order.get("status") == self.filter_status
-        ]
-        
-        logger.info(f"篩選後剩餘 {len(self.orders)} 筆訂單")
+        self._loading_more = True
+        try:
+            with self._orders_lock:
+                page, self.next_cursor = self._get_projection().get_page(
+                    status=self.filter_status,
+                    cursor=self.next_cursor,
+                    limit=self.PAGE_SIZE,
+                )
+                self.orders = self.orders + page
+            logger.info(f"載入下一頁 {len(page)} 筆訂單 (共 {len(self.orders)} 筆)")
+            if self.view and hasattr(self.view, "append_orders"):
+                self.view.append_orders(page)
+        except Exception as ex:
+            logger.error(f"載入下一頁訂單失敗: {ex}")
+        finally:
+            self._loading_more = False
         
+    def _on_order_event(self, event: OrderEvent):
+        """
+        訂單事件 (於事件匯流排的派送執行緒呼叫)：只更新投影與畫面上受影響的那一筆，
+        畫面更新交給 page.run_thread，不在派送執行緒中操作控制項
+        """
+        before, after = event.before, event.after
+        with self._orders_lock:
+            projection = self.projection
+            if projection is None or not projection.apply_change(before, after):
+                return
+
+            order_id = OrderHistoryService.get_order_identifier(after or before)
+            index = next(
+                (i for i, o in enumerate(self.orders) if OrderHistoryService.get_order_identifier(o) == order_id),
+                None,
+            )
+            keep = projection.matches(after, self.filter_status)
+            orders = list(self.orders)
+            if index is not None:
+                if keep:
+                    orders[index] = after
+                else:
+                    del orders[index]
+            elif keep and event.kind == OrderEventBus.INSERT:
+                # 新訂單時間最新，放在最前面
+                orders.insert(0, after)
+            else:
+                return
+            # 列表在「空狀態」與「卡片列表」之間切換時，畫面上沒有可單筆替換的卡片列表
+            switched = not self.orders or not orders
+            self.orders = orders
+
+        view = self.view
+        if not view or not self.page:
+            return
+        if hasattr(view, "update_order") and not switched:
+            self.page.run_thread(view.update_order, order_id, after if keep else None)
+        else:
+            self.page.run_thread(view.update_view)
+
     def set_filter(self, status: str, e=None):
         """設定篩選條件"""
         self.filter_status = status
         logger.info(f"設定篩選: {status}")
         
-        # 重新載入訂單
+        # 從記憶體投影重新取第一頁
         self.load_orders()
         
         # 更新 View
         if self.view:
             self.view.update_view()
             
-    def _format_iso_datetime(self, iso_value: Optional[str]) -> str:
-        if not iso_value:
-            return ""
-        try:
-            dt = datetime.fromisoformat(iso_value)
-            return DateService.format_date(dt, DateService.DATETIME_FORMAT)
-        except ValueError:
-            return iso_value
-
-    def extract_order_fields(self, order: Dict[str, Any]) -> Dict[str, Any]:
-        identifier = order.get("id") or order.get("order_id") or order.get("trip_id") or "N/A"
-        raw_status = (order.get("status") or "pending").lower()
-        status_key = raw_status if raw_status in self.STATUS_LABELS else raw_status
-        status_label = self.STATUS_LABELS.get(status_key, raw_status.upper())
-        status_color = self.STATUS_COLORS.get(status_key, ft.Colors.GREY_300)
-
-        date_str = order.get("date", "")
-        date_time_display = ""
-        primary_datetime_field = order.get("start_time") or order.get("created_at") or order.get("timestamp")
-        if primary_datetime_field:
-            try:
-                dt = datetime.fromisoformat(primary_datetime_field)
-                date_str = DateService.format_date(dt)
-                date_time_display = DateService.format_date(dt, DateService.DATETIME_FORMAT)
-            except ValueError:
-                date_time_display = primary_datetime_field
-                if not date_str and "T" in primary_datetime_field:
-                    date_str = primary_datetime_field.split("T")[0]
-
-        pickup = (
-            order.get("pickup_display")
-            or order.get("pickup_location")
-            or order.get("pickup")
-            or order.get("start_address")
-            or "未提供"
-        )
-        dropoff = (
-            order.get("dropoff_display")
-            or order.get("dropoff_location")
-            or order.get("dropof")
-            or order.get("end_address")
-            or "未提供"
-        )
-
-        price = order.get("price") or order.get("amount")
-        if isinstance(price, (int, float)):
-            price_display = f"NT$ {price:,.0f}"
-        elif price:
-            price_display = f"NT$ {price}"
-        else:
-            price_display = "—"
-
-        luggage_items = order.get("luggage_items") or []
-        if luggage_items:
-            luggage_count = sum(int(item.get("quantity", 1) or 1) for item in luggage_items)
-        else:
-            luggage_count = order.get("luggage_count") or order.get("luggages")
-
-        return {
-            "order_id": identifier,
-            "status_key": status_key,
-            "status_label": status_label,
-            "status_color": status_color,
-            "order_date": date_str,
-            "order_datetime": date_time_display,
-            "pickup": pickup,
-            "dropoff": dropoff,
-            "price_display": price_display,
-            "raw_price": price,
-            "order_type": order.get("order_type", "legacy"),
-            "luggage_count": luggage_count,
-            "luggage_note": order.get("luggage_note"),
-            "start_time_str": self._format_iso_datetime(order.get("start_time")),
-            "end_time_str": self._format_iso_datetime(order.get("end_time")),
-            "parent_travel_id": order.get("parent_travel_id"),
-        }
+    def get_order_summary(self, order: Dict[str, Any]) -> OrderSummary:
+        """取得訂單顯示摘要 (依訂單編號與版本快取)"""
+        return OrderSummaryService.get_summary(order)
 
     def view_order_detail(self, order_id: str, e=None):
         """查看訂單詳情"""
         logger.info(f"查看訂單詳情: {order_id}")
 
         order = next(
-            (o for o in self.orders if (o.get("id") or o.get("order_id")) == order_id),
+            (o for o in list(self.orders) if (o.get("id") or o.get("order_id")) == order_id),
             None,
         )
         if not order:
@@ -186,7 +186,7 @@ class HistoryController:
             self.page.update()
             return
 
-        info = self.extract_order_fields(order)
+        info = self.get_order_summary(order)
 
         def _text_row(label: str, value: str, icon: Optional[str] = None):
             leading = ft.Icon(icon, size=18, color=ft.Colors.BLACK87) if icon else None
@@ -206,14 +206,14 @@ class HistoryController:
 
         details_column = ft.Column(
             controls=[
-                _text_row("狀態", info["status_label"]),
-                _text_row("訂單編號", info["order_id"]),
-                _text_row("建立時間", info["order_datetime"] or info["start_time_str"]),
-                _text_row("行程開始", info["start_time_str"]),
-                _text_row("行程結束", info["end_time_str"]),
-                _text_row("起點", info["pickup"]),
-                _text_row("終點", info["dropoff"]),
-                _text_row("金額", info["price_display"]),
+                _text_row("狀態", info.status_label),
+                _text_row("訂單編號", info.order_id),
+                _text_row("建立時間", info.order_datetime or info.start_time_str),
+                _text_row("行程開始", info.start_time_str),
+                _text_row("行程結束", info.end_time_str),
+                _text_row("起點", info.pickup),
+                _text_row("終點", info.dropoff),
+                _text_row("金額", info.price_display),
             ],
             spacing=8,
             tight=True,
@@ -221,17 +221,17 @@ class HistoryController:
             height=300,
         )
 
-        if info["luggage_count"]:
+        if info.luggage_count:
             details_column.controls.append(
-                _text_row("行李件數", str(info["luggage_count"]))
+                _text_row("行李件數", str(info.luggage_count))
             )
-        if info["luggage_note"]:
+        if info.luggage_note:
             details_column.controls.append(
-                _text_row("行李備註", info["luggage_note"])
+                _text_row("行李備註", info.luggage_note)
             )
-        if info["parent_travel_id"]:
+        if info.parent_travel_id:
             details_column.controls.append(
-                _text_row("所屬旅程", info["parent_travel_id"])
+                _text_row("所屬旅程", info.parent_travel_id)
             )
 
         dialog = ft.AlertDialog(
@@ -256,10 +256,7 @@ class HistoryController:
                         ft.Text(f"訂單 {order_id} 已取消"),
                         bgcolor=ft.Colors.ORANGE
                     )
-                    # 重新載入訂單
-                    self.load_orders()
-                    if self.view:
-                        self.view.update_view()
+                    # 列表已由訂單事件 (_on_order_event) 就地更新
                 else:
                     self.page.snack_bar = ft.SnackBar(
                         ft.Text("找不到訂單，無法取消"),
@@ -289,7 +286,7 @@ class HistoryController:
         self.page.open(dialog)
         
     def refresh_orders(self, e=None):
-        """刷新訂單列表"""
+        """刷新訂單列表 (投影已由變更通知保持同步，只需重新取第一頁)"""
         logger.info("刷新訂單列表")
         self.load_orders()
         
@@ -3,16 +3,21 @@ Hotel Controller
 處理飯店相關的業務邏輯
 """
 import logging
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from .base_controller import BaseController
 from models.hotel import Hotel
 from models.scan import Scan
+from services.hotel_inventory_service import HotelInventoryService
+from services.job_queue import SAVE_SCAN_JOB, JobQueue
+from services.hotel_stats_service import HotelStatsService
 
 logger = logging.getLogger(__name__)
 
 
 class HotelController(BaseController):
     """飯店控制器"""
+
+    HOTEL_ID = 1
     
     def get_current_hotel(self) -> Optional[Hotel]:
         """
@@ -21,21 +26,41 @@ class HotelController(BaseController):
         Returns:
             Hotel 物件
         """
-        # 在 demo 中，我們使用固定的飯店 ID
-        hotel = Hotel.find_by_id(1)
+        # 在 demo 中，我們使用固定的飯店 ID；不存在時以預設值建立
+        data = HotelInventoryService.ensure_hotel(
+            self.HOTEL_ID,
+            name="圓山大飯店",
+            baggage_count=63,
+            baggage_capacity=180,
+            not_arrived_customers=27
+        )
+        return Hotel.from_dict(data)
+    
+    def save_hotel(self, hotel: Hotel) -> bool:
+        """
+        將飯店資料同步到行李庫存
         
-        # 如果不存在，創建預設飯店
-        if not hotel:
-            hotel = Hotel(
-                hotel_id=1,
-                name="圓山大飯店",
-                baggage_count=63,
-                baggage_capacity=180,
-                not_arrived_customers=27
+        Args:
+            hotel: Hotel 物件
+            
+        Returns:
+            是否成功
+        """
+        if hotel.hotel_id is None:
+            logger.warning("hotel_id 為空，未同步飯店庫存")
+            return False
+        try:
+            HotelInventoryService.upsert(
+                hotel.hotel_id,
+                hotel.name,
+                hotel.baggage_count,
+                hotel.baggage_capacity,
+                hotel.not_arrived_customers
             )
-            hotel.save()
-        
-        return hotel
+            return True
+        except Exception as e:
+            logger.error(f"同步飯店庫存時發生錯誤: {e}")
+            return False
     
     def add_baggage(self, count: int = 1) -> bool:
         """
@@ -50,8 +75,10 @@ class HotelController(BaseController):
         try:
             hotel = self.get_current_hotel()
             if hotel:
-                result = hotel.add_baggage(count)
-                if result:
+                # 容量檢查與累加在同一個 UPDATE 內完成，不會超收
+                new_count = HotelInventoryService.add_baggage(hotel.hotel_id, count)
+                if new_count is not None:
+                    hotel.baggage_count = new_count
                     # 更新 app 狀態
                     self.app.hotel_baggages = hotel.baggage_count
                     logger.info(f"行李數量已增加 {count}，目前: {hotel.baggage_count}")
@@ -77,8 +104,9 @@ class HotelController(BaseController):
         try:
             hotel = self.get_current_hotel()
             if hotel:
-                result = hotel.remove_baggage(count)
-                if result:
+                new_count = HotelInventoryService.remove_baggage(hotel.hotel_id, count)
+                if new_count is not None:
+                    hotel.baggage_count = new_count
                     # 更新 app 狀態
                     self.app.hotel_baggages = hotel.baggage_count
                     logger.info(f"行李數量已減少 {count}，目前: {hotel.baggage_count}")
@@ -91,6 +119,46 @@ class HotelController(BaseController):
             logger.error(f"減少行李數量時發生錯誤: {e}")
             return False
     
+    def check_in_baggage(self, items: List[Dict[str, Any]], reference: Optional[str] = None) -> bool:
+        """
+        批次 check-in 整組旅客的行李 (單一交易寫入)
+        
+        Args:
+            items: 行李列表 [{"size", "color", "type", "quantity"}, ...]
+            reference: 訂單或團體代號
+            
+        Returns:
+            是否成功
+        """
+        try:
+            hotel = self.get_current_hotel()
+            new_count = HotelInventoryService.check_in(hotel.hotel_id, items, reference=reference) if hotel else None
+            if new_count is not None:
+                hotel.baggage_count = new_count
+                self.app.hotel_baggages = hotel.baggage_count
+                logger.info(f"批次 check-in 完成，目前: {hotel.baggage_count}")
+                return True
+            logger.warning("行李容量不足，批次 check-in 未執行")
+            return False
+        except Exception as e:
+            logger.error(f"批次 check-in 時發生錯誤: {e}")
+            return False
+    
+    def get_dashboard_stats(self) -> Dict[str, int]:
+        """
+        取得櫃台儀表板數字 (皆為預先彙總的值，不掃描訂單表)
+        
+        Returns:
+            {"baggage_count", "baggage_capacity", "inbound_trips", "inbound_luggage", "arrived", "not_arrived"}
+        """
+        hotel = self.get_current_hotel()
+        stats = HotelStatsService.get_dashboard(hotel.name)
+        stats.update(
+            baggage_count=hotel.baggage_count,
+            baggage_capacity=hotel.baggage_capacity,
+        )
+        return stats
+    
     def update_not_arrived(self, count: int) -> bool:
         """
         更新未抵達旅客數
@@ -103,8 +171,8 @@ class HotelController(BaseController):
         """
         try:
             hotel = self.get_current_hotel()
-            if hotel:
-                hotel.update_not_arrived(count)
+            if hotel and HotelInventoryService.set_not_arrived(hotel.hotel_id, count):
+                hotel.not_arrived_customers = count
                 # 更新 app 狀態
                 self.app.hotel_not_arrived_customer = count
                 logger.info(f"未抵達旅客數已更新: {count}")
@@ -116,13 +184,13 @@ class HotelController(BaseController):
     
     def save_scan_result(self, scan_result: str) -> bool:
         """
-        儲存掃描結果
+        儲存掃描結果 (排入背景工作佇列寫檔，不等待)
         
         Args:
             scan_result: 掃描結果文字
             
         Returns:
-            是否成功
+            是否成功排入
         """
         try:
             user_email = self.page.session.get("email") or "hotel@demo.com"
@@ -133,10 +201,13 @@ class HotelController(BaseController):
                 scan_result=scan_result
             )
             
-            if scan.save():
-                logger.info("掃描結果已儲存")
-                return True
-            return False
+            JobQueue.enqueue(
+                SAVE_SCAN_JOB,
+                {"user_email": scan.user_email, "role": scan.role, "scan_result": scan.scan_result, "timestamp": scan.timestamp},
+                idempotency_key=f"scan:{scan.user_email}:{scan.timestamp}",
+            )
+            logger.info("掃描結果已排入儲存")
+            return True
         except Exception as e:
             logger.error(f"儲存掃描結果時發生錯誤: {e}")
             return False
@@ -4,15 +4,18 @@ Instant Booking Controller
 """
 import flet as ft
 import logging
-import math
 from datetime import datetime
+from functools import cached_property
 from typing import TYPE_CHECKING, List, Optional, Tuple
 
 from services import BookingService
+from services.distance_matrix_service import DistanceMatrixService
+from services.hotel_catalog import HotelCatalog
 from services.location_service import LocationService
 from services.travel_service import TravelService
 from models.trip import Trip, LuggageItem
 from config import USER_DASHBOARD_DEFAULT_LOCATION
+from tracing import Tracer
 
 if TYPE_CHECKING:
     from main import App
@@ -38,36 +41,39 @@ class InstantBookingController:
         self.luggage_count = 1
         self.luggage_note = ""  # 行李備注
         self.scan_confirmed = False
-        self.location_service = LocationService()
         self.selected_vehicle_type: str = ""
         self.selected_vehicle_label: str = ""
         self.selected_vehicle_price: float = 0.0
+        # 目前這筆預約的追蹤 ID (按下確認時產生，跨選車與送出沿用，送出後清除)
+        self.booking_trace_id: Optional[str] = None
         
-        # 飯店資料管理
-        self.all_hotels = BookingService.load_partner_hotels()
+        # 飯店資料管理 (all_hotels 於第一次使用時才載入)
         self.nearby_hotels = []
         self.current_map_center = USER_DASHBOARD_DEFAULT_LOCATION
         
         logger.debug("InstantBookingController 初始化完成")
+
+    @cached_property
+    def location_service(self) -> LocationService:
+        """地理編碼服務 (第一次查詢地址時才建立 Nominatim 客戶端)"""
+        return LocationService(defer_retries=True)
+
+    @cached_property
+    def all_hotels(self) -> HotelCatalog:
+        """合作飯店目錄 (欄式，all_hotels[i] 為 HotelRow)"""
+        return BookingService.load_partner_hotels()
+
+    @cached_property
+    def _hotel_coords(self):
+        return BookingService.get_partner_coordinates()
         
     def update_nearby_hotels(self, lat, lon, radius_km=5.0, limit=50):
         """更新附近的飯店列表"""
         self.current_map_center = (lat, lon)
         
-        # 簡單的距離計算 (歐幾里得距離近似)
-        # 1度緯度約 111km
-        # 1度經度約 111km * cos(lat)
-        
-        def calculate_distance(h_lat, h_lon):
-            return math.sqrt((h_lat - lat)**2 + (h_lon - lon)**2)
-            
-        # 排序並取前 limit 個
-        sorted_hotels = sorted(
-            self.all_hotels,
-            key=lambda h: calculate_distance(h['lat'], h['lon'])
-        )
-        
-        self.nearby_hotels = sorted_hotels[:limit]
+        # 以距離矩陣一次計算所有合作飯店的距離，只排序前 limit 筆
+        nearest = DistanceMatrixService.nearest_indices((lat, lon), self._hotel_coords, limit=limit)
+        self.nearby_hotels = [self.all_hotels[idx] for idx in nearest]
         logger.info(f"已更新附近飯店列表，中心: ({lat}, {lon})，數量: {len(self.nearby_hotels)}")
         
         # 如果 View 已經綁定，通知 View 更新地圖標記
@@ -124,6 +130,16 @@ class InstantBookingController:
             return (lat, lon)
         return None
 
+    def _booking_span(self, step: str, **attributes):
+        """預約流程某一步驟的 span，接續 booking_trace_id 所屬的追蹤"""
+        return Tracer.span(
+            f"booking.{step}",
+            trace_id=self.booking_trace_id,
+            booking_id=self.booking_trace_id,
+            session_id=getattr(self.page, "session_id", None),
+            **attributes,
+        )
+
     def _build_luggage_items(self) -> List[LuggageItem]:
         details = getattr(self.app, "scan_baggage_details", None)
         items: List[LuggageItem] = []
@@ -139,6 +155,7 @@ class InstantBookingController:
             items = [LuggageItem(size=24, quantity=max(self.luggage_count or 1, 1))]
         return items
 
+    @Tracer.traced("booking.compute_pending_trip")
     def _compute_pending_trip(self) -> None:
         pickup_ref = self.app.pickup_location_ref.current
         dropoff_ref = self.app.dropoff_location_ref.current
@@ -226,21 +243,24 @@ class InstantBookingController:
         self.dropoff_location = self.app.dropoff_location_ref.current.value
         if self.app.luggage_note_ref.current:
             self.luggage_note = self.app.luggage_note_ref.current.value or ""
-        try:
-            self._compute_pending_trip()
-        except ValueError as exc:
-            logger.warning("計算行程失敗: %s", exc)
-            self._show_snack(str(exc))
-            return
-        except Exception as exc:
-            logger.error("計算行程時發生錯誤: %s", exc)
-            self._show_snack("無法計算預估價格，請稍後重試")
-            return
 
-        logger.info(f"即時預約: {self.pickup_location} -> {self.dropoff_location}, 備注: {self.luggage_note}")
+        self.booking_trace_id = Tracer.new_trace_id()
+        with self._booking_span("confirm"):
+            try:
+                self._compute_pending_trip()
+            except ValueError as exc:
+                logger.warning("計算行程失敗: %s", exc)
+                self._show_snack(str(exc))
+                return
+            except Exception as exc:
+                logger.error("計算行程時發生錯誤: %s", exc)
+                self._show_snack("無法計算預估價格，請稍後重試")
+                return
+
+            logger.info(f"即時預約: {self.pickup_location} -> {self.dropoff_location}, 備注: {self.luggage_note}")
 
-        self._clear_vehicle_selection()
-        self.submit_order(e)
+            self._clear_vehicle_selection()
+            self.submit_order(e)
             
     def submit_order(self, e):
         """導向車型選擇畫面，延後最終儲存"""
@@ -292,10 +312,11 @@ class InstantBookingController:
         self.pending_trip.price = vehicle_price
 
         self.current_step = 2
-        if self.view:
-            self.view.update_view()
-        else:
-            self.page.go("/app/user/instant_booking")
+        with self._booking_span("select_vehicle", vehicle_type=vehicle_type):
+            if self.view:
+                self.view.update_view()
+            else:
+                self.page.go("/app/user/instant_booking")
 
     def finalize_booking(self, e):
         """最終確認訂單並儲存"""
@@ -307,31 +328,34 @@ class InstantBookingController:
             return
 
         user_email = getattr(self.app, "current_user_email", "user@example.com")
-        try:
-            TravelService.save_single_trip(
-                self.pending_trip,
-                user_email=user_email,
-                order_type="instant_trip",
-                extra_fields={
-                    "pickup_display": self.pickup_location,
-                    "dropoff_display": self.dropoff_location,
-                    "luggage_note": self.luggage_note,
-                    "selected_vehicle": self.selected_vehicle_type,
-                },
-            )
-        except Exception as exc:  # pragma: no cover - UI feedback path
-            logger.exception("即時預約儲存失敗: %s", exc)
-            self._show_snack("儲存失敗，請稍後再試")
-            return
+        with self._booking_span("finalize", vehicle_type=self.selected_vehicle_type) as span:
+            try:
+                entry = TravelService.save_single_trip(
+                    self.pending_trip,
+                    user_email=user_email,
+                    order_type="instant_trip",
+                    extra_fields={
+                        "pickup_display": self.pickup_location,
+                        "dropoff_display": self.dropoff_location,
+                        "luggage_note": self.luggage_note,
+                        "selected_vehicle": self.selected_vehicle_type,
+                    },
+                )
+            except Exception as exc:  # pragma: no cover - UI feedback path
+                logger.exception("即時預約儲存失敗: %s", exc)
+                span.set_attribute("error", str(exc))
+                self._show_snack("儲存失敗，請稍後再試")
+                return
+            span.set_attribute("order_id", entry.get("id"))
 
-        self._show_snack("已為您派車，稍候即抵達！", color=ft.Colors.GREEN_600)
+            self._show_snack("已為您派車，稍候即抵達！", color=ft.Colors.GREEN_600)
 
-        vehicle_controller = getattr(self.app, "vehicle_selection_controller", None)
-        if vehicle_controller:
-            vehicle_controller.reset()
+            vehicle_controller = getattr(self.app, "vehicle_selection_controller", None)
+            if vehicle_controller:
+                vehicle_controller.reset()
 
-        self.reset_form()
-        self.page.go("/app/user/history")
+            self.reset_form()
+            self.page.go("/app/user/history")
             
     def go_back(self, e):
         """返回上一步"""
@@ -354,6 +378,7 @@ class InstantBookingController:
         self.luggage_count = 1
         self.luggage_note = ""
         self.scan_confirmed = False
+        self.booking_trace_id = None
         self._clear_vehicle_selection()
         
         # 創建新的 trip
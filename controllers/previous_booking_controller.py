@@ -3,11 +3,13 @@ import logging
 import uuid
 from dataclasses import dataclass, field
 from datetime import datetime, date, timedelta
-from typing import Any, Dict, List, Optional
+from functools import cached_property
+from typing import Any, Dict, List, Mapping, Optional
 
 from models.trip import Travel, HotelStay
 from services.travel_service import TravelService
 from services.location_service import LocationService
+from services.worker_pool import WorkerPool
 from services import BookingService
 
 logger = logging.getLogger(__name__)
@@ -63,8 +65,9 @@ class PreviousBookingController:
         # 每次進入 previous_booking 都是一個新的 trip
         self.trip_config: TripConfiguration = TripConfiguration()
         self.preview_travel: Optional[Travel] = None
-        self.location_service = LocationService()
-        self.hotel_lookup = self._load_hotel_lookup()
+        # 上一次產生的預覽，編輯後只重新計算受影響的路段
+        self._last_travel: Optional[Travel] = None
+        self._hotel_metadata_cache: Dict[str, Dict[str, Any]] = {}
         self._init_new_trip()
         
         self.current_step = 1
@@ -81,19 +84,22 @@ class PreviousBookingController:
             date_picker_mode=ft.DatePickerMode.DAY
         )
     
-    def _load_hotel_lookup(self) -> Dict[str, Dict[str, Any]]:
-        lookup: Dict[str, Dict[str, Any]] = {}
-        for hotel in BookingService.load_hotels():
-            name = hotel.get("name")
-            if name:
-                lookup[name] = hotel
-        return lookup
+    @cached_property
+    def location_service(self) -> LocationService:
+        """地理編碼服務 (第一次查詢地址時才建立 Nominatim 客戶端)"""
+        return LocationService(defer_retries=True)
+
+    @property
+    def hotel_lookup(self) -> Mapping[str, Mapping[str, Any]]:
+        """飯店名稱 → 飯店資料 (由 BookingService 共用並快取，啟動預熱時即已建立)"""
+        return BookingService.get_hotel_lookup()
 
     def _init_new_trip(self):
         """創建一個新的 previous booking trip"""
         self.trip_config = TripConfiguration()
         self.trip_config.segments = []
         self.preview_travel = None
+        self._last_travel = None
         logger.info("已創建新的 previous booking trip")
 
     @staticmethod
@@ -115,22 +121,24 @@ class PreviousBookingController:
             logger.warning("地理編碼失敗 (%s): %s", address, exc)
             return None
 
-    def _resolve_hotel_metadata(self, hotel_name: str) -> Dict[str, Any]:
+    def _resolve_hotel_metadata(self, hotel_name: str) -> Mapping[str, Any]:
         if not hotel_name:
             raise ValueError("請輸入飯店名稱")
-        info = self.hotel_lookup.get(hotel_name)
+        info = self.hotel_lookup.get(hotel_name) or self._hotel_metadata_cache.get(hotel_name)
         if info:
             return info
         coords = self._geocode_address(hotel_name)
         if coords:
             lat, lon, formatted = coords
-            return {
+            info = {
                 "name": hotel_name,
                 "address": formatted or hotel_name,
                 "lat": lat,
                 "lon": lon,
                 "is_partner": False,
             }
+            self._hotel_metadata_cache[hotel_name] = info
+            return info
         return {
             "name": hotel_name,
             "address": hotel_name,
@@ -163,8 +171,9 @@ class PreviousBookingController:
                 )
             )
 
+        previous = self._last_travel
         travel = Travel(
-            id=str(uuid.uuid4()),
+            id=previous.id if previous else str(uuid.uuid4()),
             total_start_date=config.total_start_date,
             total_end_date=config.total_end_date,
             status="DRAFT",
@@ -186,8 +195,10 @@ class PreviousBookingController:
 
     def _ensure_preview_travel(self) -> Travel:
         travel = self._build_travel_from_config()
-        TravelService.generate_trips(travel)
+        previous_trips = self._last_travel.trips if self._last_travel else None
+        WorkerPool.generate_trips(travel, previous_trips)
         self.preview_travel = travel
+        self._last_travel = travel
         return travel
 
     def bind_view(self, view):
@@ -7,9 +7,12 @@ from typing import TYPE_CHECKING, Dict, List, Optional
 
 import requests
 
+from metrics import ROUTE_POLYLINE_FAILURES_TOTAL, ROUTE_POLYLINE_SECONDS, Metrics
 from models.trip import Trip
-from services.location_service import LocationService
+from services.distance_matrix_service import DistanceMatrixService
 from services.map_util_service import MapUtilService
+from services.pricing_service import PricingService
+from tracing import Tracer
 
 if TYPE_CHECKING:
     from main import App
@@ -31,7 +34,7 @@ class VehicleSelectionController:
             "description": "最多 3 件 24 吋行李",
             "icon": ft.Icons.DIRECTIONS_CAR,
             "eta": f"約 {random.randint(2, 10)} 分鐘抵達",
-            "multiplier": 1.0,
+            "multiplier": PricingService.VEHICLE_MULTIPLIERS["sedan"],
             "capacity_text": "3 件行李",
         },
         {
@@ -40,7 +43,7 @@ class VehicleSelectionController:
             "description": "最多 5 件 24 吋行李",
             "icon": ft.Icons.DIRECTIONS_CAR_FILLED,
             "eta": f"約 {random.randint(2, 10)} 分鐘抵達",
-            "multiplier": 1.25,
+            "multiplier": PricingService.VEHICLE_MULTIPLIERS["suv"],
             "capacity_text": "5 件行李",
         },
         {
@@ -49,7 +52,7 @@ class VehicleSelectionController:
             "description": "最多 7 件 24 吋行李",
             "icon": ft.Icons.AIRPORT_SHUTTLE,
             "eta": f"約 {random.randint(5, 20)} 分鐘抵達",
-            "multiplier": 1.5,
+            "multiplier": PricingService.VEHICLE_MULTIPLIERS["van"],
             "capacity_text": "7 件行李",
         },
     ]
@@ -81,6 +84,7 @@ class VehicleSelectionController:
         logger.debug("綁定 VehicleSelection View")
         self.view = view
 
+    @Tracer.traced("vehicle_selection.prepare_from_trip")
     def prepare_from_trip(
         self,
         trip: Trip,
@@ -100,27 +104,35 @@ class VehicleSelectionController:
         self.recommended_vehicle_type = self._recommend_vehicle(self.luggage_count)
         self.selected_vehicle_type = self.recommended_vehicle_type
 
-        self.base_price = trip.price or self._estimate_price_fallback(trip)
-        self.distance_km = round(
-            LocationService.calculate_distance(
-                trip.pickup_lat,
-                trip.pickup_lon,
-                trip.dropoff_lat,
-                trip.dropoff_lon,
-            ),
-            1,
-        )
-        self.eta_min = int(self.distance_km * 2.2) or 5
+        # 基本車資只算一次，各車型價格為基本車資 × 車型倍率
+        raw_distance_km = DistanceMatrixService.pairwise_distances(
+            [(trip.pickup_lat, trip.pickup_lon)],
+            [(trip.dropoff_lat, trip.dropoff_lon)],
+        )[0]
+        self.base_price = PricingService.base_fare(trip, raw_distance_km)
+        self.distance_km = round(raw_distance_km, 1)
 
-        self.polyline_points = self._fetch_route_polyline(
+        polyline = self._fetch_route_polyline(
             trip.pickup_lat,
             trip.pickup_lon,
             trip.dropoff_lat,
             trip.dropoff_lon,
-        ) or [
-            [trip.pickup_lon, trip.pickup_lat],
-            [trip.dropoff_lon, trip.dropoff_lat],
-        ]
+        )
+        if polyline:
+            self.polyline_points = polyline
+            # 行車時間取自路線快取 (上面的路線查詢與啟動預熱都會寫入)，未命中時才查 OSRM table
+            _, durations = DistanceMatrixService.route_matrix(
+                [(trip.pickup_lat, trip.pickup_lon)],
+                [(trip.dropoff_lat, trip.dropoff_lon)],
+            )
+            self.eta_min = max(round(durations[0][0]), 1)
+        else:
+            # 路線查詢失敗 (OSRM 多半無法連線)：不再呼叫 table 等第二次逾時，直接以距離估算
+            self.polyline_points = [
+                [trip.pickup_lon, trip.pickup_lat],
+                [trip.dropoff_lon, trip.dropoff_lat],
+            ]
+            self.eta_min = int(self.distance_km * 2.2) or 5
         self.center_latlon = MapUtilService.calculate_center(
             trip.pickup_lat,
             trip.pickup_lon,
@@ -260,16 +272,6 @@ class VehicleSelectionController:
             return "suv"
         return "van"
 
-    def _estimate_price_fallback(self, trip: Trip) -> float:
-        """缺少 price 時，根據距離與車型大致估算"""
-        distance_km = LocationService.calculate_distance(
-            trip.pickup_lat,
-            trip.pickup_lon,
-            trip.dropoff_lat,
-            trip.dropoff_lon,
-        )
-        return max(350.0, distance_km * 80)
-
     def _calculate_price(self, option: Dict[str, object]) -> float:
         multiplier = float(option.get("multiplier", 1))
         return round(self.base_price * multiplier)
@@ -284,6 +286,7 @@ class VehicleSelectionController:
         self.page.snack_bar = snack
         self.page.update()
 
+    @Metrics.timed(ROUTE_POLYLINE_SECONDS)
     def _fetch_route_polyline(
         self,
         pickup_lat: float,
@@ -303,9 +306,17 @@ class VehicleSelectionController:
             data = response.json()
             routes = data.get("routes") or []
             if routes:
+                if routes[0].get("distance") is not None and routes[0].get("duration") is not None:
+                    DistanceMatrixService.preload_route(
+                        (pickup_lat, pickup_lon),
+                        (dropoff_lat, dropoff_lon),
+                        routes[0]["distance"] / 1000.0,
+                        routes[0]["duration"] / 60.0,
+                    )
                 coordinates = routes[0]["geometry"]["coordinates"]
                 if coordinates:
                     return coordinates
         except Exception as exc:
             logger.warning("OSRM 路線取得失敗: %s", exc)
+            Metrics.inc(ROUTE_POLYLINE_FAILURES_TOTAL)
         return None
@@ -1,60 +1,164 @@
+import contextlib
 import json
 import os
+import threading
+import time
 from datetime import datetime
 
+from metrics import DB_OPERATION_SECONDS, Metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
 DB_FILE = "demo_db.json"
+DB_LOCK_TIMEOUT = 30.0
+
+# 同一行程內以 RLock 串行化，跨行程 (worker pool、API 伺服器、Flet) 以鎖檔的 OS 檔案鎖互斥
+_thread_lock = threading.RLock()
+_lock_state = threading.local()
+
+
+def _lock_file(f, timeout):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            return
+        except OSError:
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"等待資料檔鎖逾時: {f.name}")
+            time.sleep(0.005)
+
+
+def _unlock_file(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextlib.contextmanager
+def db_lock(timeout=DB_LOCK_TIMEOUT):
+    """
+    資料檔的排他鎖 (跨執行緒與行程)，讀取 → 修改 → 寫回期間持有，避免互相覆寫
+
+    同一執行緒可重入；逾時時拋出 TimeoutError。
+        with db_lock():
+            db = get_db()
+            ...
+            save_db(db)
+    """
+    if not _thread_lock.acquire(timeout=timeout):
+        raise TimeoutError("等待資料檔鎖逾時")
+    try:
+        depth = getattr(_lock_state, "depth", 0)
+        if depth == 0:
+            handle = open(DB_FILE + ".lock", "a+b")
+            try:
+                _lock_file(handle, timeout)
+            except BaseException:
+                handle.close()
+                raise
+            _lock_state.handle = handle
+        _lock_state.depth = depth + 1
+        try:
+            yield
+        finally:
+            _lock_state.depth -= 1
+            if _lock_state.depth == 0:
+                handle, _lock_state.handle = _lock_state.handle, None
+                try:
+                    _unlock_file(handle)
+                finally:
+                    handle.close()
+    finally:
+        _thread_lock.release()
+
+
+def write_json_atomic(path, data, indent=4):
+    """先寫暫存檔再原子性取代，讀取端不會讀到寫到一半的檔案"""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=indent, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_json(path, source):
+    """讀取 JSON 資料檔，耗時記入 ebaggage_db_operation_seconds (operation="load")"""
+    with Metrics.timer(DB_OPERATION_SECONDS, operation="load", source=source), open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_json(path, data, source, indent=4):
+    """write_json_atomic 並將耗時記入 ebaggage_db_operation_seconds (operation="save")"""
+    with Metrics.timer(DB_OPERATION_SECONDS, operation="save", source=source):
+        write_json_atomic(path, data, indent=indent)
+
 
 def get_db():
     """讀取本地 JSON 資料庫"""
     if not os.path.exists(DB_FILE):
         # 如果檔案不存在，創建一個空的結構
-        save_db({"users": {}, "orders": [], "scans": []})
+        with db_lock():
+            if not os.path.exists(DB_FILE):
+                save_db({"users": {}, "orders": [], "scans": []})
     
     try:
-        with open(DB_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return load_json(DB_FILE, source="db_helpers")
     except json.JSONDecodeError:
         # 如果檔案損毀，回傳一個空的結構
         return {"users": {}, "orders": [], "scans": []}
 
 def save_db(data):
     """儲存資料到本地 JSON 資料庫"""
-    with open(DB_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
+    save_json(DB_FILE, data, source="db_helpers")
 
 def save_order_to_history(trip_data, user_email):
     """
     專門用來儲存訂單的函式
     (在 order.py 抵達時呼叫)
     """
-    db = get_db()
-    
-    new_order = {
-        "id": len(db["orders"]) + 1,
-        "user_email": user_email,
-        "start_address": trip_data["start_address"],
-        "end_address": trip_data["end_address"],
-        "driver": trip_data["driver_name"],
-        "license_plate": trip_data["license_plate"],
-        "timestamp": datetime.now().isoformat() # 紀錄時間
-    }
-    
-    db["orders"].append(new_order)
-    save_db(db)
+    with db_lock():
+        db = get_db()
+        
+        new_order = {
+            "id": len(db["orders"]) + 1,
+            "user_email": user_email,
+            "start_address": trip_data["start_address"],
+            "end_address": trip_data["end_address"],
+            "driver": trip_data["driver_name"],
+            "license_plate": trip_data["license_plate"],
+            "timestamp": datetime.now().isoformat() # 紀錄時間
+        }
+        
+        db["orders"].append(new_order)
+        save_db(db)
 
 def save_scan_to_history(user_email, role, scan_result_text):
     """
     專門用來儲存 AI 掃描結果的函式
     """
-    db = get_db()
-    
-    new_scan = {
-        "id": len(db["scans"]) + 1,
-        "user_email": user_email,
-        "scanned_by": role, # "user" or "hotel"
-        "result": scan_result_text,
-        "timestamp": datetime.now().isoformat()
-    }
-    
-    db["scans"].append(new_scan)
-    save_db(db)
\ No newline at end of file
+    with db_lock():
+        db = get_db()
+        
+        new_scan = {
+            "id": len(db["scans"]) + 1,
+            "user_email": user_email,
+            "scanned_by": role, # "user" or "hotel"
+            "result": scan_result_text,
+            "timestamp": datetime.now().isoformat()
+        }
+        
+        db["scans"].append(new_scan)
+        save_db(db)
\ No newline at end of file
@@ -0,0 +1,169 @@
+"""
+Logging Config
+非同步、依模組分級的 logging 設定
+
+    - 呼叫端只把 LogRecord 放入佇列 (QueueHandler)，寫檔由背景執行緒 (QueueListener) 處理，
+      UI 執行緒與動畫計時器不再等待磁碟 I/O
+    - 訊息本身 (msg % args 與例外堆疊) 仍在呼叫端由 QueueHandler.prepare 組成，
+      以免參數物件在背景寫出前被修改；時間戳記等輸出格式 (Formatter) 在背景套用
+    - 佇列滿時丟棄新紀錄並計數，不阻塞呼叫端
+    - 依模組設定等級 (例如 flet 內部只留 WARNING)
+    - ThrottledLogger：逐格 / 逐筆訊息依次數取樣或依時間間隔限流，未輸出時不建立 LogRecord
+
+一般寫法請使用 logger.debug("... %s", value) 延遲格式化，不要傳入 f-string。
+"""
+import atexit
+import itertools
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+from typing import Any, Dict, Optional
+
+DEFAULT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+DEFAULT_QUEUE_SIZE = 10000
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional["DroppingQueueHandler"] = None
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """佇列滿時丟棄紀錄 (不阻塞、不印出例外)，並記錄丟棄筆數"""
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]"):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _level(value: Any) -> int:
+    if isinstance(value, int):
+        return value
+    level = logging.getLevelName(str(value).upper())
+    if not isinstance(level, int):
+        raise ValueError(f"未知的 logging 等級: {value}")
+    return level
+
+
+def setup_logging(
+    filename: str,
+    level: Any = logging.INFO,
+    module_levels: Optional[Dict[str, Any]] = None,
+    fmt: str = DEFAULT_FORMAT,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+) -> logging.handlers.QueueListener:
+    """
+    設定 root logger 經由佇列寫入檔案 (重複呼叫時先停止舊的背景執行緒)
+
+    Args:
+        filename: 日誌檔路徑
+        level: root 等級
+        module_levels: 模組名稱 → 等級 (例如 {"flet": "WARNING"})
+        fmt: 輸出格式
+        queue_size: 佇列上限，滿時丟棄新紀錄
+
+    Returns:
+        背景寫入的 QueueListener (行程結束時自動停止並清空佇列)
+    """
+    global _listener, _queue_handler
+    shutdown_logging()
+
+    file_handler = logging.FileHandler(filename, encoding="utf-8", delay=True)
+    file_handler.setFormatter(logging.Formatter(fmt))
+
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=queue_size)
+    _queue_handler = DroppingQueueHandler(log_queue)
+    _listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(_queue_handler)
+    root.setLevel(_level(level))
+    for name, module_level in (module_levels or {}).items():
+        logging.getLogger(name).setLevel(_level(module_level))
+
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging() -> None:
+    """停止背景寫入並把佇列中剩餘的紀錄寫完"""
+    global _listener
+    listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+def dropped_records() -> int:
+    """因佇列滿而丟棄的紀錄數"""
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+atexit.register(shutdown_logging)
+
+
+class ThrottledLogger:
+    """
+    取樣 / 限流的 logger 包裝，用於逐格動畫或逐筆計算等高頻訊息
+
+        frame_log = ThrottledLogger(logger, every=30)          # 每 30 次輸出 1 次
+        price_log = ThrottledLogger(logger, interval=1.0)      # 每秒最多輸出 1 次
+
+    兩者同時指定時需同時滿足。等級未啟用時只做一次等級檢查；
+    輸出的訊息會附上自上次輸出以來略過的筆數。
+    """
+
+    def __init__(self, logger: logging.Logger, every: int = 1, interval: float = 0.0):
+        self.logger = logger
+        self.every = max(1, every)
+        self.interval = max(0.0, interval)
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+        self._last_emit = 0.0
+        self._skipped = 0
+
+    def _should_emit(self) -> int:
+        """回傳 -1 表示略過，否則為略過的筆數"""
+        with self._lock:
+            if next(self._counter) % self.every:
+                self._skipped += 1
+                return -1
+            if self.interval:
+                now = time.monotonic()
+                if now - self._last_emit < self.interval:
+                    self._skipped += 1
+                    return -1
+                self._last_emit = now
+            skipped, self._skipped = self._skipped, 0
+            return skipped
+
+    def _log(self, level: int, msg: str, args: tuple) -> None:
+        if not self.logger.isEnabledFor(level):
+            return
+        skipped = self._should_emit()
+        if skipped < 0:
+            return
+        # stacklevel=3：紀錄中的檔名 / 行號指向呼叫 ThrottledLogger 的位置，而不是本檔
+        if skipped:
+            self.logger.log(level, msg + " (略過 %d 筆)", *args, skipped, stacklevel=3)
+        else:
+            self.logger.log(level, msg, *args, stacklevel=3)
+
+    def log(self, level: int, msg: str, *args: Any) -> None:
+        self._log(level, msg, args)
+
+    def debug(self, msg: str, *args: Any) -> None:
+        self._log(logging.DEBUG, msg, args)
+
+    def info(self, msg: str, *args: Any) -> None:
+        self._log(logging.INFO, msg, args)
@@ -1,48 +1,105 @@
 import datetime
+import importlib
 import flet as ft
 import flet_map as map
 import logging
 import random
 import time
 import json
+import multiprocessing
+import os
 import threading
+from typing import TYPE_CHECKING
 
 from constants import *
 from config import *
 
 # --- MVC 匯入 ---
-from controllers import (
-    UserController,
-    DriverController,
-    HotelController,
-    OrderController,
-    InstantBookingController,
-    PreviousBookingController,
-    HistoryController,
-    VehicleSelectionController,
-)
-from services import MapService, AnimationService
+# Controller 與 View 皆在第一次使用時才匯入，啟動畫面不需等待飯店目錄等資料載入
+# 服務 (目錄、工作佇列、掃描等) 在 session 開始或第一次使用時才匯入
 from app.router import create_route_handler
+from logging_config import ThrottledLogger, setup_logging
 
+if TYPE_CHECKING:
+    from services.scan_service import ScanResult
 
+
+# 偵錯模式 (登入免驗證)；日誌等級另由 config.py 的 LOG_LEVEL 控制
 DEBUG = True
-if DEBUG:
-    level = logging.DEBUG
-    mode = "debug"
-else:
-    level = logging.INFO
-    mode = "production"
-
-# (設定 logging)
-logging.basicConfig(
-    filename=f"ebaggage_{datetime.datetime.now().strftime('%Y%m%dT%H%M%S')}.log",
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    level=level
-)
+mode = "debug" if DEBUG else "production"
+
+# 掃描畫面使用的示範照片所在目錄 (與 ft.app 的 assets_dir 相同)
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+
+# (設定 logging：背景執行緒寫檔，等級見 config.py 的 LOG_LEVEL / LOG_MODULE_LEVELS)
+# worker pool 的子行程 (spawn) 會重新匯入本模組，只在主行程設定
+if multiprocessing.parent_process() is None:
+    setup_logging(
+        filename=LOG_FILE_PATTERN.format(timestamp=datetime.datetime.now().strftime('%Y%m%dT%H%M%S')),
+        level=LOG_LEVEL,
+        module_levels=LOG_MODULE_LEVELS,
+    )
 logger = logging.getLogger(__name__)
+# 動畫每一格都會呼叫，只取樣輸出
+frame_logger = ThrottledLogger(logger, every=10)
+
+
+def _scan_service():
+    """
+    第一次掃描時才匯入掃描服務並設定後端 (行程內共用，只設定一次)，
+    啟動時不載入 Pillow / google-generativeai
+    """
+    from services.scan_service import ScanService
+
+    if not ScanService.is_configured():
+        try:
+            ScanService.configure(
+                SCAN_BACKEND,
+                max_workers=SCAN_WORKERS,
+                **({"model_name": SCAN_GEMINI_MODEL} if SCAN_BACKEND == "gemini" else {}),
+            )
+        except Exception as e:
+            logger.error(f"掃描後端 {SCAN_BACKEND} 無法使用，改用 stub: {e}")
+            ScanService.configure("stub", max_workers=SCAN_WORKERS)
+    return ScanService
+
+
+class LazyController:
+    """
+    Controller 工廠：第一次存取 App 上的屬性時才匯入模組並建立實例，
+    之後實例存在 App 的 __dict__，存取不再經過此描述器
+    """
+
+    def __init__(self, class_name: str):
+        self.class_name = class_name
+        self.attr_name = None
+
+    def __set_name__(self, owner, name):
+        self.attr_name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        controller_class = getattr(importlib.import_module("controllers"), self.class_name)
+        logger.debug("建立 %s", self.class_name)
+        controller = controller_class(instance)
+        instance.__dict__[self.attr_name] = controller
+        return controller
 
 
 class App:
+    # --- MVC Controllers (第一次使用時才建立，需已設定 page) ---
+    user_controller = LazyController("UserController")
+    driver_controller = LazyController("DriverController")
+    hotel_controller = LazyController("HotelController")
+    order_controller = LazyController("OrderController")
+
+    # --- Booking Controllers ---
+    instant_booking_controller = LazyController("InstantBookingController")
+    previous_booking_controller = LazyController("PreviousBookingController")
+    history_controller = LazyController("HistoryController")
+    vehicle_selection_controller = LazyController("VehicleSelectionController")
+
     def __init__(self):
         """
         初始化 App。
@@ -50,18 +107,11 @@ class App:
         self.page = None
         self.mode = mode
 
-        # --- MVC Controllers ---
-        # 在 main() 中初始化，因為需要 page 實例
-        self.user_controller = None
-        self.driver_controller = None
-        self.hotel_controller = None
-        self.order_controller = None
-        
-        # --- Booking Controllers ---
-        self.instant_booking_controller = None
-        self.previous_booking_controller = None
-        self.history_controller = None
-        self.vehicle_selection_controller = None
+        # --- View 快取 (由 app/router.py 建立) ---
+        self.view_cache = None
+
+        # --- 共用目錄快照 (session 期間持有，結束時釋放) ---
+        self.catalog = None
 
         # --- 登入 Refs ---
         self.login_username = ft.Ref[ft.TextField]()
@@ -107,6 +157,9 @@ class App:
         
         # --- 其他狀態 ---
         self.scan_results = 0
+        self.last_scan_result = None
+        self.last_batch_scan = None
+        self.batch_scan_picker = None
         self.scan_confirmed = False
         self.driver_alert_dialog = ft.Ref[ft.AlertDialog]()
         
@@ -125,18 +178,21 @@ class App:
     def main(self, page: ft.Page):
         self.page = page
         self.page.title = "e-baggage"
-
-        # --- 初始化 Controllers ---
-        self.user_controller = UserController(self)
-        self.driver_controller = DriverController(self)
-        self.hotel_controller = HotelController(self)
-        self.order_controller = OrderController(self)
-        
-        # --- 初始化 Booking Controllers ---
-        self.instant_booking_controller = InstantBookingController(self)
-        self.previous_booking_controller = PreviousBookingController(self)
-        self.history_controller = HistoryController(self)
-        self.vehicle_selection_controller = VehicleSelectionController(self)
+        self.page.on_close = self.handle_session_close
+        from services import CatalogService, JobQueue, Metrics, Tracer, WarmupService
+
+        if METRICS_ENABLED and not Metrics.enabled:
+            Metrics.enable()
+        if TRACING_ENABLED and not Tracer.enabled:
+            Tracer.enable(TRACING_PATH)
+        if WORKER_POOL_ENABLED:
+            from services.worker_pool import WorkerPool
+            WorkerPool.start(WORKER_POOL_SIZE or None)
+        JobQueue.start(JOB_QUEUE_WORKERS)
+        try:
+            self.catalog = CatalogService.acquire()
+        except Exception as e:
+            logger.error(f"載入目錄失敗: {e}")
 
         self.page.window.width = WINDOW_WIDTH
         self.page.window.height = WINDOW_HEIGHT
@@ -177,9 +233,31 @@ class App:
         )
         
         self.page.on_route_change = create_route_handler(self)
+        # 啟動畫面播放期間於背景預先載入飯店目錄與索引 (整個行程只執行一次)
+        WarmupService.start()
         self.page.go("/splash")
 
 
+    def handle_session_close(self, e=None):
+        """Session 結束：釋放共用目錄、取消此 session 的訂單事件訂閱，並寫出指標快照 (若已啟用)"""
+        logger.info("Session closed")
+        from services import CatalogService, Metrics
+
+        CatalogService.release(self.catalog)
+        self.catalog = None
+        # 只處理已建立的 controller (LazyController 建立後存在實例的 __dict__)
+        for name, attr in vars(type(self)).items():
+            controller = vars(self).get(name) if isinstance(attr, LazyController) else None
+            if controller is not None and hasattr(controller, "close"):
+                controller.close()
+        if self.view_cache is not None:
+            self.view_cache.close()
+        if Metrics.enabled:
+            try:
+                Metrics.write_prometheus(METRICS_SNAPSHOT_PATH)
+            except OSError as exc:
+                logger.warning(f"寫入指標快照失敗: {exc}")
+
     # --- 處理 (Handle) 邏輯 ---
     def login_view_handle_regenerate_captcha(self, e):
         
@@ -301,58 +379,83 @@ class App:
         self.page.go("/app/user/confirm_order")
 
     def handle_scan_start(self, e):
-        
-        logger.info("Starting scan...")
-        
-        if self.page.views:
-            for ctrl in self.page.views[-1].controls:
-                if isinstance(ctrl, ft.Stack):
-                    for stack_item in ctrl.controls:
-                        if isinstance(stack_item, ft.ProgressRing):
-                            stack_item.visible = True
-                            break
-            self.page.update()
+        self._start_scan("baggages.jpg", "/app/user/scan_results")
 
-        def go_to_results():
-            self.page.go("/app/user/scan_results")
+    def handle_hotel_scan_start(self, e):
+        self._start_scan("baggages_hotel.jpg", "/app/hotel/scan_results")
 
-        threading.Timer(2.0, go_to_results).start()
+    def handle_driver_scan_start(self, e):
+        self._start_scan("baggages.jpg", "/app/driver/scan_results")
 
-    def handle_hotel_scan_start(self, e):
-        
-        logger.info("Starting scan...")
-        
-        if self.page.views:
-            for ctrl in self.page.views[-1].controls:
-                if isinstance(ctrl, ft.Stack):
-                    for stack_item in ctrl.controls:
-                        if isinstance(stack_item, ft.ProgressRing):
-                            stack_item.visible = True
-                            break
+    def handle_hotel_batch_scan_start(self, e):
+        """團體旅客：一次選取多張行李照片批次辨識"""
+        if self.batch_scan_picker is None:
+            self.batch_scan_picker = ft.FilePicker(on_result=self._on_batch_scan_picked)
+            self.page.overlay.append(self.batch_scan_picker)
             self.page.update()
+        self.batch_scan_picker.pick_files(
+            dialog_title="選擇行李照片",
+            file_type=ft.FilePickerFileType.IMAGE,
+            allow_multiple=True,
+        )
+
+    def _on_batch_scan_picked(self, e: ft.FilePickerResultEvent):
+        # 網頁版沒有本機路徑 (需先上傳)，只處理有路徑的檔案
+        paths = [f.path for f in (e.files or []) if f.path]
+        if not paths:
+            logger.info("未選擇可讀取的照片")
+            return
+        logger.info(f"Starting batch scan ({len(paths)} photos)...")
+        self._set_scan_progress(True)
 
-        def go_to_results():
-            self.page.go("/app/hotel/scan_results")
+        def show_results(future):
+            try:
+                self.last_batch_scan = future.result()
+            except Exception as exc:
+                self._on_scan_failed(exc)
+                return
+            self.page.go("/app/hotel/batch_scan_results")
 
-        threading.Timer(2.0, go_to_results).start()
+        _scan_service().submit_batch(paths).add_done_callback(show_results)
 
-    def handle_driver_scan_start(self, e):
-        
+    def _start_scan(self, image_name: str, results_route: str):
+        """送出背景掃描並顯示進度圈，辨識完成後切換到結果頁 (同一張照片已掃描過時立即完成)"""
         logger.info("Starting scan...")
-        
+        self._set_scan_progress(True)
+
+        def show_results(future):
+            try:
+                self.last_scan_result = future.result()
+            except Exception as exc:
+                self._on_scan_failed(exc)
+                return
+            self.page.go(results_route)
+
+        _scan_service().submit(os.path.join(ASSETS_DIR, "images", image_name)).add_done_callback(show_results)
+
+    def _set_scan_progress(self, visible: bool):
         if self.page.views:
             for ctrl in self.page.views[-1].controls:
                 if isinstance(ctrl, ft.Stack):
                     for stack_item in ctrl.controls:
                         if isinstance(stack_item, ft.ProgressRing):
-                            stack_item.visible = True
+                            stack_item.visible = visible
                             break
             self.page.update()
 
-        def go_to_results():
-            self.page.go("/app/driver/scan_results")
+    def _on_scan_failed(self, exc: Exception):
+        logger.error(f"行李掃描失敗: {exc}")
+        self.page.snack_bar = ft.SnackBar(ft.Text("掃描失敗，請重試"), open=True)
+        # 停在掃描頁，收起進度圈讓使用者可以重試
+        self._set_scan_progress(False)
+
+    def scan_result(self) -> "ScanResult":
+        """最近一次的掃描結果 (尚未掃描時為示範資料 SCAN_RESULT_LSIT)"""
+        if self.last_scan_result is not None:
+            return self.last_scan_result
+        from services.scan_service import ScanResult
 
-        threading.Timer(2.0, go_to_results).start()
+        return ScanResult("", [dict(item) for item in SCAN_RESULT_LSIT])
 
     def handle_scan_reject(self, e):
         
@@ -410,25 +513,29 @@ class App:
             self.page.session.set("role", role)
         self.page.go(route)
 
+    def show_driver_order_alert(self, message: str = "您有新的行李預約，車資分潤為200元，預估行車時間 50 分鐘"):
+        if not self.driver_alert_dialog.current:
+            self.driver_alert_dialog.current = ft.AlertDialog(
+                ref=self.driver_alert_dialog,
+                modal=True,
+                title=ft.Text("新的行李預約"),
+                content=ft.Text(message),
+                actions=[
+                    ft.TextButton("取消", on_click=self.handle_driver_reject, style=ft.ButtonStyle(color=ft.Colors.RED)),
+                    ft.TextButton("接單", on_click=self.handle_driver_accept, style=ft.ButtonStyle(color=ft.Colors.GREEN)),
+                ],
+                actions_alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+            )
+        else:
+            self.driver_alert_dialog.current.content = ft.Text(message)
+        
+        self.page.open(self.driver_alert_dialog.current)
+
     def handle_show_driver_alert(self):
-        def new_order_to_driver():
-            if not self.driver_alert_dialog.current:
-                self.driver_alert_dialog.current = ft.AlertDialog(
-                    ref=self.driver_alert_dialog,
-                    modal=True,
-                    title=ft.Text("新的行李預約"),
-                    content=ft.Text("您有新的行李預約，車資分潤為200元，預估行車時間 50 分鐘"),
-                    actions=[
-                        ft.TextButton("取消", on_click=self.handle_driver_reject, style=ft.ButtonStyle(color=ft.Colors.RED)),
-                        ft.TextButton("接單", on_click=self.handle_driver_accept, style=ft.ButtonStyle(color=ft.Colors.GREEN)),
-                    ],
-                    actions_alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
-                )
-            
-            self.page.open(self.driver_alert_dialog.current)
-            
+        # 確保 DriverController 已建立並訂閱新訂單事件
+        _ = self.driver_controller
         logger.info("Showing driver alert")
-        timer = threading.Timer(2.5, new_order_to_driver)
+        timer = threading.Timer(2.5, self.show_driver_order_alert)
         timer.start()
 
     def handle_driver_reject(self, e):
@@ -566,7 +673,7 @@ class App:
                 
                 current_lat, current_lon = animation_points[i]
                 
-                logger.debug(f"Animation step {i}: Lat={current_lat}, Lon={current_lon}")
+                frame_logger.debug("Animation step %d: Lat=%s, Lon=%s", i, current_lat, current_lon)
                 
                 if self.driver_marker_ref.current:
                     self.driver_marker_ref.current.coordinates = map.MapLatitudeLongitude(current_lat, current_lon)
@@ -636,7 +743,7 @@ class App:
                 
                 current_lat, current_lon = animation_points[i]
                 
-                logger.debug(f"Animation step {i}: Lat={current_lat}, Lon={current_lon}")
+                frame_logger.debug("Animation step %d: Lat=%s, Lon=%s", i, current_lat, current_lon)
                 
                 if self.driver_marker_ref.current:
                     self.driver_marker_ref.current.coordinates = map.MapLatitudeLongitude(current_lat, current_lon)
@@ -656,16 +763,9 @@ class App:
         logger.info("準備顯示抵達彈窗...")
         
         def show_dialog():
-            scan_result_text = ""
-            # (假設 SCAN_RESULT_LSIT 已經在 config.py 或 constants.py 中定義)
-            try:
-                for baggage in SCAN_RESULT_LSIT:
-                    scan_result_text += f"{baggage['size']}吋{baggage['color']}{baggage['type']} {baggage['quantity']} 件\n"
-                scan_result_amount = len(SCAN_RESULT_LSIT)
-            except NameError:
-                logger.error("SCAN_RESULT_LSIT 未定義")
-                scan_result_text = "行李資訊讀取失敗"
-                scan_result_amount = 0
+            scan = self.scan_result()
+            scan_result_text = scan.to_text()
+            scan_result_amount = len(scan.items)
 
             # --- ↓↓↓ 1. (重要) 先宣告 dialog 變數，以便內部函式可以存取 ---
             dialog = ft.AlertDialog() 
@@ -791,7 +891,7 @@ class App:
             def animate_step(i):
                 
                 if not self.animation_running:
-                    logger.debug(f"Animation stopped externally at step {i}.")
+                    logger.debug("Animation stopped externally at step %s.", i)
                     return
 
                 if i >= num_points:
@@ -822,7 +922,7 @@ class App:
                 
                 current_lat, current_lon = animation_points[i]
                 
-                logger.debug(f"Animation step {i}: Lat={current_lat}, Lon={current_lon}")
+                frame_logger.debug("Animation step %d: Lat=%s, Lon=%s", i, current_lat, current_lon)
                 
                 if self.driver_marker_ref.current:
                     self.driver_marker_ref.current.coordinates = map.MapLatitudeLongitude(current_lat, current_lon)
@@ -861,10 +961,14 @@ class App:
         )
 
 
+def main(page: ft.Page):
+    """每個 Flet session 建立自己的 App (controller 與畫面狀態)；目錄資料由 CatalogService 跨 session 共用"""
+    App().main(page)
+
+
 # --- 啟動 App ---
 if __name__ == "__main__":
-    app_instance = App()
     ft.app(
-        target=app_instance.main,
+        target=main,
         assets_dir="assets"
     )
@@ -0,0 +1,351 @@
+"""
+Metrics
+行程內的輕量指標登錄：計數器 (Counter)、直方圖 (Histogram) 與計時器 (context manager / decorator)，
+可輸出為 Prometheus 文字格式的快照
+
+預設停用：停用時 inc / observe 只檢查一個旗標就返回，Metrics.timer() 回傳共用的空計時器，
+@Metrics.timed 包裝的函式只多一次旗標檢查，因此可以留在熱路徑上。
+
+有進行中的追蹤 (tracing.py) 時，計時器同時記錄為目前 span 的子 span，
+名稱為去掉 ebaggage_ 前綴與 _seconds 後綴的指標名稱，標籤成為 span 屬性。
+
+    Metrics.enable()
+    with Metrics.timer("ebaggage_geocode_seconds", operation="geocode"):
+        ...
+    print(Metrics.render_prometheus())
+"""
+import bisect
+import functools
+import logging
+import math
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from tracing import Tracer, _current_span
+
+logger = logging.getLogger(__name__)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+# 秒為單位的預設分桶 (涵蓋快取命中的微秒級到外部 API 的數秒)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """只增不減的計數器 (可依標籤分組)"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str = ""):
+        self.name = name
+        self.help = help
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        if not Metrics.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def samples(self) -> List[Tuple[str, LabelKey, Optional[Tuple[str, str]], float]]:
+        with self._lock:
+            return [(self.name, key, None, value) for key, value in sorted(self._values.items())]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram:
+    """累積分桶直方圖 (Prometheus histogram 語意：_bucket / _sum / _count)"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str = "", buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self.span_name = name.replace("ebaggage_", "", 1).replace("_seconds", "")
+        # 標籤 → [各分桶計數..., 總和, 次數]
+        self._values: Dict[LabelKey, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        if not Metrics.enabled:
+            return
+        self._observe(value, _label_key(labels))
+
+    def _observe(self, value: float, key: LabelKey) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def summary(self, **labels) -> Dict[str, float]:
+        """次數、總和與平均 (尚無資料時皆為 0)"""
+        state = self._values.get(_label_key(labels))
+        if not state:
+            return {"count": 0, "sum": 0.0, "mean": 0.0}
+        return {"count": state[-1], "sum": state[-2], "mean": state[-2] / state[-1]}
+
+    def samples(self) -> List[Tuple[str, LabelKey, Optional[Tuple[str, str]], float]]:
+        result = []
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        for key, state in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                result.append((f"{self.name}_bucket", key, ("le", _format_value(bound)), cumulative))
+            result.append((f"{self.name}_bucket", key, ("le", "+Inf"), state[-1]))
+            result.append((f"{self.name}_sum", key, None, state[-2]))
+            result.append((f"{self.name}_count", key, None, state[-1]))
+        return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class _Timer:
+    """計時 context manager：離開時把經過秒數記入直方圖 (追蹤進行中時同時記錄子 span)"""
+
+    __slots__ = ("_histogram", "_key", "_started", "_span")
+
+    def __init__(self, histogram: Histogram, key: LabelKey):
+        self._histogram = histogram
+        self._key = key
+        self._started = 0.0
+        self._span = None
+
+    def __enter__(self) -> "_Timer":
+        self._span = Tracer.child_span(self._histogram.span_name, dict(self._key))
+        if self._span is not None:
+            self._span.__enter__()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        elapsed = time.perf_counter() - self._started
+        if self._span is not None:
+            self._span.__exit__(exc_type, exc, tb)
+        if Metrics.enabled:
+            self._histogram._observe(elapsed, self._key)
+        return False
+
+
+class _NullTimer:
+    """停用時使用的共用空計時器"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    """指標登錄 (行程內共用)"""
+
+    enabled = False
+
+    _lock = threading.Lock()
+    _metrics: Dict[str, Any] = {}
+
+    @classmethod
+    def enable(cls) -> None:
+        cls.enabled = True
+        logger.info("指標收集已啟用")
+
+    @classmethod
+    def disable(cls) -> None:
+        cls.enabled = False
+
+    @classmethod
+    def reset(cls) -> None:
+        """清除所有已記錄的數值 (保留已登錄的指標)"""
+        with cls._lock:
+            metrics = list(cls._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+    # ------------------ 登錄 ------------------
+    @classmethod
+    def counter(cls, name: str, help: str = "") -> Counter:
+        """取得 (必要時建立) 計數器"""
+        return cls._register(name, Counter, help)
+
+    @classmethod
+    def histogram(cls, name: str, help: str = "", buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """取得 (必要時建立) 直方圖"""
+        return cls._register(name, Histogram, help, buckets)
+
+    @classmethod
+    def _register(cls, name: str, kind: type, help: str, *args) -> Any:
+        metric = cls._metrics.get(name)
+        if metric is None:
+            with cls._lock:
+                metric = cls._metrics.get(name)
+                if metric is None:
+                    metric = cls._metrics[name] = kind(name, help, *args)
+        if not isinstance(metric, kind):
+            raise ValueError(f"指標 {name} 已登錄為 {metric.kind}")
+        return metric
+
+    # ------------------ 記錄 ------------------
+    @classmethod
+    def inc(cls, name: str, amount: float = 1.0, **labels) -> None:
+        if cls.enabled:
+            cls.counter(name).inc(amount, **labels)
+
+    @classmethod
+    def observe(cls, name: str, value: float, **labels) -> None:
+        if cls.enabled:
+            cls.histogram(name).observe(value, **labels)
+
+    @classmethod
+    def timer(cls, name: str, **labels):
+        """
+        計時 context manager，經過秒數記入直方圖 name
+
+        停用且沒有進行中的追蹤時回傳不做任何事的共用物件。
+        """
+        if not cls.enabled and _current_span.get() is None:
+            return _NULL_TIMER
+        return _Timer(cls.histogram(name), _label_key(labels))
+
+    @classmethod
+    def timed(cls, name: str, **labels) -> Callable[[Callable], Callable]:
+        """
+        計時 decorator (是否啟用於每次呼叫時判斷)
+
+            @staticmethod
+            @Metrics.timed("ebaggage_db_operation_seconds", operation="load", source="orders")
+            def get_all_orders(): ...
+        """
+        key = _label_key(labels)
+
+        def decorator(func: Callable) -> Callable:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not cls.enabled and _current_span.get() is None:
+                    return func(*args, **kwargs)
+                with _Timer(cls.histogram(name), key):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    # ------------------ 輸出 ------------------
+    @classmethod
+    def snapshot(cls) -> Dict[str, Dict[str, Any]]:
+        """目前各指標的數值 (名稱 → 種類、說明與樣本)"""
+        with cls._lock:
+            metrics = sorted(cls._metrics.items())
+        return {
+            name: {
+                "type": metric.kind,
+                "help": metric.help,
+                "samples": [
+                    {"name": sample, "labels": dict(key + ((extra,) if extra else ())), "value": value}
+                    for sample, key, extra, value in metric.samples()
+                ],
+            }
+            for name, metric in metrics
+        }
+
+    @classmethod
+    def render_prometheus(cls) -> str:
+        """Prometheus 文字格式 (text exposition format 0.0.4)"""
+        with cls._lock:
+            metrics = sorted(cls._metrics.items())
+        lines: List[str] = []
+        for name, metric in metrics:
+            if metric.help:
+                lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for sample, key, extra, value in metric.samples():
+                lines.append(f"{sample}{_format_labels(key, extra)} {_format_value(value)}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    @classmethod
+    def write_prometheus(cls, path: str) -> None:
+        """
+        把快照寫入檔案 (先寫暫存檔再原子性取代，可供 node_exporter textfile collector 讀取)
+
+        Raises:
+            OSError: 無法寫入時
+        """
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(cls.render_prometheus())
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+# ------------------ 預先登錄的指標 (名稱與說明集中於此) ------------------
+GEOCODE_SECONDS = "ebaggage_geocode_seconds"
+GEOCODE_CACHE_TOTAL = "ebaggage_geocode_cache_total"
+ROUTE_POLYLINE_SECONDS = "ebaggage_route_polyline_seconds"
+ROUTE_POLYLINE_FAILURES_TOTAL = "ebaggage_route_polyline_failures_total"
+ROUTE_TABLE_SECONDS = "ebaggage_route_table_seconds"
+DB_OPERATION_SECONDS = "ebaggage_db_operation_seconds"
+ROUTE_BUILD_SECONDS = "ebaggage_route_build_seconds"
+API_REQUEST_SECONDS = "ebaggage_api_request_seconds"
+JOBS_TOTAL = "ebaggage_jobs_total"
+JOB_SECONDS = "ebaggage_job_seconds"
+SCAN_SECONDS = "ebaggage_scan_seconds"
+SCAN_CACHE_TOTAL = "ebaggage_scan_cache_total"
+
+Metrics.histogram(GEOCODE_SECONDS, "LocationService 地理編碼耗時 (秒)，operation=geocode|reverse")
+Metrics.counter(GEOCODE_CACHE_TOTAL, "正向地理編碼快取命中 / 未命中次數")
+Metrics.histogram(ROUTE_POLYLINE_SECONDS, "OSRM 路線取得耗時 (秒)")
+Metrics.counter(ROUTE_POLYLINE_FAILURES_TOTAL, "OSRM 路線取得失敗次數")
+Metrics.histogram(ROUTE_TABLE_SECONDS, "OSRM 距離矩陣 (table API) 取得耗時 (秒)")
+Metrics.histogram(DB_OPERATION_SECONDS, "資料檔讀取 / 寫入耗時 (秒)，source 為呼叫位置")
+Metrics.histogram(ROUTE_BUILD_SECONDS, "頁面路由建立耗時 (秒)")
+Metrics.histogram(API_REQUEST_SECONDS, "HTTP 預約 API 請求耗時 (秒)，route 為端點樣板")
+Metrics.counter(JOBS_TOTAL, "背景工作數，result=enqueued|duplicate|done|retry|dead")
+Metrics.histogram(JOB_SECONDS, "背景工作執行耗時 (秒)")
+Metrics.histogram(SCAN_SECONDS, "行李影像前處理與辨識耗時 (秒)，backend 為模型後端")
+Metrics.counter(SCAN_CACHE_TOTAL, "行李掃描結果快取命中 / 未命中次數")
@@ -7,6 +7,8 @@ import os
 from datetime import datetime
 from typing import Dict, List, Any
 
+from db_helpers import db_lock, load_json, save_json
+
 DB_FILE = "demo_db.json"
 
 
@@ -18,17 +20,18 @@ class BaseModel:
         """讀取本地 JSON 資料庫"""
         if not os.path.exists(DB_FILE):
             # 如果檔案不存在，創建一個空的結構
-            BaseModel.save_db({
-                "users": {},
-                "orders": [],
-                "scans": [],
-                "drivers": {},
-                "hotels": {}
-            })
+            with db_lock():
+                if not os.path.exists(DB_FILE):
+                    BaseModel.save_db({
+                        "users": {},
+                        "orders": [],
+                        "scans": [],
+                        "drivers": {},
+                        "hotels": {}
+                    })
         
         try:
-            with open(DB_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_json(DB_FILE, source="models.base")
         except json.JSONDecodeError:
             # 如果檔案損毀，回傳一個空的結構
             return {
@@ -42,8 +45,12 @@ class BaseModel:
     @staticmethod
     def save_db(data: Dict[str, Any]) -> None:
         """儲存資料到本地 JSON 資料庫"""
-        with open(DB_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+        save_json(DB_FILE, data, source="models.base")
+
+    @staticmethod
+    def lock():
+        """資料檔排他鎖 (讀改寫期間持有，見 db_helpers.db_lock)"""
+        return db_lock()
     
     @staticmethod
     def generate_timestamp() -> str:
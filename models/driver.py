@@ -70,24 +70,25 @@ class Driver(BaseModel):
     
     def save(self) -> bool:
         """儲存司機資料"""
-        db = self.get_db()
-        
-        if "drivers" not in db:
-            db["drivers"] = {}
-        
-        # 如果是新司機，生成 ID
-        if self.driver_id is None:
-            self.driver_id = len(db["drivers"]) + 1
-        
-        db["drivers"][str(self.driver_id)] = {
-            "name": self.name,
-            "phone": self.phone,
-            "license_plate": self.license_plate,
-            "current_location": list(self.current_location) if self.current_location else None,
-            "status": self.status
-        }
-        
-        self.save_db(db)
+        with self.lock():
+            db = self.get_db()
+            
+            if "drivers" not in db:
+                db["drivers"] = {}
+            
+            # 如果是新司機，生成 ID
+            if self.driver_id is None:
+                self.driver_id = len(db["drivers"]) + 1
+            
+            db["drivers"][str(self.driver_id)] = {
+                "name": self.name,
+                "phone": self.phone,
+                "license_plate": self.license_plate,
+                "current_location": list(self.current_location) if self.current_location else None,
+                "status": self.status
+            }
+            
+            self.save_db(db)
         return True
     
     def update_location(self, location: Tuple[float, float]) -> bool:
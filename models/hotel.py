@@ -1,10 +1,16 @@
 """
 Hotel Model
 處理飯店相關的資料操作
+
+行李數量與未抵達旅客數的即時庫存由 HotelController 透過 HotelInventoryService 同步，
+model 本身只處理飯店資料與 JSON 資料庫。
 """
-from typing import Dict, Optional, Any
+import logging
+from typing import Any, Dict, Optional
 from .base import BaseModel
 
+logger = logging.getLogger(__name__)
+
 
 class Hotel(BaseModel):
     """飯店 Model"""
@@ -23,63 +29,53 @@ class Hotel(BaseModel):
         self.baggage_capacity = baggage_capacity
         self.not_arrived_customers = not_arrived_customers
     
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Hotel':
+        """由字典建立 (欄位同 to_dict)"""
+        return cls(
+            hotel_id=data.get("hotel_id"),
+            name=data.get("name", ""),
+            baggage_count=data.get("baggage_count", 0),
+            baggage_capacity=data.get("baggage_capacity", 180),
+            not_arrived_customers=data.get("not_arrived_customers", 0)
+        )
+    
     @classmethod
     def find_by_id(cls, hotel_id: int) -> Optional['Hotel']:
         """根據 ID 查詢飯店"""
         db = cls.get_db()
         hotels = db.get("hotels", {})
+        # demo_db.json 的 "hotels" 可能是飯店目錄 (list)，此時沒有依 ID 存放的資料
+        if not isinstance(hotels, dict):
+            return None
         
         hotel_data = hotels.get(str(hotel_id))
         if hotel_data:
-            return cls(
-                hotel_id=hotel_id,
-                name=hotel_data.get("name", ""),
-                baggage_count=hotel_data.get("baggage_count", 0),
-                baggage_capacity=hotel_data.get("baggage_capacity", 180),
-                not_arrived_customers=hotel_data.get("not_arrived_customers", 0)
-            )
+            return cls.from_dict({**hotel_data, "hotel_id": hotel_id})
         return None
     
     def save(self) -> bool:
         """儲存飯店資料"""
-        db = self.get_db()
-        
-        if "hotels" not in db:
-            db["hotels"] = {}
-        
-        # 如果是新飯店，生成 ID
         if self.hotel_id is None:
-            self.hotel_id = len(db["hotels"]) + 1
+            logger.warning("hotel_id 為空，未儲存飯店資料")
+            return False
         
-        db["hotels"][str(self.hotel_id)] = {
-            "name": self.name,
-            "baggage_count": self.baggage_count,
-            "baggage_capacity": self.baggage_capacity,
-            "not_arrived_customers": self.not_arrived_customers
-        }
-        
-        self.save_db(db)
+        with self.lock():
+            db = self.get_db()
+            
+            if "hotels" not in db:
+                db["hotels"] = {}
+            if not isinstance(db["hotels"], dict):
+                logger.warning("資料庫的 hotels 不是以 ID 存放的格式，未儲存飯店 %s", self.hotel_id)
+                return False
+            
+            data = self.to_dict()
+            data.pop("hotel_id")
+            db["hotels"][str(self.hotel_id)] = data
+            
+            self.save_db(db)
         return True
     
-    def add_baggage(self, count: int = 1) -> bool:
-        """增加行李數量"""
-        if self.baggage_count + count <= self.baggage_capacity:
-            self.baggage_count += count
-            return self.save()
-        return False
-    
-    def remove_baggage(self, count: int = 1) -> bool:
-        """減少行李數量"""
-        if self.baggage_count - count >= 0:
-            self.baggage_count -= count
-            return self.save()
-        return False
-    
-    def update_not_arrived(self, count: int) -> bool:
-        """更新未抵達旅客數"""
-        self.not_arrived_customers = count
-        return self.save()
-    
     def to_dict(self) -> Dict[str, Any]:
         """轉換為字典格式"""
         return {
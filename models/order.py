@@ -77,39 +77,40 @@ class Order(BaseModel):
     
     def save(self) -> bool:
         """儲存訂單"""
-        db = self.get_db()
-        
-        if "orders" not in db:
-            db["orders"] = []
-        
-        # 如果是新訂單，生成 ID
-        if self.order_id is None:
-            self.order_id = len(db["orders"]) + 1
-        
-        order_data = {
-            "id": self.order_id,
-            "user_email": self.user_email,
-            "start_date": self.start_date,
-            "end_date": self.end_date,
-            "start_address": self.start_address,
-            "end_address": self.end_address,
-            "driver_email": self.driver_email,
-            "status": self.status,
-            "order_time": self.order_time
-        }
-        
-        # 檢查是否已存在，如果存在則更新
-        updated = False
-        for i, order in enumerate(db["orders"]):
-            if order.get("id") == self.order_id:
-                db["orders"][i] = order_data
-                updated = True
-                break
-        
-        if not updated:
-            db["orders"].append(order_data)
-        
-        self.save_db(db)
+        with self.lock():
+            db = self.get_db()
+            
+            if "orders" not in db:
+                db["orders"] = []
+            
+            # 如果是新訂單，生成 ID
+            if self.order_id is None:
+                self.order_id = len(db["orders"]) + 1
+            
+            order_data = {
+                "id": self.order_id,
+                "user_email": self.user_email,
+                "start_date": self.start_date,
+                "end_date": self.end_date,
+                "start_address": self.start_address,
+                "end_address": self.end_address,
+                "driver_email": self.driver_email,
+                "status": self.status,
+                "order_time": self.order_time
+            }
+            
+            # 檢查是否已存在，如果存在則更新
+            updated = False
+            for i, order in enumerate(db["orders"]):
+                if order.get("id") == self.order_id:
+                    db["orders"][i] = order_data
+                    updated = True
+                    break
+            
+            if not updated:
+                db["orders"].append(order_data)
+            
+            self.save_db(db)
         return True
     
     def to_dict(self) -> Dict[str, Any]:
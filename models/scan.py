@@ -44,25 +44,26 @@ class Scan(BaseModel):
     
     def save(self) -> bool:
         """儲存掃描記錄"""
-        db = self.get_db()
-        
-        if "scans" not in db:
-            db["scans"] = []
-        
-        # 如果是新記錄，生成 ID
-        if self.scan_id is None:
-            self.scan_id = len(db["scans"]) + 1
-        
-        scan_data = {
-            "id": self.scan_id,
-            "user_email": self.user_email,
-            "role": self.role,
-            "scan_result": self.scan_result,
-            "timestamp": self.timestamp
-        }
-        
-        db["scans"].append(scan_data)
-        self.save_db(db)
+        with self.lock():
+            db = self.get_db()
+            
+            if "scans" not in db:
+                db["scans"] = []
+            
+            # 如果是新記錄，生成 ID
+            if self.scan_id is None:
+                self.scan_id = len(db["scans"]) + 1
+            
+            scan_data = {
+                "id": self.scan_id,
+                "user_email": self.user_email,
+                "role": self.role,
+                "scan_result": self.scan_result,
+                "timestamp": self.timestamp
+            }
+            
+            db["scans"].append(scan_data)
+            self.save_db(db)
         return True
     
     def to_dict(self) -> Dict[str, Any]:
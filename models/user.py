@@ -38,18 +38,19 @@ class User(BaseModel):
     
     def save(self) -> bool:
         """儲存使用者資料"""
-        db = self.get_db()
-        
-        if "users" not in db:
-            db["users"] = {}
-        
-        db["users"][self.email] = {
-            "username": self.username,
-            "password": self.password,
-            "created_at": self.generate_timestamp()
-        }
-        
-        self.save_db(db)
+        with self.lock():
+            db = self.get_db()
+            
+            if "users" not in db:
+                db["users"] = {}
+            
+            db["users"][self.email] = {
+                "username": self.username,
+                "password": self.password,
+                "created_at": self.generate_timestamp()
+            }
+            
+            self.save_db(db)
         return True
     
     def to_dict(self) -> Dict[str, Any]:
@@ -1,28 +1,63 @@
 """
 Services 模組
 用於處理共用的業務邏輯和服務
+
+各名稱在第一次存取時才匯入對應的子模組 (PEP 562)，
+匯入套件本身不會連帶載入 numpy / geopy 等較重的相依套件
 """
+import importlib
+
+_EXPORTS = {
+    'MapService': '.map_service',
+    'AnimationService': '.animation_service',
+    'BookingService': '.booking_service',
+    'MapUtilService': '.map_util_service',
+    'OrderHistoryService': '.order_history_service',
+    'ValidationService': '.validation_service',
+    'DateService': '.date_service',
+    'LocationService': '.location_service',
+    'OrderDisplayService': '.order_display_service',
+    'SimulationService': '.simulation_service',
+    'DistanceMatrixService': '.distance_matrix_service',
+    'PricingService': '.pricing_service',
+    'HotelInventoryService': '.hotel_inventory_service',
+    'HotelStatsService': '.hotel_stats_service',
+    'OrderEvent': '.order_event_bus',
+    'OrderEventBus': '.order_event_bus',
+    'UserOrderProjection': '.user_order_projection',
+    'OrderSummary': '.order_summary_service',
+    'OrderSummaryService': '.order_summary_service',
+    'WarmupService': '.warmup_service',
+    'Catalog': '.catalog_service',
+    'CatalogService': '.catalog_service',
+    'HotelCatalog': '.hotel_catalog',
+    'HotelRow': '.hotel_catalog',
+    'Metrics': 'metrics',
+    'Span': 'tracing',
+    'Tracer': 'tracing',
+    'LoadGenerator': '.load_generator',
+    'LoadProfile': '.load_generator',
+    'LoadReport': '.load_generator',
+    'BookingApi': '.booking_api',
+    'BookingApiServer': '.booking_api',
+    'WorkerPool': '.worker_pool',
+    'JobQueue': '.job_queue',
+    'BatchScanResult': '.scan_service',
+    'ScanResult': '.scan_service',
+    'ScanService': '.scan_service',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
 
-from .map_service import MapService
-from .animation_service import AnimationService
-from .booking_service import BookingService
-from .map_util_service import MapUtilService
-from .order_history_service import OrderHistoryService
-from .validation_service import ValidationService
-from .date_service import DateService
-from .location_service import LocationService
-from .order_display_service import OrderDisplayService
-from .simulation_service import SimulationService
 
-__all__ = [
-    'MapService',
-    'AnimationService',
-    'BookingService',
-    'MapUtilService',
-    'OrderHistoryService',
-    'ValidationService',
-    'DateService',
-    'LocationService',
-    'OrderDisplayService',
-    'SimulationService',
-]
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,537 @@
+"""
+Booking API
+不經過 Flet UI 的 HTTP 預約介面 (asyncio + 標準函式庫)，供飯店、旅行社等合作夥伴批次下單
+
+    GET  /health                     健康檢查
+    GET  /metrics                    Prometheus 文字格式指標 (需 METRICS_ENABLED 或 --metrics)
+    POST /quote                      單一路段報價 (各車型)
+    POST /quotes/batch               多個路段一次報價
+    POST /trips                      建立即時行程 (同 InstantBookingController.finalize_booking)
+    POST /trips/batch                批次建立行程，資料檔只寫一次
+    POST /travels                    建立旅程與各路段 trips (同 PreviousBookingController.submit_order)
+    POST /travels/batch              批次建立旅程
+    GET  /orders?user_email=...      使用者訂單 (游標分頁，status / cursor / limit)
+    POST /orders/{id}/cancel         取消訂單
+    POST /orders/cancel              批次取消 {"order_ids": [...]}
+
+連線預設保持 (HTTP/1.1 keep-alive，閒置 KEEP_ALIVE_TIMEOUT 秒後關閉)，同一連線可連續送出請求。
+報價為純計算，直接在事件迴圈中執行；讀寫資料檔的服務呼叫交給單一執行緒依序處理，
+與 Flet 應用程式或 worker 行程之間的讀改寫由 db_helpers.db_lock 互斥。
+批次端點逐筆驗證，驗證失敗的項目回報於 results，其餘項目一次寫入。
+--workers N 時批次旅程的路段產生與大批報價分派到子行程 (services/worker_pool.py)。
+
+執行方式 (於專案根目錄):
+    python -m services.booking_api --host 127.0.0.1 --port 8080
+"""
+import asyncio
+import json
+import logging
+import re
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from metrics import API_REQUEST_SECONDS, Metrics
+from models.trip import LuggageItem, Travel, Trip
+from services.order_history_service import OrderHistoryService
+from services.pricing_service import PricingService
+from services.travel_service import TravelService
+from services.worker_pool import WorkerPool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+KEEP_ALIVE_TIMEOUT = 15.0
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 8 * 1024 * 1024
+MAX_BATCH_SIZE = 1000
+API_ORDER_TYPE = "trip"
+CANCEL_STATUS = "cancelled"
+
+_REASONS = {
+    200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    411: "Length Required", 413: "Payload Too Large", 431: "Request Header Fields Too Large",
+    500: "Internal Server Error", 501: "Not Implemented",
+}
+
+
+class ApiError(Exception):
+    """以指定 HTTP 狀態碼回應的錯誤"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Request:
+    """已解析的 HTTP 請求"""
+
+    __slots__ = ("method", "path", "query", "version", "headers", "body", "params")
+
+    def __init__(self, method: str, target: str, version: str, headers: Dict[str, str], body: bytes):
+        parts = urlsplit(target)
+        self.method = method
+        self.path = unquote(parts.path)
+        self.query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        self.version = version
+        self.headers = headers
+        self.body = body
+        self.params: Dict[str, str] = {}
+
+    @property
+    def keep_alive(self) -> bool:
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    def json(self) -> Any:
+        if not self.body:
+            raise ApiError(400, "缺少 JSON 內容")
+        try:
+            return json.loads(self.body)
+        except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+            raise ApiError(400, f"JSON 格式錯誤: {exc}")
+
+
+# ------------------ 輸入解析 ------------------
+def _require(data: Any, field: str) -> Any:
+    if not isinstance(data, dict) or data.get(field) in (None, ""):
+        raise ApiError(400, f"缺少欄位: {field}")
+    return data[field]
+
+
+def _coordinate(data: Any, field: str) -> Tuple[float, float]:
+    point = _require(data, field)
+    try:
+        return float(_require(point, "lat")), float(_require(point, "lon"))
+    except (TypeError, ValueError):
+        raise ApiError(400, f"{field} 座標格式錯誤")
+
+
+def _place(data: Any, field: str) -> Tuple[str, float, float]:
+    lat, lon = _coordinate(data, field)
+    return str(_require(data[field], "name")), lat, lon
+
+
+def _luggage(data: Dict[str, Any]) -> List[LuggageItem]:
+    try:
+        items = data.get("luggage_items") or [{"size": 24, "quantity": int(data.get("luggage_count", 1) or 1)}]
+        return [LuggageItem.from_dict(item) for item in items]
+    except (AttributeError, TypeError, ValueError):
+        raise ApiError(400, "luggage_items 格式錯誤")
+
+
+def _vehicle_types(data: Dict[str, Any]) -> Tuple[str, ...]:
+    vehicle_types = tuple(data.get("vehicle_types") or PricingService.VEHICLE_MULTIPLIERS)
+    for vehicle_type in vehicle_types:
+        if vehicle_type not in PricingService.VEHICLE_MULTIPLIERS:
+            raise ApiError(400, f"未知車型: {vehicle_type}")
+    return vehicle_types
+
+
+def _batch(data: Any, field: str) -> List[Any]:
+    items = _require(data, field)
+    if not isinstance(items, list):
+        raise ApiError(400, f"{field} 必須是陣列")
+    if len(items) > MAX_BATCH_SIZE:
+        raise ApiError(413, f"{field} 超過 {MAX_BATCH_SIZE} 筆")
+    return items
+
+
+def _build_trip(data: Dict[str, Any]) -> Tuple[Trip, Dict[str, Any]]:
+    """依請求內容建立 Trip 與額外欄位 (車型與價格的處理同即時預約的選車步驟)"""
+    pickup = _place(data, "pickup")
+    dropoff = _place(data, "dropoff")
+    luggage_items = _luggage(data)
+    try:
+        start_time = datetime.fromisoformat(data["start_time"]) if data.get("start_time") else datetime.now()
+    except (TypeError, ValueError):
+        raise ApiError(400, "start_time 必須是 ISO 8601 格式")
+    vehicle_type = data.get("vehicle_type") or PricingService.DEFAULT_VEHICLE_TYPE
+    if vehicle_type not in PricingService.VEHICLE_MULTIPLIERS:
+        raise ApiError(400, f"未知車型: {vehicle_type}")
+
+    trip = TravelService.build_manual_trip(start_time, pickup, dropoff, luggage_items, vehicle_type=vehicle_type)
+    extra_fields = {
+        "pickup_display": pickup[0],
+        "dropoff_display": dropoff[0],
+        "luggage_note": str(data.get("luggage_note", "")),
+        "selected_vehicle": vehicle_type,
+    }
+    return trip, extra_fields
+
+
+def _parse_travel(data: Dict[str, Any]) -> Travel:
+    if not isinstance(data, dict):
+        raise ApiError(400, "旅程必須是物件")
+    payload = dict(data)
+    payload.setdefault("id", str(uuid.uuid4()))
+    try:
+        travel = Travel.from_dict(payload)
+    except (AttributeError, KeyError, TypeError, ValueError) as exc:
+        raise ApiError(400, f"旅程格式錯誤: {exc}")
+    return travel
+
+
+def _quote_payload(quotes: Dict[str, Any]) -> Dict[str, Any]:
+    first = next(iter(quotes.values()))
+    return {
+        "distance_km": round(first.distance_km, 3),
+        "quotes": {vehicle_type: quote.price for vehicle_type, quote in quotes.items()},
+    }
+
+
+def _error_result(exc: ApiError) -> Dict[str, Any]:
+    return {"ok": False, "status": exc.status, "error": exc.message}
+
+
+# ------------------ 端點 ------------------
+Handler = Callable[[Request], Awaitable[Tuple[int, Any]]]
+
+
+class BookingApi:
+    """API 端點 (重用 TravelService / PricingService / OrderHistoryService)"""
+
+    def __init__(self):
+        # 資料檔讀改寫依序執行 (整份 JSON 讀寫，平行執行只會在 db_lock 上排隊)
+        self._storage = ThreadPoolExecutor(max_workers=1, thread_name_prefix="booking-api-db")
+        self._routes: List[Tuple[str, "re.Pattern[str]", str, Handler]] = []
+        self._add("GET", "/health", self.health)
+        self._add("GET", "/metrics", self.metrics)
+        self._add("POST", "/quote", self.quote)
+        self._add("POST", "/quotes/batch", self.quote_batch)
+        self._add("POST", "/trips", self.create_trip)
+        self._add("POST", "/trips/batch", self.create_trips)
+        self._add("POST", "/travels", self.create_travel)
+        self._add("POST", "/travels/batch", self.create_travels)
+        self._add("GET", "/orders", self.list_orders)
+        self._add("POST", "/orders/cancel", self.cancel_orders)
+        self._add("POST", "/orders/{order_id}/cancel", self.cancel_order)
+
+    def _add(self, method: str, template: str, handler: Handler) -> None:
+        pattern = re.compile("^" + re.sub(r"\{(\w+)\}", r"(?P<\1>[^/]+)", template) + "$")
+        self._routes.append((method, pattern, template, handler))
+
+    def close(self) -> None:
+        self._storage.shutdown(wait=True)
+
+    async def _store(self, func: Callable, *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._storage, func, *args)
+
+    async def _compute(self, func: Callable, *args) -> Any:
+        """批次計算交給預設執行緒 (啟用 worker pool 時由其分派到子行程)，不阻塞事件迴圈"""
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    async def dispatch(self, request: Request) -> Tuple[int, Any]:
+        allowed = False
+        for method, pattern, template, handler in self._routes:
+            match = pattern.match(request.path)
+            if match is None:
+                continue
+            if method != request.method:
+                allowed = True
+                continue
+            request.params = match.groupdict()
+            with Metrics.timer(API_REQUEST_SECONDS, route=f"{method} {template}"):
+                return await handler(request)
+        if allowed:
+            raise ApiError(405, f"不支援的方法: {request.method}")
+        raise ApiError(404, f"找不到端點: {request.path}")
+
+    # ---- 健康檢查 / 指標 ----
+    async def health(self, request: Request) -> Tuple[int, Any]:
+        return 200, {"status": "ok"}
+
+    async def metrics(self, request: Request) -> Tuple[int, Any]:
+        return 200, Metrics.render_prometheus()
+
+    # ---- 報價 ----
+    async def quote(self, request: Request) -> Tuple[int, Any]:
+        data = request.json()
+        quotes = PricingService.quote_legs(
+            [(_coordinate(data, "pickup"), _coordinate(data, "dropoff"))],
+            [_luggage(data)],
+            vehicle_types=_vehicle_types(data),
+        )
+        return 200, _quote_payload(quotes[0])
+
+    async def quote_batch(self, request: Request) -> Tuple[int, Any]:
+        data = request.json()
+        legs = _batch(data, "legs")
+        coordinates, luggage = [], []
+        for leg in legs:
+            coordinates.append((_coordinate(leg, "pickup"), _coordinate(leg, "dropoff")))
+            luggage.append(_luggage(leg))
+        quotes = await self._compute(WorkerPool.quote_legs, coordinates, luggage, _vehicle_types(data))
+        return 200, {"results": [_quote_payload(leg_quotes) for leg_quotes in quotes]}
+
+    # ---- 建立行程 / 旅程 ----
+    async def create_trip(self, request: Request) -> Tuple[int, Any]:
+        data = request.json()
+        user_email = str(_require(data, "user_email"))
+        trip, extra_fields = _build_trip(data)
+        entries = await self._store(TravelService.save_trips, [trip], user_email, API_ORDER_TYPE, [extra_fields])
+        return 201, entries[0]
+
+    async def create_trips(self, request: Request) -> Tuple[int, Any]:
+        data = request.json()
+        default_email = data.get("user_email") if isinstance(data, dict) else None
+        results: List[Dict[str, Any]] = []
+        # 使用者 → [(結果位置, Trip, 額外欄位)]
+        groups: Dict[str, List[Tuple[int, Trip, Dict[str, Any]]]] = {}
+        for item in _batch(data, "trips"):
+            try:
+                user_email = str(item.get("user_email") or default_email or "") if isinstance(item, dict) else ""
+                if not user_email:
+                    raise ApiError(400, "缺少欄位: user_email")
+                trip, extra_fields = _build_trip(item)
+            except ApiError as exc:
+                results.append(_error_result(exc))
+                continue
+            groups.setdefault(user_email, []).append((len(results), trip, extra_fields))
+            results.append({})
+
+        def save_groups() -> None:
+            for user_email, items in groups.items():
+                entries = TravelService.save_trips(
+                    [trip for _, trip, _ in items], user_email, API_ORDER_TYPE, [extra for _, _, extra in items]
+                )
+                for (position, _, _), entry in zip(items, entries):
+                    results[position] = {"ok": True, "order": entry}
+
+        if groups:
+            await self._store(save_groups)
+        return 200, {"created": sum(len(items) for items in groups.values()), "results": results}
+
+    async def create_travel(self, request: Request) -> Tuple[int, Any]:
+        data = request.json()
+        user_email = str(_require(data, "user_email"))
+        travel = _parse_travel(_require(data, "travel"))
+        try:
+            await self._compute(WorkerPool.generate_trips, travel)
+        except ValueError as exc:
+            raise ApiError(400, str(exc))
+        travel_entry, trip_entries = (await self._store(TravelService.save_travels, [travel], user_email))[0]
+        return 201, {"travel": travel_entry, "trips": trip_entries}
+
+    async def create_travels(self, request: Request) -> Tuple[int, Any]:
+        data = request.json()
+        user_email = str(_require(data, "user_email"))
+        results: List[Dict[str, Any]] = []
+        parsed: List[Tuple[int, Travel]] = []
+        for item in _batch(data, "travels"):
+            try:
+                parsed.append((len(results), _parse_travel(item)))
+                results.append({})
+            except ApiError as exc:
+                results.append(_error_result(exc))
+
+        # 路段產生與報價為 CPU 工作，啟用 worker pool 時分段於子行程平行計算
+        generated = await self._compute(WorkerPool.generate_trips_many, [travel for _, travel in parsed])
+        travels: List[Tuple[int, Travel]] = []
+        for (position, travel), trips in zip(parsed, generated):
+            if isinstance(trips, ValueError):
+                results[position] = _error_result(ApiError(400, str(trips)))
+            else:
+                travels.append((position, travel))
+
+        if travels:
+            saved = await self._store(TravelService.save_travels, [travel for _, travel in travels], user_email)
+            for (position, _), (travel_entry, trip_entries) in zip(travels, saved):
+                results[position] = {"ok": True, "travel": travel_entry, "trips": trip_entries}
+        return 200, {"created": len(travels), "results": results}
+
+    # ---- 查詢 / 取消 ----
+    async def list_orders(self, request: Request) -> Tuple[int, Any]:
+        user_email = _require(request.query, "user_email")
+        try:
+            limit = int(request.query.get("limit", OrderHistoryService.DEFAULT_PAGE_SIZE))
+        except ValueError:
+            raise ApiError(400, "limit 必須是整數")
+        limit = max(1, min(limit, 200))
+        orders, next_cursor = await self._store(
+            OrderHistoryService.get_orders_page,
+            user_email,
+            request.query.get("status"),
+            request.query.get("cursor"),
+            limit,
+        )
+        return 200, {"orders": orders, "next_cursor": next_cursor}
+
+    async def cancel_order(self, request: Request) -> Tuple[int, Any]:
+        order_id = request.params["order_id"]
+        results = await self._store(OrderHistoryService.update_order_statuses, {order_id: CANCEL_STATUS})
+        if not results[order_id]:
+            raise ApiError(404, f"找不到訂單: {order_id}")
+        return 200, {"order_id": order_id, "status": CANCEL_STATUS}
+
+    async def cancel_orders(self, request: Request) -> Tuple[int, Any]:
+        order_ids = [str(order_id) for order_id in _batch(request.json(), "order_ids")]
+        results = await self._store(
+            OrderHistoryService.update_order_statuses, {order_id: CANCEL_STATUS for order_id in order_ids}
+        )
+        return 200, {"cancelled": sum(results.values()), "results": results}
+
+
+# ------------------ HTTP 伺服器 ------------------
+def _encode_response(status: int, payload: Any, keep_alive: bool) -> bytes:
+    if isinstance(payload, str):
+        body = payload.encode("utf-8")
+        content_type = "text/plain; version=0.0.4; charset=utf-8"
+    else:
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        content_type = "application/json; charset=utf-8"
+    headers = [
+        f"HTTP/1.1 {status} {_REASONS.get(status, 'Unknown')}",
+        f"Content-Type: {content_type}",
+        f"Content-Length: {len(body)}",
+    ]
+    if keep_alive:
+        headers += ["Connection: keep-alive", f"Keep-Alive: timeout={int(KEEP_ALIVE_TIMEOUT)}"]
+    else:
+        headers.append("Connection: close")
+    return ("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body
+
+
+class BookingApiServer:
+    """以 asyncio streams 實作的 HTTP/1.1 伺服器 (keep-alive、依序處理同一連線上的請求)"""
+
+    def __init__(self, api: Optional[BookingApi] = None, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        self.api = api or BookingApi()
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port, limit=MAX_HEADER_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("預約 API 已啟動: http://%s:%d", self.host, self.port)
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        self.api.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Request]:
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEP_ALIVE_TIMEOUT)
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+            return None
+        except asyncio.LimitOverrunError:
+            raise ApiError(431, "標頭過長")
+
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            raise ApiError(400, "請求列格式錯誤")
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            raise ApiError(501, "不支援 chunked 傳輸，請提供 Content-Length")
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise ApiError(400, "Content-Length 格式錯誤")
+        if length < 0:
+            raise ApiError(400, "Content-Length 格式錯誤")
+        if length > MAX_BODY_BYTES:
+            raise ApiError(413, f"內容超過 {MAX_BODY_BYTES} bytes")
+        body = await reader.readexactly(length) if length else b""
+        return Request(method.upper(), target, version, headers, body)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except ApiError as exc:
+                    # 無法確定請求邊界，回應後關閉連線
+                    writer.write(_encode_response(exc.status, {"error": exc.message}, keep_alive=False))
+                    await writer.drain()
+                    break
+                except asyncio.IncompleteReadError:
+                    break
+                if request is None:
+                    break
+
+                keep_alive = request.keep_alive
+                try:
+                    status, payload = await self.api.dispatch(request)
+                except ApiError as exc:
+                    status, payload = exc.status, {"error": exc.message}
+                except Exception as exc:
+                    logger.exception("處理 %s %s 時發生錯誤: %s", request.method, request.path, exc)
+                    status, payload = 500, {"error": "伺服器內部錯誤"}
+                writer.write(_encode_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import argparse
+
+    from config import LOG_FILE_PATTERN, LOG_LEVEL, LOG_MODULE_LEVELS, METRICS_ENABLED
+    from logging_config import setup_logging
+
+    parser = argparse.ArgumentParser(description="e-baggage HTTP 預約 API")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--metrics", action="store_true", help="啟用指標 (GET /metrics)")
+    parser.add_argument("--workers", type=int, default=0, help="worker pool 行程數 (0 為不啟用)")
+    args = parser.parse_args(argv)
+
+    setup_logging(
+        LOG_FILE_PATTERN.format(timestamp=datetime.now().strftime("%Y%m%dT%H%M%S")),
+        level=LOG_LEVEL,
+        module_levels=LOG_MODULE_LEVELS,
+    )
+    if args.metrics or METRICS_ENABLED:
+        Metrics.enable()
+
+    if args.workers:
+        WorkerPool.start(args.workers)
+    server = BookingApiServer(host=args.host, port=args.port)
+
+    async def run() -> None:
+        await server.start()
+        print(f"Booking API listening on http://{server.host}:{server.port}")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.stop()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
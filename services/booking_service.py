@@ -5,7 +5,12 @@ Booking Service
 import logging
 import json
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Mapping
+
+from db_helpers import db_lock, load_json, save_json
+from services.catalog_service import CatalogService
+from services.hotel_catalog import HotelCatalog, HotelRow
+from services.order_event_bus import OrderEventBus
 
 logger = logging.getLogger(__name__)
 
@@ -14,42 +19,66 @@ DEMO_DB_PATH = "demo_db.json"
 
 class BookingService:
     """預約服務"""
-    
+
     @staticmethod
-    def load_hotels() -> List[Dict[str, Any]]:
+    def load_hotels() -> HotelCatalog:
         """
         從資料庫載入所有飯店資訊 (用於搜尋)
         
         Returns:
-            所有飯店列表
+            欄式飯店目錄 (共用唯讀)，hotels[i] 為第 i 間飯店的 HotelRow
         """
         try:
-            with open(DEMO_DB_PATH, 'r', encoding='utf-8') as f:
-                db_data = json.load(f)
-            hotels = db_data.get('hotels', [])
+            hotels = CatalogService.current().hotels
             logger.info(f"載入了 {len(hotels)} 間飯店")
             return hotels
         except (FileNotFoundError, json.JSONDecodeError) as e:
             logger.error(f"載入飯店時發生錯誤: {e}")
-            return []
+            return HotelCatalog.from_records([])
 
     @staticmethod
-    def load_partner_hotels() -> List[Dict[str, Any]]:
+    def load_partner_hotels() -> HotelCatalog:
         """
         從資料庫載入合作飯店資訊 (用於地圖顯示)
         
         Returns:
-            合作飯店列表
+            欄式合作飯店目錄 (共用唯讀)
         """
         try:
-            with open(DEMO_DB_PATH, 'r', encoding='utf-8') as f:
-                db_data = json.load(f)
-            hotels = db_data.get('partner_hotels', [])
+            hotels = CatalogService.current().partner_hotels
             logger.info(f"載入了 {len(hotels)} 間合作飯店")
             return hotels
         except (FileNotFoundError, json.JSONDecodeError) as e:
             logger.error(f"載入合作飯店時發生錯誤: {e}")
-            return []
+            return HotelCatalog.from_records([])
+
+    @staticmethod
+    def get_hotel_lookup() -> Mapping[str, HotelRow]:
+        """
+        飯店名稱 → 飯店資料 (唯讀共用)
+        
+        Returns:
+            {飯店名稱: HotelRow}
+        """
+        try:
+            return CatalogService.current().hotel_lookup
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            logger.error(f"建立飯店索引時發生錯誤: {e}")
+            return {}
+
+    @staticmethod
+    def get_partner_coordinates():
+        """
+        合作飯店座標 (與 load_partner_hotels 的順序相同，供距離矩陣查詢最近飯店)
+        
+        Returns:
+            N × 2 座標陣列 (未安裝 numpy 時為 ((lat, lon), ...))
+        """
+        try:
+            return CatalogService.current().partner_coordinates
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            logger.error(f"建立合作飯店座標索引時發生錯誤: {e}")
+            return ()
     
     @staticmethod
     def save_order(order_data: Dict[str, Any]) -> bool:
@@ -63,49 +92,49 @@ class BookingService:
             是否成功
         """
         try:
-            # 讀取現有資料
-            try:
-                with open(DEMO_DB_PATH, 'r', encoding='utf-8') as f:
-                    db_data = json.load(f)
-            except (FileNotFoundError, json.JSONDecodeError):
-                db_data = {
-                    "users": {},
-                    "orders": [],
-                    "scans": [],
-                    "hotels": []
-                }
-            
-            orders = db_data.get('orders', [])
-            orders.append(order_data)
-            
-            # 按日期降序排序
-            def get_order_date(order):
-                # 嘗試獲取 date 欄位
-                date_str = order.get('date')
-                if date_str:
-                    try:
-                        return datetime.strptime(date_str, '%Y/%m/%d')
-                    except ValueError:
-                        pass
+            with db_lock():
+                # 讀取現有資料
+                try:
+                    db_data = load_json(DEMO_DB_PATH, source="booking.save_order")
+                except (FileNotFoundError, json.JSONDecodeError):
+                    db_data = {
+                        "users": {},
+                        "orders": [],
+                        "scans": [],
+                        "hotels": []
+                    }
                 
-                # 嘗試獲取 created_at 欄位 (針對不同格式的訂單)
-                created_at = order.get('created_at')
-                if created_at:
-                    try:
-                        # 處理 ISO 格式
-                        return datetime.fromisoformat(created_at)
-                    except ValueError:
-                        pass
+                orders = db_data.get('orders', [])
+                orders.append(order_data)
                 
-                return datetime.min
+                # 按日期降序排序
+                def get_order_date(order):
+                    # 嘗試獲取 date 欄位
+                    date_str = order.get('date')
+                    if date_str:
+                        try:
+                            return datetime.strptime(date_str, '%Y/%m/%d')
+                        except ValueError:
+                            pass
+                    
+                    # 嘗試獲取 created_at 欄位 (針對不同格式的訂單)
+                    created_at = order.get('created_at')
+                    if created_at:
+                        try:
+                            # 處理 ISO 格式
+                            return datetime.fromisoformat(created_at)
+                        except ValueError:
+                            pass
+                    
+                    return datetime.min
 
-            orders.sort(key=get_order_date, reverse=True)
-            db_data['orders'] = orders
-            
-            # 寫入檔案
-            with open(DEMO_DB_PATH, 'w', encoding='utf-8') as f:
-                json.dump(db_data, f, ensure_ascii=False, indent=2)
+                orders.sort(key=get_order_date, reverse=True)
+                db_data['orders'] = orders
+                
+                # 寫入檔案
+                save_json(DEMO_DB_PATH, db_data, source="booking.save_order", indent=2)
             
+            OrderEventBus.publish(OrderEventBus.INSERT, None, order_data)
             logger.info(f"訂單 {order_data.get('id', 'unknown')} 已儲存")
             return True
         except Exception as e:
@@ -121,8 +150,7 @@ class BookingService:
             訂單 ID (格式: O001, O002, ...)
         """
         try:
-            with open(DEMO_DB_PATH, 'r', encoding='utf-8') as f:
-                db_data = json.load(f)
+            db_data = load_json(DEMO_DB_PATH, source="booking.generate_order_id")
             
             existing_orders = db_data.get('orders', [])
             max_id = 0
@@ -183,9 +211,7 @@ class BookingService:
             推薦列表
         """
         try:
-            with open(DEMO_DB_PATH, 'r', encoding='utf-8') as f:
-                db_data = json.load(f)
-            recommendations = db_data.get('recommendations', [])
+            recommendations = list(CatalogService.current().recommendations)
             logger.info(f"載入了 {len(recommendations)} 條推薦")
             return recommendations
         except (FileNotFoundError, json.JSONDecodeError) as e:
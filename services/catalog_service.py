@@ -0,0 +1,207 @@
+"""
+Catalog Service
+行程內共用的唯讀目錄 (飯店、合作飯店、推薦景點、已知路線)：
+整個行程只載入一次，所有 Flet session 共用同一份不可變快照，並以參照計數管理生命週期
+
+目錄與訂單存放在同一個資料檔，訂單寫入會改變檔案時間，因此執行中不以檔案版本自動重新載入；
+目錄資料更新後請呼叫 CatalogService.reload()
+
+飯店資料由 CatalogSnapshot 以 mmap 映射二進位快照 (以目錄資料表的內容雜湊判斷是否需要重新產生)，
+快照無法產生 (例如目錄不可寫入) 時退回直接解析 JSON。
+"""
+import itertools
+import json
+import logging
+import threading
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+from metrics import DB_OPERATION_SECONDS, Metrics
+from services.catalog_snapshot import HOTEL_TABLES, JSON_TABLES, CatalogSnapshot
+from services.hotel_catalog import HotelCatalog, HotelRow
+
+logger = logging.getLogger(__name__)
+
+CATALOG_DB_PATH = "demo_db.json"
+CATALOG_SNAPSHOT_PATH = "catalog_snapshot.bin"
+
+
+def _freeze(value: Any) -> Any:
+    """將 JSON 資料轉為不可變結構 (dict → MappingProxyType、list → tuple)"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class Catalog:
+    """
+    單一版本的目錄快照 (唯讀，所有 session 共用)
+
+    飯店與合作飯店為欄式 HotelCatalog；衍生索引於第一次使用時建立，並隨快照一起釋放。
+    """
+
+    def __init__(
+        self,
+        version: int,
+        hotels: HotelCatalog,
+        partner_hotels: HotelCatalog,
+        recommendations: Tuple[Mapping[str, Any], ...],
+        route_fixtures: Mapping[str, Mapping[str, Any]],
+    ):
+        self.version = version
+        self.hotels = hotels
+        self.partner_hotels = partner_hotels
+        self.recommendations = recommendations
+        self.route_fixtures = route_fixtures
+        self._indexes: Dict[str, Any] = {}
+        self._index_lock = threading.Lock()
+
+    def index(self, name: str, build: Callable[["Catalog"], Any]) -> Any:
+        """
+        取得 (必要時建立) 此快照的衍生索引
+
+        建立時不持有鎖，索引可以依賴其他索引；同時建立時以先完成者為準。
+        """
+        value = self._indexes.get(name)
+        if value is not None:
+            return value
+        value = build(self)
+        with self._index_lock:
+            return self._indexes.setdefault(name, value)
+
+    @property
+    def hotel_lookup(self) -> Mapping[str, HotelRow]:
+        """飯店名稱 → 飯店資料"""
+        return self.hotels.by_name
+
+    @property
+    def partner_coordinates(self):
+        """合作飯店座標 (與 partner_hotels 順序相同)"""
+        return self.partner_hotels.coordinates
+
+
+class CatalogService:
+    """共用目錄服務"""
+
+    DB_PATH = CATALOG_DB_PATH
+    SNAPSHOT_PATH = CATALOG_SNAPSHOT_PATH
+
+    _lock = threading.Lock()
+    _versions = itertools.count(1)
+    _current: Optional[Catalog] = None
+    # 仍被 session 持有的舊版本快照 (id → 快照)，參照歸零時釋放
+    _retained: Dict[int, Catalog] = {}
+    _refcounts: Dict[int, int] = {}
+
+    @classmethod
+    def current(cls) -> Catalog:
+        """
+        取得目前的目錄快照 (第一次呼叫時載入)
+
+        Raises:
+            FileNotFoundError / json.JSONDecodeError: 資料檔無法讀取時
+        """
+        catalog = cls._current
+        if catalog is not None:
+            return catalog
+        with cls._lock:
+            if cls._current is None:
+                cls._current = cls._load()
+            return cls._current
+
+    @classmethod
+    def reload(cls) -> Catalog:
+        """
+        重新載入目錄並成為新的目前版本
+
+        仍被 session 持有的舊版本會保留到最後一個持有者 release 為止。
+        """
+        with cls._lock:
+            catalog = cls._load()
+            previous, cls._current = cls._current, catalog
+            if previous is not None and cls._refcounts.get(id(previous)):
+                cls._retained[id(previous)] = previous
+            return catalog
+
+    @classmethod
+    def acquire(cls) -> Catalog:
+        """取得目前的快照並登記持有 (session 開始時呼叫，結束時呼叫 release)"""
+        catalog = cls.current()
+        with cls._lock:
+            cls._refcounts[id(catalog)] = cls._refcounts.get(id(catalog), 0) + 1
+        return catalog
+
+    @classmethod
+    def release(cls, catalog: Optional[Catalog]) -> None:
+        """釋放持有的快照；舊版本在最後一個持有者釋放後即被丟棄"""
+        if catalog is None:
+            return
+        with cls._lock:
+            count = cls._refcounts.get(id(catalog), 0) - 1
+            if count > 0:
+                cls._refcounts[id(catalog)] = count
+                return
+            cls._refcounts.pop(id(catalog), None)
+            if cls._retained.pop(id(catalog), None) is not None:
+                logger.info("舊版目錄快照已無 session 持有，已釋放")
+
+    @classmethod
+    def stats(cls) -> Dict[str, int]:
+        """目前快照的持有數與仍保留的舊版本數"""
+        with cls._lock:
+            current_refs = cls._refcounts.get(id(cls._current), 0) if cls._current else 0
+            return {
+                "version": cls._current.version if cls._current else 0,
+                "current_refs": current_refs,
+                "retained_versions": len(cls._retained),
+            }
+
+    # ------------------ 內部工具 ------------------
+    @classmethod
+    def _load(cls) -> Catalog:
+        """呼叫端須持有 _lock"""
+        from config import MAP_ROUTING_101_BANQIAO, MAP_ROUTING_101_GRAND_HOTEL, MAP_ROUTING_CITYHALL_101
+
+        try:
+            with Metrics.timer(DB_OPERATION_SECONDS, operation="load", source="catalog.snapshot"):
+                tables = cls._load_snapshot_tables()
+        except OSError as e:
+            logger.warning(f"目錄快照無法使用，改為直接解析資料檔: {e}")
+            with Metrics.timer(DB_OPERATION_SECONDS, operation="load", source="catalog.json"):
+                tables = cls._load_json_tables()
+        catalog = Catalog(
+            version=next(cls._versions),
+            hotels=tables["hotels"],
+            partner_hotels=tables["partner_hotels"],
+            recommendations=_freeze(tables["recommendations"]),
+            route_fixtures=_freeze({
+                "101_banqiao": MAP_ROUTING_101_BANQIAO,
+                "cityhall_101": MAP_ROUTING_CITYHALL_101,
+                "101_grand_hotel": MAP_ROUTING_101_GRAND_HOTEL,
+            }),
+        )
+        logger.info(
+            f"目錄快照已載入：{len(catalog.hotels)} 間飯店、{len(catalog.partner_hotels)} 間合作飯店、"
+            f"{len(catalog.recommendations)} 條推薦，飯店欄位共 "
+            f"{(catalog.hotels.memory_usage()['total'] + catalog.partner_hotels.memory_usage()['total']) / 1024:.0f} KB"
+        )
+        return catalog
+
+    @classmethod
+    def _load_snapshot_tables(cls) -> Dict[str, Any]:
+        snapshot = CatalogSnapshot.load(cls.DB_PATH, cls.SNAPSHOT_PATH)
+        tables: Dict[str, Any] = {table: snapshot.hotel_catalog(table) for table in HOTEL_TABLES}
+        tables.update({table: snapshot.json_table(table) for table in JSON_TABLES})
+        return tables
+
+    @classmethod
+    def _load_json_tables(cls) -> Dict[str, Any]:
+        with open(cls.DB_PATH, "r", encoding="utf-8") as f:
+            db_data = json.load(f)
+        tables: Dict[str, Any] = {
+            table: HotelCatalog.from_records(db_data.get(table, [])) for table in HOTEL_TABLES
+        }
+        tables.update({table: db_data.get(table, []) for table in JSON_TABLES})
+        return tables
@@ -0,0 +1,277 @@
+"""
+Catalog Snapshot
+把資料檔中的 hotels / partner_hotels 編譯成帶版本的二進位快照，啟動時以 mmap 零複製載入
+
+檔案格式 (原生位元組序，所有區段以 8 bytes 對齊):
+
+    header      magic(8) | format(u32) | byteorder(u32) | source mtime_ns(i64) | source size(i64)
+                | 目錄內容雜湊(32) | table 數(u32)
+    directory   每個資料表: 名稱(16) | 區段位移(u64) | 區段長度(u64)
+    hotel 區段  count(u64) + 名稱數(u64) + 各欄位位移 → lat f64[n] | lon f64[n] | 合作飯店位元圖
+                | 名稱 id u32[n] | 名稱位移 u32[k+1] | 名稱 UTF-8 | 地址位移 u32[n+1] | 地址 UTF-8
+    json 區段   推薦景點等小型資料，直接存 JSON 文字
+
+快照的版本是目錄資料表 (hotels / partner_hotels / recommendations) 內容的雜湊，
+訂單等其他資料寫入資料檔不會讓快照失效。資料檔的 mtime / 大小只作為「上次驗證時」的快取：
+一致時直接使用；不一致時解析資料檔重新計算目錄雜湊，相同就只更新標頭的 mtime / 大小，
+不同 (或格式版本、位元組序不符) 才重新產生。
+快照以「寫入暫存檔後 os.replace」方式產生，其他行程已映射的舊檔不受影響。
+
+手動產生:
+    python -m services.catalog_snapshot
+"""
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.hotel_catalog import HotelCatalog
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"EBGCATS\x00"
+SNAPSHOT_FORMAT = 2
+HOTEL_TABLES = ("hotels", "partner_hotels")
+JSON_TABLES = ("recommendations",)
+
+_BYTEORDER = 1 if sys.byteorder == "little" else 2
+_HEADER = struct.Struct("=8sIIqq32sI4x")
+_STAMP = struct.Struct("=qq")
+_STAMP_OFFSET = 16  # 標頭中 source mtime_ns / size 的位置
+_DIRECTORY_ENTRY = struct.Struct("=16sQQ")
+# count, 名稱數, 名稱 UTF-8 長度, 地址 UTF-8 長度, 各欄位位移 (順序同 _HOTEL_COLUMNS)
+_HOTEL_SECTION = struct.Struct("=QQQQQQQQQQQQ")
+_HOTEL_COLUMNS = (
+    "lat", "lon", "partner_bits", "name_ids", "name_offsets", "name_blob", "address_offsets", "address_blob"
+)
+
+SourceStamp = Tuple[int, int]
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+class CatalogSnapshot:
+    """以 mmap 映射的唯讀目錄快照"""
+
+    def __init__(
+        self,
+        path: str,
+        mapping: mmap.mmap,
+        source_stamp: SourceStamp,
+        catalog_hash: bytes,
+        tables: Dict[str, Tuple[int, int]],
+    ):
+        self.path = path
+        self.source_stamp = source_stamp
+        self.catalog_hash = catalog_hash
+        self._view = memoryview(mapping)
+        self._tables = tables
+
+    @classmethod
+    def load(cls, source_path: str, snapshot_path: str) -> "CatalogSnapshot":
+        """
+        開啟快照；快照不存在、格式不符或目錄資料表已變更時先重新產生
+
+        Raises:
+            OSError: 無法讀取資料檔或寫入快照時
+            json.JSONDecodeError: 需要驗證或重新產生但資料檔格式錯誤時
+        """
+        stamp = cls.source_stamp_of(source_path)
+        try:
+            snapshot = cls.open(snapshot_path)
+        except FileNotFoundError:
+            logger.info("目錄快照不存在，開始產生")
+        except ValueError as e:
+            logger.info(f"目錄快照無法使用 ({e})，重新產生")
+        else:
+            if snapshot.source_stamp == stamp:
+                return snapshot
+            db_data = cls._read_source(source_path)
+            if cls.catalog_hash_of(db_data) == snapshot.catalog_hash:
+                # 只有訂單等其他資料變更：沿用快照，記下這次驗證時的 mtime / 大小
+                cls._restamp(snapshot_path, stamp)
+                return snapshot
+            logger.info("目錄資料已變更，重新產生目錄快照")
+            cls._write(db_data, stamp, snapshot_path)
+            return cls.open(snapshot_path)
+        cls.build(source_path, snapshot_path)
+        return cls.open(snapshot_path)
+
+    @classmethod
+    def open(cls, snapshot_path: str) -> "CatalogSnapshot":
+        """
+        以唯讀 mmap 開啟既有快照 (不檢查資料檔是否變更)
+
+        Raises:
+            FileNotFoundError: 快照不存在
+            ValueError: 檔案不是可用的快照
+        """
+        with open(snapshot_path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _HEADER.size:
+                raise ValueError("快照檔過短")
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, fmt, byteorder, mtime_ns, source_size, catalog_hash, table_count = _HEADER.unpack_from(mapping, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError("不是目錄快照檔")
+        if fmt != SNAPSHOT_FORMAT or byteorder != _BYTEORDER:
+            raise ValueError(f"快照格式 {fmt} / 位元組序 {byteorder} 不符")
+
+        tables = {}
+        for index in range(table_count):
+            raw_name, offset, length = _DIRECTORY_ENTRY.unpack_from(mapping, _HEADER.size + index * _DIRECTORY_ENTRY.size)
+            if offset + length > size:
+                raise ValueError("快照檔內容不完整")
+            tables[raw_name.rstrip(b"\x00").decode("ascii")] = (offset, length)
+        missing = set(HOTEL_TABLES + JSON_TABLES) - set(tables)
+        if missing:
+            raise ValueError(f"快照缺少資料表: {', '.join(sorted(missing))}")
+        return cls(snapshot_path, mapping, (mtime_ns, source_size), catalog_hash, tables)
+
+    def hotel_catalog(self, table: str) -> HotelCatalog:
+        """取得以快照區段為底層的 HotelCatalog (不複製資料)"""
+        offset, _ = self._tables[table]
+        count, name_count, name_length, address_length, *column_offsets = _HOTEL_SECTION.unpack_from(self._view, offset)
+        lengths = {
+            "lat": count * 8,
+            "lon": count * 8,
+            "partner_bits": (count + 7) // 8,
+            "name_ids": count * 4,
+            "name_offsets": (name_count + 1) * 4,
+            "name_blob": name_length,
+            "address_offsets": (count + 1) * 4,
+            "address_blob": address_length,
+        }
+        columns = {
+            name: self._view[offset + start:offset + start + lengths[name]]
+            for name, start in zip(_HOTEL_COLUMNS, column_offsets)
+        }
+        # 名稱表很小且重複率高：載入時解碼並 intern 一次，其餘欄位維持映射
+        names = HotelCatalog.decode_names(columns.pop("name_offsets"), columns.pop("name_blob"))
+        return HotelCatalog(names, **columns)
+
+    def json_table(self, table: str) -> Any:
+        offset, length = self._tables[table]
+        return json.loads(str(self._view[offset:offset + length], "utf-8"))
+
+    # ------------------ 產生快照 ------------------
+    @staticmethod
+    def source_stamp_of(source_path: str) -> SourceStamp:
+        stat = os.stat(source_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    @staticmethod
+    def catalog_hash_of(db_data: Dict[str, Any]) -> bytes:
+        """目錄資料表內容的雜湊 (快照的版本；與其他資料表及 JSON 排版無關)"""
+        catalog = {table: db_data.get(table, []) for table in HOTEL_TABLES + JSON_TABLES}
+        canonical = json.dumps(catalog, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+        return hashlib.blake2b(canonical.encode("utf-8"), digest_size=32).digest()
+
+    @classmethod
+    def build(cls, source_path: str, snapshot_path: str) -> None:
+        """
+        由資料檔產生快照 (先寫暫存檔再原子性取代)
+
+        Raises:
+            OSError / json.JSONDecodeError: 資料檔無法讀取或快照無法寫入時
+        """
+        stamp = cls.source_stamp_of(source_path)
+        cls._write(cls._read_source(source_path), stamp, snapshot_path)
+
+    @staticmethod
+    def _read_source(source_path: str) -> Dict[str, Any]:
+        with open(source_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def _restamp(snapshot_path: str, stamp: SourceStamp) -> None:
+        """只改寫標頭中的資料檔 mtime / 大小 (已映射的行程只在開啟時讀標頭，不受影響)"""
+        try:
+            with open(snapshot_path, "r+b") as f:
+                f.seek(_STAMP_OFFSET)
+                f.write(_STAMP.pack(*stamp))
+        except OSError as e:
+            # 無法更新只代表下次啟動需要再驗證一次
+            logger.warning(f"無法更新目錄快照標頭: {e}")
+
+    @classmethod
+    def _write(cls, db_data: Dict[str, Any], stamp: SourceStamp, snapshot_path: str) -> None:
+        started = time.perf_counter()
+        sections: List[Tuple[str, bytes]] = []
+        for table in HOTEL_TABLES:
+            sections.append((table, cls._pack_hotels(HotelCatalog.from_records(db_data.get(table, [])))))
+        for table in JSON_TABLES:
+            sections.append((table, json.dumps(db_data.get(table, []), ensure_ascii=False).encode("utf-8")))
+
+        directory_end = _HEADER.size + len(sections) * _DIRECTORY_ENTRY.size
+        offset = _align(directory_end)
+        header = bytearray(
+            _HEADER.pack(
+                SNAPSHOT_MAGIC, SNAPSHOT_FORMAT, _BYTEORDER, stamp[0], stamp[1], cls.catalog_hash_of(db_data), len(sections)
+            )
+        )
+        body = bytearray()
+        for name, data in sections:
+            header += _DIRECTORY_ENTRY.pack(name.encode("ascii"), offset + len(body), len(data))
+            body += data
+            body += b"\x00" * (_align(len(body)) - len(body))
+        header += b"\x00" * (offset - len(header))
+
+        tmp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(header)
+                f.write(body)
+            os.replace(tmp_path, snapshot_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        logger.info(
+            f"目錄快照已產生：{snapshot_path} ({(len(header) + len(body)) / 1024:.0f} KB，"
+            f"{(time.perf_counter() - started) * 1000:.0f} ms)"
+        )
+
+    @staticmethod
+    def _pack_hotels(catalog: HotelCatalog) -> bytes:
+        columns = catalog.columns()
+        name_offsets, name_blob = HotelCatalog.encode_names(catalog.names)
+        columns["name_offsets"] = memoryview(name_offsets)
+        columns["name_blob"] = memoryview(name_blob)
+        offsets, position = [], _align(_HOTEL_SECTION.size)
+        for name in _HOTEL_COLUMNS:
+            offsets.append(position)
+            position = _align(position + columns[name].nbytes)
+
+        data = bytearray(position)
+        _HOTEL_SECTION.pack_into(
+            data, 0, len(catalog), len(catalog.names), len(name_blob), columns["address_blob"].nbytes, *offsets
+        )
+        for name, start in zip(_HOTEL_COLUMNS, offsets):
+            raw = columns[name].cast("B")
+            data[start:start + raw.nbytes] = raw
+        return bytes(data)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import argparse
+
+    from services.catalog_service import CATALOG_DB_PATH, CATALOG_SNAPSHOT_PATH
+
+    parser = argparse.ArgumentParser(description="產生目錄二進位快照")
+    parser.add_argument("--source", default=CATALOG_DB_PATH)
+    parser.add_argument("--output", default=CATALOG_SNAPSHOT_PATH)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    CatalogSnapshot.build(args.source, args.output)
+
+
+if __name__ == "__main__":
+    main()
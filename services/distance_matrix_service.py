@@ -0,0 +1,342 @@
+"""
+Distance Matrix Service
+批次計算多個起點 × 多個終點之間的距離（Haversine 向量化 / OSRM table）
+"""
+import logging
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from metrics import ROUTE_TABLE_SECONDS, Metrics
+
+try:
+    import numpy as np
+except ImportError:  # 允許在未安裝 numpy 時退回純 Python 計算
+    np = None
+
+logger = logging.getLogger(__name__)
+
+Coordinate = Tuple[float, float]
+
+EARTH_RADIUS_KM = 6371.0
+
+
+class DistanceMatrixService:
+    """距離矩陣服務"""
+
+    OSRM_TABLE_ENDPOINT = (
+        "http://router.project-osrm.org/table/v1/driving/{coordinates}"
+        "?sources={sources}&destinations={destinations}&annotations=distance,duration"
+    )
+    ROUTE_CACHE_SIZE = 4096
+    COORD_PRECISION = 5  # 快取鍵的座標精度 (約 1 公尺)
+
+    _route_cache: "OrderedDict[Tuple[Coordinate, Coordinate], Tuple[float, float]]" = OrderedDict()
+    _route_cache_lock = threading.Lock()
+
+    # ------------------ Haversine ------------------
+    @staticmethod
+    def haversine_matrix(
+        origins: Sequence[Coordinate],
+        destinations: Sequence[Coordinate],
+    ):
+        """
+        計算 N 個起點 × M 個終點的直線距離矩陣
+
+        Args:
+            origins: 起點座標列表 [(緯度, 經度), ...]
+            destinations: 終點座標列表 [(緯度, 經度), ...]
+
+        Returns:
+            N × M 距離矩陣（公里），可使用 matrix[i][j] 取值；
+            安裝 numpy 時為 ndarray，否則為巢狀 list
+        """
+        if len(origins) == 0 or len(destinations) == 0:
+            return np.zeros((len(origins), len(destinations))) if np is not None else [[] for _ in origins]
+
+        if np is None:
+            return [
+                [DistanceMatrixService._haversine_scalar(o[0], o[1], d[0], d[1]) for d in destinations]
+                for o in origins
+            ]
+
+        origin_arr = np.radians(np.asarray(origins, dtype=np.float64))
+        dest_arr = np.radians(np.asarray(destinations, dtype=np.float64))
+
+        lat1 = origin_arr[:, 0][:, np.newaxis]
+        lon1 = origin_arr[:, 1][:, np.newaxis]
+        lat2 = dest_arr[:, 0][np.newaxis, :]
+        lon2 = dest_arr[:, 1][np.newaxis, :]
+
+        a = np.sin((lat2 - lat1) / 2.0) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2.0) ** 2
+        return 2.0 * EARTH_RADIUS_KM * np.arctan2(np.sqrt(a), np.sqrt(1.0 - a))
+
+    @staticmethod
+    def pairwise_distances(
+        origins: Sequence[Coordinate],
+        destinations: Sequence[Coordinate],
+    ) -> List[float]:
+        """
+        逐對計算距離 (origins[i] → destinations[i])，用於一次計算整段行程的所有路段
+
+        Args:
+            origins: 起點座標列表
+            destinations: 終點座標列表（長度須與 origins 相同）
+
+        Returns:
+            List[float]: 每一對的距離（公里）
+        """
+        if len(origins) != len(destinations):
+            raise ValueError("origins 與 destinations 長度必須相同")
+        if not origins:
+            return []
+
+        if np is None:
+            return [
+                DistanceMatrixService._haversine_scalar(o[0], o[1], d[0], d[1])
+                for o, d in zip(origins, destinations)
+            ]
+
+        origin_arr = np.radians(np.asarray(origins, dtype=np.float64))
+        dest_arr = np.radians(np.asarray(destinations, dtype=np.float64))
+        lat1, lon1 = origin_arr[:, 0], origin_arr[:, 1]
+        lat2, lon2 = dest_arr[:, 0], dest_arr[:, 1]
+
+        a = np.sin((lat2 - lat1) / 2.0) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2.0) ** 2
+        distances = 2.0 * EARTH_RADIUS_KM * np.arctan2(np.sqrt(a), np.sqrt(1.0 - a))
+        return distances.tolist()
+
+    @staticmethod
+    def nearest_indices(
+        origin: Coordinate,
+        candidates: Sequence[Coordinate],
+        limit: Optional[int] = None,
+        radius_km: Optional[float] = None,
+    ) -> List[int]:
+        """
+        依距離由近到遠回傳候選點的索引（派車、附近飯店搜尋使用）
+
+        Args:
+            origin: 中心點 (緯度, 經度)
+            candidates: 候選座標列表
+            limit: 最多回傳幾筆
+            radius_km: 只保留此半徑內的候選點
+
+        Returns:
+            List[int]: 候選點索引
+        """
+        if len(candidates) == 0:
+            return []
+
+        row = DistanceMatrixService.haversine_matrix([origin], candidates)[0]
+
+        if np is None:
+            order = sorted(range(len(row)), key=row.__getitem__)
+            if radius_km is not None:
+                order = [idx for idx in order if row[idx] <= radius_km]
+            return order[:limit] if limit is not None else order
+
+        if limit is not None and limit < len(row):
+            # 先以 argpartition 取前 limit 筆，再只排序這一小段
+            partial = np.argpartition(row, limit)[:limit]
+            order = partial[np.argsort(row[partial], kind="stable")]
+        else:
+            order = np.argsort(row, kind="stable")
+        if radius_km is not None:
+            order = order[row[order] <= radius_km]
+        return order.tolist()
+
+    @staticmethod
+    def assign_nearest(
+        pickups: Sequence[Coordinate],
+        drivers: Sequence[Coordinate],
+        radius_km: Optional[float] = None,
+    ) -> List[int]:
+        """
+        批次派車：多筆訂單同時分配司機，每位司機最多一筆 (全域依距離由近到遠貪婪配對)
+
+        Args:
+            pickups: 訂單上車座標列表
+            drivers: 可用司機座標列表
+            radius_km: 超過此距離不配對
+
+        Returns:
+            List[int]: 每筆訂單分配到的司機索引，未分配為 -1
+        """
+        assignment = [-1] * len(pickups)
+        if len(pickups) == 0 or len(drivers) == 0:
+            return assignment
+
+        matrix = DistanceMatrixService.haversine_matrix(pickups, drivers)
+        if np is None:
+            pairs = sorted(
+                (distance, i, j) for i, row in enumerate(matrix) for j, distance in enumerate(row)
+            )
+        else:
+            flat = np.argsort(matrix, axis=None, kind="stable")
+            rows, cols = np.unravel_index(flat, matrix.shape)
+            pairs = zip(matrix.ravel()[flat].tolist(), rows.tolist(), cols.tolist())
+
+        used = set()
+        remaining = min(len(pickups), len(drivers))
+        for distance, i, j in pairs:
+            if radius_km is not None and distance > radius_km:
+                break
+            if assignment[i] != -1 or j in used:
+                continue
+            assignment[i] = j
+            used.add(j)
+            remaining -= 1
+            if not remaining:
+                break
+        return assignment
+
+    @staticmethod
+    def _haversine_scalar(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+        lat1_rad, lon1_rad = math.radians(lat1), math.radians(lon1)
+        lat2_rad, lon2_rad = math.radians(lat2), math.radians(lon2)
+        a = (
+            math.sin((lat2_rad - lat1_rad) / 2) ** 2
+            + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin((lon2_rad - lon1_rad) / 2) ** 2
+        )
+        return 2 * EARTH_RADIUS_KM * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+    # ------------------ OSRM table ------------------
+    @classmethod
+    def route_matrix(
+        cls,
+        origins: Sequence[Coordinate],
+        destinations: Sequence[Coordinate],
+        timeout: float = 5.0,
+    ) -> Tuple[List[List[float]], List[List[float]]]:
+        """
+        以 OSRM table API 取得實際道路距離與行車時間，結果依座標對快取
+
+        無法取得的座標對（網路錯誤、無路線）會退回 Haversine 直線距離，
+        並以平均時速 35 km/h 估算時間。
+
+        Args:
+            origins: 起點座標列表
+            destinations: 終點座標列表
+            timeout: 單次請求逾時秒數
+
+        Returns:
+            (距離矩陣（公里）, 時間矩陣（分鐘）)
+        """
+        distances: List[List[Optional[float]]] = [[None] * len(destinations) for _ in origins]
+        durations: List[List[Optional[float]]] = [[None] * len(destinations) for _ in origins]
+
+        missing_origins: Dict[int, Coordinate] = {}
+        missing_destinations: Dict[int, Coordinate] = {}
+        for i, origin in enumerate(origins):
+            for j, destination in enumerate(destinations):
+                cached = cls._get_cached_route(origin, destination)
+                if cached:
+                    distances[i][j], durations[i][j] = cached
+                else:
+                    missing_origins[i] = origin
+                    missing_destinations[j] = destination
+
+        if missing_origins:
+            cls._fetch_route_table(
+                missing_origins, missing_destinations, distances, durations, timeout
+            )
+
+        fallback = None
+        for i, origin in enumerate(origins):
+            for j, destination in enumerate(destinations):
+                if distances[i][j] is None:
+                    if fallback is None:
+                        fallback = cls.haversine_matrix(origins, destinations)
+                    distances[i][j] = float(fallback[i][j])
+                    durations[i][j] = distances[i][j] / 35.0 * 60.0
+        return distances, durations
+
+    @classmethod
+    def _fetch_route_table(
+        cls,
+        origin_map: Dict[int, Coordinate],
+        destination_map: Dict[int, Coordinate],
+        distances: List[List[Optional[float]]],
+        durations: List[List[Optional[float]]],
+        timeout: float,
+    ) -> None:
+        try:
+            import requests
+        except ImportError:
+            logger.warning("未安裝 requests，無法使用 OSRM table")
+            return
+
+        origin_indices = list(origin_map.keys())
+        destination_indices = list(destination_map.keys())
+        coordinates = [origin_map[i] for i in origin_indices] + [destination_map[j] for j in destination_indices]
+        url = cls.OSRM_TABLE_ENDPOINT.format(
+            coordinates=";".join(f"{lon},{lat}" for lat, lon in coordinates),
+            sources=";".join(str(k) for k in range(len(origin_indices))),
+            destinations=";".join(
+                str(len(origin_indices) + k) for k in range(len(destination_indices))
+            ),
+        )
+        try:
+            with Metrics.timer(ROUTE_TABLE_SECONDS):
+                response = requests.get(url, timeout=timeout)
+                response.raise_for_status()
+                data = response.json()
+        except Exception as exc:
+            logger.warning("OSRM table 取得失敗: %s", exc)
+            return
+
+        table_distances = data.get("distances") or []
+        table_durations = data.get("durations") or []
+        for row_idx, i in enumerate(origin_indices):
+            for col_idx, j in enumerate(destination_indices):
+                try:
+                    meters = table_distances[row_idx][col_idx]
+                    seconds = table_durations[row_idx][col_idx]
+                except (IndexError, TypeError):
+                    continue
+                if meters is None or seconds is None:
+                    continue
+                distance_km = meters / 1000.0
+                duration_min = seconds / 60.0
+                distances[i][j] = distance_km
+                durations[i][j] = duration_min
+                cls._put_cached_route(origin_map[i], destination_map[j], (distance_km, duration_min))
+
+    @classmethod
+    def _route_key(cls, origin: Coordinate, destination: Coordinate) -> Tuple[Coordinate, Coordinate]:
+        precision = cls.COORD_PRECISION
+        return (
+            (round(origin[0], precision), round(origin[1], precision)),
+            (round(destination[0], precision), round(destination[1], precision)),
+        )
+
+    @classmethod
+    def _get_cached_route(cls, origin: Coordinate, destination: Coordinate) -> Optional[Tuple[float, float]]:
+        key = cls._route_key(origin, destination)
+        with cls._route_cache_lock:
+            value = cls._route_cache.get(key)
+            if value is not None:
+                cls._route_cache.move_to_end(key)
+            return value
+
+    @classmethod
+    def _put_cached_route(cls, origin: Coordinate, destination: Coordinate, value: Tuple[float, float]) -> None:
+        key = cls._route_key(origin, destination)
+        with cls._route_cache_lock:
+            cls._route_cache[key] = value
+            cls._route_cache.move_to_end(key)
+            while len(cls._route_cache) > cls.ROUTE_CACHE_SIZE:
+                cls._route_cache.popitem(last=False)
+
+    @classmethod
+    def preload_route(cls, origin: Coordinate, destination: Coordinate, distance_km: float, duration_min: float) -> None:
+        """預先放入已知路線 (例如設定檔中的路線資料)，查詢時不必呼叫 OSRM"""
+        cls._put_cached_route(origin, destination, (distance_km, duration_min))
+
+    @classmethod
+    def clear_route_cache(cls) -> None:
+        """清除 OSRM 路線快取"""
+        with cls._route_cache_lock:
+            cls._route_cache.clear()
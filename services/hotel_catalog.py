@@ -0,0 +1,236 @@
+"""
+Hotel Catalog
+欄式 (columnar) 飯店目錄：以連續陣列存放經緯度、以位元圖存放是否為合作飯店、
+名稱存放在去除重複的字串表、地址壓縮成一段 UTF-8 位元組，取代每間飯店一個 dict 的資料結構
+
+每列以飯店 id (列號) 存取，HotelRow 是不複製資料的唯讀 Mapping 檢視，
+既有使用 hotel["lat"] / hotel.get("is_partner") 的程式不需修改。
+"""
+import sys
+from array import array
+from collections.abc import Mapping as MappingABC, Sequence as SequenceABC
+from functools import cached_property
+from typing import Any, Dict, Iterable, Iterator, Mapping, Optional, Sequence, Tuple
+
+HOTEL_FIELDS = ("name", "address", "lat", "lon", "is_partner")
+
+
+class HotelRow(MappingABC):
+    """單一飯店的唯讀檢視 (只保存目錄參照與列號)"""
+
+    __slots__ = ("_catalog", "id")
+
+    def __init__(self, catalog: "HotelCatalog", hotel_id: int):
+        self._catalog = catalog
+        self.id = hotel_id
+
+    def __getitem__(self, key: str) -> Any:
+        catalog, hotel_id = self._catalog, self.id
+        if key == "name":
+            return catalog.name(hotel_id)
+        if key == "address":
+            return catalog.address(hotel_id)
+        if key == "lat":
+            return catalog.lat[hotel_id]
+        if key == "lon":
+            return catalog.lon[hotel_id]
+        if key == "is_partner":
+            return catalog.is_partner(hotel_id)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(HOTEL_FIELDS)
+
+    def __len__(self) -> int:
+        return len(HOTEL_FIELDS)
+
+    def __repr__(self) -> str:
+        return f"HotelRow({self.id}, {dict(self)!r})"
+
+
+class _NameIndex(MappingABC):
+    """飯店名稱 → HotelRow (名稱重複時以最後一筆為準)"""
+
+    __slots__ = ("_catalog", "_ids")
+
+    def __init__(self, catalog: "HotelCatalog", ids: Dict[str, int]):
+        self._catalog = catalog
+        self._ids = ids
+
+    def __getitem__(self, name: str) -> HotelRow:
+        return HotelRow(self._catalog, self._ids[name])
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._ids
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+class HotelCatalog(SequenceABC):
+    """
+    欄式飯店目錄 (唯讀)
+
+    - lat / lon: float64 連續陣列 (唯讀 memoryview，可直接交給 numpy.frombuffer)
+    - 是否為合作飯店: 每間飯店 1 bit 的位元圖
+    - name: uint32 索引，指向 intern 過且去除重複的名稱表 (名稱同時是 by_name 的鍵)
+    - address: 幾乎每間都不同，intern 沒有效果，改為一段 UTF-8 位元組加上 uint32 位移，讀取時才解碼
+    - catalog[i] / catalog.row(i) 回傳 HotelRow；by_name 提供名稱查詢
+
+    名稱表以外的欄位只要求支援 buffer protocol，可以是記憶體中的 array / bytes，
+    也可以是 CatalogSnapshot 以 mmap 映射的檔案區段 (零複製、跨行程共用分頁)。
+    """
+
+    def __init__(
+        self,
+        names: Tuple[str, ...],
+        name_ids,
+        address_blob,
+        address_offsets,
+        lat,
+        lon,
+        partner_bits,
+    ):
+        self._names = names
+        self._name_ids = memoryview(name_ids).cast("B").cast("I").toreadonly()
+        self._address_blob = memoryview(address_blob).cast("B").toreadonly()
+        self._address_offsets = memoryview(address_offsets).cast("B").cast("I").toreadonly()
+        self.lat = memoryview(lat).cast("B").cast("d").toreadonly()
+        self.lon = memoryview(lon).cast("B").cast("d").toreadonly()
+        self._partner_bits = memoryview(partner_bits).cast("B").toreadonly()
+
+    @classmethod
+    def from_records(cls, records: Iterable[Mapping[str, Any]]) -> "HotelCatalog":
+        """由 JSON 載入的飯店 dict 列表建立目錄"""
+        table: Dict[str, int] = {}
+        names = []
+        name_ids = array("I")
+        address_blob, address_offsets = bytearray(), array("I", [0])
+        lat, lon = array("d"), array("d")
+        partner_bits = bytearray()
+        for row, record in enumerate(records):
+            name = sys.intern(str(record.get("name") or ""))
+            name_id = table.get(name)
+            if name_id is None:
+                name_id = table[name] = len(names)
+                names.append(name)
+            name_ids.append(name_id)
+            address_blob += str(record.get("address") or "").encode("utf-8")
+            address_offsets.append(len(address_blob))
+            lat.append(float(record.get("lat", 0.0)))
+            lon.append(float(record.get("lon", 0.0)))
+            if row % 8 == 0:
+                partner_bits.append(0)
+            if record.get("is_partner", False):
+                partner_bits[row // 8] |= 1 << (row % 8)
+        return cls(tuple(names), name_ids, bytes(address_blob), address_offsets, lat, lon, bytes(partner_bits))
+
+    @staticmethod
+    def encode_names(names: Sequence[str]) -> Tuple[array, bytes]:
+        """名稱表編碼為 (uint32 位移, UTF-8 位元組)，供快照保存"""
+        offsets, blob = array("I", [0]), bytearray()
+        for name in names:
+            blob += name.encode("utf-8")
+            offsets.append(len(blob))
+        return offsets, bytes(blob)
+
+    @staticmethod
+    def decode_names(offsets, blob) -> Tuple[str, ...]:
+        """encode_names 的反向 (名稱會 intern)"""
+        offsets = memoryview(offsets).cast("B").cast("I")
+        blob = memoryview(blob).cast("B")
+        return tuple(sys.intern(str(blob[offsets[i]:offsets[i + 1]], "utf-8")) for i in range(len(offsets) - 1))
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        """去除重複的名稱表 (name id → 名稱)"""
+        return self._names
+
+    def columns(self) -> Dict[str, memoryview]:
+        """名稱表以外各欄位的原始位元組 (供 CatalogSnapshot 寫入快照檔)"""
+        return {
+            "lat": self.lat,
+            "lon": self.lon,
+            "partner_bits": self._partner_bits,
+            "name_ids": self._name_ids,
+            "address_offsets": self._address_offsets,
+            "address_blob": self._address_blob,
+        }
+
+    # ------------------ 列存取 ------------------
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [HotelRow(self, i) for i in range(*index.indices(len(self)))]
+        return self.row(index)
+
+    def row(self, hotel_id: int) -> HotelRow:
+        """以飯店 id (列號) 取得唯讀檢視"""
+        if hotel_id < 0:
+            hotel_id += len(self)
+        if not 0 <= hotel_id < len(self):
+            raise IndexError(f"飯店 id 超出範圍: {hotel_id}")
+        return HotelRow(self, hotel_id)
+
+    def name(self, hotel_id: int) -> str:
+        return self._names[self._name_ids[hotel_id]]
+
+    def address(self, hotel_id: int) -> str:
+        start, end = self._address_offsets[hotel_id], self._address_offsets[hotel_id + 1]
+        return str(self._address_blob[start:end], "utf-8")
+
+    def is_partner(self, hotel_id: int) -> bool:
+        return bool(self._partner_bits[hotel_id >> 3] & (1 << (hotel_id & 7)))
+
+    def find(self, name: str) -> Optional[HotelRow]:
+        """以名稱查詢飯店；找不到時回傳 None"""
+        hotel_id = self._ids_by_name.get(name)
+        return None if hotel_id is None else HotelRow(self, hotel_id)
+
+    # ------------------ 衍生索引 ------------------
+    @cached_property
+    def _ids_by_name(self) -> Dict[str, int]:
+        return {self.name(i): i for i in range(len(self)) if self.name(i)}
+
+    @cached_property
+    def by_name(self) -> Mapping[str, HotelRow]:
+        """飯店名稱 → HotelRow"""
+        return _NameIndex(self, self._ids_by_name)
+
+    @cached_property
+    def coordinates(self):
+        """
+        (lat, lon) 座標，順序與列號相同 (供距離矩陣計算)
+
+        Returns:
+            安裝 numpy 時為唯讀的 N × 2 ndarray，否則為 tuple
+        """
+        # 於第一次需要座標陣列時才匯入 numpy，啟動畫面不必載入
+        try:
+            import numpy as np
+        except ImportError:
+            return tuple(zip(self.lat, self.lon))
+        coords = np.column_stack((np.frombuffer(self.lat, dtype=np.float64), np.frombuffer(self.lon, dtype=np.float64)))
+        coords.flags.writeable = False
+        return coords
+
+    def memory_usage(self) -> Dict[str, int]:
+        """
+        各欄位佔用的位元組數 (不含 by_name / coordinates 等衍生索引)
+
+        Returns:
+            {"coordinates", "partner_bitmap", "names", "addresses", "total"}
+        """
+        usage = {
+            "coordinates": self.lat.nbytes + self.lon.nbytes,
+            "partner_bitmap": self._partner_bits.nbytes,
+            "names": self._name_ids.nbytes + sys.getsizeof(self._names) + sum(sys.getsizeof(s) for s in self._names),
+            "addresses": self._address_blob.nbytes + self._address_offsets.nbytes,
+        }
+        usage["total"] = sum(usage.values())
+        return usage
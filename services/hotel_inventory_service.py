@@ -0,0 +1,282 @@
+"""
+Hotel Inventory Service
+飯店行李寄放庫存：以 SQLite 交易做原子性的增減與容量檢查，並提供批次 check-in
+"""
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from metrics import DB_OPERATION_SECONDS, Metrics
+
+logger = logging.getLogger(__name__)
+
+INVENTORY_DB_FILE = "hotel_inventory.db"
+
+
+class HotelInventoryService:
+    """飯店行李庫存服務"""
+
+    DB_PATH = INVENTORY_DB_FILE
+    DEFAULT_CAPACITY = 180
+    BUSY_TIMEOUT_SECONDS = 5.0
+
+    _lock = threading.Lock()
+    _initialized_paths: set = set()
+
+    # ------------------ 連線與結構 ------------------
+    @classmethod
+    @contextmanager
+    def _transaction(cls) -> Iterator[sqlite3.Connection]:
+        """
+        取得一個 IMMEDIATE 交易 (開始即取得寫入鎖)
+
+        同一行程內以 threading.Lock 串行化；跨行程由 SQLite 的檔案鎖保證原子性。
+        記錄的耗時包含等待鎖的時間。
+        """
+        with Metrics.timer(DB_OPERATION_SECONDS, operation="transaction", source="hotel_inventory"), cls._lock:
+            conn = sqlite3.connect(cls.DB_PATH, timeout=cls.BUSY_TIMEOUT_SECONDS, isolation_level=None)
+            try:
+                conn.row_factory = sqlite3.Row
+                if cls.DB_PATH not in cls._initialized_paths:
+                    cls._create_schema(conn)
+                    cls._initialized_paths.add(cls.DB_PATH)
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    yield conn
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+                else:
+                    conn.execute("COMMIT")
+            finally:
+                conn.close()
+
+    @staticmethod
+    def _create_schema(conn: sqlite3.Connection) -> None:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS hotel_inventory (
+                hotel_id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL DEFAULT '',
+                baggage_count INTEGER NOT NULL DEFAULT 0 CHECK (baggage_count >= 0),
+                baggage_capacity INTEGER NOT NULL,
+                not_arrived_customers INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS baggage_checkins (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                hotel_id INTEGER NOT NULL,
+                reference TEXT,
+                size TEXT,
+                color TEXT,
+                type TEXT,
+                quantity INTEGER NOT NULL,
+                created_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_checkins_hotel ON baggage_checkins (hotel_id);
+            """
+        )
+
+    @staticmethod
+    def _row_to_dict(row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        return dict(row) if row is not None else None
+
+    @staticmethod
+    def _fetch(conn: sqlite3.Connection, hotel_id: int) -> Optional[Dict[str, Any]]:
+        row = conn.execute(
+            "SELECT hotel_id, name, baggage_count, baggage_capacity, not_arrived_customers, updated_at "
+            "FROM hotel_inventory WHERE hotel_id = ?",
+            (hotel_id,),
+        ).fetchone()
+        return HotelInventoryService._row_to_dict(row)
+
+    # ------------------ 查詢 / 建立 ------------------
+    @classmethod
+    def get(cls, hotel_id: int) -> Optional[Dict[str, Any]]:
+        """
+        取得飯店庫存
+
+        Returns:
+            {"hotel_id", "name", "baggage_count", "baggage_capacity", "not_arrived_customers", "updated_at"}
+            或 None
+        """
+        with cls._transaction() as conn:
+            return cls._fetch(conn, hotel_id)
+
+    @classmethod
+    def ensure_hotel(
+        cls,
+        hotel_id: int,
+        name: str = "",
+        baggage_count: int = 0,
+        baggage_capacity: int = DEFAULT_CAPACITY,
+        not_arrived_customers: int = 0,
+    ) -> Dict[str, Any]:
+        """飯店不存在時以預設值建立，回傳目前庫存"""
+        with cls._transaction() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO hotel_inventory "
+                "(hotel_id, name, baggage_count, baggage_capacity, not_arrived_customers, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (hotel_id, name, baggage_count, baggage_capacity, not_arrived_customers, cls._now()),
+            )
+            return cls._fetch(conn, hotel_id)
+
+    @classmethod
+    def upsert(
+        cls,
+        hotel_id: int,
+        name: str,
+        baggage_count: int,
+        baggage_capacity: int,
+        not_arrived_customers: int,
+    ) -> Dict[str, Any]:
+        """以指定值覆寫整筆飯店庫存 (管理用途；日常增減請用 add/remove/check_in)"""
+        with cls._transaction() as conn:
+            conn.execute(
+                "INSERT INTO hotel_inventory "
+                "(hotel_id, name, baggage_count, baggage_capacity, not_arrived_customers, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(hotel_id) DO UPDATE SET name = excluded.name, "
+                "baggage_count = excluded.baggage_count, baggage_capacity = excluded.baggage_capacity, "
+                "not_arrived_customers = excluded.not_arrived_customers, updated_at = excluded.updated_at",
+                (hotel_id, name, baggage_count, baggage_capacity, not_arrived_customers, cls._now()),
+            )
+            return cls._fetch(conn, hotel_id)
+
+    # ------------------ 原子增減 ------------------
+    @classmethod
+    def add_baggage(cls, hotel_id: int, count: int = 1) -> Optional[int]:
+        """
+        原子性增加行李數量，超過容量時不做任何變更
+
+        Returns:
+            變更後的行李數量；容量不足或飯店不存在時返回 None
+        """
+        if count < 0:
+            raise ValueError("count 不可為負數")
+        with cls._transaction() as conn:
+            return cls._increment(conn, hotel_id, count)
+
+    @classmethod
+    def remove_baggage(cls, hotel_id: int, count: int = 1) -> Optional[int]:
+        """
+        原子性減少行李數量，數量不足時不做任何變更
+
+        Returns:
+            變更後的行李數量；數量不足或飯店不存在時返回 None
+        """
+        if count < 0:
+            raise ValueError("count 不可為負數")
+        with cls._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE hotel_inventory SET baggage_count = baggage_count - ?, updated_at = ? "
+                "WHERE hotel_id = ? AND baggage_count - ? >= 0",
+                (count, cls._now(), hotel_id, count),
+            )
+            if cursor.rowcount == 0:
+                return None
+            return cls._fetch(conn, hotel_id)["baggage_count"]
+
+    @classmethod
+    def check_in(
+        cls,
+        hotel_id: int,
+        items: Iterable[Dict[str, Any]],
+        reference: Optional[str] = None,
+        arrived_groups: int = 0,
+    ) -> Optional[int]:
+        """
+        批次 check-in：整批行李在單一交易中寫入，全數成功或全數不寫入
+
+        Args:
+            hotel_id: 飯店 ID
+            items: 行李列表 [{"size", "color", "type", "quantity"}, ...]
+            reference: 訂單或團體代號 (選填)
+            arrived_groups: 同時抵達的旅客組數，會從「尚未抵達旅客」扣除
+
+        Returns:
+            變更後的行李數量；容量不足或飯店不存在時返回 None
+        """
+        rows: List[tuple] = []
+        now = cls._now()
+        total = 0
+        for item in items:
+            quantity = max(int(item.get("quantity", 1)), 1)
+            total += quantity
+            rows.append(
+                (hotel_id, reference, str(item.get("size", "")), item.get("color"), item.get("type"), quantity, now)
+            )
+        if not rows:
+            current = cls.get(hotel_id)
+            return current["baggage_count"] if current else None
+
+        with cls._transaction() as conn:
+            new_count = cls._increment(conn, hotel_id, total)
+            if new_count is None:
+                return None
+            conn.executemany(
+                "INSERT INTO baggage_checkins (hotel_id, reference, size, color, type, quantity, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            if arrived_groups:
+                conn.execute(
+                    "UPDATE hotel_inventory SET not_arrived_customers = MAX(not_arrived_customers - ?, 0) "
+                    "WHERE hotel_id = ?",
+                    (arrived_groups, hotel_id),
+                )
+        logger.info("飯店 %s 批次 check-in %d 件行李，目前 %d 件", hotel_id, total, new_count)
+        return new_count
+
+    @classmethod
+    def set_not_arrived(cls, hotel_id: int, count: int) -> bool:
+        """設定尚未抵達旅客組數"""
+        with cls._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE hotel_inventory SET not_arrived_customers = ?, updated_at = ? WHERE hotel_id = ?",
+                (max(count, 0), cls._now(), hotel_id),
+            )
+            return cursor.rowcount > 0
+
+    @classmethod
+    def count_check_in_groups(cls, hotel_name: str, day: date) -> int:
+        """
+        某飯店某日完成 check-in 的旅客組數 (同一代號算一組；沒有代號時每次批次 check-in 算一組)
+
+        Args:
+            hotel_name: 飯店名稱 (hotel_inventory.name)
+            day: 日期 (依 check-in 時間)
+        """
+        start = day.isoformat()
+        end = (day + timedelta(days=1)).isoformat()
+        with cls._transaction() as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) FROM ("
+                "  SELECT 1 FROM baggage_checkins c JOIN hotel_inventory h ON h.hotel_id = c.hotel_id"
+                "  WHERE h.name = ? AND c.created_at >= ? AND c.created_at < ?"
+                "  GROUP BY COALESCE(c.reference, c.created_at)"
+                ")",
+                (hotel_name, start, end),
+            ).fetchone()
+        return row[0]
+
+    # ------------------ 內部工具 ------------------
+    @classmethod
+    def _increment(cls, conn: sqlite3.Connection, hotel_id: int, count: int) -> Optional[int]:
+        cursor = conn.execute(
+            "UPDATE hotel_inventory SET baggage_count = baggage_count + ?, updated_at = ? "
+            "WHERE hotel_id = ? AND baggage_count + ? <= baggage_capacity",
+            (count, cls._now(), hotel_id, count),
+        )
+        if cursor.rowcount == 0:
+            return None
+        return cls._fetch(conn, hotel_id)["baggage_count"]
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now().isoformat()
@@ -0,0 +1,213 @@
+"""
+Hotel Stats Service
+飯店櫃台儀表板的增量彙總：訂單寫入時即時更新各飯店的每日計數，
+畫面讀取時直接取用預先計算好的數字，不必掃描整張訂單表。
+櫃台 check-in 的組數取自 HotelInventoryService 的 baggage_checkins 表 (重新啟動後仍保留)
+"""
+import logging
+import threading
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.hotel_inventory_service import HotelInventoryService
+from services.order_event_bus import OrderEvent, OrderEventBus
+
+logger = logging.getLogger(__name__)
+
+StatsKey = Tuple[str, date]
+Contribution = Tuple[StatsKey, int, bool]
+
+
+class HotelStatsService:
+    """飯店每日彙總服務"""
+
+    # 不計入任何統計的訂單狀態 / 視為已抵達的訂單狀態
+    INACTIVE_STATUSES = {"cancelled"}
+    ARRIVED_STATUSES = {"completed", "delivered"}
+    # 只有單段行程 (有 dropoff) 會送達飯店；travel 母單本身不計
+    TRIP_ORDER_TYPES = {"trip", "travel_trip", "instant_trip"}
+
+    # 由訂單推導的計數 / 各訂單目前被計入的貢獻 (依訂單編號，重複套用同一版本不會重複計數)
+    _stats: Dict[StatsKey, Dict[str, int]] = {}
+    _counted: Dict[str, Contribution] = {}
+    _lock = threading.Lock()
+    _loaded = False
+    _pending: List[OrderEvent] = []
+    _subscription = None
+    _seen_dropped = 0
+
+    # ------------------ 初始化 ------------------
+    @classmethod
+    def _ensure_loaded(cls) -> None:
+        """
+        第一次使用時以既有訂單建立彙總，之後只由訂單事件做增量更新
+
+        先訂閱再讀取訂單表；載入期間收到的事件先暫存，載入後只重播序號大於載入版本的事件
+        """
+        if cls._loaded:
+            return
+        from services.order_history_service import OrderHistoryService
+
+        with cls._lock:
+            if cls._subscription is None:
+                # 彙總必須精確，佇列滿時對發布者施加背壓而非丟棄事件
+                cls._subscription = OrderEventBus.subscribe(
+                    cls._on_order_event, name="hotel_stats", overflow="block"
+                )
+
+        version = OrderEventBus.last_sequence()
+        orders = OrderHistoryService.get_all_orders()
+        with cls._lock:
+            if cls._loaded:
+                return
+            cls._stats.clear()
+            cls._counted.clear()
+            for order in orders:
+                cls._apply_change(cls._order_id(order), None, order)
+            replayed = [event for event in cls._pending if event.sequence > version]
+            for event in replayed:
+                cls._apply_change(event.order_id, event.before, event.after)
+            cls._pending.clear()
+            cls._loaded = True
+        logger.info(
+            "飯店彙總已建立 (%d 筆訂單, 重播 %d 個事件, %d 個飯店日)", len(orders), len(replayed), len(cls._stats)
+        )
+
+    @classmethod
+    def rebuild(cls) -> None:
+        """以訂單表重新建立訂單計數"""
+        with cls._lock:
+            cls._loaded = False
+        cls._ensure_loaded()
+
+    @classmethod
+    def _reload_if_dropped(cls) -> None:
+        subscription = cls._subscription
+        if subscription is not None and subscription.dropped != cls._seen_dropped:
+            # block 逾時後事件仍會被丟棄，彙總可能已不準確，以訂單表重建一次
+            cls._seen_dropped = subscription.dropped
+            logger.warning("飯店彙總有 %d 個訂單事件被丟棄，重新建立", subscription.dropped)
+            cls.rebuild()
+
+    # ------------------ 增量更新 ------------------
+    @classmethod
+    def _on_order_event(cls, event: OrderEvent) -> None:
+        with cls._lock:
+            if not cls._loaded:
+                cls._pending.append(event)
+                return
+            cls._apply_change(event.order_id, event.before, event.after)
+
+    @classmethod
+    def apply_order_change(
+        cls,
+        before: Optional[Dict[str, Any]],
+        after: Optional[Dict[str, Any]],
+    ) -> None:
+        """
+        訂單新增 / 修改 / 刪除時呼叫：以新版本的貢獻取代該訂單目前被計入的貢獻
+
+        Args:
+            before: 變更前的訂單 (新增時為 None)
+            after: 變更後的訂單 (刪除時為 None)
+        """
+        if not cls._loaded:
+            # 尚未建立彙總時，之後的全量載入會包含這次變更
+            return
+        with cls._lock:
+            cls._apply_change(cls._order_id(after or before or {}), before, after)
+
+    # ------------------ 查詢 ------------------
+    @classmethod
+    def get_dashboard(cls, hotel_name: str, day: Optional[date] = None) -> Dict[str, int]:
+        """
+        取得飯店儀表板數字 (訂單計數為 O(1)；check-in 組數為一次索引查詢)
+
+        Returns:
+            {"inbound_trips", "inbound_luggage", "arrived", "not_arrived"}
+        """
+        cls._reload_if_dropped()
+        cls._ensure_loaded()
+        key = (hotel_name, day or date.today())
+        with cls._lock:
+            bucket = dict(cls._stats.get(key, cls._empty_bucket()))
+        checked_in = HotelInventoryService.count_check_in_groups(*key)
+        arrived = bucket["arrived"] + checked_in
+        return {
+            "inbound_trips": bucket["inbound_trips"],
+            "inbound_luggage": bucket["inbound_luggage"],
+            "arrived": arrived,
+            "not_arrived": max(bucket["inbound_trips"] - arrived, 0),
+        }
+
+    # ------------------ 內部工具 ------------------
+    @staticmethod
+    def _empty_bucket() -> Dict[str, int]:
+        return {"inbound_trips": 0, "inbound_luggage": 0, "arrived": 0}
+
+    @staticmethod
+    def _order_id(order: Dict[str, Any]) -> str:
+        """與 OrderEvent.order_id 相同的取法"""
+        return str(order.get("id") or order.get("order_id") or order.get("trip_id") or "")
+
+    @classmethod
+    def _apply_change(
+        cls,
+        order_id: str,
+        before: Optional[Dict[str, Any]],
+        after: Optional[Dict[str, Any]],
+    ) -> None:
+        """呼叫端須持有 _lock；有訂單編號時以已計入的貢獻為準，沒有時才退回以 before 扣除"""
+        old = cls._counted.pop(order_id, None) if order_id else cls._contribution(before)
+        new = cls._contribution(after)
+        cls._add(old, -1)
+        cls._add(new, 1)
+        if order_id and new is not None:
+            cls._counted[order_id] = new
+
+    @classmethod
+    def _contribution(cls, order: Optional[Dict[str, Any]]) -> Optional[Contribution]:
+        """訂單對彙總的貢獻：(飯店日, 行李件數, 是否已抵達)；不計入時為 None"""
+        if not order:
+            return None
+        key = cls._order_key(order)
+        if key is None:
+            return None
+        status = str(order.get("status") or "").lower()
+        if status in cls.INACTIVE_STATUSES:
+            return None
+        return key, cls._luggage_quantity(order), status in cls.ARRIVED_STATUSES
+
+    @classmethod
+    def _add(cls, contribution: Optional[Contribution], sign: int) -> None:
+        if contribution is None:
+            return
+        key, luggage, arrived = contribution
+        bucket = cls._stats.get(key)
+        if bucket is None:
+            bucket = cls._stats[key] = cls._empty_bucket()
+        bucket["inbound_trips"] += sign
+        bucket["inbound_luggage"] += sign * luggage
+        if arrived:
+            bucket["arrived"] += sign
+
+    @classmethod
+    def _order_key(cls, order: Dict[str, Any]) -> Optional[StatsKey]:
+        if order.get("order_type") not in cls.TRIP_ORDER_TYPES:
+            return None
+        hotel_name = order.get("dropoff_location")
+        start_time = order.get("start_time")
+        if not hotel_name or not start_time:
+            return None
+        try:
+            day = datetime.fromisoformat(start_time).date()
+        except (TypeError, ValueError):
+            return None
+        return hotel_name, day
+
+    @staticmethod
+    def _luggage_quantity(order: Dict[str, Any]) -> int:
+        items = order.get("luggage_items") or []
+        if items:
+            return sum(max(int(item.get("quantity", 1)), 1) for item in items if isinstance(item, dict))
+        return int(order.get("luggage_count") or 0)
@@ -0,0 +1,463 @@
+"""
+Job Queue
+以 SQLite 保存的本機背景工作佇列：UI 事件處理只負責排入工作並立即返回，
+寫檔、外部服務重試等副作用交給背景執行緒執行
+
+    JobQueue.start(2)
+    JobQueue.enqueue(SAVE_SCAN_JOB, payload, idempotency_key=f"scan:{email}:{timestamp}")
+
+- 工作內容 (payload) 以 JSON 保存於 JOB_QUEUE_DB_FILE，程式重新啟動後會繼續執行
+- 失敗時依指數退避 (含隨機抖動) 重新排程，超過 max_attempts 或拋出 PermanentJobError
+  時移入死信 (status=dead)，可以 python -m services.job_queue --retry 重新排入
+- 同一個 idempotency_key 只會建立一個工作 (完成的工作保留 DONE_RETENTION_SECONDS 後清除；
+  死信不算，之後以相同鍵排入時會建立新的工作)
+- 執行中的工作有租約 (LEASE_SECONDS)；行程在執行途中結束時，租約到期後由其他 worker 重新領取，
+  因此處理函式必須可重複執行 (內建的工作都會先檢查是否已寫入)
+"""
+import argparse
+import atexit
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from metrics import DB_OPERATION_SECONDS, JOB_SECONDS, JOBS_TOTAL, Metrics
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUE_DB_FILE = "job_queue.db"
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+DEAD = "dead"
+
+
+class PermanentJobError(Exception):
+    """處理函式拋出此例外時不再重試，工作直接移入死信"""
+
+
+@dataclass(frozen=True)
+class _Handler:
+    func: Callable[[Dict[str, Any]], Any]
+    max_attempts: int
+    base_delay: float
+
+
+class JobQueue:
+    """背景工作佇列 (行程內共用，預設未啟動；未啟動時排入的工作會保留到下次啟動)"""
+
+    DB_PATH = JOB_QUEUE_DB_FILE
+    BUSY_TIMEOUT_SECONDS = 5.0
+    DEFAULT_MAX_ATTEMPTS = 5
+    BASE_BACKOFF_SECONDS = 1.0
+    MAX_BACKOFF_SECONDS = 300.0
+    LEASE_SECONDS = 300.0
+    POLL_INTERVAL_SECONDS = 1.0
+    DONE_RETENTION_SECONDS = 24 * 3600
+
+    _lock = threading.Lock()
+    _initialized_paths: set = set()
+    _handlers: Dict[str, _Handler] = {}
+    _workers: List[threading.Thread] = []
+    _stop_event: Optional[threading.Event] = None
+    _wakeup = threading.Condition()
+    _atexit_registered = False
+
+    # ------------------ 連線與結構 ------------------
+    @classmethod
+    @contextmanager
+    def _transaction(cls) -> Iterator[sqlite3.Connection]:
+        """取得一個 IMMEDIATE 交易 (同 HotelInventoryService._transaction)"""
+        with Metrics.timer(DB_OPERATION_SECONDS, operation="transaction", source="job_queue"), cls._lock:
+            conn = sqlite3.connect(cls.DB_PATH, timeout=cls.BUSY_TIMEOUT_SECONDS, isolation_level=None)
+            try:
+                conn.row_factory = sqlite3.Row
+                if cls.DB_PATH not in cls._initialized_paths:
+                    cls._create_schema(conn)
+                    cls._initialized_paths.add(cls.DB_PATH)
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    yield conn
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+                else:
+                    conn.execute("COMMIT")
+            finally:
+                conn.close()
+
+    @staticmethod
+    def _create_schema(conn: sqlite3.Connection) -> None:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                idempotency_key TEXT UNIQUE,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                run_at REAL NOT NULL,
+                lease_until REAL,
+                last_error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs (status, run_at);
+            """
+        )
+
+    # ------------------ 工作種類 ------------------
+    @classmethod
+    def register(
+        cls,
+        kind: str,
+        func: Callable[[Dict[str, Any]], Any],
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        base_delay: float = BASE_BACKOFF_SECONDS,
+    ) -> None:
+        """
+        登錄工作種類的處理函式 (於 worker 執行緒呼叫，參數為排入時的 payload)
+
+        Args:
+            kind: 工作種類名稱 (保存於資料庫，重新命名會讓既有工作無人處理)
+            func: 處理函式；拋出例外即視為失敗並重試
+            max_attempts: 預設的最多嘗試次數
+            base_delay: 第一次重試前的等待秒數，之後每次加倍
+        """
+        cls._handlers[kind] = _Handler(func, max(1, max_attempts), max(0.0, base_delay))
+
+    @classmethod
+    def _handler(cls, kind: str) -> _Handler:
+        handler = cls._handlers.get(kind)
+        if handler is None:
+            raise ValueError(f"未登錄的工作種類: {kind}")
+        return handler
+
+    # ------------------ 排入 ------------------
+    @classmethod
+    def enqueue(
+        cls,
+        kind: str,
+        payload: Dict[str, Any],
+        idempotency_key: Optional[str] = None,
+        delay: float = 0.0,
+        max_attempts: Optional[int] = None,
+    ) -> int:
+        """
+        排入工作並立即返回
+
+        Args:
+            kind: 已登錄的工作種類
+            payload: 可序列化為 JSON 的參數
+            idempotency_key: 冪等鍵；已有相同鍵的工作時不重複建立
+            delay: 延後執行的秒數
+            max_attempts: 覆寫工作種類預設的最多嘗試次數
+
+        Returns:
+            工作 id (重複排入時為既有工作的 id)
+
+        Raises:
+            ValueError: 工作種類未登錄時
+        """
+        handler = cls._handler(kind)
+        body = json.dumps(payload, ensure_ascii=False)
+        now = time.time()
+        with cls._transaction() as conn:
+            if idempotency_key is not None:
+                row = conn.execute(
+                    "SELECT id, status FROM jobs WHERE idempotency_key = ?", (idempotency_key,)
+                ).fetchone()
+                if row is not None and row["status"] != DEAD:
+                    Metrics.inc(JOBS_TOTAL, kind=kind, result="duplicate")
+                    logger.info("工作 %s 已存在 (idempotency_key=%s)", row["id"], idempotency_key)
+                    return row["id"]
+                if row is not None:
+                    # 死信保留供查詢，但釋放冪等鍵讓新的工作可以建立
+                    conn.execute("UPDATE jobs SET idempotency_key = NULL WHERE id = ?", (row["id"],))
+            cursor = conn.execute(
+                "INSERT INTO jobs (kind, payload, idempotency_key, status, attempts, max_attempts, run_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, 0, ?, ?, ?, ?)",
+                (kind, body, idempotency_key, PENDING, max_attempts or handler.max_attempts, now + max(0.0, delay), now, now),
+            )
+            job_id = cursor.lastrowid
+        Metrics.inc(JOBS_TOTAL, kind=kind, result="enqueued")
+        with cls._wakeup:
+            cls._wakeup.notify()
+        return job_id
+
+    # ------------------ 執行 ------------------
+    @classmethod
+    def start(cls, workers: int = 2) -> None:
+        """啟動 worker 執行緒並清除過期的已完成工作 (重複呼叫時沿用既有的執行緒)"""
+        with cls._wakeup:
+            if cls._workers:
+                return
+            cls._stop_event = stop_event = threading.Event()
+            cls._workers = [
+                threading.Thread(target=cls._worker_loop, args=(stop_event,), name=f"job-worker-{index}", daemon=True)
+                for index in range(max(1, workers))
+            ]
+            if not cls._atexit_registered:
+                atexit.register(cls.stop)
+                cls._atexit_registered = True
+        cls.purge()
+        for thread in cls._workers:
+            thread.start()
+        logger.info("背景工作佇列已啟動 (%d 個 worker，%s)", len(cls._workers), cls.DB_PATH)
+
+    @classmethod
+    def stop(cls, timeout: float = 5.0) -> None:
+        """停止 worker (等待執行中的工作最多 timeout 秒；未完成的工作租約到期後會再執行)"""
+        with cls._wakeup:
+            workers, cls._workers = cls._workers, []
+            if cls._stop_event is not None:
+                cls._stop_event.set()
+            cls._wakeup.notify_all()
+        deadline = time.monotonic() + timeout
+        for thread in workers:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        if workers:
+            logger.info("背景工作佇列已停止")
+
+    @classmethod
+    def is_running(cls) -> bool:
+        return bool(cls._workers)
+
+    @classmethod
+    def run_pending(cls, limit: Optional[int] = None) -> int:
+        """在呼叫端依序執行已到期的工作 (管理工具 / 基準測試用)，回傳執行的數量"""
+        count = 0
+        while limit is None or count < limit:
+            job, _ = cls._claim()
+            if job is None:
+                break
+            cls._execute(job)
+            count += 1
+        return count
+
+    @classmethod
+    def _worker_loop(cls, stop_event: threading.Event) -> None:
+        while not stop_event.is_set():
+            # 領取、執行、回寫狀態都在保護範圍內：回寫失敗的工作維持執行中，租約到期後重新執行
+            try:
+                job, next_run_at = cls._claim()
+                if job is not None:
+                    cls._execute(job)
+                    continue
+            except sqlite3.Error as exc:
+                logger.error("背景工作佇列資料庫錯誤: %s", exc)
+                stop_event.wait(cls.POLL_INTERVAL_SECONDS)
+                continue
+            # 輪詢以接收其他行程排入的工作；同行程排入時由 enqueue 喚醒
+            timeout = cls.POLL_INTERVAL_SECONDS
+            if next_run_at is not None:
+                timeout = min(timeout, max(0.0, next_run_at - time.time()))
+            with cls._wakeup:
+                if not stop_event.is_set():
+                    cls._wakeup.wait(timeout)
+
+    @classmethod
+    def _claim(cls) -> Tuple[Optional[Dict[str, Any]], Optional[float]]:
+        """
+        領取一個已到期的工作 (待執行，或租約已過期的執行中工作)
+
+        Returns:
+            (工作, None)；沒有可執行的工作時為 (None, 最早的待執行時間或 None)
+        """
+        kinds = list(cls._handlers)
+        if not kinds:
+            return None, None
+        placeholders = ", ".join("?" * len(kinds))
+        now = time.time()
+        with cls._transaction() as conn:
+            row = conn.execute(
+                f"SELECT * FROM jobs WHERE kind IN ({placeholders}) AND "
+                "((status = ? AND run_at <= ?) OR (status = ? AND lease_until <= ?)) "
+                "ORDER BY run_at, id LIMIT 1",
+                (*kinds, PENDING, now, RUNNING, now),
+            ).fetchone()
+            if row is None:
+                next_row = conn.execute(
+                    f"SELECT MIN(run_at) AS run_at FROM jobs WHERE kind IN ({placeholders}) AND status = ?",
+                    (*kinds, PENDING),
+                ).fetchone()
+                return None, next_row["run_at"]
+            conn.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, lease_until = ?, updated_at = ? WHERE id = ?",
+                (RUNNING, now + cls.LEASE_SECONDS, now, row["id"]),
+            )
+        job = dict(row)
+        job["attempts"] += 1
+        return job, None
+
+    @classmethod
+    def _execute(cls, job: Dict[str, Any]) -> None:
+        kind = job["kind"]
+        try:
+            handler = cls._handler(kind)
+            with Metrics.timer(JOB_SECONDS, kind=kind):
+                handler.func(json.loads(job["payload"]))
+        except Exception as exc:
+            cls._fail(job, exc)
+        else:
+            with cls._transaction() as conn:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, lease_until = NULL, last_error = NULL, updated_at = ? WHERE id = ?",
+                    (DONE, time.time(), job["id"]),
+                )
+            Metrics.inc(JOBS_TOTAL, kind=kind, result="done")
+            logger.debug("工作 %s (%s) 完成", job["id"], kind)
+
+    @classmethod
+    def _fail(cls, job: Dict[str, Any], exc: Exception) -> None:
+        kind = job["kind"]
+        error = f"{type(exc).__name__}: {exc}"
+        now = time.time()
+        if isinstance(exc, PermanentJobError) or job["attempts"] >= job["max_attempts"]:
+            with cls._transaction() as conn:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, lease_until = NULL, last_error = ?, updated_at = ? WHERE id = ?",
+                    (DEAD, error, now, job["id"]),
+                )
+            Metrics.inc(JOBS_TOTAL, kind=kind, result="dead")
+            logger.error("工作 %s (%s) 第 %d 次失敗，移入死信: %s", job["id"], kind, job["attempts"], error)
+            return
+
+        delay = cls._backoff(kind, job["attempts"])
+        with cls._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, run_at = ?, lease_until = NULL, last_error = ?, updated_at = ? WHERE id = ?",
+                (PENDING, now + delay, error, now, job["id"]),
+            )
+        Metrics.inc(JOBS_TOTAL, kind=kind, result="retry")
+        logger.warning(
+            "工作 %s (%s) 第 %d/%d 次失敗，%.1f 秒後重試: %s",
+            job["id"], kind, job["attempts"], job["max_attempts"], delay, error,
+        )
+
+    @classmethod
+    def _backoff(cls, kind: str, attempts: int) -> float:
+        """指數退避：base * 2^(attempts-1)，上限 MAX_BACKOFF_SECONDS，乘上 0.5~1 的抖動避免同時重試"""
+        handler = cls._handlers.get(kind)
+        base = handler.base_delay if handler else cls.BASE_BACKOFF_SECONDS
+        return min(cls.MAX_BACKOFF_SECONDS, base * 2 ** (attempts - 1)) * random.uniform(0.5, 1.0)
+
+    # ------------------ 查詢 / 管理 ------------------
+    @classmethod
+    def get(cls, job_id: int) -> Optional[Dict[str, Any]]:
+        with cls._transaction() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    @classmethod
+    def stats(cls) -> Dict[str, int]:
+        """各狀態的工作數量"""
+        counts = {PENDING: 0, RUNNING: 0, DONE: 0, DEAD: 0}
+        with cls._transaction() as conn:
+            for row in conn.execute("SELECT status, COUNT(*) AS count FROM jobs GROUP BY status"):
+                counts[row["status"]] = row["count"]
+        return counts
+
+    @classmethod
+    def dead_letters(cls, limit: int = 50) -> List[Dict[str, Any]]:
+        """最近移入死信的工作"""
+        with cls._transaction() as conn:
+            rows = conn.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY updated_at DESC LIMIT ?", (DEAD, limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    @classmethod
+    def retry_dead(cls, job_id: Optional[int] = None) -> int:
+        """把死信 (job_id 為 None 時為全部) 重新排入並歸零嘗試次數，回傳重新排入的數量"""
+        now = time.time()
+        query = "UPDATE jobs SET status = ?, attempts = 0, run_at = ?, updated_at = ? WHERE status = ?"
+        params: Tuple[Any, ...] = (PENDING, now, now, DEAD)
+        if job_id is not None:
+            query += " AND id = ?"
+            params += (job_id,)
+        with cls._transaction() as conn:
+            count = conn.execute(query, params).rowcount
+        if count:
+            with cls._wakeup:
+                cls._wakeup.notify_all()
+        return count
+
+    @classmethod
+    def purge(cls, older_than: Optional[float] = None) -> int:
+        """刪除完成超過 older_than 秒 (預設 DONE_RETENTION_SECONDS) 的工作，釋放其冪等鍵"""
+        cutoff = time.time() - (cls.DONE_RETENTION_SECONDS if older_than is None else older_than)
+        with cls._transaction() as conn:
+            return conn.execute("DELETE FROM jobs WHERE status = ? AND updated_at < ?", (DONE, cutoff)).rowcount
+
+
+# ------------------ 內建的工作種類 (處理函式於執行時才匯入相依模組) ------------------
+SAVE_SCAN_JOB = "scan.save"
+GEOCODE_RETRY_JOB = "geocode.retry"
+
+
+def _save_scan_job(payload: Dict[str, Any]) -> None:
+    """寫入掃描記錄 (以使用者 + 時間戳記 + 內容判斷是否已寫入)"""
+    from models.scan import Scan
+
+    scan = Scan(
+        user_email=payload["user_email"],
+        role=payload.get("role", "user"),
+        scan_result=payload.get("scan_result", ""),
+        timestamp=payload.get("timestamp"),
+    )
+    with Scan.lock():
+        for saved in Scan.find_by_user(scan.user_email):
+            if saved.timestamp == scan.timestamp and saved.scan_result == scan.scan_result:
+                return
+        scan.save()
+
+
+def _geocode_retry_job(payload: Dict[str, Any]) -> None:
+    """重新查詢地址並寫入共用的地理編碼快取，使用者下次查詢同一地址時直接命中"""
+    from services.location_service import LocationService
+
+    if LocationService(max_retries=1).fetch_geocode(payload["address"], payload.get("country_code", "TW")) is None:
+        raise PermanentJobError(f"找不到位置: {payload['address']}")
+
+
+JobQueue.register(SAVE_SCAN_JOB, _save_scan_job)
+JobQueue.register(GEOCODE_RETRY_JOB, _geocode_retry_job, max_attempts=6, base_delay=2.0)
+
+
+def _format_time(value: Optional[float]) -> str:
+    return datetime.fromtimestamp(value).strftime("%Y-%m-%d %H:%M:%S") if value else "-"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="背景工作佇列管理")
+    parser.add_argument("--db", default=JOB_QUEUE_DB_FILE)
+    parser.add_argument("--dead", action="store_true", help="列出死信")
+    parser.add_argument("--retry", metavar="ID", help="重新排入死信 (ID 或 all)")
+    parser.add_argument("--run", action="store_true", help="在此行程執行所有已到期的工作")
+    args = parser.parse_args()
+
+    JobQueue.DB_PATH = args.db
+    if args.retry:
+        count = JobQueue.retry_dead(None if args.retry == "all" else int(args.retry))
+        print(f"已重新排入 {count} 個工作")
+    if args.run:
+        print(f"已執行 {JobQueue.run_pending()} 個工作")
+    if args.dead:
+        for job in JobQueue.dead_letters():
+            print(f"#{job['id']:<6} {job['kind']:<16} {job['attempts']:>2} 次  {_format_time(job['updated_at'])}  {job['last_error']}")
+    print("  ".join(f"{status}: {count}" for status, count in JobQueue.stats().items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,390 @@
+"""
+Load Generator
+不經過 UI、直接對服務層重播預約流量的壓力測試工具 (容量規劃用)
+
+    1. 以 SimulationService 產生 N 位使用者、M 位司機，並由飯店目錄座標產生 K 筆既有訂單 (一次寫入)
+    2. 依設定的速率與比例送出操作：
+         book      TravelService.build_manual_trip + save_single_trip (即時預約)
+         status    OrderHistoryService.update_order_status (派車 → 上車 → 完成，少數取消)
+         history   OrderHistoryService.get_orders_page (使用者查看歷史紀錄)
+         driver    Driver.find_by_id + update_location (司機回報位置)
+    3. 回報各操作的吞吐量與延遲百分位
+
+rate > 0 時為開放式負載：依排程時間送出，延遲由排程時間起算 (包含排隊時間)；
+rate = 0 時每個 worker 連續送出，量測最大吞吐量。
+
+資料檔以相對路徑存取，CLI 會把來源資料檔複製到暫存目錄後在其中執行，不會改動專案內的 demo_db.json。
+所有服務共用同一個 JSON 資料檔，讀改寫以 db_helpers.db_lock 互斥，workers > 1 時寫入會排隊 (延遲反映鎖等待)。
+
+執行方式 (於專案根目錄):
+    python -m services.load_generator --users 200 --drivers 50 --orders 2000 --rate 20 --duration 30
+"""
+import logging
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+OPERATIONS = ("book", "status", "history", "driver")
+DEFAULT_MIX = {"book": 0.25, "status": 0.35, "history": 0.3, "driver": 0.1}
+# 訂單狀態的前進順序；CANCEL_RATIO 的機率改為取消
+STATUS_FLOW = {"PENDING": "ASSIGNED", "ASSIGNED": "PICKED_UP", "PICKED_UP": "COMPLETED"}
+CANCEL_STATUS = "cancelled"
+CANCEL_RATIO = 0.05
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    index = max(0, math.ceil(q / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+@dataclass
+class LoadProfile:
+    """壓力測試設定"""
+
+    users: int = 50
+    drivers: int = 20
+    orders: int = 500
+    duration: float = 10.0
+    rate: float = 20.0
+    workers: int = 1
+    mix: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_MIX))
+    seed: int = 42
+
+
+@dataclass
+class LoadReport:
+    """壓力測試結果 (延遲單位為秒)"""
+
+    profile: LoadProfile
+    elapsed: float
+    latencies: Dict[str, List[float]]
+    service_times: Dict[str, List[float]]
+    errors: Dict[str, int]
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """各操作與全部操作的次數、錯誤數、吞吐量與延遲百分位 (毫秒)"""
+        result = {}
+        names = [name for name in OPERATIONS if self.latencies.get(name) or self.errors.get(name)]
+        for name in names + ["total"]:
+            if name == "total":
+                latencies = sorted(x for values in self.latencies.values() for x in values)
+                service = sorted(x for values in self.service_times.values() for x in values)
+                errors = sum(self.errors.values())
+            else:
+                latencies = sorted(self.latencies.get(name, []))
+                service = sorted(self.service_times.get(name, []))
+                errors = self.errors.get(name, 0)
+            result[name] = {
+                "count": len(latencies),
+                "errors": errors,
+                "throughput": len(latencies) / self.elapsed if self.elapsed else 0.0,
+                "p50_ms": _percentile(latencies, 50) * 1000,
+                "p95_ms": _percentile(latencies, 95) * 1000,
+                "p99_ms": _percentile(latencies, 99) * 1000,
+                "max_ms": (latencies[-1] if latencies else 0.0) * 1000,
+                "service_p50_ms": _percentile(service, 50) * 1000,
+            }
+        return result
+
+    def format(self) -> str:
+        profile = self.profile
+        lines = [
+            f"users={profile.users} drivers={profile.drivers} seed orders={profile.orders} "
+            f"rate={profile.rate or 'max'}/s workers={profile.workers} elapsed={self.elapsed:.1f}s",
+            f"{'operation':<10} {'count':>7} {'errors':>6} {'ops/s':>8} {'p50 ms':>9} {'p95 ms':>9} "
+            f"{'p99 ms':>9} {'max ms':>9} {'svc p50':>9}",
+        ]
+        for name, row in self.summary().items():
+            lines.append(
+                f"{name:<10} {row['count']:>7} {row['errors']:>6} {row['throughput']:>8.1f} "
+                f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} "
+                f"{row['max_ms']:>9.1f} {row['service_p50_ms']:>9.1f}"
+            )
+        return "\n".join(lines)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "profile": vars(self.profile),
+            "elapsed": self.elapsed,
+            "operations": self.summary(),
+        }
+
+
+class LoadGenerator:
+    """對服務層重播預約流量 (須在資料檔所在目錄中執行)"""
+
+    def __init__(self, profile: LoadProfile):
+        unknown = set(profile.mix) - set(OPERATIONS)
+        if unknown:
+            raise ValueError(f"未知的操作: {', '.join(sorted(unknown))}")
+        self.profile = profile
+        self._rng = random.Random(profile.seed)
+        # _plan_lock 保護亂數產生器 (不限速時多個 worker 各自規劃操作)；_lock 保護訂單狀態與結果
+        self._plan_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._hotels = None
+        self._users: List[str] = []
+        self._driver_ids: List[str] = []
+        # 仍可前進狀態的訂單 (編號 → 目前狀態)
+        self._open_orders: Dict[str, str] = {}
+        self._latencies: Dict[str, List[float]] = {name: [] for name in OPERATIONS}
+        self._service_times: Dict[str, List[float]] = {name: [] for name in OPERATIONS}
+        self._errors: Dict[str, int] = {name: 0 for name in OPERATIONS}
+
+    # ------------------ 準備資料 ------------------
+    def seed(self) -> None:
+        """產生使用者、司機與既有訂單，一次寫入資料檔"""
+        from db_helpers import db_lock, get_db, save_db
+        from models.trip import LuggageItem
+        from services.catalog_service import CatalogService
+        from services.simulation_service import SimulationService
+        from services.travel_service import TravelService
+
+        started = time.perf_counter()
+        self._hotels = CatalogService.current().hotels
+        if not len(self._hotels):
+            raise ValueError("飯店目錄是空的，無法產生行程")
+        users = SimulationService.generate_users(self.profile.users, self._rng)
+        self._users = list(users)
+
+        orders = []
+        base_time = datetime.now()
+        for _ in range(self.profile.orders):
+            pickup, dropoff = SimulationService.random_trip_endpoints(self._hotels, self._rng)
+            trip = TravelService.build_manual_trip(
+                start_time=base_time - timedelta(minutes=self._rng.randrange(0, 60 * 24 * 90)),
+                pickup=pickup,
+                dropoff=dropoff,
+                luggage_items=self._random_luggage(LuggageItem),
+            )
+            trip.status = self._rng.choice(list(STATUS_FLOW) + ["COMPLETED"] * 3)
+            orders.append(TravelService._serialize_trip(trip, self._rng.choice(self._users), "instant_trip"))
+            if trip.status in STATUS_FLOW:
+                self._open_orders[trip.id] = trip.status
+
+        with db_lock():
+            db = get_db()
+            # 模擬司機編號接在既有司機之後，不覆蓋資料檔中的真實司機
+            existing = db.get("drivers") or {}
+            first_id = max((int(key) for key in existing if str(key).isdigit()), default=0) + 1
+            drivers = SimulationService.generate_drivers(
+                self.profile.drivers, self._hotels.coordinates, self._rng, first_id=first_id
+            )
+            self._driver_ids = list(drivers)
+            db.setdefault("users", {}).update(users)
+            db["drivers"] = {**existing, **drivers}
+            db_orders = db.setdefault("orders", [])
+            db_orders.extend(orders)
+            db_orders.sort(key=lambda o: o.get("start_time", o.get("created_at", "")), reverse=True)
+            save_db(db)
+        logger.info(
+            "壓測資料已寫入：%d 位使用者、%d 位司機、%d 筆訂單 (%.1f 秒)",
+            len(users), len(drivers), len(orders), time.perf_counter() - started,
+        )
+
+    def _random_luggage(self, luggage_item_cls) -> list:
+        return [luggage_item_cls(size=self._rng.choice((20, 24, 28)), quantity=self._rng.randint(1, 3))]
+
+    # ------------------ 操作 ------------------
+    def _plan(self, name: str) -> Tuple[str, Callable[[], None]]:
+        """
+        決定操作的參數 (使用同一個亂數產生器，限速時結果可重現)
+
+        Returns:
+            (操作名稱, 實際執行的函式)；沒有可更新狀態的訂單時 status 改為 book
+        """
+        from models.driver import Driver
+        from models.trip import LuggageItem
+        from services.order_history_service import OrderHistoryService
+        from services.simulation_service import SimulationService
+        from services.travel_service import TravelService
+
+        rng = self._rng
+        if name == "book":
+            pickup, dropoff = SimulationService.random_trip_endpoints(self._hotels, rng)
+            user = rng.choice(self._users)
+            luggage = self._random_luggage(LuggageItem)
+
+            def book() -> None:
+                trip = TravelService.build_manual_trip(
+                    start_time=datetime.now(), pickup=pickup, dropoff=dropoff, luggage_items=luggage
+                )
+                TravelService.save_single_trip(trip, user_email=user, order_type="instant_trip")
+                with self._lock:
+                    self._open_orders[trip.id] = trip.status
+            return name, book
+
+        if name == "status":
+            with self._lock:
+                if not self._open_orders:
+                    return self._plan("book")
+                order_id = rng.choice(list(self._open_orders))
+                current = self._open_orders[order_id]
+            new_status = CANCEL_STATUS if rng.random() < CANCEL_RATIO else STATUS_FLOW[current]
+
+            def change_status() -> None:
+                if not OrderHistoryService.update_order_status(order_id, new_status):
+                    raise RuntimeError(f"訂單 {order_id} 狀態更新失敗")
+                with self._lock:
+                    if new_status in STATUS_FLOW:
+                        self._open_orders[order_id] = new_status
+                    else:
+                        self._open_orders.pop(order_id, None)
+            return name, change_status
+
+        if name == "history":
+            user = rng.choice(self._users)
+            pages = rng.choice((1, 1, 1, 2, 3))
+
+            def read_history() -> None:
+                cursor = None
+                for _ in range(pages):
+                    _, cursor = OrderHistoryService.get_orders_page(user, cursor=cursor)
+                    if cursor is None:
+                        break
+            return name, read_history
+
+        driver_id = rng.choice(self._driver_ids)
+        lat, lon = rng.uniform(21.9, 25.3), rng.uniform(120.0, 122.0)
+
+        def report_location() -> None:
+            driver = Driver.find_by_id(int(driver_id))
+            if driver is None:
+                raise RuntimeError(f"找不到司機 {driver_id}")
+            driver.update_location((float(lat), float(lon)))
+        return name, report_location
+
+    def _execute(self, name: str, func: Callable[[], None], scheduled: float) -> None:
+        started = time.perf_counter()
+        try:
+            func()
+        except Exception as e:
+            logger.warning("操作 %s 失敗: %s", name, e)
+            with self._lock:
+                self._errors[name] += 1
+            return
+        finished = time.perf_counter()
+        with self._lock:
+            self._latencies[name].append(finished - scheduled)
+            self._service_times[name].append(finished - started)
+
+    def _choose(self) -> str:
+        names = [name for name in OPERATIONS if self.profile.mix.get(name, 0) > 0]
+        weights = [self.profile.mix[name] for name in names]
+        return self._rng.choices(names, weights)[0]
+
+    # ------------------ 執行 ------------------
+    def run(self) -> LoadReport:
+        """依設定送出流量直到 duration 結束 (需先呼叫 seed)"""
+        if self._hotels is None:
+            raise RuntimeError("請先呼叫 seed() 準備資料")
+        profile = self.profile
+        start = time.perf_counter()
+        deadline = start + profile.duration
+
+        with ThreadPoolExecutor(max_workers=max(1, profile.workers), thread_name_prefix="load") as executor:
+            if profile.rate > 0:
+                interval = 1.0 / profile.rate
+                sent = 0
+                while True:
+                    scheduled = start + sent * interval
+                    if scheduled >= deadline:
+                        break
+                    delay = scheduled - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    name, func = self._plan(self._choose())
+                    executor.submit(self._execute, name, func, scheduled)
+                    sent += 1
+            else:
+                def closed_loop() -> None:
+                    while time.perf_counter() < deadline:
+                        with self._plan_lock:
+                            name, func = self._plan(self._choose())
+                        self._execute(name, func, time.perf_counter())
+
+                for _ in range(max(1, profile.workers)):
+                    executor.submit(closed_loop)
+
+        return LoadReport(
+            profile=profile,
+            elapsed=time.perf_counter() - start,
+            latencies=self._latencies,
+            service_times=self._service_times,
+            errors=self._errors,
+        )
+
+
+def _parse_mix(value: str) -> Dict[str, float]:
+    """"book=1,status=2" → {"book": 1.0, "status": 2.0}"""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import argparse
+    import json
+    import os
+    import shutil
+    import tempfile
+
+    from services.catalog_service import CATALOG_DB_PATH
+
+    parser = argparse.ArgumentParser(description="服務層壓力測試 (不經過 UI)")
+    parser.add_argument("--db", default=CATALOG_DB_PATH, help="來源資料檔 (會先複製到暫存目錄)")
+    parser.add_argument("--users", type=int, default=LoadProfile.users)
+    parser.add_argument("--drivers", type=int, default=LoadProfile.drivers)
+    parser.add_argument("--orders", type=int, default=LoadProfile.orders)
+    parser.add_argument("--duration", type=float, default=LoadProfile.duration, help="秒")
+    parser.add_argument("--rate", type=float, default=LoadProfile.rate, help="每秒操作數，0 為不限速")
+    parser.add_argument("--workers", type=int, default=LoadProfile.workers)
+    parser.add_argument("--mix", type=_parse_mix, default=dict(DEFAULT_MIX), help="例如 book=1,status=1,history=2")
+    parser.add_argument("--seed", type=int, default=LoadProfile.seed)
+    parser.add_argument("--json", help="另把結果寫入此 JSON 檔")
+    parser.add_argument("--verbose", action="store_true", help="顯示服務層的 INFO 日誌")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, format="%(message)s")
+    profile = LoadProfile(
+        users=args.users,
+        drivers=args.drivers,
+        orders=args.orders,
+        duration=args.duration,
+        rate=args.rate,
+        workers=args.workers,
+        mix=args.mix,
+        seed=args.seed,
+    )
+    json_path = os.path.abspath(args.json) if args.json else None
+    source = os.path.abspath(args.db)
+    previous_dir = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="ebaggage-load-") as work_dir:
+        shutil.copy(source, os.path.join(work_dir, "demo_db.json"))
+        os.chdir(work_dir)
+        try:
+            generator = LoadGenerator(profile)
+            generator.seed()
+            report = generator.run()
+        finally:
+            os.chdir(previous_dir)
+
+    print(report.format())
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(report.to_dict(), f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
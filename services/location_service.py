@@ -3,12 +3,18 @@ Location Service
 處理地理位置、地址搜索、地圖相關業務邏輯
 """
 import logging
+import threading
 import time
+from collections import OrderedDict
 from typing import Callable, Optional, Tuple
 
 from geopy.exc import GeocoderTimedOut, GeocoderUnavailable
 from geopy.geocoders import Nominatim
 
+from logging_config import ThrottledLogger
+from metrics import GEOCODE_CACHE_TOTAL, GEOCODE_SECONDS, Metrics
+from services.job_queue import GEOCODE_RETRY_JOB, JobQueue
+
 try:
     from requests.exceptions import ConnectionError as RequestsConnectionError
     from requests.exceptions import ReadTimeout
@@ -26,10 +32,18 @@ RETRYABLE_EXCEPTIONS = (
 )
 
 logger = logging.getLogger(__name__)
+# 每次估價都會計算距離，每秒最多輸出一筆
+distance_logger = ThrottledLogger(logger, interval=1.0)
 
 
 class LocationService:
     """地理位置服務"""
+
+    GEOCODE_CACHE_SIZE = 512
+
+    # 正向地理編碼結果於所有實例間共用，同一地址不重複呼叫 Nominatim
+    _geocode_cache: "OrderedDict[Tuple[str, str], Tuple[float, float, str]]" = OrderedDict()
+    _geocode_cache_lock = threading.Lock()
     
     def __init__(
         self,
@@ -37,6 +51,7 @@ class LocationService:
         timeout: float = 5.0,
         max_retries: int = 3,
         retry_delay: float = 0.5,
+        defer_retries: bool = False,
     ):
         """
         初始化位置服務
@@ -46,10 +61,13 @@ class LocationService:
             timeout: 單次呼叫逾時秒數
             max_retries: 逾時時最多重試次數
             retry_delay: 每次重試前的延遲秒數基準
+            defer_retries: 只在呼叫端嘗試一次 (UI 事件處理用)；正向地理編碼可重試的失敗改排入
+                背景工作佇列依指數退避重試，成功後寫入共用快取
         """
         self.timeout = timeout
         self.max_retries = max(1, max_retries)
         self.retry_delay = max(0.1, retry_delay)
+        self.defer_retries = defer_retries
         
         try:
             self.geolocator = Nominatim(user_agent=user_agent, timeout=self.timeout)
@@ -58,6 +76,7 @@ class LocationService:
             logger.error(f"初始化 Nominatim 失敗: {e}")
             self.geolocator = None
     
+    @Metrics.timed(GEOCODE_SECONDS, operation="geocode")
     def geocode(self, address: str, country_code: str = "TW") -> Optional[Tuple[float, float, str]]:
         """
         地址轉換為經緯度（正向地理編碼）
@@ -69,35 +88,92 @@ class LocationService:
         Returns:
             Optional[Tuple[float, float, str]]: (緯度, 經度, 完整地址) 或 None
         """
-        if not self.geolocator:
-            logger.error("Geolocator 未初始化")
-            return None
-        
+        cache_key = ((address or "").strip(), country_code)
+        with self._geocode_cache_lock:
+            cached = self._geocode_cache.get(cache_key)
+            if cached is not None:
+                self._geocode_cache.move_to_end(cache_key)
+                Metrics.inc(GEOCODE_CACHE_TOTAL, result="hit")
+                return cached
+        Metrics.inc(GEOCODE_CACHE_TOTAL, result="miss")
+
         try:
-            logger.info(f"正向地理編碼: {address}")
-            location = self._with_retry(
-                operation_name="正向地理編碼",
-                func=lambda: self.geolocator.geocode(
-                    address,
-                    country_codes=country_code,
-                    timeout=self.timeout,
-                ),
-            )
-            
-            if location:
-                logger.info(f"找到位置: {location.address}")
-                return (location.latitude, location.longitude, location.address)
-            else:
-                logger.warning(f"找不到位置: {address}")
-                return None
-                
+            return self.fetch_geocode(address, country_code)
         except RETRYABLE_EXCEPTIONS as e:
-            logger.error(f"地理編碼多次逾時/失敗: {e}")
+            if self.defer_retries:
+                logger.warning("地理編碼逾時/失敗，改於背景重試: %s", e)
+                JobQueue.enqueue(
+                    GEOCODE_RETRY_JOB,
+                    {"address": cache_key[0], "country_code": country_code},
+                    idempotency_key=f"geocode:{country_code}:{cache_key[0]}",
+                )
+            else:
+                logger.error("地理編碼多次逾時/失敗: %s", e)
             return None
         except Exception as e:
             logger.error(f"地理編碼失敗: {e}")
             return None
+
+    def fetch_geocode(self, address: str, country_code: str = "TW") -> Optional[Tuple[float, float, str]]:
+        """
+        略過快取直接查詢 Nominatim，找到時寫入快取
+
+        Raises:
+            RETRYABLE_EXCEPTIONS: 重試後仍逾時 / 無法連線時
+        """
+        if not self.geolocator:
+            logger.error("Geolocator 未初始化")
+            return None
+
+        address = (address or "").strip()
+        logger.info("正向地理編碼: %s", address)
+        location = self._with_retry(
+            operation_name="正向地理編碼",
+            func=lambda: self.geolocator.geocode(
+                address,
+                country_codes=country_code,
+                timeout=self.timeout,
+            ),
+        )
+
+        if location:
+            logger.info("找到位置: %s", location.address)
+            result = (location.latitude, location.longitude, location.address)
+            self._put_geocode_cache((address, country_code), result)
+            return result
+        logger.warning("找不到位置: %s", address)
+        return None
+    
+    @classmethod
+    def _put_geocode_cache(cls, key: Tuple[str, str], value: Tuple[float, float, str]) -> None:
+        with cls._geocode_cache_lock:
+            cls._geocode_cache[key] = value
+            cls._geocode_cache.move_to_end(key)
+            while len(cls._geocode_cache) > cls.GEOCODE_CACHE_SIZE:
+                cls._geocode_cache.popitem(last=False)
+
+    @classmethod
+    def preload_geocode(
+        cls,
+        address: str,
+        latitude: float,
+        longitude: float,
+        display_name: Optional[str] = None,
+        country_code: str = "TW",
+    ) -> None:
+        """預先放入已知地點的座標 (例如機場、車站)，查詢時不必呼叫 Nominatim"""
+        cls._put_geocode_cache(
+            ((address or "").strip(), country_code),
+            (latitude, longitude, display_name or address),
+        )
+
+    @classmethod
+    def clear_geocode_cache(cls) -> None:
+        """清除正向地理編碼快取"""
+        with cls._geocode_cache_lock:
+            cls._geocode_cache.clear()
     
+    @Metrics.timed(GEOCODE_SECONDS, operation="reverse")
     def reverse_geocode(self, latitude: float, longitude: float, language: str = "zh-TW") -> Optional[str]:
         """
         經緯度轉換為地址（反向地理編碼）
@@ -159,15 +235,16 @@ class LocationService:
     def _with_retry(self, operation_name: str, func: Callable):
         """針對可恢復錯誤進行簡單重試"""
         last_exception = None
-        for attempt in range(1, self.max_retries + 1):
+        max_retries = 1 if self.defer_retries else self.max_retries
+        for attempt in range(1, max_retries + 1):
             try:
                 return func()
             except RETRYABLE_EXCEPTIONS as exc:
                 last_exception = exc
                 logger.warning(
-                    f"{operation_name} 第{attempt}/{self.max_retries}次失敗 (可重試): {exc}"
+                    f"{operation_name} 第{attempt}/{max_retries}次失敗 (可重試): {exc}"
                 )
-                if attempt < self.max_retries:
+                if attempt < max_retries:
                     sleep_time = self.retry_delay * attempt
                     time.sleep(sleep_time)
             except Exception:
@@ -251,6 +328,6 @@ class LocationService:
         c = 2 * atan2(sqrt(a), sqrt(1 - a))
         
         distance = R * c
-        logger.info(f"計算距離: {distance:.2f} km")
+        distance_logger.debug("計算距離: %.2f km", distance)
         
         return distance
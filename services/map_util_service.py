@@ -76,5 +76,5 @@ class MapUtilService:
         center_lat = (lat1 + lat2) / 2
         center_lon = (lon1 + lon2) / 2
         
-        logger.debug(f"計算中心點: ({center_lat}, {center_lon})")
+        logger.debug("計算中心點: (%s, %s)", center_lat, center_lon)
         return (center_lat, center_lon)
@@ -0,0 +1,316 @@
+"""
+Order Event Bus
+訂單變更資料流 (CDC)：儲存層在訂單新增 / 更新 / 取消後發布事件，
+訂閱者透過各自的有界佇列依序收到變更，並據此增量更新；
+所有非同步訂閱者共用一個派送執行緒 (不論有多少 session 與訂閱者)
+"""
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class OrderEvent:
+    """單筆訂單變更事件"""
+
+    kind: str
+    order_id: str
+    before: Optional[Dict[str, Any]]
+    after: Optional[Dict[str, Any]]
+    sequence: int
+    timestamp: float = field(default_factory=time.time)
+
+
+EventHandler = Callable[[OrderEvent], None]
+
+
+class Subscription:
+    """
+    單一訂閱者
+
+    sync=True 時在發布者的執行緒中直接呼叫 handler；否則事件先放入有界佇列，
+    由匯流排共用的派送執行緒依序處理 (每個訂閱者的事件仍依發布順序)。佇列滿時依 overflow 策略處理：
+        "block"        發布者最多等待 block_timeout 秒 (背壓)，逾時則丟棄此事件；
+                       在派送執行緒中 (handler 內再發布) 不等待，直接丟棄
+        "drop_oldest"  丟棄佇列中最舊的事件
+        "drop_newest"  丟棄這次的新事件
+    """
+
+    OVERFLOW_POLICIES = ("block", "drop_oldest", "drop_newest")
+
+    def __init__(
+        self,
+        bus,
+        handler: EventHandler,
+        name: str,
+        maxsize: int,
+        sync: bool,
+        overflow: str,
+        block_timeout: float,
+        kinds: Optional[set],
+    ):
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"未知的 overflow 策略: {overflow}")
+        self._bus = bus
+        self.handler = handler
+        self.name = name
+        self.sync = sync
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.kinds = kinds
+        self.delivered = 0
+        self.dropped = 0
+        self.failed = 0
+        self._queue: "queue.Queue[OrderEvent]" = queue.Queue(maxsize=maxsize)
+        self._closed = False
+
+    @property
+    def pending(self) -> int:
+        """佇列中尚未處理的事件數"""
+        return self._queue.qsize()
+
+    def offer(self, event: OrderEvent) -> bool:
+        """交付事件；回傳是否成功進入佇列 (或已同步處理)"""
+        if self._closed or (self.kinds and event.kind not in self.kinds):
+            return False
+        if self.sync:
+            self._deliver(event)
+            return True
+
+        if self.overflow == "block" and not self._bus._in_dispatcher():
+            try:
+                self._queue.put(event, timeout=self.block_timeout)
+            except queue.Full:
+                return self._drop(event)
+            self._bus._wake()
+            return True
+        try:
+            self._queue.put_nowait(event)
+            self._bus._wake()
+            return True
+        except queue.Full:
+            if self.overflow in ("drop_newest", "block"):
+                return self._drop(event)
+            try:
+                stale = self._queue.get_nowait()
+                self._queue.task_done()
+                self._drop(stale)
+            except queue.Empty:
+                pass
+            try:
+                self._queue.put_nowait(event)
+                self._bus._wake()
+                return True
+            except queue.Full:
+                return self._drop(event)
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """等待佇列中的事件處理完畢"""
+        if self.sync:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def close(self) -> None:
+        """取消訂閱並丟棄尚未處理的事件"""
+        if self._closed:
+            return
+        self._closed = True
+        self._bus.unsubscribe(self)
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._queue.task_done()
+
+    def _drop(self, event: OrderEvent) -> bool:
+        self.dropped += 1
+        logger.warning("訂閱者 %s 佇列已滿，丟棄事件 #%d (%s)", self.name, event.sequence, event.kind)
+        return False
+
+    def _deliver(self, event: OrderEvent) -> None:
+        try:
+            self.handler(event)
+            self.delivered += 1
+        except Exception as e:
+            self.failed += 1
+            logger.error("訂閱者 %s 處理事件失敗: %s", self.name, e)
+
+    def _deliver_next(self) -> bool:
+        """由派送執行緒呼叫：處理佇列中的下一個事件，佇列為空時返回 False"""
+        try:
+            event = self._queue.get_nowait()
+        except queue.Empty:
+            return False
+        try:
+            if not self._closed:
+                self._deliver(event)
+        finally:
+            self._queue.task_done()
+        return True
+
+
+class OrderEventBus:
+    """訂單事件匯流排"""
+
+    INSERT = "insert"
+    UPDATE = "update"
+    CANCEL = "cancel"
+
+    DEFAULT_QUEUE_SIZE = 1000
+    DEFAULT_BLOCK_TIMEOUT = 1.0
+
+    _subscriptions: List[Subscription] = []
+    _lock = threading.Lock()
+    _last_sequence = 0
+    _dispatcher: Optional[threading.Thread] = None
+    _wakeup = threading.Condition()
+    _signaled = False
+
+    @classmethod
+    def subscribe(
+        cls,
+        handler: EventHandler,
+        name: Optional[str] = None,
+        maxsize: int = DEFAULT_QUEUE_SIZE,
+        sync: bool = False,
+        overflow: str = "block",
+        block_timeout: float = DEFAULT_BLOCK_TIMEOUT,
+        kinds: Optional[List[str]] = None,
+    ) -> Subscription:
+        """
+        訂閱訂單事件
+
+        Args:
+            handler: 事件處理函式，參數為 OrderEvent
+            name: 訂閱者名稱 (記錄與統計用)
+            maxsize: 佇列上限
+            sync: 是否在發布者的執行緒中同步處理
+            overflow: 佇列滿時的策略 (block / drop_oldest / drop_newest)
+            block_timeout: overflow="block" 時發布者最多等待的秒數
+            kinds: 只接收這些種類的事件，None 表示全部
+
+        Returns:
+            Subscription，呼叫 close() 取消訂閱
+        """
+        subscription = Subscription(
+            cls,
+            handler,
+            name or getattr(handler, "__qualname__", "subscriber"),
+            maxsize,
+            sync,
+            overflow,
+            block_timeout,
+            set(kinds) if kinds else None,
+        )
+        with cls._lock:
+            cls._subscriptions.append(subscription)
+            if not sync and (cls._dispatcher is None or not cls._dispatcher.is_alive()):
+                cls._dispatcher = threading.Thread(target=cls._dispatch_loop, name="order-events", daemon=True)
+                cls._dispatcher.start()
+        return subscription
+
+    @classmethod
+    def unsubscribe(cls, subscription: Subscription) -> None:
+        """取消訂閱"""
+        with cls._lock:
+            if subscription in cls._subscriptions:
+                cls._subscriptions.remove(subscription)
+
+    @classmethod
+    def _in_dispatcher(cls) -> bool:
+        return threading.current_thread() is cls._dispatcher
+
+    @classmethod
+    def _wake(cls) -> None:
+        with cls._wakeup:
+            cls._signaled = True
+            cls._wakeup.notify()
+
+    @classmethod
+    def _dispatch_loop(cls) -> None:
+        """共用的派送執行緒：輪流從各非同步訂閱者的佇列取一個事件處理，直到全部清空"""
+        while True:
+            with cls._wakeup:
+                while not cls._signaled:
+                    cls._wakeup.wait()
+                cls._signaled = False
+            while True:
+                with cls._lock:
+                    subscriptions = [s for s in cls._subscriptions if not s.sync]
+                delivered = False
+                for subscription in subscriptions:
+                    delivered = subscription._deliver_next() or delivered
+                if not delivered:
+                    break
+
+    @classmethod
+    def publish(
+        cls,
+        kind: str,
+        before: Optional[Dict[str, Any]],
+        after: Optional[Dict[str, Any]],
+    ) -> OrderEvent:
+        """
+        發布訂單變更 (於寫入成功後由儲存層呼叫)
+
+        Args:
+            kind: INSERT / UPDATE / CANCEL
+            before: 變更前的訂單 (新增時為 None)
+            after: 變更後的訂單
+
+        Returns:
+            發布的 OrderEvent
+        """
+        order = after or before or {}
+        with cls._lock:
+            cls._last_sequence += 1
+            sequence = cls._last_sequence
+            subscriptions = list(cls._subscriptions)
+        event = OrderEvent(
+            kind=kind,
+            order_id=str(order.get("id") or order.get("order_id") or order.get("trip_id") or ""),
+            before=before,
+            after=after,
+            sequence=sequence,
+        )
+        for subscription in subscriptions:
+            subscription.offer(event)
+        return event
+
+    @classmethod
+    def last_sequence(cls) -> int:
+        """
+        最後一個已發布事件的序號
+
+        儲存層在寫入完成後才發布事件，因此序號不大於此值的事件，其變更已在之後讀取的資料中
+        """
+        with cls._lock:
+            return cls._last_sequence
+
+    @classmethod
+    def flush(cls, timeout: Optional[float] = None) -> bool:
+        """等待所有非同步訂閱者處理完目前的事件"""
+        with cls._lock:
+            subscriptions = list(cls._subscriptions)
+        return all(subscription.join(timeout) for subscription in subscriptions)
+
+    @classmethod
+    def stats(cls) -> Dict[str, Dict[str, int]]:
+        """各訂閱者的處理統計"""
+        with cls._lock:
+            subscriptions = list(cls._subscriptions)
+        return {
+            s.name: {"delivered": s.delivered, "dropped": s.dropped, "failed": s.failed, "pending": s.pending}
+            for s in subscriptions
+        }
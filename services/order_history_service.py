@@ -2,10 +2,16 @@
 Order History Service
 處理訂單歷史查詢
 """
+import bisect
 import logging
 import json
+import os
+import threading
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+
+from db_helpers import db_lock, load_json, save_json
+from services.order_event_bus import OrderEventBus
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +20,13 @@ DEMO_DB_PATH = "demo_db.json"
 
 class OrderHistoryService:
     """訂單歷史服務"""
+
+    DEFAULT_PAGE_SIZE = 20
+
+    # 依檔案版本 (mtime, size) 快取的每位使用者時間索引，翻頁時不必重新載入與排序
+    _index_lock = threading.Lock()
+    _index_signature: Optional[Tuple[int, int]] = None
+    _user_index: Dict[str, Tuple[List[Tuple[str, str]], List[Dict[str, Any]]]] = {}
     
     @staticmethod
     def get_all_orders() -> List[Dict[str, Any]]:
@@ -24,8 +37,7 @@ class OrderHistoryService:
             訂單列表
         """
         try:
-            with open(DEMO_DB_PATH, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = load_json(DEMO_DB_PATH, source="order_history.get_all_orders")
             orders = data.get('orders', [])
             logger.info(f"載入了 {len(orders)} 筆訂單")
             return orders
@@ -46,31 +58,124 @@ class OrderHistoryService:
         """
         orders = OrderHistoryService.get_all_orders()
         try:
-            def get_order_date(order):
-                # 嘗試獲取 date 欄位
-                date_str = order.get('date')
-                if date_str:
-                    try:
-                        return datetime.strptime(date_str, '%Y/%m/%d')
-                    except ValueError:
-                        pass
-                
-                # 嘗試獲取 created_at 欄位
-                created_at = order.get('created_at')
-                if created_at:
-                    try:
-                        return datetime.fromisoformat(created_at)
-                    except ValueError:
-                        pass
-                
-                return datetime.min
-
-            orders.sort(key=get_order_date, reverse=reverse)
+            orders.sort(key=OrderHistoryService.get_order_date, reverse=reverse)
         except Exception as e:
             logger.error(f"排序訂單時發生錯誤: {e}")
         
         return orders
     
+    @staticmethod
+    def get_order_date(order: Dict[str, Any]) -> datetime:
+        """訂單排序用的時間 (date 欄位優先，其次 created_at)"""
+        # 嘗試獲取 date 欄位
+        date_str = order.get('date')
+        if date_str:
+            try:
+                return datetime.strptime(date_str, '%Y/%m/%d')
+            except ValueError:
+                pass
+        
+        # 嘗試獲取 created_at 欄位
+        created_at = order.get('created_at')
+        if created_at:
+            try:
+                return datetime.fromisoformat(created_at)
+            except ValueError:
+                pass
+        
+        return datetime.min
+
+    @staticmethod
+    def get_order_identifier(order: Dict[str, Any]) -> str:
+        """訂單編號 (支援 id / order_id / trip_id 欄位)"""
+        return str(order.get('id') or order.get('order_id') or order.get('trip_id') or "")
+
+    @staticmethod
+    def encode_cursor(key: Tuple[str, str]) -> str:
+        """分頁游標：(排序時間, 訂單編號) → 字串 (get_orders_page 與 UserOrderProjection 共用)"""
+        return "|".join(key)
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[str, str]:
+        """encode_cursor 的反向"""
+        sort_key, _, identifier = cursor.partition("|")
+        return sort_key, identifier
+
+    @classmethod
+    def get_orders_page(
+        cls,
+        user_email: str,
+        status: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        以游標分頁取得使用者訂單 (由新到舊)
+        
+        Args:
+            user_email: 使用者 email
+            status: 只取此狀態的訂單 (不分大小寫)，None 或 "all" 表示全部
+            cursor: 上一頁回傳的 next_cursor，None 表示第一頁
+            limit: 每頁筆數
+            
+        Returns:
+            (本頁訂單, next_cursor)；沒有下一頁時 next_cursor 為 None
+        """
+        keys, orders = cls._get_user_index(user_email)
+        status = status.lower() if status and status != "all" else None
+
+        # keys 依 (時間, 編號) 升冪排列，由尾端往前走即為由新到舊
+        position = len(keys)
+        if cursor:
+            position = bisect.bisect_left(keys, cls.decode_cursor(cursor))
+
+        page: List[Dict[str, Any]] = []
+        next_cursor = None
+        last_position = position
+        while position > 0:
+            position -= 1
+            order = orders[position]
+            if status and (order.get('status') or "pending").lower() != status:
+                continue
+            if len(page) == limit:
+                # 還有符合條件的訂單，游標指向本頁最後一筆
+                next_cursor = cls.encode_cursor(keys[last_position])
+                break
+            page.append(order)
+            last_position = position
+
+        return page, next_cursor
+
+    @classmethod
+    def _get_user_index(cls, user_email: str) -> Tuple[List[Tuple[str, str]], List[Dict[str, Any]]]:
+        try:
+            stat = os.stat(DEMO_DB_PATH)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            signature = None
+
+        with cls._index_lock:
+            if signature != cls._index_signature:
+                cls._user_index = {}
+                cls._index_signature = signature
+            cached = cls._user_index.get(user_email)
+        if cached is not None:
+            return cached
+
+        entries = []
+        for order in cls.get_all_orders():
+            if order.get('user_email') != user_email:
+                continue
+            key = (cls.get_order_date(order).isoformat(), cls.get_order_identifier(order))
+            entries.append((key, order))
+        entries.sort(key=lambda entry: entry[0])
+        index = ([key for key, _ in entries], [order for _, order in entries])
+
+        with cls._index_lock:
+            if signature == cls._index_signature:
+                cls._user_index[user_email] = index
+        return index
+
     @staticmethod
     def get_orders_by_user(user_email: str) -> List[Dict[str, Any]]:
         """
@@ -102,36 +207,57 @@ class OrderHistoryService:
         Returns:
             是否更新成功
         """
-        try:
-            with open(DEMO_DB_PATH, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            logger.error(f"載入訂單資料時發生錯誤: {e}")
-            return False
+        return OrderHistoryService.update_order_statuses({order_id: new_status}).get(order_id, False)
+
+    @staticmethod
+    def update_order_statuses(updates: Dict[str, str]) -> Dict[str, bool]:
+        """
+        批次更新多筆訂單的狀態 (資料檔只讀寫一次)
+        
+        Args:
+            updates: 訂單編號 → 新的狀態文字
+        
+        Returns:
+            訂單編號 → 是否更新成功
+        """
+        results = {order_id: False for order_id in updates}
+        with db_lock():
+            try:
+                data = load_json(DEMO_DB_PATH, source="order_history.update_order_status")
+            except (FileNotFoundError, json.JSONDecodeError) as e:
+                logger.error(f"載入訂單資料時發生錯誤: {e}")
+                return results
 
-        orders = data.get('orders', [])
-        updated = False
-        timestamp = datetime.now().isoformat()
+            orders = data.get('orders', [])
+            updated = []
+            timestamp = datetime.now().isoformat()
 
-        for order in orders:
-            identifier = order.get('id') or order.get('order_id')
-            if identifier == order_id:
+            for order in orders:
+                identifier = order.get('id') or order.get('order_id')
+                new_status = updates.get(identifier)
+                if new_status is None or results[identifier]:
+                    continue
+                before = dict(order)
                 order['status'] = new_status
                 order['updated_at'] = timestamp
                 if new_status == "cancelled":
                     order['cancelled_at'] = timestamp
-                updated = True
-                break
+                updated.append((before, order))
+                results[identifier] = True
 
-        if not updated:
-            logger.warning(f"找不到訂單 {order_id}，無法更新狀態")
-            return False
+            if updated:
+                try:
+                    save_json(DEMO_DB_PATH, data, source="order_history.update_order_status", indent=2)
+                except Exception as e:
+                    logger.error(f"寫入訂單狀態時發生錯誤: {e}")
+                    return {order_id: False for order_id in updates}
 
-        try:
-            with open(DEMO_DB_PATH, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            logger.info(f"訂單 {order_id} 狀態已更新為 {new_status}")
-            return True
-        except Exception as e:
-            logger.error(f"寫入訂單狀態時發生錯誤: {e}")
-            return False
+        for order_id, found in results.items():
+            if not found:
+                logger.warning(f"找不到訂單 {order_id}，無法更新狀態")
+
+        for before, order in updated:
+            kind = OrderEventBus.CANCEL if order['status'] == "cancelled" else OrderEventBus.UPDATE
+            OrderEventBus.publish(kind, before, order)
+            logger.info(f"訂單 {before.get('id') or before.get('order_id')} 狀態已更新為 {order['status']}")
+        return results
@@ -0,0 +1,178 @@
+"""
+Order Summary Service
+訂單顯示用的正規化摘要：統一新舊訂單格式，依訂單編號與版本快取，
+畫面渲染時只需讀取欄位 (顏色等樣式由 View 依 status_key 對應，本模組不相依 flet)
+"""
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from services.date_service import DateService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class OrderSummary:
+    """訂單摘要 (歷史列表與詳情對話框使用)"""
+
+    order_id: str
+    status_key: str
+    status_label: str
+    order_date: str
+    order_datetime: str
+    pickup: str
+    dropoff: str
+    price_display: str
+    raw_price: Any
+    order_type: str
+    luggage_count: Any
+    luggage_note: Optional[str]
+    start_time_str: str
+    end_time_str: str
+    parent_travel_id: Optional[str]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class OrderSummaryService:
+    """訂單摘要服務"""
+
+    STATUS_LABELS = {
+        "pending": "待確認",
+        "confirmed": "已確認",
+        "completed": "已完成",
+        "cancelled": "已取消",
+    }
+
+    # 新 (Trip) / 舊 (legacy) 格式的欄位別名，依優先順序排列
+    PICKUP_FIELDS = ("pickup_display", "pickup_location", "pickup", "start_address")
+    DROPOFF_FIELDS = ("dropoff_display", "dropoff_location", "dropoff", "dropof", "end_address")
+    DATETIME_FIELDS = ("start_time", "created_at", "timestamp")
+
+    CACHE_SIZE = 4096
+
+    _cache: "OrderedDict[Tuple, OrderSummary]" = OrderedDict()
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_summary(cls, order: Dict[str, Any]) -> OrderSummary:
+        """
+        取得訂單摘要；同一訂單在內容版本未變前只計算一次 (沒有訂單編號的訂單不快取)
+
+        Args:
+            order: 訂單字典 (Trip 或 legacy 格式)
+
+        Returns:
+            OrderSummary
+        """
+        key = cls._version_key(order)
+        if key is None:
+            return cls.build_summary(order)
+        with cls._lock:
+            summary = cls._cache.get(key)
+            if summary is not None:
+                cls._cache.move_to_end(key)
+                return summary
+
+        summary = cls.build_summary(order)
+        with cls._lock:
+            cls._cache[key] = summary
+            while len(cls._cache) > cls.CACHE_SIZE:
+                cls._cache.popitem(last=False)
+        return summary
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """清除摘要快取"""
+        with cls._lock:
+            cls._cache.clear()
+
+    @classmethod
+    def build_summary(cls, order: Dict[str, Any]) -> OrderSummary:
+        """由訂單字典計算摘要 (不經快取)"""
+        identifier = order.get("id") or order.get("order_id") or order.get("trip_id") or "N/A"
+        status_key = (order.get("status") or "pending").lower()
+
+        date_str = order.get("date", "")
+        date_time_display = ""
+        primary_value = cls._first(order, cls.DATETIME_FIELDS)
+        primary_dt = cls._parse_iso(primary_value)
+        if primary_dt:
+            date_str = DateService.format_date(primary_dt)
+            date_time_display = DateService.format_date(primary_dt, DateService.DATETIME_FORMAT)
+        elif primary_value:
+            date_time_display = primary_value
+            if not date_str and "T" in primary_value:
+                date_str = primary_value.split("T")[0]
+
+        price = order.get("price") or order.get("amount")
+        if isinstance(price, (int, float)):
+            price_display = f"NT$ {price:,.0f}"
+        elif price:
+            price_display = f"NT$ {price}"
+        else:
+            price_display = "—"
+
+        luggage_items = order.get("luggage_items") or []
+        if luggage_items:
+            luggage_count = sum(int(item.get("quantity", 1) or 1) for item in luggage_items)
+        else:
+            luggage_count = order.get("luggage_count") or order.get("luggages")
+
+        start_value = order.get("start_time")
+        start_dt = primary_dt if start_value is not None and start_value == primary_value else cls._parse_iso(start_value)
+
+        return OrderSummary(
+            order_id=identifier,
+            status_key=status_key,
+            status_label=cls.STATUS_LABELS.get(status_key, status_key.upper()),
+            order_date=date_str,
+            order_datetime=date_time_display,
+            pickup=cls._first(order, cls.PICKUP_FIELDS) or "未提供",
+            dropoff=cls._first(order, cls.DROPOFF_FIELDS) or "未提供",
+            price_display=price_display,
+            raw_price=price,
+            order_type=order.get("order_type", "legacy"),
+            luggage_count=luggage_count,
+            luggage_note=order.get("luggage_note"),
+            start_time_str=cls._format_datetime(start_dt, start_value),
+            end_time_str=cls._format_datetime(cls._parse_iso(order.get("end_time")), order.get("end_time")),
+            parent_travel_id=order.get("parent_travel_id"),
+        )
+
+    # ------------------ 內部工具 ------------------
+    @staticmethod
+    def _version_key(order: Dict[str, Any]) -> Optional[Tuple]:
+        # updated_at 在狀態變更時寫入；status 一併納入，避免未帶時間戳的修改讀到舊摘要
+        identifier = order.get("id") or order.get("order_id") or order.get("trip_id")
+        if not identifier:
+            return None
+        return identifier, order.get("updated_at") or order.get("created_at"), order.get("status")
+
+    @staticmethod
+    def _first(order: Dict[str, Any], fields: Tuple[str, ...]) -> Optional[str]:
+        for field in fields:
+            value = order.get(field)
+            if value:
+                return value
+        return None
+
+    @staticmethod
+    def _parse_iso(value: Optional[str]) -> Optional[datetime]:
+        if not value:
+            return None
+        try:
+            return datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _format_datetime(dt: Optional[datetime], raw: Optional[str]) -> str:
+        if dt:
+            return DateService.format_date(dt, DateService.DATETIME_FORMAT)
+        return raw or ""
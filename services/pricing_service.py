@@ -0,0 +1,239 @@
+"""
+Pricing Service
+批次報價引擎：一次計算整段旅程所有路段 × 所有車型的價格，並快取報價
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from models.trip import LuggageItem, Trip
+from services.distance_matrix_service import DistanceMatrixService
+
+logger = logging.getLogger(__name__)
+
+Coordinate = Tuple[float, float]
+LuggageSignature = Tuple[Tuple[int, int], ...]
+
+
+@dataclass(frozen=True)
+class Quote:
+    """單一路段、單一車型的報價"""
+
+    vehicle_type: str
+    distance_km: float
+    fare: float  # 基本車資 (未乘車型倍率)
+    multiplier: float
+    price: float
+    expires_at: float
+
+    @property
+    def is_expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+
+class PricingService:
+    """報價服務"""
+
+    BASE_FARE = 30.0
+    DISTANCE_RATE = 30.0  # 每公里 30 元
+    VEHICLE_MULTIPLIERS: Dict[str, float] = {
+        "sedan": 1.0,
+        "suv": 1.25,
+        "van": 1.5,
+    }
+    DEFAULT_VEHICLE_TYPE = "sedan"
+    # 行程沒有帶價格時的估價：每公里 80 元，最低 350 元
+    ESTIMATE_RATE = 80.0
+    MINIMUM_FARE = 350.0
+
+    QUOTE_TTL_SECONDS = 300.0
+    CACHE_MAX_ENTRIES = 10000
+    COORD_PRECISION = 5
+
+    _cache: Dict[Tuple, Quote] = {}
+    _cache_lock = threading.Lock()
+
+    # ------------------ 計價規則 ------------------
+    @staticmethod
+    def luggage_fee(items: Iterable[LuggageItem]) -> float:
+        """依行李尺寸計算行李費"""
+        total = 0.0
+        for item in items:
+            size = int(item.size)
+            if size <= 20:
+                rate = 50
+            elif size <= 24:
+                rate = 80
+            else:
+                rate = 100
+            total += rate * max(item.quantity, 1)
+        return total
+
+    @staticmethod
+    def luggage_signature(items: Iterable[LuggageItem]) -> LuggageSignature:
+        """行李組合的正規化表示 (依尺寸合併數量)，作為快取鍵的一部分"""
+        merged: Dict[int, int] = {}
+        for item in items:
+            size = int(item.size)
+            merged[size] = merged.get(size, 0) + max(int(item.quantity), 1)
+        return tuple(sorted(merged.items()))
+
+    @classmethod
+    def _fare(cls, distance_km: float, luggage_fee: float) -> float:
+        return cls.BASE_FARE + distance_km * cls.DISTANCE_RATE + luggage_fee
+
+    @classmethod
+    def base_fare(cls, trip: Trip, distance_km: float) -> float:
+        """
+        行程的基本車資 (未乘車型倍率)
+
+        以行程上已有的價格為準 (扣除該行程車型的倍率)；沒有價格時依距離估算並套用最低車資
+        """
+        if trip.price:
+            return trip.price / cls.VEHICLE_MULTIPLIERS.get(trip.vehicle_type, 1.0)
+        return max(cls.MINIMUM_FARE, distance_km * cls.ESTIMATE_RATE)
+
+    # ------------------ 報價 API ------------------
+    @classmethod
+    def quote(
+        cls,
+        pickup: Coordinate,
+        dropoff: Coordinate,
+        luggage_items: Sequence[LuggageItem],
+        vehicle_type: str = DEFAULT_VEHICLE_TYPE,
+        distance_km: Optional[float] = None,
+    ) -> Quote:
+        """
+        單一路段、單一車型報價
+
+        Args:
+            pickup: 上車座標 (緯度, 經度)
+            dropoff: 下車座標 (緯度, 經度)
+            luggage_items: 行李列表
+            vehicle_type: 車型
+            distance_km: 已知距離時可直接帶入，省去計算
+
+        Returns:
+            Quote 物件
+        """
+        return cls.quote_legs(
+            [(pickup, dropoff)],
+            [luggage_items],
+            vehicle_types=(vehicle_type,),
+            distances=[distance_km] if distance_km is not None else None,
+        )[0][vehicle_type]
+
+    @classmethod
+    def quote_legs(
+        cls,
+        legs: Sequence[Tuple[Coordinate, Coordinate]],
+        luggage: Sequence[Sequence[LuggageItem]],
+        vehicle_types: Optional[Sequence[str]] = None,
+        distances: Optional[Sequence[float]] = None,
+    ) -> List[Dict[str, Quote]]:
+        """
+        批次報價：所有路段 × 所有車型，未命中快取的路段一次向量化計算距離
+
+        Args:
+            legs: 路段列表 [(上車座標, 下車座標), ...]
+            luggage: 每個路段對應的行李列表
+            vehicle_types: 需要報價的車型，預設為全部車型
+            distances: 已知的路段距離（公里），可省略
+
+        Returns:
+            List[Dict[str, Quote]]: 每個路段 {車型: 報價}
+        """
+        if len(luggage) != len(legs):
+            raise ValueError("legs 與 luggage 長度必須相同")
+        vehicle_types = tuple(vehicle_types or cls.VEHICLE_MULTIPLIERS.keys())
+        for vehicle_type in vehicle_types:
+            if vehicle_type not in cls.VEHICLE_MULTIPLIERS:
+                raise ValueError(f"未知車型: {vehicle_type}")
+
+        now = time.monotonic()
+        results: List[Dict[str, Quote]] = [{} for _ in legs]
+        leg_keys = []
+        missing: List[int] = []
+
+        with cls._cache_lock:
+            for idx, (pickup, dropoff) in enumerate(legs):
+                leg_key = cls._leg_key(pickup, dropoff, luggage[idx])
+                leg_keys.append(leg_key)
+                for vehicle_type in vehicle_types:
+                    cached = cls._cache.get(leg_key + (vehicle_type,))
+                    if cached is not None and cached.expires_at > now:
+                        results[idx][vehicle_type] = cached
+                if len(results[idx]) < len(vehicle_types):
+                    missing.append(idx)
+
+        if not missing:
+            return results
+
+        if distances is not None:
+            missing_distances = [distances[idx] for idx in missing]
+        else:
+            missing_distances = DistanceMatrixService.pairwise_distances(
+                [legs[idx][0] for idx in missing],
+                [legs[idx][1] for idx in missing],
+            )
+
+        expires_at = now + cls.QUOTE_TTL_SECONDS
+        new_entries: Dict[Tuple, Quote] = {}
+        for idx, distance_km in zip(missing, missing_distances):
+            fare = cls._fare(distance_km, cls.luggage_fee(luggage[idx]))
+            for vehicle_type in vehicle_types:
+                if vehicle_type in results[idx]:
+                    continue
+                multiplier = cls.VEHICLE_MULTIPLIERS[vehicle_type]
+                quote = Quote(
+                    vehicle_type=vehicle_type,
+                    distance_km=distance_km,
+                    fare=round(fare, 2),
+                    multiplier=multiplier,
+                    price=round(fare * multiplier, 2),
+                    expires_at=expires_at,
+                )
+                results[idx][vehicle_type] = quote
+                new_entries[leg_keys[idx] + (vehicle_type,)] = quote
+
+        with cls._cache_lock:
+            cls._cache.update(new_entries)
+            if len(cls._cache) > cls.CACHE_MAX_ENTRIES:
+                cls._evict_expired(now)
+
+        logger.debug("報價完成: %d 個路段, %d 個重新計算", len(legs), len(missing))
+        return results
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """清除報價快取"""
+        with cls._cache_lock:
+            cls._cache.clear()
+
+    # ------------------ 內部工具 ------------------
+    @classmethod
+    def _leg_key(
+        cls,
+        pickup: Coordinate,
+        dropoff: Coordinate,
+        luggage_items: Sequence[LuggageItem],
+    ) -> Tuple:
+        precision = cls.COORD_PRECISION
+        return (
+            (round(pickup[0], precision), round(pickup[1], precision)),
+            (round(dropoff[0], precision), round(dropoff[1], precision)),
+            cls.luggage_signature(luggage_items),
+        )
+
+    @classmethod
+    def _evict_expired(cls, now: float) -> None:
+        """呼叫端須持有 _cache_lock"""
+        expired = [key for key, quote in cls._cache.items() if quote.expires_at <= now]
+        for key in expired:
+            del cls._cache[key]
+        # 仍超過上限時，丟棄最早寫入的一半
+        if len(cls._cache) > cls.CACHE_MAX_ENTRIES:
+            for key in list(cls._cache.keys())[: len(cls._cache) // 2]:
+                del cls._cache[key]
@@ -0,0 +1,486 @@
+"""
+Scan Service
+AI 行李辨識：影像先以 Pillow 縮小並重新編碼為 JPEG，再交給可替換的模型後端，
+在有上限的執行緒池中非同步執行
+
+    future = ScanService.submit("assets/images/baggages.jpg")   # Future[ScanResult]
+    result = ScanService.scan(image_bytes)                       # 同步
+    future = ScanService.submit_batch(paths)                     # Future[BatchScanResult] (團體批次)
+
+結果以原始影像內容的 SHA-256 快取 (行程內共用)：同一張照片在交接點 (旅客 → 司機 → 飯店)
+重複掃描時不再前處理也不再呼叫模型；同一張照片同時送出多次時共用同一個 Future。
+
+後端：
+    stub    依影像雜湊產生固定結果 (離線 / 測試用，不需網路)
+    gemini  google-generativeai (未安裝或未設定 GOOGLE_API_KEY 時無法使用)
+
+Pillow 與 google-generativeai 都在第一次前處理 / 建立後端時才匯入，匯入本模組不會拖慢啟動。
+"""
+import abc
+import hashlib
+import io
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from metrics import SCAN_CACHE_TOTAL, SCAN_SECONDS, Metrics
+from models.trip import LuggageItem
+
+logger = logging.getLogger(__name__)
+
+ImageSource = Union[bytes, str, os.PathLike]
+
+
+@dataclass(frozen=True)
+class ScanResult:
+    """單張影像的辨識結果"""
+
+    image_hash: str
+    items: List[Dict[str, Any]] = field(default_factory=list)  # [{"size", "color", "type", "quantity"}, ...]
+    backend: str = ""
+    cached: bool = False
+
+    @property
+    def total(self) -> int:
+        """行李總件數"""
+        return sum(int(item.get("quantity", 1)) for item in self.items)
+
+    def copy(self, cached: bool = False) -> "ScanResult":
+        """複製一份結果 (行李列表各自獨立，快取中的結果不會被呼叫端修改)"""
+        return replace(self, items=[dict(item) for item in self.items], cached=cached)
+
+    def to_text(self) -> str:
+        """掃描結果畫面顯示的文字 (每件一行)"""
+        return "".join(
+            f"{item['size']}吋{item['color']}{item['type']} {item['quantity']} 件\n" for item in self.items
+        )
+
+
+@dataclass(frozen=True)
+class BatchScanResult:
+    """一批照片的辨識結果 (同一張照片重複出現時只計一次)"""
+
+    results: List[ScanResult]
+    seconds: float
+    duplicates: int = 0
+
+    @property
+    def total(self) -> int:
+        return sum(result.total for result in self.results)
+
+    @property
+    def bags_per_minute(self) -> float:
+        return self.total * 60 / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def items(self) -> List[Dict[str, Any]]:
+        """合併相同尺寸 / 顏色 / 類型後的行李列表 (HotelInventoryService.check_in 的格式)"""
+        merged: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        for result in self.results:
+            for item in result.items:
+                key = (str(item.get("size", "")), item.get("color", ""), item.get("type", ""))
+                if key in merged:
+                    merged[key]["quantity"] += int(item.get("quantity", 1))
+                else:
+                    merged[key] = {"size": key[0], "color": key[1], "type": key[2], "quantity": int(item.get("quantity", 1))}
+        return list(merged.values())
+
+    def luggage_items(self) -> List[LuggageItem]:
+        """依尺寸彙總的件數 (無法辨識尺寸時以 24 吋計)"""
+        sizes: Dict[int, int] = {}
+        for item in self.items:
+            try:
+                size = int(item["size"])
+            except ValueError:
+                size = 24
+            sizes[size] = sizes.get(size, 0) + item["quantity"]
+        return [LuggageItem(size=size, quantity=quantity) for size, quantity in sorted(sizes.items())]
+
+
+class ScanBackend(abc.ABC):
+    """模型後端介面"""
+
+    name = "base"
+    # 支援單次呼叫辨識多張影像時，submit_batch 每 max_batch_size 張合併為一次呼叫
+    supports_batch = False
+    max_batch_size = 1
+
+    @abc.abstractmethod
+    def detect(self, image: bytes) -> List[Dict[str, Any]]:
+        """
+        辨識單張 (已前處理的 JPEG) 影像中的行李
+
+        Returns:
+            [{"size", "color", "type", "quantity"}, ...]
+        """
+
+    def detect_batch(self, images: Sequence[bytes]) -> List[List[Dict[str, Any]]]:
+        """辨識多張影像，回傳與 images 對應的行李列表"""
+        return [self.detect(image) for image in images]
+
+
+class StubScanBackend(ScanBackend):
+    """以影像雜湊決定結果的本機後端：同一張影像永遠得到同樣的行李列表"""
+
+    name = "stub"
+
+    COLORS = ("黑色", "白色", "深灰色", "深藍色", "玫瑰金", "銀色", "紅色")
+    SIZES = ("20", "24", "28")
+    TYPES = ("硬殼行李箱", "軟殼行李箱", "登機箱")
+
+    def detect(self, image: bytes) -> List[Dict[str, Any]]:
+        rng = random.Random(hashlib.sha256(image).digest())
+        return [
+            {"color": rng.choice(self.COLORS), "size": rng.choice(self.SIZES), "type": rng.choice(self.TYPES), "quantity": 1}
+            for _ in range(rng.randint(1, 5))
+        ]
+
+
+class GeminiScanBackend(ScanBackend):
+    """Google Gemini 多模態模型 (回應限定為 JSON)"""
+
+    name = "gemini"
+    supports_batch = True
+    max_batch_size = 8
+
+    PROMPT = (
+        "辨識照片中的每一件行李，以 JSON 陣列回覆，每個元素為 "
+        '{"size": "20|24|28 (吋)", "color": "顏色 (繁體中文)", "type": "硬殼行李箱|軟殼行李箱|登機箱|其他", "quantity": 件數}，'
+        "相同外觀的行李合併計數，不要輸出其他文字。"
+    )
+    BATCH_PROMPT = (
+        "以下共 {count} 張照片。分別辨識每張照片中的行李，以 JSON 陣列回覆，第 i 個元素為第 i 張照片的行李陣列，"
+        '元素格式為 {{"size": "20|24|28 (吋)", "color": "顏色 (繁體中文)", "type": "硬殼行李箱|軟殼行李箱|登機箱|其他", "quantity": 件數}}，'
+        "不要輸出其他文字。"
+    )
+
+    def __init__(self, model_name: str = "gemini-1.5-flash", api_key: Optional[str] = None):
+        try:
+            import google.generativeai as genai
+        except ImportError:
+            raise RuntimeError("未安裝 google-generativeai，無法使用 gemini 掃描後端")
+        genai.configure(api_key=api_key or os.environ.get("GOOGLE_API_KEY"))
+        self.model = genai.GenerativeModel(
+            model_name, generation_config={"response_mime_type": "application/json"}
+        )
+
+    def detect(self, image: bytes) -> List[Dict[str, Any]]:
+        response = self.model.generate_content([self.PROMPT, {"mime_type": "image/jpeg", "data": image}])
+        return self._parse_items(json.loads(response.text))
+
+    def detect_batch(self, images: Sequence[bytes]) -> List[List[Dict[str, Any]]]:
+        if len(images) == 1:
+            return [self.detect(images[0])]
+        parts: List[Any] = [self.BATCH_PROMPT.format(count=len(images))]
+        parts.extend({"mime_type": "image/jpeg", "data": image} for image in images)
+        data = json.loads(self.model.generate_content(parts).text)
+        if not isinstance(data, list) or len(data) != len(images):
+            raise ValueError(f"批次辨識回應數量不符: 預期 {len(images)} 張")
+        return [self._parse_items(items) for items in data]
+
+    @staticmethod
+    def _parse_items(data: Any) -> List[Dict[str, Any]]:
+        if isinstance(data, dict):
+            data = data.get("items", [])
+        return [
+            {
+                "size": str(item.get("size", "")),
+                "color": str(item.get("color", "")),
+                "type": str(item.get("type", "")),
+                "quantity": max(1, int(item.get("quantity", 1) or 1)),
+            }
+            for item in data
+            if isinstance(item, dict)
+        ]
+
+
+class ScanService:
+    """行李掃描服務 (行程內共用)"""
+
+    BACKENDS = {"stub": StubScanBackend, "gemini": GeminiScanBackend}
+    MAX_EDGE = 1024
+    JPEG_QUALITY = 85
+    CACHE_SIZE = 256
+
+    _backend: Optional[ScanBackend] = None
+    _executor: Optional[ThreadPoolExecutor] = None
+    _max_workers = 2
+    _lock = threading.Lock()
+    _cache: "OrderedDict[str, ScanResult]" = OrderedDict()
+    _inflight: Dict[str, Future] = {}
+
+    @classmethod
+    def configure(
+        cls,
+        backend: Union[str, ScanBackend, None] = None,
+        max_workers: Optional[int] = None,
+        **backend_options: Any,
+    ) -> None:
+        """
+        設定模型後端與執行緒數 (變更後端時清除快取；以名稱指定目前的後端時沿用既有實例)
+
+        Args:
+            backend: BACKENDS 中的名稱或 ScanBackend 實例
+            max_workers: 同時辨識的影像數上限
+            backend_options: 以名稱建立後端時的參數 (例如 gemini 的 model_name)
+        """
+        if isinstance(backend, str):
+            if cls._backend is not None and cls._backend.name == backend:
+                backend = cls._backend
+            else:
+                backend = cls.BACKENDS[backend](**backend_options)
+        with cls._lock:
+            if backend is not None and backend is not cls._backend:
+                cls._backend = backend
+                cls._cache.clear()
+            if max_workers and max_workers != cls._max_workers:
+                cls._max_workers = max_workers
+                executor, cls._executor = cls._executor, None
+                if executor is not None:
+                    executor.shutdown(wait=False)
+        logger.info("掃描後端: %s (%d 個執行緒)", cls.backend().name, cls._max_workers)
+
+    @classmethod
+    def is_configured(cls) -> bool:
+        """是否已設定 (或已使用) 模型後端"""
+        return cls._backend is not None
+
+    @classmethod
+    def backend(cls) -> ScanBackend:
+        if cls._backend is None:
+            cls._backend = StubScanBackend()
+        return cls._backend
+
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        with cls._lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(max_workers=cls._max_workers, thread_name_prefix="scan")
+            return cls._executor
+
+    # ------------------ 影像 ------------------
+    @staticmethod
+    def _read(source: ImageSource) -> bytes:
+        if isinstance(source, bytes):
+            return source
+        with open(source, "rb") as f:
+            return f.read()
+
+    @staticmethod
+    def image_hash(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    @classmethod
+    def prepare_image(cls, data: bytes) -> bytes:
+        """依 EXIF 轉正、長邊縮小至 MAX_EDGE 並重新編碼為 JPEG (未安裝 pillow 時原樣返回)"""
+        try:
+            from PIL import Image, ImageOps
+        except ImportError:  # 允許在未安裝 pillow 時仍可掃描 (略過前處理)
+            return data
+        with Image.open(io.BytesIO(data)) as image:
+            # JPEG 在解碼時就以 1/2~1/8 比例縮小 (不小於 MAX_EDGE)，相機原圖不必完整解碼
+            image.draft("RGB", (cls.MAX_EDGE, cls.MAX_EDGE))
+            image = ImageOps.exif_transpose(image).convert("RGB")
+            image.thumbnail((cls.MAX_EDGE, cls.MAX_EDGE))
+            buffer = io.BytesIO()
+            image.save(buffer, format="JPEG", quality=cls.JPEG_QUALITY, optimize=True)
+        return buffer.getvalue()
+
+    # ------------------ 掃描 ------------------
+    @classmethod
+    def cached(cls, source: ImageSource) -> Optional[ScanResult]:
+        """已掃描過的影像直接取得結果，未掃描過時返回 None"""
+        result = cls._cache_get(cls.image_hash(cls._read(source)))
+        return result.copy(cached=True) if result is not None else None
+
+    @classmethod
+    def _cache_get(cls, key: str) -> Optional[ScanResult]:
+        with cls._lock:
+            result = cls._cache.get(key)
+            if result is not None:
+                cls._cache.move_to_end(key)
+        return result
+
+    @classmethod
+    def _cache_put(cls, result: ScanResult) -> None:
+        result = result.copy()
+        with cls._lock:
+            cls._cache[result.image_hash] = result
+            cls._cache.move_to_end(result.image_hash)
+            while len(cls._cache) > cls.CACHE_SIZE:
+                cls._cache.popitem(last=False)
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        with cls._lock:
+            cls._cache.clear()
+
+    @classmethod
+    def scan(cls, source: ImageSource) -> ScanResult:
+        """同步掃描 (於呼叫端執行緒前處理與推論)"""
+        data = cls._read(source)
+        key = cls.image_hash(data)
+        result = cls._cache_get(key)
+        if result is not None:
+            Metrics.inc(SCAN_CACHE_TOTAL, result="hit")
+            return result.copy(cached=True)
+        Metrics.inc(SCAN_CACHE_TOTAL, result="miss")
+        return cls._detect(key, data)
+
+    @classmethod
+    def _detect(cls, key: str, data: bytes) -> ScanResult:
+        backend = cls.backend()
+        with Metrics.timer(SCAN_SECONDS, backend=backend.name):
+            items = backend.detect(cls.prepare_image(data))
+        result = ScanResult(key, items, backend.name)
+        cls._cache_put(result)
+        logger.info("影像 %s 辨識出 %d 件行李 (%s)", key[:12], result.total, backend.name)
+        return result
+
+    @classmethod
+    def submit(cls, source: ImageSource) -> Future:
+        """
+        非同步掃描，回傳 Future[ScanResult]
+
+        已快取時回傳已完成的 Future；同一張影像仍在辨識中時回傳同一個 Future
+        """
+        return cls._submit_loaded(*cls._load(source))
+
+    @classmethod
+    def _load(cls, source: ImageSource) -> Tuple[str, bytes]:
+        data = cls._read(source)
+        return cls.image_hash(data), data
+
+    @classmethod
+    def _submit_loaded(cls, key: str, data: bytes) -> Future:
+        result = cls._cache_get(key)
+        if result is not None:
+            Metrics.inc(SCAN_CACHE_TOTAL, result="hit")
+            future: Future = Future()
+            future.set_result(result.copy(cached=True))
+            return future
+
+        executor = cls._get_executor()
+        with cls._lock:
+            future = cls._inflight.get(key)
+            if future is None:
+                Metrics.inc(SCAN_CACHE_TOTAL, result="miss")
+                future = cls._inflight[key] = executor.submit(cls._detect, key, data)
+                future.add_done_callback(lambda _: cls._inflight.pop(key, None))
+        return future
+
+    @classmethod
+    def _detect_many(cls, keys: List[str], datas: List[bytes]) -> List[ScanResult]:
+        backend = cls.backend()
+        with Metrics.timer(SCAN_SECONDS, backend=backend.name):
+            detected = backend.detect_batch([cls.prepare_image(data) for data in datas])
+        results = [ScanResult(key, items, backend.name) for key, items in zip(keys, detected)]
+        for result in results:
+            cls._cache_put(result)
+        logger.info("批次辨識 %d 張影像 (%s)", len(results), backend.name)
+        return results
+
+    @classmethod
+    def submit_batch(cls, sources: Sequence[ImageSource]) -> Future:
+        """
+        批次掃描一疊照片 (例如團體旅客的行李)，回傳 Future[BatchScanResult]
+
+        讀檔與雜湊在執行緒池中進行，呼叫端立即返回；已快取的照片不再辨識；
+        後端支援批次時每 max_batch_size 張合併為一次模型呼叫，否則各張在執行緒池中平行辨識
+        """
+        start = time.perf_counter()
+        executor = cls._get_executor()
+        loads = [executor.submit(cls._load, source) for source in sources]
+        return _chain(_gather(loads, lambda loaded: cls._dispatch_batch(loaded, start)))
+
+    @classmethod
+    def _dispatch_batch(cls, loaded: List[Tuple[str, bytes]], start: float) -> Future:
+        """所有照片讀取完成後 (於執行緒池中) 分派辨識，回傳 Future[BatchScanResult]"""
+        keys: List[str] = []
+        known: Dict[str, ScanResult] = {}
+        misses: Dict[str, bytes] = {}
+        futures: List[Future] = []
+        backend = cls.backend()
+        for key, data in loaded:
+            if key in keys:
+                continue
+            keys.append(key)
+            result = cls._cache_get(key)
+            if result is not None:
+                Metrics.inc(SCAN_CACHE_TOTAL, result="hit")
+                known[key] = result.copy(cached=True)
+            elif backend.supports_batch:
+                Metrics.inc(SCAN_CACHE_TOTAL, result="miss")
+                misses[key] = data
+            else:
+                futures.append(cls._submit_loaded(key, data))
+
+        if misses:
+            executor = cls._get_executor()
+            pending = list(misses.items())
+            for offset in range(0, len(pending), backend.max_batch_size):
+                chunk = pending[offset:offset + backend.max_batch_size]
+                futures.append(executor.submit(cls._detect_many, [key for key, _ in chunk], [data for _, data in chunk]))
+
+        def finish(done: List[Any]) -> BatchScanResult:
+            for value in done:
+                for result in value if isinstance(value, list) else [value]:
+                    known[result.image_hash] = result
+            return BatchScanResult([known[key] for key in keys], time.perf_counter() - start, len(loaded) - len(keys))
+
+        return _gather(futures, finish)
+
+
+def _gather(futures: List[Future], finish: Callable[[List[Any]], Any]) -> Future:
+    """所有 futures 完成後以 finish(結果列表) 完成回傳的 Future (不佔用執行緒等待)"""
+    combined: Future = Future()
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def complete() -> None:
+        try:
+            combined.set_result(finish([future.result() for future in futures]))
+        except Exception as exc:
+            combined.set_exception(exc)
+
+    def on_done(_: Future) -> None:
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            complete()
+
+    if not futures:
+        complete()
+    for future in futures:
+        future.add_done_callback(on_done)
+    return combined
+
+
+def _chain(outer: Future) -> Future:
+    """outer 的結果本身是 Future 時，回傳以內層 Future 結果完成的 Future"""
+    combined: Future = Future()
+
+    def on_inner(inner: Future) -> None:
+        try:
+            combined.set_result(inner.result())
+        except Exception as exc:
+            combined.set_exception(exc)
+
+    def on_outer(_: Future) -> None:
+        try:
+            inner = outer.result()
+        except Exception as exc:
+            combined.set_exception(exc)
+            return
+        inner.add_done_callback(on_inner)
+
+    outer.add_done_callback(on_outer)
+    return combined
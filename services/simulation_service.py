@@ -1,12 +1,20 @@
 """
 Simulation Service
 處理模擬數據生成、動畫模擬等業務邏輯
+
+generate_users / generate_drivers / random_trip_endpoints 產生壓力測試用的批次資料
+(見 services/load_generator.py)；傳入 random.Random 即可重現。
 """
 import random
 import logging
-from typing import Tuple
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from logging_config import ThrottledLogger
 
 logger = logging.getLogger(__name__)
+# 逐格位置每 30 次取樣一次；逐筆的時間 / 價格估算每秒最多一筆
+frame_logger = ThrottledLogger(logger, every=30)
+item_logger = ThrottledLogger(logger, interval=1.0)
 
 
 class SimulationService:
@@ -40,7 +48,7 @@ class SimulationService:
         if new_top > max_top:
             new_top = 50
         
-        logger.debug(f"計算新位置: ({new_left}, {new_top})")
+        frame_logger.debug("計算新位置: (%s, %s)", new_left, new_top)
         return new_left, new_top
     
     @staticmethod
@@ -68,7 +76,7 @@ class SimulationService:
             "rating": round(random.uniform(4.0, 5.0), 1)
         }
         
-        logger.info(f"生成司機資訊: {driver_info['name']}")
+        logger.info("生成司機資訊: %s", driver_info['name'])
         return driver_info
     
     @staticmethod
@@ -87,7 +95,7 @@ class SimulationService:
         random_suffix = random.randint(1000, 9999)
         order_id = f"{prefix}{timestamp}{random_suffix}"
         
-        logger.info(f"生成訂單ID: {order_id}")
+        logger.info("生成訂單ID: %s", order_id)
         return order_id
     
     @staticmethod
@@ -112,7 +120,7 @@ class SimulationService:
         variance = random.uniform(0.9, 1.1)
         time_minutes = int(time_minutes * variance)
         
-        logger.info(f"計算預估時間: {distance_km}km -> {time_minutes}分鐘")
+        item_logger.info("計算預估時間: %skm -> %s分鐘", distance_km, time_minutes)
         return max(5, time_minutes)  # 最少5分鐘
     
     @staticmethod
@@ -141,7 +149,7 @@ class SimulationService:
         # 四捨五入到整數
         total_price = round(total_price)
         
-        logger.info(f"計算價格: {distance_km}km -> NT${total_price}")
+        item_logger.info("計算價格: %skm -> NT$%s", distance_km, total_price)
         return total_price
     
     @staticmethod
@@ -169,5 +177,100 @@ class SimulationService:
         ]
         
         selected = random.sample(mock_locations, min(count, len(mock_locations)))
-        logger.info(f"生成 {len(selected)} 個模擬地點")
+        logger.info("生成 %d 個模擬地點", len(selected))
         return selected
+
+    # ------------------ 壓力測試資料 ------------------
+    @staticmethod
+    def generate_users(count: int, rng: Optional[random.Random] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        生成模擬使用者 (與資料庫 users 相同的結構)
+
+        Args:
+            count: 使用者數量
+            rng: 亂數產生器，None 時使用 random 模組
+
+        Returns:
+            dict: email → 使用者資料
+        """
+        rng = rng or random
+        users = {}
+        for index in range(count):
+            email = f"load{index:05d}@example.com"
+            users[email] = {
+                "username": f"壓測使用者{index:05d}",
+                "password": f"pw{rng.randint(100000, 999999)}",
+                "created_at": "2025-01-01T00:00:00",
+            }
+        logger.info("生成 %d 位模擬使用者", count)
+        return users
+
+    @staticmethod
+    def generate_drivers(
+        count: int,
+        locations: Sequence[Tuple[float, float]],
+        rng: Optional[random.Random] = None,
+        first_id: int = 1,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        生成模擬司機 (與資料庫 drivers 相同的結構)，初始位置取自 locations
+
+        Args:
+            count: 司機數量
+            locations: 候選位置 (緯度, 經度)，例如飯店座標
+            rng: 亂數產生器，None 時使用 random 模組
+            first_id: 第一位司機的編號 (寫入既有資料檔時應避開已存在的編號)
+
+        Returns:
+            dict: 司機編號 (字串) → 司機資料
+        """
+        rng = rng or random
+        driver_names = ["王小明", "李大華", "張志明", "陳美麗", "林建國"]
+        drivers = {}
+        for index in range(first_id, first_id + count):
+            lat, lon = locations[rng.randrange(len(locations))]
+            drivers[str(index)] = {
+                "name": rng.choice(driver_names),
+                "phone": f"09{rng.randint(10000000, 99999999)}",
+                "license_plate": f"{rng.choice(['ABC', 'DEF', 'GHI', 'JKL'])}-{rng.randint(1000, 9999)}",
+                "current_location": [float(lat), float(lon)],
+                "status": "available",
+            }
+        logger.info("生成 %d 位模擬司機", count)
+        return drivers
+
+    @staticmethod
+    def random_trip_endpoints(
+        hotels,
+        rng: Optional[random.Random] = None,
+        nearby: int = 50,
+    ) -> Tuple[Tuple[str, float, float], Tuple[str, float, float]]:
+        """
+        由飯店目錄抽出一段行程的上下車點：上車點隨機，下車點取自上車點最近的 nearby 間飯店
+        (市區內移動較符合實際訂單)
+
+        Args:
+            hotels: HotelCatalog
+            rng: 亂數產生器，None 時使用 random 模組
+            nearby: 下車點的候選數
+
+        Returns:
+            ((上車地名, 緯度, 經度), (下車地名, 緯度, 經度))
+        """
+        from services.distance_matrix_service import DistanceMatrixService
+
+        rng = rng or random
+        pickup_index = rng.randrange(len(hotels))
+        pickup = hotels[pickup_index]
+        candidates = [
+            index
+            for index in DistanceMatrixService.nearest_indices(
+                (pickup["lat"], pickup["lon"]), hotels.coordinates, limit=nearby + 1
+            )
+            if index != pickup_index
+        ]
+        dropoff = hotels[rng.choice(candidates)] if candidates else hotels[rng.randrange(len(hotels))]
+        return (
+            (pickup["name"], float(pickup["lat"]), float(pickup["lon"])),
+            (dropoff["name"], float(dropoff["lat"]), float(dropoff["lon"])),
+        )
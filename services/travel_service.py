@@ -1,14 +1,17 @@
 """Travel / Trip services: validation, generation, pricing, persistence."""
 from __future__ import annotations
 
+import dataclasses
 import logging
 import uuid
 from datetime import datetime, time, timedelta
 from typing import List, Tuple, Dict, Any, Optional
 
-from db_helpers import get_db, save_db
+from db_helpers import db_lock, get_db, save_db
 from models.trip import Travel, Trip, HotelStay, LuggageItem
-from services.location_service import LocationService
+from services.order_event_bus import OrderEventBus
+from services.pricing_service import PricingService, Quote
+from tracing import Tracer
 
 logger = logging.getLogger(__name__)
 
@@ -19,8 +22,8 @@ class TravelService:
     DEFAULT_ARRIVAL_TIME = time(14, 0)
     DEFAULT_CHECKOUT_TIME = time(11, 0)
     DEFAULT_DEPARTURE_TIME = time(12, 0)
-    BASE_FARE = 30.0
-    DISTANCE_RATE = 30.0  # 每公里 30 元
+    BASE_FARE = PricingService.BASE_FARE
+    DISTANCE_RATE = PricingService.DISTANCE_RATE
 
     @staticmethod
     def _ensure_order_list(db: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -53,35 +56,6 @@ class TravelService:
         duration_hours = max(distance_km / avg_speed_kmh, 0.5)
         return start_time + timedelta(hours=duration_hours)
 
-    @classmethod
-    def _luggage_fee(cls, items: List[LuggageItem]) -> float:
-        total = 0.0
-        for item in items:
-            size = int(item.size)
-            if size <= 20:
-                rate = 50
-            elif size <= 24:
-                rate = 80
-            else:
-                rate = 100
-            total += rate * max(item.quantity, 1)
-        return total
-
-    @classmethod
-    def _calculate_trip_price(
-        cls,
-        pickup_lat: float,
-        pickup_lon: float,
-        dropoff_lat: float,
-        dropoff_lon: float,
-        luggage_items: List[LuggageItem],
-    ) -> Tuple[float, float]:
-        distance_km = LocationService.calculate_distance(
-            pickup_lat, pickup_lon, dropoff_lat, dropoff_lon
-        )
-        fare = cls.BASE_FARE + distance_km * cls.DISTANCE_RATE + cls._luggage_fee(luggage_items)
-        return round(fare, 2), distance_km
-
     @classmethod
     def _build_trip(
         cls,
@@ -90,27 +64,31 @@ class TravelService:
         pickup: Tuple[str, float, float],
         dropoff: Tuple[str, float, float],
         luggage_items: List[LuggageItem],
+        quote: Optional[Quote] = None,
     ) -> Trip:
         pickup_location, pick_lat, pick_lon = pickup
         dropoff_location, drop_lat, drop_lon = dropoff
-        price, distance_km = cls._calculate_trip_price(pick_lat, pick_lon, drop_lat, drop_lon, luggage_items)
+        if quote is None:
+            quote = PricingService.quote((pick_lat, pick_lon), (drop_lat, drop_lon), luggage_items)
         trip = Trip(
             id=str(uuid.uuid4()),
             parent_travel_id=parent_id,
             start_time=start_time,
-            end_time=cls._estimate_end_time(start_time, distance_km),
+            end_time=cls._estimate_end_time(start_time, quote.distance_km),
             pickup_location=pickup_location,
             pickup_lat=pick_lat,
             pickup_lon=pick_lon,
             dropoff_location=dropoff_location,
             dropoff_lat=drop_lat,
             dropoff_lon=drop_lon,
-            price=price,
+            vehicle_type=quote.vehicle_type,
+            price=quote.price,
             luggage_items=luggage_items,
         )
         return trip
 
     @classmethod
+    @Tracer.traced("travel.build_manual_trip")
     def build_manual_trip(
         cls,
         start_time: datetime,
@@ -118,28 +96,28 @@ class TravelService:
         dropoff: Tuple[str, float, float],
         luggage_items: List[LuggageItem],
         parent_id: Optional[str] = None,
+        vehicle_type: str = PricingService.DEFAULT_VEHICLE_TYPE,
     ) -> Trip:
-        """提供即時訂單等情境建立單一 Trip"""
-        return cls._build_trip(parent_id, start_time, pickup, dropoff, luggage_items)
+        """提供即時訂單等情境建立單一 Trip (依指定車型報價)"""
+        quote = PricingService.quote((pickup[1], pickup[2]), (dropoff[1], dropoff[2]), luggage_items, vehicle_type)
+        return cls._build_trip(parent_id, start_time, pickup, dropoff, luggage_items, quote)
 
     @classmethod
-    def generate_trips(cls, travel: Travel) -> List[Trip]:
-        cls.validate_hotels(travel)
-        trips: List[Trip] = []
-
-        luggage_items = travel.luggage_items or [LuggageItem(size=24, quantity=max(travel.luggage_count, 1))]
+    def _plan_legs(
+        cls, travel: Travel
+    ) -> List[Tuple[datetime, Tuple[str, float, float], Tuple[str, float, float]]]:
+        """依住宿順序列出所有路段 (出發時間, 上車點, 下車點)"""
+        legs = []
         first_hotel = travel.hotels[0]
         last_hotel = travel.hotels[-1]
 
         if travel.arrival_transfer and travel.arrival_location and travel.arrival_lat and travel.arrival_lon:
             start_dt = datetime.combine(travel.total_start_date, travel.arrival_time or cls.DEFAULT_ARRIVAL_TIME)
-            trips.append(
-                cls._build_trip(
-                    travel.id,
+            legs.append(
+                (
                     start_dt,
                     (travel.arrival_location, travel.arrival_lat, travel.arrival_lon),
                     (first_hotel.hotel_name, first_hotel.lat, first_hotel.lon),
-                    luggage_items,
                 )
             )
 
@@ -148,27 +126,95 @@ class TravelService:
             current_hotel = travel.hotels[idx]
             next_hotel = travel.hotels[idx + 1]
             start_dt = datetime.combine(current_hotel.check_out_date, default_checkout)
-            trips.append(
-                cls._build_trip(
-                    travel.id,
+            legs.append(
+                (
                     start_dt,
                     (current_hotel.hotel_name, current_hotel.lat, current_hotel.lon),
                     (next_hotel.hotel_name, next_hotel.lat, next_hotel.lon),
-                    luggage_items,
                 )
             )
 
         if travel.departure_transfer and travel.departure_location and travel.departure_lat and travel.departure_lon:
             start_dt = datetime.combine(travel.total_end_date, travel.departure_time or cls.DEFAULT_DEPARTURE_TIME)
-            trips.append(
-                cls._build_trip(
-                    travel.id,
+            legs.append(
+                (
                     start_dt,
                     (last_hotel.hotel_name, last_hotel.lat, last_hotel.lon),
                     (travel.departure_location, travel.departure_lat, travel.departure_lon),
-                    luggage_items,
                 )
             )
+        return legs
+
+    @classmethod
+    def _leg_key(
+        cls,
+        start_dt: datetime,
+        pickup: Tuple[str, float, float],
+        dropoff: Tuple[str, float, float],
+        luggage_items: List[LuggageItem],
+    ) -> Tuple:
+        return (start_dt, pickup, dropoff, PricingService.luggage_signature(luggage_items))
+
+    @classmethod
+    def generate_trips(cls, travel: Travel, previous_trips: Optional[List[Trip]] = None) -> List[Trip]:
+        """
+        依住宿安排產生所有 Trip
+
+        Args:
+            travel: 旅程
+            previous_trips: 上一次產生的 Trip 列表；路段 (時間、上下車點、行李) 未變動者
+                複製沿用 (保留原 id 與報價，不修改傳入的 Trip)，只重新計算受影響的路段
+
+        Returns:
+            List[Trip]
+        """
+        cls.validate_hotels(travel)
+
+        luggage_items = travel.luggage_items or [LuggageItem(size=24, quantity=max(travel.luggage_count, 1))]
+        legs = cls._plan_legs(travel)
+
+        reusable: Dict[Tuple, Trip] = {}
+        for trip in previous_trips or []:
+            key = cls._leg_key(
+                trip.start_time,
+                (trip.pickup_location, trip.pickup_lat, trip.pickup_lon),
+                (trip.dropoff_location, trip.dropoff_lat, trip.dropoff_lon),
+                trip.luggage_items,
+            )
+            reusable[key] = trip
+
+        trips: List[Optional[Trip]] = []
+        changed: List[int] = []
+        for idx, (start_dt, pickup, dropoff) in enumerate(legs):
+            trip = reusable.pop(cls._leg_key(start_dt, pickup, dropoff, luggage_items), None)
+            if trip is not None:
+                # 複製後再改上層旅程，舊 Travel 的 trips 維持不變
+                trip = dataclasses.replace(
+                    trip,
+                    parent_travel_id=travel.id,
+                    luggage_items=list(trip.luggage_items),
+                    luggage_images=list(trip.luggage_images),
+                )
+            else:
+                changed.append(idx)
+            trips.append(trip)
+
+        if changed:
+            # 變動的路段一次批次報價 (未命中快取的路段以向量化方式計算距離)
+            quotes = PricingService.quote_legs(
+                [((legs[idx][1][1], legs[idx][1][2]), (legs[idx][2][1], legs[idx][2][2])) for idx in changed],
+                [luggage_items] * len(changed),
+                vehicle_types=(PricingService.DEFAULT_VEHICLE_TYPE,),
+            )
+            for idx, quote in zip(changed, quotes):
+                start_dt, pickup, dropoff = legs[idx]
+                trips[idx] = cls._build_trip(
+                    travel.id, start_dt, pickup, dropoff, luggage_items,
+                    quote[PricingService.DEFAULT_VEHICLE_TYPE],
+                )
+
+        if previous_trips is not None:
+            logger.debug("增量產生 trips: 共 %d 段, 重新計算 %d 段", len(legs), len(changed))
 
         travel.trips = trips
         travel.total_price = round(sum(trip.price for trip in trips), 2)
@@ -201,21 +247,36 @@ class TravelService:
 
     @classmethod
     def save_travel_with_trips(cls, travel: Travel, user_email: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
-        db = get_db()
-        orders = cls._ensure_order_list(db)
+        return cls.save_travels([travel], user_email)[0]
 
-        travel_entry = cls._serialize_travel(travel, user_email)
-        trip_entries = [cls._serialize_trip(trip, user_email, "travel_trip") for trip in travel.trips]
-
-        orders.append(travel_entry)
-        orders.extend(trip_entries)
+    @classmethod
+    def save_travels(
+        cls, travels: List[Travel], user_email: str
+    ) -> List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        """批次儲存多個旅程與其 trips (資料檔只讀寫一次)"""
+        saved = []
+        for travel in travels:
+            travel_entry = cls._serialize_travel(travel, user_email)
+            trip_entries = [cls._serialize_trip(trip, user_email, "travel_trip") for trip in travel.trips]
+            saved.append((travel_entry, trip_entries))
 
-        orders.sort(key=lambda o: o.get("created_at", o.get("start_time", "")), reverse=True)
-        save_db(db)
-        logger.info("Travel %s 已儲存 (%d 個 trips)", travel.id, len(travel.trips))
-        return travel_entry, trip_entries
+        with db_lock():
+            db = get_db()
+            orders = cls._ensure_order_list(db)
+            for travel_entry, trip_entries in saved:
+                orders.append(travel_entry)
+                orders.extend(trip_entries)
+            orders.sort(key=lambda o: o.get("created_at", o.get("start_time", "")), reverse=True)
+            save_db(db)
+        for travel_entry, trip_entries in saved:
+            OrderEventBus.publish(OrderEventBus.INSERT, None, travel_entry)
+            for entry in trip_entries:
+                OrderEventBus.publish(OrderEventBus.INSERT, None, entry)
+            logger.info("Travel %s 已儲存 (%d 個 trips)", travel_entry["id"], len(trip_entries))
+        return saved
 
     @classmethod
+    @Tracer.traced("travel.save_single_trip")
     def save_single_trip(
         cls,
         trip: Trip,
@@ -223,13 +284,58 @@ class TravelService:
         order_type: str = "trip",
         extra_fields: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
-        db = get_db()
-        orders = cls._ensure_order_list(db)
-        entry = cls._serialize_trip(trip, user_email, order_type)
-        if extra_fields:
-            entry.update(extra_fields)
-        orders.append(entry)
-        orders.sort(key=lambda o: o.get("start_time", o.get("created_at", "")), reverse=True)
-        save_db(db)
-        logger.info("Trip %s 已儲存", trip.id)
-        return entry
+        return cls.save_trips([trip], user_email, order_type, [extra_fields])[0]
+
+    @classmethod
+    def save_trips(
+        cls,
+        trips: List[Trip],
+        user_email: str,
+        order_type: str = "trip",
+        extra_fields: Optional[List[Optional[Dict[str, Any]]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        批次儲存多個 Trip (資料檔只讀寫一次)
+
+        Args:
+            trips: 要儲存的 Trip
+            user_email: 下單使用者
+            order_type: 訂單類型
+            extra_fields: 與 trips 對應的額外欄位 (可省略或含 None)
+
+        Returns:
+            寫入資料檔的訂單列表 (與 trips 順序相同)
+        """
+        extra_fields = extra_fields or [None] * len(trips)
+        if len(extra_fields) != len(trips):
+            raise ValueError("trips 與 extra_fields 長度必須相同")
+
+        entries = []
+        for trip, extra in zip(trips, extra_fields):
+            entry = cls._serialize_trip(trip, user_email, order_type)
+            if extra:
+                entry.update(extra)
+            entries.append(entry)
+        return cls.insert_orders(entries)
+
+    @classmethod
+    def insert_orders(cls, entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        把已序列化的訂單寫入資料檔 (資料檔只讀寫一次) 並發布新增事件
+
+        Args:
+            entries: 訂單
+
+        Returns:
+            實際寫入的訂單
+        """
+        with db_lock():
+            db = get_db()
+            orders = cls._ensure_order_list(db)
+            orders.extend(entries)
+            orders.sort(key=lambda o: o.get("start_time", o.get("created_at", "")), reverse=True)
+            save_db(db)
+        for entry in entries:
+            OrderEventBus.publish(OrderEventBus.INSERT, None, entry)
+            logger.info("Trip %s 已儲存", entry["id"])
+        return entries
@@ -0,0 +1,150 @@
+"""
+User Order Projection
+單一使用者的訂單記憶體投影：依狀態分桶並依時間排序，
+切換篩選或套用單筆變更時只動到記憶體中受影響的資料列
+"""
+import bisect
+import itertools
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.order_history_service import OrderHistoryService
+
+logger = logging.getLogger(__name__)
+
+SortKey = Tuple[str, str]
+
+ALL_STATUSES = "all"
+
+
+class UserOrderProjection:
+    """使用者訂單投影"""
+
+    def __init__(self, user_email: str):
+        self.user_email = user_email
+        self._lock = threading.Lock()
+        # 每個桶內的 keys 依 (時間, 編號) 升冪排列
+        self._buckets: Dict[str, List[SortKey]] = {}
+        self._orders: Dict[SortKey, Dict[str, Any]] = {}
+        self._key_by_id: Dict[str, SortKey] = {}
+        self._status_by_key: Dict[SortKey, str] = {}
+        # 沒有訂單編號的訂單以流水號作為排序鍵的編號部分 (不會被事件更新或刪除)
+        self._anonymous = itertools.count(1)
+        self.reload()
+
+    # ------------------ 建立 ------------------
+    def reload(self) -> None:
+        """由儲存層重新載入此使用者的所有訂單"""
+        orders = OrderHistoryService.get_orders_by_user(self.user_email)
+        with self._lock:
+            self._buckets = {ALL_STATUSES: []}
+            self._orders = {}
+            self._key_by_id = {}
+            self._status_by_key = {}
+            for order in orders:
+                key = self._sort_key(order)
+                status = self.status_of(order)
+                self._orders[key] = order
+                if key[1] == OrderHistoryService.get_order_identifier(order):
+                    self._key_by_id[key[1]] = key
+                self._status_by_key[key] = status
+                self._buckets[ALL_STATUSES].append(key)
+                self._buckets.setdefault(status, []).append(key)
+            for keys in self._buckets.values():
+                keys.sort()
+
+    # ------------------ 查詢 ------------------
+    def get_page(
+        self,
+        status: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = OrderHistoryService.DEFAULT_PAGE_SIZE,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        取得一頁訂單 (由新到舊)，游標以 OrderHistoryService.encode_cursor 編碼
+
+        Returns:
+            (本頁訂單, next_cursor)
+        """
+        bucket_name = (status or ALL_STATUSES).lower()
+        with self._lock:
+            keys = self._buckets.get(bucket_name, [])
+            end = len(keys)
+            if cursor:
+                end = bisect.bisect_left(keys, OrderHistoryService.decode_cursor(cursor))
+            start = max(end - limit, 0)
+            page_keys = keys[start:end][::-1]
+            page = [self._orders[key] for key in page_keys]
+        next_cursor = OrderHistoryService.encode_cursor(page_keys[-1]) if start > 0 and page_keys else None
+        return page, next_cursor
+
+    def count(self, status: Optional[str] = None) -> int:
+        """各狀態的訂單數"""
+        with self._lock:
+            return len(self._buckets.get((status or ALL_STATUSES).lower(), []))
+
+    def matches(self, order: Optional[Dict[str, Any]], status: Optional[str] = None) -> bool:
+        """訂單是否屬於此使用者，且符合指定的狀態篩選"""
+        if not order or order.get("user_email") != self.user_email:
+            return False
+        bucket_name = (status or ALL_STATUSES).lower()
+        return bucket_name == ALL_STATUSES or self.status_of(order) == bucket_name
+
+    # ------------------ 增量更新 ------------------
+    def apply_change(
+        self,
+        before: Optional[Dict[str, Any]],
+        after: Optional[Dict[str, Any]],
+    ) -> bool:
+        """
+        套用單筆訂單變更 (來自 OrderEventBus)
+
+        Returns:
+            投影是否有變動
+        """
+        changed = False
+        with self._lock:
+            for order in (before, after):
+                identifier = OrderHistoryService.get_order_identifier(order) if order else ""
+                if identifier and order.get("user_email") == self.user_email:
+                    changed |= self._remove(identifier)
+            if after and after.get("user_email") == self.user_email:
+                self._insert(after)
+                changed = True
+        return changed
+
+    def _insert(self, order: Dict[str, Any]) -> None:
+        key = self._sort_key(order)
+        status = self.status_of(order)
+        self._orders[key] = order
+        if key[1] == OrderHistoryService.get_order_identifier(order):
+            self._key_by_id[key[1]] = key
+        self._status_by_key[key] = status
+        bisect.insort(self._buckets[ALL_STATUSES], key)
+        bisect.insort(self._buckets.setdefault(status, []), key)
+
+    def _remove(self, identifier: str) -> bool:
+        key = self._key_by_id.pop(identifier, None)
+        if key is None:
+            return False
+        del self._orders[key]
+        for bucket_name in (ALL_STATUSES, self._status_by_key.pop(key)):
+            keys = self._buckets.get(bucket_name, [])
+            idx = bisect.bisect_left(keys, key)
+            if idx < len(keys) and keys[idx] == key:
+                del keys[idx]
+        return True
+
+    # ------------------ 內部工具 ------------------
+    @staticmethod
+    def status_of(order: Dict[str, Any]) -> str:
+        return (order.get("status") or "pending").lower()
+
+    def _sort_key(self, order: Dict[str, Any]) -> SortKey:
+        identifier = OrderHistoryService.get_order_identifier(order)
+        if not identifier:
+            # 共用同一個空編號會互相覆蓋 _orders / _key_by_id；改用不與訂單編號衝突的流水號
+            identifier = f"~{next(self._anonymous)}"
+            logger.debug("使用者 %s 的訂單沒有編號，以 %s 代替", self.user_email, identifier)
+        return OrderHistoryService.get_order_date(order).isoformat(), identifier
@@ -0,0 +1,141 @@
+"""
+Warmup Service
+啟動預熱：在啟動畫面播放期間以背景執行緒預先載入飯店目錄、建立搜尋 / 空間索引、
+初始化地理編碼器並放入常用地點與已知路線，讓預約畫面第一次開啟時不必同步等待
+"""
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class WarmupService:
+    """啟動預熱服務 (每個行程只執行一次，所有 session 共用結果)"""
+
+    STAGES = ("catalogs", "indexes", "geocoder", "routing", "known_locations")
+
+    _lock = threading.Lock()
+    _thread: Optional[threading.Thread] = None
+    _events: Dict[str, threading.Event] = {stage: threading.Event() for stage in STAGES}
+    _results: Dict[str, Dict[str, object]] = {}
+
+    @classmethod
+    def start(cls) -> bool:
+        """
+        啟動背景預熱；已啟動過時不重複執行
+
+        Returns:
+            這次呼叫是否真的啟動了預熱
+        """
+        with cls._lock:
+            if cls._thread is not None:
+                return False
+            cls._thread = threading.Thread(target=cls._run, name="startup-warmup", daemon=True)
+            cls._thread.start()
+        logger.info("啟動預熱開始")
+        return True
+
+    @classmethod
+    def is_ready(cls, stage: Optional[str] = None) -> bool:
+        """指定階段 (或全部階段) 是否已完成；失敗的階段也視為完成，呼叫端會自行載入"""
+        stages = (stage,) if stage else cls.STAGES
+        return all(cls._events[name].is_set() for name in stages)
+
+    @classmethod
+    def wait(cls, stage: Optional[str] = None, timeout: Optional[float] = None) -> bool:
+        """等待指定階段 (或全部階段) 完成；畫面請勿呼叫，僅供測量與背景工作使用"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for name in ((stage,) if stage else cls.STAGES):
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            if not cls._events[name].wait(remaining):
+                return False
+        return True
+
+    @classmethod
+    def status(cls) -> Dict[str, Dict[str, object]]:
+        """
+        各階段的狀態
+
+        Returns:
+            {stage: {"ready": bool, "seconds": float | None, "error": str | None}}
+        """
+        with cls._lock:
+            results = dict(cls._results)
+        return {
+            stage: {
+                "ready": cls._events[stage].is_set(),
+                "seconds": results.get(stage, {}).get("seconds"),
+                "error": results.get(stage, {}).get("error"),
+            }
+            for stage in cls.STAGES
+        }
+
+    # ------------------ 預熱階段 ------------------
+    @classmethod
+    def _run(cls) -> None:
+        stages: List[Tuple[str, Callable[[], None]]] = [
+            ("catalogs", cls._load_catalogs),
+            ("indexes", cls._build_indexes),
+            ("geocoder", cls._init_geocoder),
+            ("routing", cls._preload_routes),
+            ("known_locations", cls._preload_known_locations),
+        ]
+        started = time.perf_counter()
+        for stage, func in stages:
+            stage_start = time.perf_counter()
+            error = None
+            try:
+                func()
+            except Exception as e:
+                error = str(e)
+                logger.warning(f"預熱階段 {stage} 失敗: {e}")
+            with cls._lock:
+                cls._results[stage] = {"seconds": time.perf_counter() - stage_start, "error": error}
+            cls._events[stage].set()
+        logger.info(f"啟動預熱完成，共 {time.perf_counter() - started:.2f} 秒")
+
+    @staticmethod
+    def _load_catalogs() -> None:
+        from services.catalog_service import CatalogService
+
+        CatalogService.current()
+
+    @staticmethod
+    def _build_indexes() -> None:
+        from services.booking_service import BookingService
+        from services.distance_matrix_service import DistanceMatrixService
+
+        BookingService.get_hotel_lookup()
+        coordinates = BookingService.get_partner_coordinates()
+        if len(coordinates):
+            # 同時載入 numpy 與距離矩陣的程式路徑
+            DistanceMatrixService.nearest_indices(coordinates[0], coordinates, limit=1)
+
+    @staticmethod
+    def _init_geocoder() -> None:
+        from services.location_service import LocationService
+
+        LocationService()
+
+    @staticmethod
+    def _preload_routes() -> None:
+        from config import WARMUP_ROUTE_FIXTURES
+        from services.catalog_service import CatalogService
+        from services.distance_matrix_service import DistanceMatrixService
+
+        fixtures = CatalogService.current().route_fixtures
+        for origin, destination, name in WARMUP_ROUTE_FIXTURES:
+            route = fixtures[name]["routes"][0]
+            DistanceMatrixService.preload_route(
+                origin, destination, route["distance"] / 1000.0, route["duration"] / 60.0
+            )
+
+    @staticmethod
+    def _preload_known_locations() -> None:
+        from config import WARMUP_KNOWN_LOCATIONS
+        from services.location_service import LocationService
+
+        for address, lat, lon in WARMUP_KNOWN_LOCATIONS:
+            LocationService.preload_geocode(address, lat, lon)
@@ -0,0 +1,233 @@
+"""
+Worker Pool
+把 CPU 密集的工作 (旅程路段產生、批次報價、批次派車、目錄快照重建) 交給子行程執行，
+避免與 Flet 的 UI 事件處理在同一個行程內搶 GIL
+
+    WorkerPool.start(4)
+    WorkerPool.generate_trips(travel, previous_trips)      # 單一旅程低於門檻，直接在呼叫端計算
+    quotes = WorkerPool.quote_legs(legs, luggage)          # 分段平行報價
+    future = WorkerPool.assign_drivers(pickups, drivers)   # Future[List[int]]
+    future = WorkerPool.rebuild_catalog()                  # 完成後主行程 CatalogService.reload()
+
+未啟動時所有方法直接在呼叫端執行 (submit 回傳已完成的 Future)，呼叫端不需分支。
+子行程以 spawn 啟動 (Flet 行程內有多個執行緒，fork 不安全)；子行程寫入資料檔時與主行程
+一樣經由 db_helpers.db_lock (檔案鎖 + 原子性取代)，不會互相覆寫。
+參數與結果以 pickle 傳遞，單筆小工作的傳遞成本高於計算本身，批次方法會先分段再平行執行。
+"""
+import atexit
+import logging
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from models.trip import LuggageItem, Travel, Trip
+from services.distance_matrix_service import DistanceMatrixService
+from services.pricing_service import Coordinate, PricingService, Quote
+from services.travel_service import TravelService
+
+logger = logging.getLogger(__name__)
+
+# 少於此數量的路段 / 旅程直接在呼叫端計算 (傳遞成本高於平行的收益)
+MIN_QUOTE_CHUNK = 256
+MIN_TRAVEL_CHUNK = 4
+
+
+# ------------------ 子行程執行的任務 (須為模組層級函式才能 pickle) ------------------
+def _ping() -> int:
+    return os.getpid()
+
+
+def _generate_trips_task(travel: Travel, previous_trips: Optional[List[Trip]]) -> Travel:
+    TravelService.generate_trips(travel, previous_trips)
+    return travel
+
+
+def _generate_trips_batch_task(travels: List[Travel]) -> List[Union[Travel, ValueError]]:
+    results: List[Union[Travel, ValueError]] = []
+    for travel in travels:
+        try:
+            results.append(_generate_trips_task(travel, None))
+        except ValueError as exc:
+            results.append(exc)
+    return results
+
+
+def _quote_legs_task(
+    legs: Sequence[Tuple[Coordinate, Coordinate]],
+    luggage: Sequence[Sequence[LuggageItem]],
+    vehicle_types: Optional[Sequence[str]],
+) -> List[Dict[str, Quote]]:
+    return PricingService.quote_legs(legs, luggage, vehicle_types=vehicle_types)
+
+
+def _rebuild_catalog_task(source_path: str, snapshot_path: str) -> None:
+    from services.catalog_snapshot import CatalogSnapshot
+
+    CatalogSnapshot.build(source_path, snapshot_path)
+
+
+def _apply_generated(travel: Travel, generated: Travel) -> List[Trip]:
+    """子行程回傳的是副本，把排序後的住宿、trips 與總價寫回呼叫端的物件"""
+    travel.hotels = generated.hotels
+    travel.trips = generated.trips
+    travel.total_price = generated.total_price
+    return travel.trips
+
+
+def _chunks(count: int, workers: int, minimum: int) -> List[Tuple[int, int]]:
+    size = max(minimum, math.ceil(count / max(1, workers)))
+    return [(start, min(start + size, count)) for start in range(0, count, size)]
+
+
+class WorkerPool:
+    """行程池 (行程內共用，預設未啟動)"""
+
+    max_workers = 0
+    _executor: Optional[ProcessPoolExecutor] = None
+    _lock = threading.Lock()
+    _atexit_registered = False
+
+    @classmethod
+    def start(cls, max_workers: Optional[int] = None) -> None:
+        """啟動行程池並預先建立子行程 (重複呼叫時沿用既有的池)"""
+        with cls._lock:
+            if cls._executor is not None:
+                return
+            cls.max_workers = max_workers or os.cpu_count() or 1
+            cls._executor = ProcessPoolExecutor(
+                max_workers=cls.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            if not cls._atexit_registered:
+                atexit.register(cls.shutdown)
+                cls._atexit_registered = True
+            # 先送出空工作讓子行程開始啟動，第一次使用時不必等待 spawn
+            for _ in range(cls.max_workers):
+                cls._executor.submit(_ping)
+        logger.info("Worker pool 已啟動 (%d 個行程)", cls.max_workers)
+
+    @classmethod
+    def shutdown(cls, wait: bool = True) -> None:
+        with cls._lock:
+            executor, cls._executor = cls._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+            logger.info("Worker pool 已關閉")
+
+    @classmethod
+    def is_running(cls) -> bool:
+        return cls._executor is not None
+
+    @classmethod
+    def submit(cls, func: Callable, *args: Any) -> Future:
+        """送出工作；未啟動時在呼叫端直接執行並回傳已完成的 Future"""
+        executor = cls._executor
+        if executor is not None:
+            return executor.submit(func, *args)
+        future: Future = Future()
+        try:
+            future.set_result(func(*args))
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+
+    # ------------------ 旅程 / 報價 / 派車 / 目錄 ------------------
+    @classmethod
+    def generate_trips(cls, travel: Travel, previous_trips: Optional[List[Trip]] = None) -> List[Trip]:
+        """
+        同 TravelService.generate_trips (結果寫回 travel)；與 generate_trips_many 使用相同的門檻，
+        單一旅程低於門檻時直接在呼叫端計算 (子行程往返比計算本身慢)
+
+        Raises:
+            ValueError: 住宿安排不合法時
+        """
+        if cls._in_process(1):
+            return TravelService.generate_trips(travel, previous_trips)
+        generated = cls.submit(_generate_trips_task, travel, previous_trips).result()
+        return _apply_generated(travel, generated)
+
+    @classmethod
+    def _in_process(cls, travel_count: int) -> bool:
+        """旅程數少於 MIN_TRAVEL_CHUNK * 2 (或未啟動) 時直接在呼叫端計算"""
+        return cls._executor is None or travel_count < MIN_TRAVEL_CHUNK * 2
+
+    @classmethod
+    def generate_trips_many(cls, travels: Sequence[Travel]) -> List[Union[List[Trip], ValueError]]:
+        """
+        批次產生多個旅程的 trips，分段平行執行
+
+        Returns:
+            與 travels 對應：成功時為該旅程的 trips (已寫回旅程物件)，住宿不合法時為 ValueError
+        """
+        if cls._in_process(len(travels)):
+            results: List[Union[List[Trip], ValueError]] = []
+            for travel in travels:
+                try:
+                    results.append(TravelService.generate_trips(travel))
+                except ValueError as exc:
+                    results.append(exc)
+            return results
+
+        futures = [
+            (start, cls.submit(_generate_trips_batch_task, list(travels[start:end])))
+            for start, end in _chunks(len(travels), cls.max_workers, MIN_TRAVEL_CHUNK)
+        ]
+        results = [None] * len(travels)
+        for start, future in futures:
+            for offset, generated in enumerate(future.result()):
+                travel = travels[start + offset]
+                results[start + offset] = generated if isinstance(generated, ValueError) else _apply_generated(travel, generated)
+        return results
+
+    @classmethod
+    def quote_legs(
+        cls,
+        legs: Sequence[Tuple[Coordinate, Coordinate]],
+        luggage: Sequence[Sequence[LuggageItem]],
+        vehicle_types: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Quote]]:
+        """同 PricingService.quote_legs，路段多時分段於子行程計算 (報價快取各行程獨立)"""
+        if len(luggage) != len(legs):
+            raise ValueError("legs 與 luggage 長度必須相同")
+        if cls._executor is None or len(legs) < MIN_QUOTE_CHUNK * 2:
+            return PricingService.quote_legs(legs, luggage, vehicle_types=vehicle_types)
+
+        futures = [
+            cls.submit(_quote_legs_task, list(legs[start:end]), list(luggage[start:end]), vehicle_types)
+            for start, end in _chunks(len(legs), cls.max_workers, MIN_QUOTE_CHUNK)
+        ]
+        results: List[Dict[str, Quote]] = []
+        for future in futures:
+            results.extend(future.result())
+        return results
+
+    @classmethod
+    def assign_drivers(
+        cls,
+        pickups: Sequence[Coordinate],
+        drivers: Sequence[Coordinate],
+        radius_km: Optional[float] = None,
+    ) -> Future:
+        """批次派車 (DistanceMatrixService.assign_nearest)，回傳 Future[List[int]]"""
+        return cls.submit(DistanceMatrixService.assign_nearest, list(pickups), list(drivers), radius_km)
+
+    @classmethod
+    def rebuild_catalog(cls) -> Future:
+        """於子行程重新產生目錄快照，完成後主行程載入新版本，回傳 Future[Catalog]"""
+        from services.catalog_service import CatalogService
+
+        reloaded: Future = Future()
+
+        def reload(built: Future) -> None:
+            try:
+                built.result()
+                reloaded.set_result(CatalogService.reload())
+            except Exception as exc:
+                logger.error("目錄快照重建失敗: %s", exc)
+                reloaded.set_exception(exc)
+
+        cls.submit(_rebuild_catalog_task, CatalogService.DB_PATH, CatalogService.SNAPSHOT_PATH).add_done_callback(reload)
+        return reloaded
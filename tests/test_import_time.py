@@ -0,0 +1,20 @@
+"""
+冷啟動匯入預算 (benchmarks/bench_import_time.py 的量測)
+
+每次量測都啟動新的子行程，先暖身一次再取中位數；
+預算 (150 ms) 約為目前中位數的兩倍，留有機器差異的餘裕，超過代表有模組被提前匯入。
+
+執行方式 (於專案根目錄):
+    python -m pytest tests/test_import_time.py
+"""
+from benchmarks.bench_import_time import DEFAULT_BUDGET_MS, measure
+
+
+def test_splash_does_not_load_deferred_modules_and_stays_within_budget():
+    report = measure(runs=5)
+
+    assert report.early == [], f"進入 /splash 前就載入了: {report.early}"
+    assert report.median_ms <= DEFAULT_BUDGET_MS, (
+        f"import main 中位數 {report.median_ms:.1f} ms 超過預算 {DEFAULT_BUDGET_MS:.0f} ms "
+        f"(各次: {', '.join(f'{sample:.1f}' for sample in report.samples_ms)})"
+    )
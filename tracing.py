@@ -0,0 +1,278 @@
+"""
+Tracing
+預約流程的端到端追蹤：以 contextvars 傳遞目前的 span，結束的 span 由匯出器逐行寫入 JSONL
+
+    - 根 span 只在 Tracer 啟用時建立；子 span 只要有進行中的 span 就會建立
+    - Metrics 計時器 (地理編碼、OSRM、資料檔讀寫、路由建立) 在追蹤進行中時自動成為子 span，
+      因此網路呼叫與資料檔操作不必另外標記
+    - 一次預約跨越多個 UI 事件 (確認 → 選車 → 送出)，contextvars 無法跨事件延續，
+      由 controller 保存 trace_id，各步驟以 Tracer.span(..., trace_id=...) 接續同一條追蹤
+
+檢視瀑布圖:
+    python -m tracing traces.jsonl [--trace <trace_id>]
+"""
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRACE_PATH = "traces.jsonl"
+
+
+class Span:
+    """單一追蹤區段"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "attributes", "start", "duration_ms", "error", "thread", "_started")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start = time.time()
+        self.duration_ms: Optional[float] = None
+        self.error: Optional[str] = None
+        self.thread = threading.current_thread().name
+        self._started = time.perf_counter()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def finish(self, exc: Optional[BaseException] = None) -> None:
+        self.duration_ms = (time.perf_counter() - self._started) * 1000
+        if exc is not None:
+            self.error = f"{type(exc).__name__}: {exc}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+            "error": self.error,
+            "thread": self.thread,
+        }
+
+
+class _NullSpan:
+    """未追蹤時使用的空 span (同時是 context manager)"""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+_current_span: "contextvars.ContextVar[Optional[Span]]" = contextvars.ContextVar("ebaggage_current_span", default=None)
+
+
+class JsonlSpanExporter:
+    """把結束的 span 逐行附加到 JSONL 檔 (每行一個 span)"""
+
+    def __init__(self, path: str = DEFAULT_TRACE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+            except OSError as e:
+                logger.warning(f"寫入追蹤資料失敗: {e}")
+
+
+class _SpanScope:
+    """span 的 context manager：進入時設為目前的 span，離開時結束並匯出"""
+
+    __slots__ = ("_span", "_token")
+
+    def __init__(self, span: Span):
+        self._span = span
+        self._token = None
+
+    def __enter__(self) -> Span:
+        self._token = _current_span.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self._span.finish(exc)
+        _current_span.reset(self._token)
+        Tracer._export(self._span)
+        return False
+
+
+class Tracer:
+    """追蹤器 (行程內共用)"""
+
+    enabled = False
+    _exporter: Optional[JsonlSpanExporter] = None
+
+    @classmethod
+    def enable(cls, path: str = DEFAULT_TRACE_PATH) -> None:
+        cls._exporter = JsonlSpanExporter(path)
+        cls.enabled = True
+        logger.info(f"追蹤已啟用，輸出至 {path}")
+
+    @classmethod
+    def disable(cls) -> None:
+        cls.enabled = False
+
+    @staticmethod
+    def new_trace_id() -> str:
+        return uuid.uuid4().hex
+
+    @staticmethod
+    def current_span() -> Optional[Span]:
+        return _current_span.get()
+
+    @classmethod
+    def span(cls, name: str, trace_id: Optional[str] = None, **attributes):
+        """
+        開始一個 span (context manager，as 取得 Span)
+
+        Args:
+            name: 區段名稱
+            trace_id: 指定所屬的追蹤 (跨 UI 事件接續同一次預約)；未指定時沿用目前 span 的追蹤
+            attributes: 附加屬性
+
+        未啟用且沒有進行中的 span 時回傳空 span。
+        """
+        parent = _current_span.get()
+        if parent is None and not cls.enabled:
+            return _NULL_SPAN
+        if parent is not None and trace_id in (None, parent.trace_id):
+            return _SpanScope(Span(name, parent.trace_id, parent.span_id, attributes))
+        return _SpanScope(Span(name, trace_id or cls.new_trace_id(), None, attributes))
+
+    @classmethod
+    def child_span(cls, name: str, attributes: Dict[str, Any]):
+        """只在有進行中的 span 時建立子 span，否則回傳 None (供 Metrics 計時器使用)"""
+        parent = _current_span.get()
+        if parent is None:
+            return None
+        return _SpanScope(Span(name, parent.trace_id, parent.span_id, attributes))
+
+    @classmethod
+    def traced(cls, name: str, **attributes) -> Callable[[Callable], Callable]:
+        """以 span 包裝函式 (是否追蹤於每次呼叫時判斷)"""
+        def decorator(func: Callable) -> Callable:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if _current_span.get() is None and not cls.enabled:
+                    return func(*args, **kwargs)
+                with cls.span(name, **attributes):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @classmethod
+    def _export(cls, span: Span) -> None:
+        exporter = cls._exporter
+        if exporter is not None:
+            exporter.export(span)
+
+
+# ------------------ 瀑布圖 ------------------
+def load_traces(path: str) -> Dict[str, List[Dict[str, Any]]]:
+    """讀取 JSONL 並依 trace_id 分組 (每組依開始時間排序)"""
+    traces: Dict[str, List[Dict[str, Any]]] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                span = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            traces.setdefault(span["trace_id"], []).append(span)
+    for spans in traces.values():
+        spans.sort(key=lambda s: s["start"])
+    return traces
+
+
+def render_waterfall(spans: List[Dict[str, Any]], width: int = 40) -> str:
+    """把同一條追蹤的 span 畫成文字瀑布圖 (縮排表示父子關係)"""
+    if not spans:
+        return ""
+    origin = spans[0]["start"]
+    end = max(s["start"] + (s["duration_ms"] or 0) / 1000 for s in spans)
+    total_ms = max((end - origin) * 1000, 1e-6)
+    ids = {s["span_id"] for s in spans}
+    children: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    for span in spans:
+        parent = span["parent_id"] if span["parent_id"] in ids else None
+        children.setdefault(parent, []).append(span)
+
+    lines = [f"trace {spans[0]['trace_id']}  total {total_ms:.1f} ms  ({len(spans)} spans)"]
+
+    def walk(parent: Optional[str], depth: int) -> None:
+        for span in children.get(parent, []):
+            offset_ms = (span["start"] - origin) * 1000
+            duration_ms = span["duration_ms"] or 0.0
+            lead = int(offset_ms / total_ms * width)
+            bar = " " * lead + "█" * max(1, int(duration_ms / total_ms * width))
+            attributes = " ".join(f"{k}={v}" for k, v in span["attributes"].items())
+            error = f"  !! {span['error']}" if span.get("error") else ""
+            lines.append(
+                f"{offset_ms:9.1f} ms {duration_ms:9.1f} ms |{bar:<{width}}| "
+                f"{'  ' * depth}{span['name']} {attributes}{error}".rstrip()
+            )
+            walk(span["span_id"], depth + 1)
+
+    walk(None, 0)
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="以瀑布圖顯示追蹤資料")
+    parser.add_argument("path", nargs="?", default=DEFAULT_TRACE_PATH)
+    parser.add_argument("--trace", help="trace_id (可只給開頭)；未指定時顯示最近一次追蹤")
+    parser.add_argument("--slowest", action="store_true", help="顯示總耗時最長的追蹤")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.path):
+        parser.error(f"找不到追蹤檔: {args.path}")
+    traces = load_traces(args.path)
+    if not traces:
+        print("沒有追蹤資料")
+        return
+    if args.trace:
+        matched = [spans for trace_id, spans in traces.items() if trace_id.startswith(args.trace)]
+        if not matched:
+            parser.error(f"找不到追蹤: {args.trace}")
+        spans = matched[0]
+    elif args.slowest:
+        spans = max(
+            traces.values(),
+            key=lambda s: max(x["start"] + (x["duration_ms"] or 0) / 1000 for x in s) - s[0]["start"],
+        )
+    else:
+        spans = max(traces.values(), key=lambda s: s[-1]["start"])
+    print(render_waterfall(spans))
+
+
+if __name__ == "__main__":
+    main()
@@ -59,7 +59,7 @@ def build_map_view(app_instance: 'App', view: ft.View) -> ft.View:
         )
 
     # --- 2. 初始化 & Refs ---
-    location_service = LocationService() 
+    location_service = LocationService(defer_retries=True)
 
     map_control_ref = ft.Ref[map.Map]()
     marker_layer_ref = ft.Ref[map.MarkerLayer]()
@@ -111,7 +111,7 @@ def build_map_view(app_instance: 'App', view: ft.View) -> ft.View:
             map_control_ref.current.update()
 
     def on_map_tap(e: map.MapTapEvent):
-        logger.debug(f"地圖點擊: Lat={e.coordinates.latitude}, Lon={e.coordinates.longitude}")
+        logger.debug("地圖點擊: Lat=%s, Lon=%s", e.coordinates.latitude, e.coordinates.longitude)
             
         coords = map.MapLatitudeLongitude(e.coordinates.latitude, e.coordinates.longitude)
         # 先顯示座標格式，立即更新 UI，並顯示載入指示器
@@ -125,7 +125,7 @@ def build_map_view(app_instance: 'App', view: ft.View) -> ft.View:
                 address = location_service.reverse_geocode(e.coordinates.latitude, e.coordinates.longitude)
                 if address:
                     selected_display_name.current = address
-                    logger.debug(f"反向地理編碼完成: {address}")
+                    logger.debug("反向地理編碼完成: %s", address)
                     # 更新地址顯示文字並隱藏載入指示器
                     try:
                         if selected_address_text_ref.current and selected_address_text_ref.current.page:
@@ -165,7 +165,7 @@ def build_map_view(app_instance: 'App', view: ft.View) -> ft.View:
             geocode_start = time.time()
             result = location_service.geocode(query_str, country_code="TW")
             geocode_time = time.time() - geocode_start
-            logger.debug(f"[Thread] 地理編碼耗時: {geocode_time:.3f}秒")
+            logger.debug("[Thread] 地理編碼耗時: %.3f秒", geocode_time)
             
             if result:
                 latitude, longitude, address = result
@@ -189,11 +189,11 @@ def build_map_view(app_instance: 'App', view: ft.View) -> ft.View:
                 # 移動地圖中心（一次性更新）
                 map_update_start = time.time()
                 if map_control_ref.current:
-                    logger.debug(f"[Thread] 更新地圖中心: {coords}")
+                    logger.debug("[Thread] 更新地圖中心: %s", coords)
                     map_control_ref.current.center_on(coords, zoom=16)
                     map_control_ref.current.update()
                 map_update_time = time.time() - map_update_start
-                logger.debug(f"[Thread] 地圖更新耗時: {map_update_time:.3f}秒")
+                logger.debug("[Thread] 地圖更新耗時: %.3f秒", map_update_time)
                 
                 # 隱藏搜尋載入指示器
                 if search_progress_ring_ref.current:
@@ -237,7 +237,7 @@ def build_map_view(app_instance: 'App', view: ft.View) -> ft.View:
             search_progress_ring_ref.current.visible = True
             search_progress_ring_ref.current.update()
         
-        logger.debug(f"搜尋 UI 更新完成，耗時: {time.time() - start_time:.3f}秒")
+        logger.debug("搜尋 UI 更新完成，耗時: %.3f秒", time.time() - start_time)
         
         threading.Thread(
             target=search_worker_thread,
@@ -18,6 +18,13 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+STATUS_COLORS = {
+    "pending": ft.Colors.ORANGE_300,
+    "confirmed": ft.Colors.BLUE_300,
+    "completed": ft.Colors.GREEN_300,
+    "cancelled": ft.Colors.RED_300,
+}
+
 
 def build_history_view(app_instance: 'App') -> ft.View:
     """
@@ -28,26 +35,30 @@ def build_history_view(app_instance: 'App') -> ft.View:
     
     # 使用 App 中已初始化的 Controller (保持狀態)
     controller = app_instance.history_controller
-    logger.debug(f"使用現有 HistoryController，filter_status={controller.filter_status}")
+    logger.debug("使用現有 HistoryController，filter_status=%s", controller.filter_status)
     
     # 載入訂單
     controller.load_orders()
     
     # 主容器
     main_content = ft.Container(expand=True)
+    # 目前的訂單列表與「載入更多」按鈕 (翻頁時只附加新的一頁卡片)
+    order_list_ref = ft.Ref[ft.ListView]()
+    load_more_ref = ft.Ref[ft.Container]()
     
     def _create_order_card(order):
         """創建訂單卡片"""
-        info = controller.extract_order_fields(order)
-        order_id = info["order_id"]
-        order_date = info["order_date"]
-        pickup = info["pickup"]
-        dropoff = info["dropoff"]
-        status = info["status_key"]
-        status_label = info["status_label"]
-        status_color = info["status_color"]
+        info = controller.get_order_summary(order)
+        order_id = info.order_id
+        order_date = info.order_date
+        pickup = info.pickup
+        dropoff = info.dropoff
+        status = info.status_key
+        status_label = info.status_label
+        status_color = STATUS_COLORS.get(status, ft.Colors.GREY_300)
         
         return ft.Container(
+            data=order_id,
             padding=15,
             bgcolor=ft.Colors.WHITE,
             border_radius=10,
@@ -150,6 +161,24 @@ def build_history_view(app_instance: 'App') -> ft.View:
             )
         )
     
+    def _build_load_more():
+        """列表尾端的「載入更多」按鈕，沒有下一頁時隱藏"""
+        return ft.Container(
+            ref=load_more_ref,
+            visible=controller.has_more,
+            alignment=ft.alignment.center,
+            content=ft.TextButton(
+                text="載入更多",
+                icon=ft.Icons.EXPAND_MORE,
+                on_click=controller.load_more  # 委派給 Controller
+            )
+        )
+
+    def _on_scroll(e: ft.OnScrollEvent):
+        """捲動接近底部時自動載入下一頁"""
+        if controller.has_more and e.max_scroll_extent and e.pixels >= e.max_scroll_extent - 200:
+            controller.load_more(e)
+
     def _build_content():
         """建立內容區域"""
         
@@ -185,11 +214,12 @@ def build_history_view(app_instance: 'App') -> ft.View:
             scroll=ft.ScrollMode.AUTO
         )
         
-        # 訂單列表
+        # 訂單列表 (只建立已載入頁面的卡片)
         order_cards = []
         if controller.orders:
             for order in controller.orders:
                 order_cards.append(_create_order_card(order))
+            order_cards.append(_build_load_more())
         else:
             # 空狀態
             order_cards.append(
@@ -260,10 +290,12 @@ def build_history_view(app_instance: 'App') -> ft.View:
                     
                     # 訂單列表
                     ft.Container(
-                        content=ft.Column(
+                        content=ft.ListView(
+                            ref=order_list_ref,
                             controls=order_cards,
                             spacing=15,
-                            scroll=ft.ScrollMode.AUTO
+                            on_scroll=_on_scroll,
+                            on_scroll_interval=100,
                         ),
                         expand=True
                     )
@@ -275,10 +307,44 @@ def build_history_view(app_instance: 'App') -> ft.View:
     def update_view(self=None):
         """更新 View 內容（由 Controller 調用）"""
         main_content.content = _build_content()
-        main_content.update()
+        if main_content.page:
+            main_content.update()
+
+    def append_orders(self=None, orders=None):
+        """附加下一頁的訂單卡片（由 Controller 調用），不重建既有卡片"""
+        order_list = order_list_ref.current
+        if order_list is None:
+            return
+        load_more = load_more_ref.current
+        insert_at = len(order_list.controls) - 1 if load_more is not None else len(order_list.controls)
+        order_list.controls[insert_at:insert_at] = [_create_order_card(order) for order in orders or []]
+        if load_more is not None:
+            load_more.visible = controller.has_more
+        if order_list.page:
+            order_list.update()
+    
+    def update_order(self=None, order_id=None, order=None):
+        """只替換 / 移除 / 插入單一訂單卡片（由 Controller 調用）"""
+        order_list = order_list_ref.current
+        if order_list is None:
+            return
+        index = next((i for i, card in enumerate(order_list.controls) if card.data == order_id), None)
+        if order is None:
+            if index is not None:
+                del order_list.controls[index]
+        elif index is not None:
+            order_list.controls[index] = _create_order_card(order)
+        else:
+            order_list.controls.insert(0, _create_order_card(order))
+        if order_list.page:
+            order_list.update()
     
-    # 綁定 update_view 到 controller
-    controller.bind_view(type('ViewUpdater', (), {'update_view': update_view})())
+    # 綁定 update_view / append_orders / update_order 到 controller
+    controller.bind_view(type('ViewUpdater', (), {
+        'update_view': update_view,
+        'append_orders': append_orders,
+        'update_order': update_order,
+    })())
     
     # 設置初始內容（不調用 update）
     main_content.content = _build_content()
@@ -29,7 +29,7 @@ def build_instant_booking_view(app_instance: 'App') -> ft.View:
     
     # 使用 App 中已初始化的 Controller (保持狀態)
     controller = app_instance.instant_booking_controller
-    logger.debug(f"使用現有 InstantBookingController，scan_confirmed={controller.scan_confirmed}")
+    logger.debug("使用現有 InstantBookingController，scan_confirmed=%s", controller.scan_confirmed)
     
     # 主容器 (用於動態切換內容)
     main_content = ft.Container(expand=True)
@@ -28,21 +28,19 @@ def build_previous_booking_view(app_instance: 'App') -> ft.View:
     
     # 使用 App 中已初始化的 Controller (保持狀態)
     controller = app_instance.previous_booking_controller
-    logger.debug(f"使用現有 PreviousBookingController，current_step={controller.current_step}")
+    logger.debug("使用現有 PreviousBookingController，current_step=%s", controller.current_step)
     
-    # 載入飯店資料
-    from services import BookingService
-    all_hotels = BookingService.load_hotels()
-    # 建立飯店字典 {"飯店名稱": {"地址", "is_partner", ...}}
-    hotel_dict = {}
-    for hotel in all_hotels:
-        name = hotel.get('name', '')
-        address = hotel.get('address', '')
-        hotel_dict[name] = {
-            'address': address,
-            'is_partner': hotel.get('is_partner', False),
-            'full_text': f"{name} ({address})"
-        }
+    from services import CatalogService
+
+    def _hotel_suggestions():
+        """飯店搜尋建議 (建立在共用目錄快照上，所有 session 與住宿段落共用同一份唯讀列表)"""
+        return CatalogService.current().index(
+            "hotel_autocomplete_suggestions",
+            lambda catalog: [
+                ft.AutoCompleteSuggestion(key=name, value=f"{name} ({hotel['address']})")
+                for name, hotel in catalog.hotel_lookup.items()
+            ],
+        )
     
     # 主容器
     main_content = ft.Container(expand=True)
@@ -277,13 +275,7 @@ def build_previous_booking_view(app_instance: 'App') -> ft.View:
                         controls=[
                             ft.Text("住宿地點 / 飯店名稱", size=12, color=ft.Colors.GREY_700),
                             ft.AutoComplete(
-                                suggestions=[
-                                    ft.AutoCompleteSuggestion(
-                                        key=name,
-                                        value=hotel_info['full_text']
-                                    )
-                                    for name, hotel_info in hotel_dict.items()
-                                ],
+                                suggestions=_hotel_suggestions(),
                                 suggestions_max_height=100,
                                 visible=True,
                                 on_select=on_hotel_select,
@@ -558,7 +550,8 @@ def build_previous_booking_view(app_instance: 'App') -> ft.View:
             3: _build_step3_confirm
         }.get(controller.current_step, _build_step1_landing)()
         
-        main_content.update()
+        if main_content.page:
+            main_content.update()
         logger.debug("事先預約 View 更新完成")
     
     # 綁定 update_view 到 controller